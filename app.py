@@ -8,9 +8,12 @@ import os
 import sys
 import subprocess
 import threading
+import queue
 import time
 import json
 import re
+import gc
+import tracemalloc
 import shlex
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -21,7 +24,15 @@ import requests
 from urllib.parse import urljoin
 import settings
 from scheduler import get_scheduler, start_scheduler, stop_scheduler
-import queue
+from maintenance import get_maintenance, start_maintenance, stop_maintenance
+from script_registry import get_script_registry
+from sse_broker import get_sse_broker
+from log_stream import get_log_streams
+from script_events import EVENTS_FD_ENV, parse_event, parse_log_line, progress_state
+from execution_output import EXECUTION_OUTPUT_TTL_SECONDS, get_output_store
+from output_capture import get_output_capture
+from executor import get_executor, start_executor
+from backup import BACKUP_DIR, BACKUP_KEEP, BACKUP_INTERVAL_HOURS, create_backup, list_backups, find_backup, backup_in_progress
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'soulseekarr-music-tools-secret-key-2025'
@@ -32,18 +43,24 @@ logger = logging.getLogger(__name__)
 
 # Initialize database early and ensure migrations complete
 logger.info("Initializing database with migrations...")
-from database import get_db
+from database import get_db, EXPIRING_ALBUM_SORTS
 db = get_db()  # This will trigger lazy initialization and complete migrations
 logger.info("Database initialization complete")
 
 # Disable Werkzeug access logging to reduce noise
 logging.getLogger('werkzeug').setLevel(logging.WARNING)
 
-# Global variables to track script execution
+# Global variables to track script execution. Output is held per run in
+# bounded ring buffers; finished runs are evicted after a while
 running_scripts = {}
-script_outputs = {}
+output_store = get_output_store()
+# One thread reads the output pipes of every running script
+output_capture = get_output_capture()
 script_lock = threading.Lock()
 
+STATE_PRUNE_INTERVAL = 60  # Seconds between sweeps of finished runs' in-memory state
+MEMORY_TRACE = os.environ.get('MEMORY_TRACE', '').lower() in ('1', 'true', 'yes')  # tracemalloc for /api/debug/memory
+
 # Database instance
 db = get_db()
 
@@ -51,11 +68,12 @@ db = get_db()
 script_execution_history = {}
 script_history_lock = threading.Lock()
 
-# Global variables for cron queue management
+# Global variables for cron queue management. Items run one after another,
+# each handed to the executor when the one before it has finished
 cron_queue = []
 cron_running = False
 cron_queue_lock = threading.Lock()
-cron_runner_thread = None
+CRON_ITEM_GAP_SECONDS = 2  # Pause between cron queue items
 
 # Global variable for service status cache
 service_status_cache = {
@@ -65,85 +83,98 @@ service_status_cache = {
 }
 service_status_lock = threading.Lock()
 
-# SSE Management
-sse_queues = []
-sse_lock = threading.Lock()
+# SSE Management: the broker encodes each event once and keeps the versioned
+# dashboard state that clients receive as a snapshot followed by deltas
+sse_broker = get_sse_broker()
+
+# Live execution logs: committed log batches are pushed to the viewers of each execution
+log_streams = get_log_streams()
+
+# Every script run (manual, scheduled, cron queue) goes through the executor's
+# bounded worker pool and per-resource limits
+executor = get_executor()
+
+STATUS_BROADCAST_INTERVAL = 1.0  # Seconds between dashboard state checks
 
 def broadcast_event(event_type, data):
     """Broadcast an event to all connected SSE clients."""
-    with sse_lock:
-        dead_queues = []
-        for q in sse_queues:
-            try:
-                q.put({
-                    'type': event_type,
-                    'data': data
-                })
-            except Exception:
-                dead_queues.append(q)
-        
-        # Clean up dead queues
-        for q in dead_queues:
-            if q in sse_queues:
-                sse_queues.remove(q)
+    sse_broker.publish(event_type, data)
+
+def collect_running_scripts_state():
+    """JSON-ready status of the scripts that are running, with parsed progress."""
+    running = {}
+    with script_lock:
+        for script_id, status in running_scripts.items():
+            if status.get('running'):
+                # Progress is kept up to date by the script's output reader
+                state = status.copy()
+                # Convert datetime objects to strings
+                for key in ('start_time', 'end_time'):
+                    if isinstance(state.get(key), datetime):
+                        state[key] = state[key].isoformat()
+                running[script_id] = state
+    return running
+
+def collect_execution_queue_state():
+    """The 20 most recent executions as shown in the queue panel."""
+    return [{
+        'scriptId': execution.script_id,
+        'name': execution.script_name,
+        'startTime': execution.start_time.isoformat(),
+        'endTime': execution.end_time.isoformat() if execution.end_time else None,
+        'status': execution.status,
+        'duration_seconds': execution.duration_seconds,
+        'dry_run': execution.dry_run,
+        'execution_id': execution.id,
+        'note': execution.error_message if execution.status == 'coalesced' else None
+    } for execution in db.get_execution_queue(limit=20)]
+
+def prune_script_state():
+    """Forget runs that finished more than EXECUTION_OUTPUT_TTL_SECONDS ago."""
+    cutoff = datetime.now() - timedelta(seconds=EXECUTION_OUTPUT_TTL_SECONDS)
+    with script_lock:
+        stale = [script_id for script_id, status in running_scripts.items()
+                 if not status.get('running') and isinstance(status.get('end_time'), datetime)
+                 and status['end_time'] < cutoff]
+        for script_id in stale:
+            del running_scripts[script_id]
+    output_store.prune()
 
 def status_broadcaster():
-    """Background thread to broadcast status updates to SSE clients."""
-    last_state = {}
+    """Background thread that publishes dashboard state changes to SSE clients."""
+    execution_queue = []
+    data_version = None
+    last_prune = time.monotonic()
     
     while True:
         try:
-            # Collect current state
-            current_state = {
-                'running_scripts': {},
-                'execution_queue': []
-            }
+            if time.monotonic() - last_prune >= STATE_PRUNE_INTERVAL:
+                prune_script_state()
+                last_prune = time.monotonic()
             
-            # Get running scripts status
-            with script_lock:
-                for script_id, status in running_scripts.items():
-                    if status.get('running'):
-                        # Add progress if available
-                        if script_id in script_outputs:
-                            progress = parse_progress(script_outputs[script_id], script_id)
-                            if progress:
-                                status['progress'] = progress
-                        current_state['running_scripts'][script_id] = status.copy()
-                        # Convert datetime objects to strings
-                        if 'start_time' in current_state['running_scripts'][script_id]:
-                            dt = current_state['running_scripts'][script_id]['start_time']
-                            if isinstance(dt, datetime):
-                                current_state['running_scripts'][script_id]['start_time'] = dt.isoformat()
-                        if 'end_time' in current_state['running_scripts'][script_id]:
-                            dt = current_state['running_scripts'][script_id]['end_time']
-                            if isinstance(dt, datetime):
-                                current_state['running_scripts'][script_id]['end_time'] = dt.isoformat()
-
-            # Get execution queue
-            try:
-                # We can't easily detect changes in DB without querying, 
-                # but querying every second is cheap for SQLite WAL
-                executions = db.get_execution_queue(limit=20)
-                queue_items = []
-                for execution in executions:
-                    queue_items.append({
-                        'scriptId': execution['script_id'],
-                        'name': execution['script_name'],
-                        'startTime': execution['start_time'].isoformat(),
-                        'endTime': execution['end_time'].isoformat() if execution['end_time'] else None,
-                        'status': execution['status'],
-                        'duration_seconds': execution['duration_seconds'],
-                        'dry_run': execution['dry_run'],
-                        'execution_id': execution['id']
-                    })
-                current_state['execution_queue'] = queue_items
-            except Exception as e:
-                logger.error(f"Error getting execution queue for broadcast: {e}")
-
-            # Broadcast update
-            broadcast_event('status_update', current_state)
+            # No dashboard connected: don't query or diff state until one is
+            if not sse_broker.wait_for_subscribers(timeout=STATE_PRUNE_INTERVAL):
+                continue
             
-            time.sleep(1)
+            running = collect_running_scripts_state()
+            
+            # Only re-read the queue after something was committed to the database
+            current_version = db.get_data_version()
+            if current_version != data_version:
+                try:
+                    execution_queue = collect_execution_queue_state()
+                    data_version = current_version
+                except Exception as e:
+                    logger.error(f"Error getting execution queue for broadcast: {e}")
+            
+            # Sends a delta only when the state differs from the last one published
+            sse_broker.publish_state({
+                'running_scripts': running,
+                'execution_queue': execution_queue,
+                'run_queue': executor.get_queue()
+            })
+            
+            time.sleep(STATUS_BROADCAST_INTERVAL)
             
         except Exception as e:
             logger.error(f"Error in status broadcaster: {e}")
@@ -151,28 +182,13 @@ def status_broadcaster():
 
 @app.route('/api/events')
 def sse_events():
-    """Server-Sent Events endpoint."""
-    def stream():
-        q = queue.Queue()
-        with sse_lock:
-            sse_queues.append(q)
-        
-        try:
-            while True:
-                try:
-                    # Wait for new event
-                    event = q.get(timeout=20) # Keep-alive timeout
-                    yield f"event: {event['type']}\n"
-                    yield f"data: {json.dumps(event['data'])}\n\n"
-                except queue.Empty:
-                    # Send keep-alive comment
-                    yield ": keep-alive\n\n"
-        except GeneratorExit:
-            with sse_lock:
-                if q in sse_queues:
-                    sse_queues.remove(q)
-
-    return Response(stream(), mimetype='text/event-stream')
+    """Server-Sent Events endpoint: a state snapshot (or missed deltas on resume), then deltas."""
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    return Response(
+        sse_broker.stream(last_event_id),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 def test_navidrome_service():
     """Test Navidrome service connectivity."""
@@ -440,207 +456,112 @@ def get_script_status(script_id):
                 # Update in-memory status
                 running_scripts[script_id] = status
         
-        # Parse progress from output for long-running scripts
-        if status.get('running') and script_id in script_outputs:
-            output_lines = script_outputs[script_id]
-            progress_info = parse_progress(output_lines, script_id)
-            if progress_info:
-                status['progress'] = progress_info
-        
         return status
 
-def parse_progress(output_lines, script_id):
-    """Parse progress information from script output."""
-    # Look for progress patterns in recent output lines
-    main_progress = None
-    sub_progress = None
+def parse_progress_line(line):
+    """Parse a progress marker from one line of script output.
     
-    for line in reversed(output_lines[-50:]):  # Check last 50 lines
-        # Strip timestamp prefix if present (e.g., "[19:43:50] PROGRESS: ...")
-        clean_line = line
-        if line.startswith('[') and '] ' in line:
-            clean_line = line.split('] ', 1)[1] if '] ' in line else line
-        
-        # Main progress pattern: PROGRESS: [123/456] 67% - Processing: Artist - Album
-        if clean_line.startswith('PROGRESS: [') and '%' in clean_line and ' - Processing:' in clean_line:
-            try:
-                # Extract [current/total] percentage
-                bracket_part = clean_line.split('[')[1].split(']')[0]
-                current, total = bracket_part.split('/')
-                percentage_part = clean_line.split('] ')[1].split('%')[0]
-                percentage = int(percentage_part)
-                
-                # Extract current item being processed
-                processing_part = clean_line.split(' - Processing: ')[1] if ' - Processing: ' in clean_line else 'Processing...'
-                
-                main_progress = {
-                    'current': int(current),
-                    'total': int(total),
-                    'percentage': percentage,
-                    'current_item': processing_part.strip()
-                }
-                break
-            except (IndexError, ValueError):
-                continue
-        
-        # Sub-progress pattern: PROGRESS_SUB: Getting track listing for Album Name...
-        elif clean_line.startswith('PROGRESS_SUB: ') and not sub_progress:
-            try:
-                sub_progress = {
-                    'message': clean_line.replace('PROGRESS_SUB: ', '').strip()
-                }
-            except:
-                continue
-        
-        # Legacy pattern: [123/456] Processing: Artist Name
-        elif '[' in clean_line and '/' in clean_line and '] Processing:' in clean_line and not main_progress:
-            try:
-                # Extract numbers like [123/456]
-                parts = clean_line.split('[')[1].split(']')[0].split('/')
-                current = int(parts[0])
-                total = int(parts[1])
-                percentage = int((current / total) * 100)
-                main_progress = {
-                    'current': current,
-                    'total': total,
-                    'percentage': percentage,
-                    'current_item': 'Processing...'
-                }
-                break
-            except (IndexError, ValueError):
-                continue
+    Returns ('progress', info) for a main progress line, ('sub_progress', info) for
+    a sub-progress line, or None.
+    """
+    # Main progress pattern: PROGRESS: [123/456] 67% - Processing: Artist - Album
+    if line.startswith('PROGRESS: [') and '%' in line and ' - Processing:' in line:
+        try:
+            # Extract [current/total] percentage
+            bracket_part = line.split('[')[1].split(']')[0]
+            current, total = bracket_part.split('/')
+            percentage = int(line.split('] ')[1].split('%')[0])
+            
+            # Extract current item being processed
+            processing_part = line.split(' - Processing: ')[1] if ' - Processing: ' in line else 'Processing...'
+            
+            return 'progress', {
+                'current': int(current),
+                'total': int(total),
+                'percentage': percentage,
+                'current_item': processing_part.strip()
+            }
+        except (IndexError, ValueError):
+            return None
     
-    # Return combined progress information
-    if main_progress or sub_progress:
-        result = {}
-        if main_progress:
-            result.update(main_progress)
-        if sub_progress:
-            result['sub_progress'] = sub_progress
-        return result
+    # Sub-progress pattern: PROGRESS_SUB: Getting track listing for Album Name...
+    if line.startswith('PROGRESS_SUB: '):
+        return 'sub_progress', {'message': line.replace('PROGRESS_SUB: ', '').strip()}
+    
+    # Legacy pattern: [123/456] Processing: Artist Name
+    if '[' in line and '/' in line and '] Processing:' in line:
+        try:
+            # Extract numbers like [123/456]
+            parts = line.split('[')[1].split(']')[0].split('/')
+            current = int(parts[0])
+            total = int(parts[1])
+            return 'progress', {
+                'current': current,
+                'total': total,
+                'percentage': int((current / total) * 100),
+                'current_item': 'Processing...'
+            }
+        except (IndexError, ValueError, ZeroDivisionError):
+            return None
     
     return None
 
+def apply_progress(script_id, kind, info):
+    """Record a progress update for a running script.
+    
+    A main progress update replaces any sub-progress, which only describes a
+    step of the current item. New dicts are stored each time so states already
+    handed to the SSE broker are not changed underneath it.
+    """
+    with script_lock:
+        status = running_scripts.get(script_id)
+        if status is None:
+            return
+        if kind == 'progress':
+            status['progress'] = info
+        else:
+            status['progress'] = dict(status.get('progress') or {}, sub_progress=info)
+
+def apply_script_events(lines, script_id, structured_progress):
+    """Apply a batch of lines read from a script's events pipe."""
+    for line in lines:
+        event = parse_event(line)
+        if event is None:
+            continue
+        event_type = event['type']
+        if event_type == 'progress':
+            info = progress_state(event)
+            if info:
+                structured_progress.set()
+                apply_progress(script_id, 'progress', info)
+        elif event_type == 'sub_progress':
+            structured_progress.set()
+            apply_progress(script_id, 'sub_progress', {'message': str(event.get('message', ''))})
+        else:
+            with script_lock:
+                status = running_scripts.get(script_id)
+                if status is None:
+                    continue
+                if event_type == 'metric':
+                    status['metrics'] = dict(status.get('metrics') or {}, **{str(event.get('name')): event.get('value')})
+                else:
+                    # Items completed, counted by status (ok, skipped, failed, ...)
+                    items = dict(status.get('items') or {})
+                    item_status = str(event.get('status') or 'ok')
+                    items[item_status] = items.get(item_status, 0) + 1
+                    status['items'] = items
+
 def find_script_config(script_id):
     """Find script configuration from discovered scripts only."""
     # Only check discovered scripts from the scripts folder
-    discovered_scripts = scan_scripts_folder()
-    if script_id in discovered_scripts:
-        return discovered_scripts[script_id]
-    
-    return None
+    return get_script_registry().get(script_id)
 
 def scan_scripts_folder():
-    """Scan the scripts folder and return information about available Python scripts."""
-    # Scripts folder path
-    scripts_dir = os.path.join(os.getcwd(), 'scripts')
-    
-    discovered_scripts = {}
-    
-    try:
-        if not os.path.exists(scripts_dir):
-            logger.warning(f"Scripts directory not found: {scripts_dir}")
-            return discovered_scripts
-        
-        logger.debug(f"Using scripts directory: {scripts_dir}")
-        
-        for filename in os.listdir(scripts_dir):
-            # Skip system files, hidden files, and Python cache files
-            if (filename.endswith('.py') and 
-                not filename.startswith('__') and 
-                not filename.startswith('._') and 
-                not filename.startswith('.') and
-                filename != '__pycache__'):
-                script_id = filename[:-3]  # Remove .py extension
-                script_path = os.path.join(scripts_dir, filename)
-                
-                # Extract metadata from script
-                metadata = extract_script_metadata(script_path)
-                
-                discovered_scripts[script_id] = {
-                    'name': metadata.get('name', script_id.replace('_', ' ').title()),
-                    'description': metadata.get('description', 'Python script'),
-                    'script': f'python3 -u scripts/{filename}',
-                    'supports_dry_run': metadata.get('supports_dry_run', True),
-                    'section': metadata.get('section', 'commands'),
-                    'author': metadata.get('author', ''),
-                    'version': metadata.get('version', ''),
-                    'tags': metadata.get('tags', [])
-                }
-                
-        logger.debug(f"Discovered {len(discovered_scripts)} scripts in {scripts_dir}")
-        
-    except Exception as e:
-        logger.error(f"Error scanning scripts folder: {e}")
+    """Information about the available Python scripts in the scripts folder.
     
-    return discovered_scripts
-
-def extract_script_metadata(script_path):
-    """Extract metadata from a Python script's docstring and comments."""
-    metadata = {
-        'name': None,
-        'description': 'Python script',
-        'supports_dry_run': True,
-        'section': 'commands',
-        'author': '',
-        'version': '',
-        'tags': []
-    }
-    
-    try:
-        with open(script_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Look for module docstring
-        if '"""' in content:
-            start = content.find('"""')
-            if start != -1:
-                end = content.find('"""', start + 3)
-                if end != -1:
-                    docstring = content[start + 3:end].strip()
-                    lines = docstring.split('\n')
-                    
-                    # First line is usually the description
-                    if lines:
-                        first_line = lines[0].strip()
-                        if first_line:
-                            metadata['description'] = first_line
-                    
-                    # Look for metadata in docstring
-                    for line in lines:
-                        line = line.strip()
-                        if line.startswith('Name:'):
-                            metadata['name'] = line[5:].strip()
-                        elif line.startswith('Author:'):
-                            metadata['author'] = line[7:].strip()
-                        elif line.startswith('Version:'):
-                            metadata['version'] = line[8:].strip()
-                        elif line.startswith('Section:'):
-                            metadata['section'] = line[8:].strip().lower()
-                        elif line.startswith('Tags:'):
-                            tags = line[5:].strip()
-                            metadata['tags'] = [tag.strip() for tag in tags.split(',') if tag.strip()]
-                        elif line.startswith('Supports dry run:'):
-                            supports = line[17:].strip().lower()
-                            metadata['supports_dry_run'] = supports in ['true', 'yes', '1']
-        
-        # Check for specific patterns in code
-        if '--dry-run' in content or 'DRY_RUN' in content:
-            metadata['supports_dry_run'] = True
-        elif 'dry_run' not in content.lower():
-            metadata['supports_dry_run'] = False
-            
-        # Determine section based on filename patterns
-        filename = os.path.basename(script_path).lower()
-        if 'test' in filename or 'validate' in filename:
-            metadata['section'] = 'tests'
-        elif 'monitor' in filename or 'queue' in filename or 'process' in filename:
-            metadata['section'] = 'commands'
-            
-    except Exception as e:
-        logger.warning(f"Could not extract metadata from {script_path}: {e}")
-    
-    return metadata
+    Served from the script registry, which only re-reads files that changed.
+    """
+    return get_script_registry().get_all()
 
 def get_script_execution_history(script_id):
     """Get execution history for a script."""
@@ -671,19 +592,25 @@ def update_script_execution_history(script_id, start_time, end_time, status):
             'last_status': status
         })
 
-def run_script_thread(script_id, script_path, input_value=None, script_env=None):
-    """Run a script in a separate thread and capture output."""
+def run_script_thread(script_id, script_path, input_value=None, script_env=None, run_name=None, timeout=None,
+                      cwd=None):
+    """Run a script and capture its output; returns its exit code (-1 when it could not run).
+    
+    Used for manual runs, cron items and, through the scheduler, for scheduled ones.
+    ``run_name`` is the name the run is recorded under, a run still going after
+    ``timeout`` seconds is killed, and ``cwd`` defaults to the app's working directory.
+    """
     start_time = datetime.now()
     execution_id = None
+    output = None
     
     try:
         # Import action logger
         from action_logger import log_script_start, log_script_complete
         
         # Log script start
-        discovered_scripts = scan_scripts_folder()
-        script_config = discovered_scripts.get(script_id, {})
-        script_name = script_config.get('name', script_id)
+        script_config = find_script_config(script_id) or {}
+        script_name = run_name or script_config.get('name', script_id)
         log_script_start(script_name, input_value)
         
         with script_lock:
@@ -697,18 +624,23 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
                 'end_time': None,
                 'dry_run': is_dry_run
             }
-            script_outputs[script_id] = []
+        output = output_store.open(script_id)
 
         logger.debug(f"Starting script: {script_path}")
         
         # Handle Python scripts differently from shell scripts
         if script_path.startswith('python'):
-            # For Python commands like "python -u script.py" or "python -u script.py --flag"
-            cmd = script_path.split()
+            # For Python commands like "python -u script.py" or "python -u script.py --flag";
+            # paths containing spaces are quoted (shlex.quote)
+            cmd = shlex.split(script_path)
             # Don't try to make Python scripts executable or use shell wrapper
-        else:
+        elif os.path.exists(script_path):
+            # A bare executable path, which may itself contain spaces.
             # For shell scripts on Windows, we'll use shell=True in Popen
             cmd = [script_path]
+        else:
+            # Any other command line, such as "/bin/bash '/app/scripts/job.sh'"
+            cmd = shlex.split(script_path)
         
         # Use provided environment or copy current one
         if script_env is None:
@@ -739,7 +671,6 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
                 if script_env.get('DRY_RUN') == 'true':
                     cmd.append('--dry-run')
             else:
-                cmd = [script_path]
                 if input_value.strip().startswith('-'):
                     try:
                         cmd.extend(shlex.split(input_value))
@@ -748,9 +679,7 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
                 else:
                     cmd.append(input_value)
         else:
-            if not script_path.startswith('python'):
-                cmd = [script_path]
-            else:
+            if script_path.startswith('python'):
                 # For Python scripts without input, just add dry-run if needed
                 if script_env.get('DRY_RUN') == 'true':
                     cmd.append('--dry-run')
@@ -759,16 +688,32 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
         # Use shell=True on Windows for better compatibility
         shell_needed = not script_path.startswith('python') and os.name == 'nt'
         
-        process = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            universal_newlines=True,
-            bufsize=1,
-            cwd=os.getcwd(),
-            env=script_env,
-            shell=shell_needed
-        )
+        # Structured events (progress, metrics, items) arrive on a pipe of
+        # their own; scripts find its descriptor in the environment
+        events_read_fd = events_write_fd = None
+        if os.name != 'nt':
+            events_read_fd, events_write_fd = os.pipe()
+            script_env = dict(script_env, **{EVENTS_FD_ENV: str(events_write_fd)})
+        
+        try:
+            # Binary pipes: the output capture reads and decodes them in chunks
+            process = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=cwd or os.getcwd(),
+                env=script_env,
+                shell=shell_needed,
+                pass_fds=(events_write_fd,) if events_write_fd is not None else ()
+            )
+        except Exception:
+            if events_read_fd is not None:
+                os.close(events_read_fd)
+            raise
+        finally:
+            # Only the script holds the write end, so the pipe closes when it exits
+            if events_write_fd is not None:
+                os.close(events_write_fd)
         
         # Start execution tracking in database
         execution_id = db.start_execution(script_id, script_name, is_dry_run, process.pid)
@@ -776,72 +721,110 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
         with script_lock:
             running_scripts[script_id]['pid'] = process.pid
             running_scripts[script_id]['execution_id'] = execution_id
+        output_store.set_execution(output, execution_id)
+        # A newer run with the cancel-older policy stops this one through its lease
+        executor.leases.attach(script_id, pid=process.pid, execution_id=execution_id)
 
-        # Read output line by line with buffering for database
+        # Log lines are buffered for the database
         log_buffer = []
+        log_lock = threading.Lock()
         last_flush_time = time.time()
         
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                current_time = datetime.now()
-                timestamp_str = current_time.strftime('%H:%M:%S')
-                output_line = f"[{timestamp_str}] {line.rstrip()}"
+        def flush_log_buffer(block=False):
+            """Queue the buffered lines for the database writer and live viewers (log_lock held).
+            
+            Called from the shared output reader, which must never wait on the writer:
+            when the write queue is full the lines stay buffered for the next flush.
+            """
+            nonlocal log_buffer, last_flush_time
+            entries, log_buffer = log_buffer, []
+            last_flush_time = time.time()
+            if not entries:
+                return
+            try:
+                future = db.add_log_lines_batch(execution_id, entries, wait=False, block=block)
+                new_lines = [f"[{entry['timestamp'].strftime('%H:%M:%S')}] {entry['content']}" for entry in entries]
+                # Live viewers get the lines once the writer has numbered and committed them
+                log_streams.publish_on_commit(execution_id, future, new_lines)
                 
-                # Determine log level
-                log_level = 'info'
-                line_lower = line.lower()
-                if 'error' in line_lower or 'exception' in line_lower or 'failed' in line_lower:
-                    log_level = 'error'
-                elif 'warning' in line_lower or 'warn' in line_lower:
-                    log_level = 'warning'
+                # Also keep the tail in memory (the ring buffer drops the oldest lines)
+                output_store.append(output, new_lines)
+            except queue.Full:
+                # Writer is behind (a slow commit, VACUUM or backup); retry with the next lines
+                log_buffer = entries + log_buffer
+            except Exception as db_err:
+                logger.error(f"Error writing logs: {db_err}")
+        
+        def add_log_entries(entries):
+            with log_lock:
+                log_buffer.extend(entries)
+                # Flush buffer if full or time elapsed
+                if len(log_buffer) >= 100 or time.time() - last_flush_time >= 1.0:
+                    flush_log_buffer()
+        
+        # Set once the script reports progress as events; its text is then not scanned
+        structured_progress = threading.Event()
+        
+        def handle_output(lines, timestamp):
+            """A chunk's worth of output lines, all stamped with the chunk's arrival time."""
+            entries = []
+            for line in lines:
+                content = line.rstrip()
                 
-                # Add to buffer
-                if execution_id:
-                    log_buffer.append({
-                        'content': line.rstrip(),
-                        'log_level': log_level,
-                        'timestamp': current_time
-                    })
+                # Lines from script_events.log() carry their level; others are guessed
+                tagged = parse_log_line(content)
+                if tagged:
+                    log_level, content = tagged
+                else:
+                    log_level = 'info'
+                    line_lower = content.lower()
+                    if 'error' in line_lower or 'exception' in line_lower or 'failed' in line_lower:
+                        log_level = 'error'
+                    elif 'warning' in line_lower or 'warn' in line_lower:
+                        log_level = 'warning'
                 
-                # Flush buffer if full or time elapsed
-                # Increased batch size to 100 to reduce I/O and locking frequency
-                if execution_id and (len(log_buffer) >= 100 or time.time() - last_flush_time >= 1.0):
-                    try:
-                        db.add_log_lines_batch(execution_id, log_buffer)
-                        
-                        # Also update in-memory logs in batch to reduce lock contention
-                        with script_lock:
-                            # Extract content lines for in-memory display
-                            new_lines = [f"[{entry['timestamp'].strftime('%H:%M:%S')}] {entry['content']}" for entry in log_buffer]
-                            script_outputs[script_id].extend(new_lines)
-                            # Keep only last 1000 lines
-                            if len(script_outputs[script_id]) > 1000:
-                                script_outputs[script_id] = script_outputs[script_id][-1000:]
-                                
-                        log_buffer = []
-                        last_flush_time = time.time()
-                    except Exception as db_err:
-                        logger.error(f"Error writing logs: {db_err}")
-                        log_buffer = []
-                        last_flush_time = time.time()
+                # Progress markers are parsed once, as the line arrives
+                if not structured_progress.is_set():
+                    update = parse_progress_line(content)
+                    if update:
+                        apply_progress(script_id, *update)
                 
-                # Removed per-line script_lock acquisition
-                # with script_lock:
-                #    script_outputs[script_id].append(output_line)
-                #    ...
-
-        # Flush remaining logs
-        if execution_id and log_buffer:
-            try:
-                db.add_log_lines_batch(execution_id, log_buffer)
-                with script_lock:
-                    new_lines = [f"[{entry['timestamp'].strftime('%H:%M:%S')}] {entry['content']}" for entry in log_buffer]
-                    script_outputs[script_id].extend(new_lines)
-                    if len(script_outputs[script_id]) > 1000:
-                        script_outputs[script_id] = script_outputs[script_id][-1000:]
-            except Exception as db_err:
-                logger.error(f"Error flushing final logs: {db_err}")
-            log_buffer = []
+                entries.append({'content': content, 'log_level': log_level, 'timestamp': timestamp})
+            # A completed line replaces the one being rewritten
+            output_store.set_pending(output, None)
+            add_log_entries(entries)
+        
+        def handle_pending(text, timestamp):
+            """A line rewritten in place with carriage returns (a progress bar): shown, not logged."""
+            content = text.rstrip()
+            if not structured_progress.is_set():
+                update = parse_progress_line(content)
+                if update:
+                    apply_progress(script_id, *update)
+            output_store.set_pending(output, f"[{timestamp.strftime('%H:%M:%S')}] {content}" if content else None)
+        
+        # Both pipes are served by the shared capture thread rather than a thread each
+        stdout_capture = output_capture.watch(process.stdout, handle_output, handle_pending)
+        events_capture = None
+        if events_read_fd is not None:
+            events_capture = output_capture.watch(
+                os.fdopen(events_read_fd, 'rb', buffering=0),
+                lambda lines, timestamp: apply_script_events(lines, script_id, structured_progress)
+            )
+        if not stdout_capture.wait(timeout):
+            add_log_entries([{'content': f"Script timed out after {timeout} seconds, stopping it",
+                              'log_level': 'error', 'timestamp': datetime.now()}])
+            logger.error(f"Script {script_id} timed out after {timeout} seconds")
+            process.kill()
+            stdout_capture.wait()
+
+        # Collect the last events, then flush remaining logs
+        if events_capture is not None and not events_capture.wait(timeout=5):
+            # A child of the script still holds the pipe open
+            logger.warning(f"Events pipe of {script_id} still open after its output ended")
+        with log_lock:
+            # Off the reader thread now, so wait for room in the write queue
+            flush_log_buffer(block=True)
 
         # Wait for process to complete
         process.wait()
@@ -855,11 +838,14 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
         
         # Store completion in database
         if execution_id:
-            db.add_log_line(execution_id, f"Script completed with exit code: {return_code}")
+            future = db.add_log_line(execution_id, f"Script completed with exit code: {return_code}", wait=False)
+            log_streams.publish_on_commit(execution_id, future, [completion_msg])
             db.finish_execution(execution_id, return_code)
+            log_streams.finish(execution_id)
         
+        output_store.append(output, [completion_msg])
+        output_store.finish(output)
         with script_lock:
-            script_outputs[script_id].append(completion_msg)
             running_scripts[script_id]['running'] = False
             running_scripts[script_id]['end_time'] = end_time
             running_scripts[script_id]['return_code'] = return_code
@@ -874,6 +860,7 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
         update_script_execution_history(script_id, start_time, end_time, status)
 
         logger.debug(f"Script {script_id} completed with return code: {return_code}")
+        return return_code
 
     except Exception as e:
         end_time = datetime.now()
@@ -883,8 +870,9 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
         
         # Store error in database
         if execution_id:
-            db.add_log_line(execution_id, f"Failed to run script: {str(e)}", 'error')
+            db.add_log_line(execution_id, f"Failed to run script: {str(e)}", 'error', wait=False)
             db.finish_execution(execution_id, -1, str(e))
+            log_streams.finish(execution_id)
         
         # Log script failure
         try:
@@ -896,11 +884,40 @@ def run_script_thread(script_id, script_path, input_value=None, script_env=None)
         # Update execution history
         update_script_execution_history(script_id, start_time, end_time, 'error')
         
+        if output is None:
+            output = output_store.open(script_id)
+        output_store.append(output, [error_msg])
+        output_store.finish(output)
         with script_lock:
-            script_outputs[script_id].append(error_msg)
-            running_scripts[script_id]['running'] = False
-            running_scripts[script_id]['end_time'] = end_time
-            running_scripts[script_id]['error'] = str(e)
+            if script_id in running_scripts:
+                running_scripts[script_id]['running'] = False
+                running_scripts[script_id]['end_time'] = end_time
+                running_scripts[script_id]['error'] = str(e)
+        return -1
+
+def queue_script_run(script_id, script_config, input_value=None, dry_run=False):
+    """Submit a run started from the UI or API to the executor."""
+    # Only the overrides are queued; the rest of the environment is taken when the run starts
+    env = {}
+    if script_config.get('supports_dry_run'):
+        env['DRY_RUN'] = 'true' if dry_run else 'false'
+    return executor.submit(script_id, 'manual', {
+        'name': script_config['name'],
+        'script_path': script_config['script'],
+        'input_value': input_value,
+        'env': env
+    })
+
+def run_queued_script(job):
+    """Executor handler for manual runs; returns the script's exit code."""
+    payload = job.payload
+    script_env = os.environ.copy()
+    script_env.update(payload.get('env', {}))
+    return run_script_thread(job.script_id, payload['script_path'], payload.get('input_value'), script_env)
+
+executor.register('manual', run_queued_script)
+# Scheduled jobs run through the same capture, logging and progress tracking
+get_scheduler().set_runner(run_script_thread)
 
 @app.route('/')
 def index():
@@ -944,11 +961,6 @@ def run_script_api(script_id):
     
     script_path = script_config['script']
     
-    # Check if script is already running
-    status = get_script_status(script_id)
-    if status['running']:
-        return jsonify({'success': False, 'error': 'Script is already running'}), 400
-    
     # Get dry run setting from request body
     request_data = request.get_json() or {}
     dry_run = request_data.get('dry_run', False)
@@ -971,21 +983,26 @@ def run_script_api(script_id):
             logger.error(f"❌ Shell script file not found: {script_path}")
             return jsonify({'success': False, 'error': f'Script file not found: {script_path}'}), 404
     
-    # Set up environment with dry run setting
-    script_env = os.environ.copy()
-    if script_config.get('supports_dry_run'):
-        script_env['DRY_RUN'] = 'true' if dry_run else 'false'
-    
-    # Start script in background thread
-    thread = threading.Thread(target=run_script_thread, args=(script_id, script_path, input_value, script_env))
-    thread.daemon = True
-    thread.start()
+    # Queue the run; it starts as soon as a worker and its resources are free. The
+    # script's overlap policy decides what happens when it is already queued or running
+    job = queue_script_run(script_id, script_config, input_value, dry_run)
+    if job.state == 'coalesced':
+        return jsonify({
+            'success': True,
+            'message': f'{script_config["name"]} is already running or queued - {job.note}',
+            'script_id': script_id,
+            'coalesced': True
+        })
+    waiting = executor.waiting_for(job)
     
     mode = "Dry-Run" if (dry_run and script_config.get('supports_dry_run')) else "Live"
     return jsonify({
         'success': True, 
-        'message': f'Started {script_config["name"]} ({mode})', 
-        'script_id': script_id
+        'message': (f'Queued {script_config["name"]} ({mode}) - {waiting}' if waiting
+                    else f'Started {script_config["name"]} ({mode})'),
+        'script_id': script_id,
+        'run_id': job.id,
+        'queued': waiting is not None
     })
 
 @app.route('/run/<script_id>', methods=['GET', 'POST'])
@@ -1033,23 +1050,19 @@ def run_script(script_id):
             logger.error(f"❌ Shell script file not found: {script_path}")
             return jsonify({'error': f'Script file not found: {script_path}'}), 404
     
-    # Check if script is already running
-    status = get_script_status(script_id)
-    if status['running']:
-        return jsonify({'error': 'Script is already running'}), 400
-    
-    # Set DRY_RUN environment variable for the script
-    script_env = os.environ.copy()
-    if script_config.get('supports_dry_run'):
-        script_env['DRY_RUN'] = 'true' if dry_run else 'false'
-    
-    # Start script in background thread
-    thread = threading.Thread(target=run_script_thread, args=(script_id, script_path, input_value, script_env))
-    thread.daemon = True
-    thread.start()
+    # Queue the run; the script's overlap policy decides what happens when it is already queued or running
+    job = queue_script_run(script_id, script_config, input_value, dry_run)
+    if job.state == 'coalesced':
+        return jsonify({'message': f'{script_config["name"]} is already running or queued - {job.note}',
+                        'script_id': script_id, 'coalesced': True})
+    waiting = executor.waiting_for(job)
     
     mode = "Dry-Run" if dry_run else "Live"
-    return jsonify({'message': f'Started {script_config["name"]} ({mode})', 'script_id': script_id})
+    if waiting:
+        return jsonify({'message': f'Queued {script_config["name"]} ({mode}) - {waiting}', 'script_id': script_id,
+                        'run_id': job.id, 'queued': True})
+    return jsonify({'message': f'Started {script_config["name"]} ({mode})', 'script_id': script_id,
+                    'run_id': job.id, 'queued': False})
 
 @app.route('/stop/<script_id>')
 def stop_script(script_id):
@@ -1107,6 +1120,9 @@ def get_script_status_api(script_id):
         return jsonify({'error': 'Script not found'}), 404
     
     status = get_script_status(script_id)
+    job = executor.find(script_id)
+    if job and job.state == 'queued' and not status['running']:
+        status = dict(status, queued=executor.waiting_for(job) or 'Starting', run_id=job.id)
     return jsonify(status)
 
 @app.route('/output/<script_id>')
@@ -1122,11 +1138,8 @@ def get_script_output(script_id):
     except ValueError:
         max_lines = 100
     
-    with script_lock:
-        output_lines = script_outputs.get(script_id, [])
-        # Return last N lines
-        if max_lines > 0:
-            output_lines = output_lines[-max_lines:]
+    # Return last N lines
+    output_lines = output_store.script_lines(script_id, max_lines if max_lines > 0 else None)
     
     return jsonify({'output': output_lines})
 
@@ -1137,8 +1150,7 @@ def clear_script_output(script_id):
     if script_config is None:
         return jsonify({'error': 'Script not found'}), 404
     
-    with script_lock:
-        script_outputs[script_id] = []
+    output_store.clear(script_id)
     
     return jsonify({'message': 'Output cleared'})
 
@@ -1211,18 +1223,22 @@ def reorder_cron_queue():
 @app.route('/cron/start', methods=['POST'])
 def start_cron_queue():
     """Start processing the cron queue."""
-    global cron_runner_thread, cron_running
+    global cron_running
     
-    if cron_running:
+    if cron_running or any(run['source'] == 'cron' for run in executor.get_queue()):
         return jsonify({'error': 'Cron queue is already running'}), 400
     
     with cron_queue_lock:
         if not cron_queue:
             return jsonify({'error': 'Queue is empty'}), 400
     
-    cron_runner_thread = threading.Thread(target=run_cron_queue)
-    cron_runner_thread.daemon = True
-    cron_runner_thread.start()
+    # Get start delay from environment variable (in minutes)
+    start_delay = int(os.environ.get('CRON_START_DELAY_MINUTES', 0))
+    if start_delay > 0:
+        logger.info(f"Cron queue starting in {start_delay} minutes...")
+    
+    cron_running = True
+    queue_next_cron_item(start_delay * 60)
     
     return jsonify({'message': 'Cron queue started'})
 
@@ -1231,82 +1247,84 @@ def stop_cron_queue():
     """Stop processing the cron queue."""
     global cron_running
     cron_running = False
+    # The next item may already be waiting in the executor
+    if executor.cancel_source('cron'):
+        logger.info("Cron queue stopped")
     return jsonify({'message': 'Cron queue will stop after current script'})
 
-def run_cron_queue():
-    """Run scripts in the cron queue sequentially."""
+def queue_next_cron_item(delay_seconds=0):
+    """Hand the item at the head of the cron queue to the executor. Returns False when the queue is empty."""
     global cron_running
-    cron_running = True
+    while True:
+        with cron_queue_lock:
+            if not cron_queue:
+                cron_running = False
+                logger.info("Cron queue stopped")
+                return False
+            item = dict(cron_queue[0])
+        not_before = datetime.now() + timedelta(seconds=delay_seconds) if delay_seconds > 0 else None
+        # Cron items wait for a run already in progress instead of being dropped
+        job = executor.submit(item['script_id'], 'cron', {'name': item['name'], 'item': item},
+                              not_before=not_before, overlap='queue-behind')
+        if job.state != 'coalesced':
+            return True
+        # Another run of the script is already waiting: this item is covered by it
+        with cron_queue_lock:
+            if cron_queue and cron_queue[0]['id'] == item['id']:
+                cron_queue.pop(0)
+
+def run_cron_item(job):
+    """Executor handler for cron queue items: run one item, then queue the next.
+
+    Returns the item's exit code (-1 if it could not be started).
+    """
+    queued_item = job.payload['item']
+    with cron_queue_lock:
+        # The live entry, so /cron/queue shows its progress (gone if the app restarted)
+        current_item = next((item for item in cron_queue if item['id'] == queued_item['id']), queued_item)
+        current_item['status'] = 'running'
+        current_item['started_at'] = datetime.now().isoformat()
     
-    # Get start delay from environment variable (in minutes)
-    start_delay = int(os.environ.get('CRON_START_DELAY_MINUTES', 0))
+    logger.info(f"Running cron job: {current_item['name']}")
     
-    if start_delay > 0:
-        logger.info(f"Cron queue starting in {start_delay} minutes...")
-        time.sleep(start_delay * 60)
+    # Run the script through the runner, so it is recorded, streamed and
+    # cancellable like a manual run
+    script_path = current_item['script_path']
+    input_value = current_item.get('input_value')
+    return_code = -1
     
     try:
-        while cron_running:
-            with cron_queue_lock:
-                if not cron_queue:
-                    break
-                
-                current_item = cron_queue[0]
-                current_item['status'] = 'running'
-                current_item['started_at'] = datetime.now().isoformat()
-            
-            logger.info(f"Running cron job: {current_item['name']}")
-            
-            # Run the script
-            script_path = current_item['script_path']
-            input_value = current_item.get('input_value')
-            
-            try:
-                # Make script executable
-                os.chmod(script_path, 0o755)
-                
-                # Build command
-                if input_value:
-                    cmd = ['/bin/sh', script_path, input_value]
-                else:
-                    cmd = ['/bin/sh', script_path]
-                
-                # Run the script and wait for completion
-                process = subprocess.run(
-                    cmd,
-                    cwd='/data',
-                    capture_output=True,
-                    text=True,
-                    timeout=3600  # 1 hour timeout
-                )
-                
-                current_item['status'] = 'completed' if process.returncode == 0 else 'failed'
-                current_item['return_code'] = process.returncode
-                current_item['completed_at'] = datetime.now().isoformat()
-                
-                logger.info(f"Cron job {current_item['name']} {'completed' if process.returncode == 0 else 'failed'}")
-                
-            except subprocess.TimeoutExpired:
-                current_item['status'] = 'timeout'
-                current_item['completed_at'] = datetime.now().isoformat()
-                logger.error(f"Cron job {current_item['name']} timed out")
-            except Exception as e:
-                current_item['status'] = 'error'
-                current_item['error'] = str(e)
-                current_item['completed_at'] = datetime.now().isoformat()
-                logger.error(f"Cron job {current_item['name']} error: {e}")
-            
-            # Remove completed item from queue
-            with cron_queue_lock:
-                if cron_queue and cron_queue[0]['id'] == current_item['id']:
-                    cron_queue.pop(0)
-            
-            # Small delay between jobs
-            time.sleep(2)
+        return_code = run_script_thread(job.script_id, f"/bin/sh {shlex.quote(script_path)}", input_value,
+                                        run_name=f"{current_item['name']} (Cron)", timeout=3600,  # 1 hour timeout
+                                        cwd='/data')
+        
+        current_item['status'] = 'completed' if return_code == 0 else 'failed'
+        current_item['return_code'] = return_code
+        current_item['completed_at'] = datetime.now().isoformat()
+        
+        logger.info(f"Cron job {current_item['name']} {'completed' if return_code == 0 else 'failed'}")
+        
+    except Exception as e:
+        current_item['status'] = 'error'
+        current_item['error'] = str(e)
+        current_item['completed_at'] = datetime.now().isoformat()
+        logger.error(f"Cron job {current_item['name']} error: {e}")
     
     finally:
-        cron_running = False
-        logger.info("Cron queue stopped")
+        # Remove completed item from queue
+        with cron_queue_lock:
+            if cron_queue and cron_queue[0]['id'] == current_item['id']:
+                cron_queue.pop(0)
+        
+        # Small delay between jobs
+        if cron_running:
+            queue_next_cron_item(CRON_ITEM_GAP_SECONDS)
+        else:
+            logger.info("Cron queue stopped")
+    
+    return return_code
+
+executor.register('cron', run_cron_item)
 
 @app.route('/activity/history')
 def get_activity_history():
@@ -1373,10 +1391,27 @@ def get_available_scripts():
 
 @app.route('/library/expiring-albums')
 def get_expiring_albums():
-    """Get albums that will expire soon from database."""
+    """Get albums that will expire soon from database.
+
+    Optional query parameters: q (artist/album search), sort (expiry, artist,
+    album or size), limit and offset. Without a limit every album is returned.
+    """
+    sort = request.args.get('sort', 'expiry')
+    if sort not in EXPIRING_ALBUM_SORTS:
+        return jsonify({'error': f"sort must be one of: {', '.join(EXPIRING_ALBUM_SORTS)}"}), 400
+
+    limit = request.args.get('limit', type=int)
+    if limit is not None:
+        limit = max(1, min(limit, 1000))
+
     try:
         # Get from database
-        summary = db.get_expiring_albums_summary()
+        summary = db.get_expiring_albums_summary(
+            search=request.args.get('q', '').strip() or None,
+            sort=sort,
+            limit=limit,
+            offset=max(0, request.args.get('offset', 0, type=int))
+        )
         
         # Debug logging
         logger.debug(f"Returning {len(summary.get('albums', []))} albums")
@@ -1400,12 +1435,12 @@ def get_album_tracks(album_key):
         formatted_tracks = []
         for track in tracks:
             formatted_tracks.append({
-                'file_name': track['file_name'],
-                'track_title': track['track_title'],
-                'file_size_mb': round(track['file_size_mb'], 2),
-                'days_old': track['days_old'],
-                'last_modified': track['last_modified'].isoformat(),
-                'is_starred': track.get('is_starred', False)
+                'file_name': track.file_name,
+                'track_title': track.track_title,
+                'file_size_mb': round(track.file_size_mb, 2),
+                'days_old': track.days_old,
+                'last_modified': track.last_modified.isoformat(),
+                'is_starred': track.is_starred
             })
         
         return jsonify({
@@ -1455,6 +1490,33 @@ def debug_albums():
         return jsonify({'error': str(e)}), 500
 
 # Helper function to ensure playlists have active flags
+def ensure_backup_job():
+    """Schedule the database backup script unless it already has a schedule (BACKUP_INTERVAL_HOURS=0 opts out)."""
+    try:
+        if BACKUP_INTERVAL_HOURS <= 0:
+            return
+        
+        scheduler = get_scheduler()
+        if scheduler.get_job_status('backup_database') is not None:
+            # Keep whatever schedule (or disabled state) was set in the UI
+            return
+        
+        success, message = scheduler.add_job(
+            script_id='backup_database',
+            script_name='Backup Database',
+            script_path='scripts/backup_database.py',
+            interval_type='hours',
+            interval_value=BACKUP_INTERVAL_HOURS,
+            next_run=datetime.now() + timedelta(hours=1)
+        )
+        if success:
+            logger.info(f"Scheduled database backups every {BACKUP_INTERVAL_HOURS} hours")
+        else:
+            logger.error(f"Failed to schedule database backups: {message}")
+        
+    except Exception as e:
+        logger.error(f"Error scheduling database backups: {e}")
+
 def ensure_playlist_active_flags():
     """Ensure all playlists have an 'active' flag (default to True)"""
     try:
@@ -1657,19 +1719,39 @@ def get_script_logs(script_id):
     execution_id = request.args.get('execution_id', type=int)
     
     if execution_id:
-        # Get logs for specific execution
+        # Get one page of logs for a specific execution. after_line/before_line are
+        # line-number cursors; with neither, the latest lines are returned.
         try:
-            execution_logs = db.get_execution_logs(execution_id)
-            if execution_logs:
+            page = db.get_execution_log_page(
+                execution_id,
+                after_line=request.args.get('after_line', type=int),
+                before_line=request.args.get('before_line', type=int),
+                limit=max(1, min(request.args.get('limit', 1000, type=int), 10000))
+            )
+            if page['lines'] or 'after_line' in request.args:
                 return jsonify({
-                    'logs': execution_logs,
+                    'logs': [db._format_log_line(line['timestamp'], line['content']) for line in page['lines']],
                     'script_id': script_id,
                     'script_name': script_config.get('name', script_id),
                     'execution_id': execution_id,
+                    'first_line': page['first_line'],
+                    'last_line': page['last_line'],
+                    'has_more': page['has_more'],
                     'source': 'database'
                 })
         except Exception as e:
             logger.error(f"Error getting execution logs from database: {e}")
+        
+        # Lines of a run still in memory (not yet written, or the database failed)
+        output_lines = output_store.execution_lines(execution_id)
+        if output_lines:
+            return jsonify({
+                'logs': output_lines,
+                'script_id': script_id,
+                'script_name': script_config.get('name', script_id),
+                'execution_id': execution_id,
+                'source': 'memory'
+            })
     
     # Try to get logs from database first, fall back to memory
     try:
@@ -1685,8 +1767,7 @@ def get_script_logs(script_id):
         logger.error(f"Error getting logs from database: {e}")
     
     # Fallback to in-memory logs
-    with script_lock:
-        output_lines = script_outputs.get(script_id, [])
+    output_lines = output_store.script_lines(script_id)
     
     return jsonify({
         'logs': output_lines,
@@ -1707,8 +1788,7 @@ def clear_script_logs(script_id):
         db.clear_script_logs(script_id)
         
         # Clear from memory
-        with script_lock:
-            script_outputs[script_id] = []
+        output_store.clear(script_id)
         
         return jsonify({'message': 'Logs cleared successfully'})
     except Exception as e:
@@ -1722,33 +1802,85 @@ def download_script_logs(script_id):
     if script_config is None:
         return jsonify({'error': 'Script not found'}), 404
     
-    # Get logs from database first, fall back to memory
-    try:
-        db_logs = db.get_script_logs(script_id, limit=10000)
-        output_lines = db_logs if db_logs else script_outputs.get(script_id, [])
-    except Exception as e:
-        logger.error(f"Error getting logs from database: {e}")
-        with script_lock:
-            output_lines = script_outputs.get(script_id, [])
-    
-    if not output_lines:
-        return jsonify({'error': 'No logs available'}), 404
-    
-    # Create log content
-    log_content = '\n'.join(output_lines)
-    
     # Create filename
     script_name = script_config.get('name', script_id)
     safe_name = re.sub(r'[^a-zA-Z0-9_-]', '_', script_name.lower())
     filename = f"{safe_name}_logs_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
     
+    # Stream straight from the database cursor so large logs download in constant memory
+    execution_id = request.args.get('execution_id', type=int)
+    if execution_id:
+        log_lines = db.iter_execution_log_lines(execution_id)
+    else:
+        log_lines = db.iter_script_log_lines(script_id)
+    
+    try:
+        first_line = next(log_lines)
+    except StopIteration:
+        first_line = None
+    except Exception as e:
+        logger.error(f"Error getting logs from database: {e}")
+        first_line = None
+    
+    if first_line is None:
+        # Fall back to memory
+        output_lines = output_store.script_lines(script_id)
+        if not output_lines:
+            return jsonify({'error': 'No logs available'}), 404
+        log_lines = iter(output_lines[1:])
+        first_line = output_lines[0]
+    
+    def generate():
+        # Group lines into ~64 KB writes rather than one write per line
+        buffer = [first_line]
+        size = len(first_line)
+        for line in log_lines:
+            buffer.append(line)
+            size += len(line) + 1
+            if size >= 65536:
+                yield '\n'.join(buffer) + '\n'
+                buffer = []
+                size = 0
+        yield '\n'.join(buffer)
+    
     # Return as file
     return Response(
-        log_content,
+        generate(),
         mimetype='text/plain',
         headers={'Content-Disposition': f'attachment; filename={filename}'}
     )
 
+@app.route('/api/logs/search')
+def search_logs_api():
+    """Full-text search across execution logs."""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+
+    since = None
+    if request.args.get('since'):
+        try:
+            since = datetime.fromisoformat(request.args['since'])
+        except ValueError:
+            return jsonify({'error': 'since must be an ISO date or datetime'}), 400
+
+    try:
+        results = db.search_logs(
+            query,
+            script_id=request.args.get('script_id') or None,
+            level=request.args.get('level') or None,
+            since=since,
+            limit=request.args.get('limit', 50, type=int),
+            before=request.args.get('cursor', type=int)
+        )
+        results['query'] = query
+        return jsonify(results)
+    except RuntimeError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logger.error(f"Error searching logs: {e}")
+        return jsonify({'error': 'Failed to search logs'}), 500
+
 @app.route('/api/execution-queue')
 def get_execution_queue_api():
     """Get the execution queue from database."""
@@ -1759,14 +1891,15 @@ def get_execution_queue_api():
         queue_items = []
         for execution in executions:
             queue_items.append({
-                'scriptId': execution['script_id'],
-                'name': execution['script_name'],
-                'startTime': execution['start_time'].isoformat(),
-                'endTime': execution['end_time'].isoformat() if execution['end_time'] else None,
-                'status': execution['status'],
-                'duration_seconds': execution['duration_seconds'],
-                'dry_run': execution['dry_run'],
-                'execution_id': execution['id']
+                'scriptId': execution.script_id,
+                'name': execution.script_name,
+                'startTime': execution.start_time.isoformat(),
+                'endTime': execution.end_time.isoformat() if execution.end_time else None,
+                'status': execution.status,
+                'duration_seconds': execution.duration_seconds,
+                'dry_run': execution.dry_run,
+                'execution_id': execution.id,
+                'note': execution.error_message if execution.status == 'coalesced' else None
             })
         
         return jsonify({'queue': queue_items})
@@ -1784,6 +1917,253 @@ def get_execution_stats_api():
         logger.error(f"Error getting execution stats: {e}")
         return jsonify({'error': 'Failed to get execution stats'}), 500
 
+@app.route('/api/debug/db-stats')
+def get_db_stats_api():
+    """Per-statement latency histograms and recent slow queries (needs DB_QUERY_STATS=1)."""
+    try:
+        if db.query_stats is None:
+            return jsonify({'enabled': False})
+
+        limit = request.args.get('limit', 50, type=int)
+        stats = db.query_stats.snapshot(limit=max(1, min(limit, 1000)))
+        if request.args.get('reset', '').lower() in ('1', 'true', 'yes'):
+            db.query_stats.reset()
+        return jsonify(stats)
+    except Exception as e:
+        logger.error(f"Error getting database stats: {e}")
+        return jsonify({'error': 'Failed to get database stats'}), 500
+
+@app.route('/api/debug/sse')
+def get_sse_stats_api():
+    """SSE subscriber count, buffered events and slow-consumer counters."""
+    try:
+        stats = sse_broker.get_stats()
+        stats['log_streams'] = log_streams.get_stats()
+        return jsonify(stats)
+    except Exception as e:
+        logger.error(f"Error getting SSE stats: {e}")
+        return jsonify({'error': 'Failed to get SSE stats'}), 500
+
+def get_process_memory():
+    """Resident set size of this process now and at its peak, in bytes (Linux)."""
+    memory = {'rss_bytes': None, 'peak_rss_bytes': None}
+    try:
+        with open('/proc/self/status') as status_file:
+            for line in status_file:
+                if line.startswith('VmRSS:'):
+                    memory['rss_bytes'] = int(line.split()[1]) * 1024
+                elif line.startswith('VmHWM:'):
+                    memory['peak_rss_bytes'] = int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return memory
+
+@app.route('/api/debug/memory')
+def get_memory_report_api():
+    """Process memory and the size of the web app's in-memory state."""
+    try:
+        with script_lock:
+            running_entries = len(running_scripts)
+        with script_history_lock:
+            history_entries = len(script_execution_history)
+        with cron_queue_lock:
+            cron_queue_length = len(cron_queue)
+        sse_stats = sse_broker.get_stats()
+        
+        report = {
+            'process': get_process_memory(),
+            'threads': threading.active_count(),
+            'gc_counts': gc.get_count(),
+            'execution_output': output_store.get_stats(),
+            'running_scripts_entries': running_entries,
+            'script_history_entries': history_entries,
+            'cron_queue_length': cron_queue_length,
+            'sse': {
+                'subscribers': sse_stats['subscribers'],
+                'queued_events': sse_stats['queued_events'],
+                'queued_bytes': sse_stats['queued_bytes']
+            },
+            'log_streams': log_streams.get_stats(),
+            'db_pool': db.get_pool_stats()
+        }
+        
+        # Largest allocation sites, when started with MEMORY_TRACE=1
+        if tracemalloc.is_tracing():
+            limit = max(1, min(request.args.get('limit', 15, type=int), 100))
+            current, peak = tracemalloc.get_traced_memory()
+            report['tracemalloc'] = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top': [{
+                    'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    'size_bytes': stat.size,
+                    'count': stat.count
+                } for stat in tracemalloc.take_snapshot().statistics('lineno')[:limit]]
+            }
+        return jsonify(report)
+    except Exception as e:
+        logger.error(f"Error getting memory report: {e}")
+        return jsonify({'error': 'Failed to get memory report'}), 500
+
+@app.route('/api/executor/status')
+def get_executor_status_api():
+    """Runs holding or waiting for an executor worker, with worker and resource usage and execution leases."""
+    try:
+        return jsonify({'queue': executor.get_queue(), 'stats': executor.get_stats(),
+                        'leases': executor.leases.get_status()})
+    except Exception as e:
+        logger.error(f"Error getting executor status: {e}")
+        return jsonify({'error': 'Failed to get executor status'}), 500
+
+@app.route('/api/executor/queue/<int:run_id>', methods=['DELETE'])
+def cancel_queued_run_api(run_id):
+    """Remove a run that is still waiting in the executor queue."""
+    try:
+        if not executor.cancel(run_id):
+            return jsonify({'success': False, 'error': 'Run is not waiting in the queue'}), 404
+        return jsonify({'success': True, 'message': 'Queued run cancelled'})
+    except Exception as e:
+        logger.error(f"Error cancelling queued run {run_id}: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/api/maintenance/status')
+def get_maintenance_status_api():
+    """Database storage, maintenance schedule and recent maintenance pass reports."""
+    try:
+        return jsonify(get_maintenance().get_status())
+    except Exception as e:
+        logger.error(f"Error getting maintenance status: {e}")
+        return jsonify({'error': 'Failed to get maintenance status'}), 500
+
+@app.route('/api/maintenance/run', methods=['POST'])
+def run_maintenance_api():
+    """Start a maintenance pass now (runs in the background)."""
+    try:
+        maintenance = get_maintenance()
+        if maintenance.current_pass is not None:
+            return jsonify({'success': False, 'message': 'A maintenance pass is already running'}), 409
+        if maintenance.running:
+            maintenance.request_pass()
+        else:
+            threading.Thread(target=maintenance.run_pass, daemon=True).start()
+        return jsonify({'success': True, 'message': 'Maintenance pass started'}), 202
+    except Exception as e:
+        logger.error(f"Error starting maintenance pass: {e}")
+        return jsonify({'error': 'Failed to start maintenance pass'}), 500
+
+@app.route('/api/maintenance/retention', methods=['GET'])
+def get_retention_policies_api():
+    """Retention policy per script that has executions or an explicit policy."""
+    try:
+        maintenance = get_maintenance()
+        policies = db.get_retention_policies()
+        script_ids = sorted(set(db.get_execution_script_ids()) | set(policies))
+        return jsonify({
+            'defaults': maintenance.get_retention_policy(None, {}),
+            'policies': {
+                script_id: dict(maintenance.get_retention_policy(script_id, policies),
+                                custom=script_id in policies)
+                for script_id in script_ids
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error getting retention policies: {e}")
+        return jsonify({'error': 'Failed to get retention policies'}), 500
+
+@app.route('/api/maintenance/retention/<script_id>', methods=['POST'])
+def set_retention_policy_api(script_id):
+    """Set a script's retention: {"retention_days": int (0 = forever), "keep_last": int}."""
+    try:
+        data = request.get_json() or {}
+        try:
+            retention_days = int(data['retention_days'])
+            keep_last = int(data.get('keep_last', 0))
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'retention_days (and optional keep_last) must be integers'}), 400
+        if retention_days < 0 or keep_last < 0:
+            return jsonify({'success': False, 'message': 'retention_days and keep_last cannot be negative'}), 400
+
+        db.set_retention_policy(script_id, retention_days, keep_last)
+        return jsonify({'success': True, 'script_id': script_id,
+                        'retention_days': retention_days, 'keep_last': keep_last})
+    except Exception as e:
+        logger.error(f"Error setting retention policy for {script_id}: {e}")
+        return jsonify({'error': 'Failed to set retention policy'}), 500
+
+@app.route('/api/maintenance/retention/<script_id>', methods=['DELETE'])
+def delete_retention_policy_api(script_id):
+    """Remove a script's retention override so the defaults apply."""
+    try:
+        if not db.delete_retention_policy(script_id):
+            return jsonify({'success': False, 'message': 'No retention policy for this script'}), 404
+        return jsonify({'success': True})
+    except Exception as e:
+        logger.error(f"Error deleting retention policy for {script_id}: {e}")
+        return jsonify({'error': 'Failed to delete retention policy'}), 500
+
+@app.route('/api/backups', methods=['GET'])
+def get_backups_api():
+    """Database snapshots, newest first, with the backup job's schedule."""
+    try:
+        return jsonify({
+            'backups': list_backups(),
+            'backup_dir': str(BACKUP_DIR),
+            'keep': BACKUP_KEEP,
+            'in_progress': backup_in_progress(),
+            'schedule': get_scheduler().get_job_status('backup_database')
+        })
+    except Exception as e:
+        logger.error(f"Error listing backups: {e}")
+        return jsonify({'error': 'Failed to list backups'}), 500
+
+@app.route('/api/backups', methods=['POST'])
+def create_backup_api():
+    """Take a database snapshot now (runs in the background)."""
+    try:
+        if backup_in_progress():
+            return jsonify({'success': False, 'message': 'A backup is already running'}), 409
+        
+        def run_backup():
+            try:
+                create_backup()
+            except Exception as e:
+                logger.error(f"Database backup failed: {e}")
+        
+        threading.Thread(target=run_backup, daemon=True).start()
+        return jsonify({'success': True, 'message': 'Backup started'}), 202
+    except Exception as e:
+        logger.error(f"Error starting backup: {e}")
+        return jsonify({'error': 'Failed to start backup'}), 500
+
+@app.route('/api/backups/<name>', methods=['GET'])
+def download_backup_api(name):
+    """Download a database snapshot."""
+    if find_backup(name) is None:
+        return jsonify({'error': 'Backup not found'}), 404
+    return send_from_directory(BACKUP_DIR.resolve(), name, as_attachment=True)
+
+@app.route('/api/execution/<int:execution_id>/stream')
+def stream_execution_logs(execution_id):
+    """Server-Sent Events endpoint: an execution's log lines past a line number, live until it ends."""
+    try:
+        if db.get_execution(execution_id) is None:
+            return jsonify({'error': 'Execution not found'}), 404
+    except Exception as e:
+        logger.error(f"Error opening log stream for execution {execution_id}: {e}")
+        return jsonify({'error': 'Failed to open log stream'}), 500
+    
+    # EventSource resumes with the id of the last event it saw, which is a line number
+    after_line = request.headers.get('Last-Event-ID') or request.args.get('after_line')
+    try:
+        after_line = int(after_line) if after_line else None
+    except ValueError:
+        after_line = None
+    return Response(
+        log_streams.stream(db, execution_id, after_line),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/api/execution/<int:execution_id>/stop', methods=['POST'])
 def stop_execution_api(execution_id):
     """Stop a running execution."""
@@ -1793,6 +2173,16 @@ def stop_execution_api(execution_id):
         
         success = db.stop_execution(execution_id, reason)
         if success:
+            log_streams.finish(execution_id)
+            # The run's process, when it runs here (manual and scheduled runs alike)
+            with script_lock:
+                pid = next((status.get('pid') for status in running_scripts.values()
+                            if status.get('running') and status.get('execution_id') == execution_id), None)
+            if pid:
+                try:
+                    os.kill(pid, 15)  # SIGTERM
+                except ProcessLookupError:
+                    pass
             return jsonify({
                 'success': True,
                 'message': f'Execution {execution_id} stopped successfully'
@@ -2834,14 +3224,19 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
+    if MEMORY_TRACE:
+        tracemalloc.start()
+    
     # Create logs directory if it doesn't exist
     logs_dir = os.path.join(os.getcwd(), 'logs')
     os.makedirs(logs_dir, exist_ok=True)
     
-    # Initialize database and clean up old data (keep last 30 days)
+    # Initialize database; old data is removed in the background by the maintenance task
     logger.info("Initializing database...")
     try:
-        db.cleanup_old_data(days=30)
+        db.cleanup_orphaned_executions()
+        # Pack logs of executions that finished before the archive tier existed
+        db.archive_finished_execution_logs()
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Database initialization error: {e}")
@@ -2849,6 +3244,16 @@ if __name__ == '__main__':
     # Initialize playlist script configurations on startup
     ensure_playlist_active_flags()
     
+    # Database snapshots run as a regular scheduled job
+    ensure_backup_job()
+    
+    # Start the executor workers; runs still queued from before a restart resume
+    logger.info("Starting script executor...")
+    try:
+        start_executor()
+    except Exception as e:
+        logger.error(f"Failed to start script executor: {e}")
+    
     # Start the internal scheduler
     logger.info("Starting internal scheduler...")
     try:
@@ -2857,6 +3262,13 @@ if __name__ == '__main__':
     except Exception as e:
         logger.error(f"Failed to start internal scheduler: {e}")
     
+    # Start background database maintenance (retention, vacuum, WAL checkpoints)
+    logger.info("Starting database maintenance...")
+    try:
+        start_maintenance()
+    except Exception as e:
+        logger.error(f"Failed to start database maintenance: {e}")
+    
     # Test service connectivity on startup
     logger.info("Testing service connectivity on startup...")
     update_service_status()
@@ -2883,4 +3295,5 @@ if __name__ == '__main__':
     except KeyboardInterrupt:
         logger.info("Shutting down SoulSeekarr...")
         stop_scheduler()
+        stop_maintenance()
         logger.info("Scheduler stopped. Goodbye!")
\ No newline at end of file
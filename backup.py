@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Backup module for SoulSeekarr
+Online snapshots of the live database, and restoring them.
+
+A snapshot is taken with the SQLite backup API from a dedicated connection
+that holds one read transaction for the whole copy. In WAL mode a reader never
+blocks the writer, so scripts keep logging while the pages are copied a step at
+a time, and because the snapshot is pinned the copy is never restarted by those
+writes. The copy is integrity-checked, switched out of WAL mode so it is a
+single self-contained file, gzip-compressed into BACKUP_DIR and the oldest
+snapshots beyond BACKUP_KEEP are removed.
+
+Restoring is an offline operation, done with SoulSeekarr stopped. It
+decompresses a snapshot to a scratch file, verifies its integrity and schema
+version, keeps a copy of the current database and only then copies the
+snapshot over the live file (again through the backup API, so SQLite's locking
+is respected), upgrading its schema if it came from an older version.
+"""
+
+import os
+import re
+import gzip
+import time
+import shutil
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from database import get_db, DB_PATH
+from leases import EXECUTION_LEASE_STALE_SECONDS
+from migrations import migrate, get_schema_version, SCHEMA_VERSION
+from records import to_epoch_ms
+
+logger = logging.getLogger(__name__)
+
+# Where snapshots are kept and how many
+BACKUP_DIR = Path(os.environ.get('BACKUP_DIR', 'work/backups'))
+BACKUP_KEEP = int(os.environ.get('BACKUP_KEEP', '7'))                  # 0 keeps every snapshot
+BACKUP_INTERVAL_HOURS = int(os.environ.get('BACKUP_INTERVAL_HOURS', '24'))  # Default schedule, 0 disables
+
+# Copy pacing
+BACKUP_PAGES_PER_STEP = int(os.environ.get('BACKUP_PAGES_PER_STEP', '1024'))
+BACKUP_STEP_PAUSE = 0.01           # Seconds between steps, leaves I/O to the app
+BACKUP_COMPRESSION_LEVEL = 6       # gzip level for snapshots
+BACKUP_COPY_CHUNK_SIZE = 1024 * 1024
+
+BACKUP_NAME_FORMAT = 'soulseekarr-%Y%m%d-%H%M%S.db.gz'
+BACKUP_NAME_PATTERN = re.compile(r'^soulseekarr-(\d{8}-\d{6})\.db\.gz$')
+
+# The copy of the database taken before a restore; never listed or rotated
+PRE_RESTORE_NAME_FORMAT = 'pre-restore-%Y%m%d-%H%M%S.db.gz'
+PRE_RESTORE_NAME_PATTERN = re.compile(r'^pre-restore-(\d{8}-\d{6})\.db\.gz$')
+
+# One snapshot at a time per process (scheduled job, API or CLI)
+_backup_lock = threading.Lock()
+
+
+class BackupError(Exception):
+    """A snapshot could not be written or failed verification."""
+
+
+def _backup_path(backup_dir: Path, when: datetime, name_format: str = BACKUP_NAME_FORMAT) -> Path:
+    """Snapshot file name for a point in time, made unique within the second."""
+    path = backup_dir / when.strftime(name_format)
+    while path.exists():
+        when = datetime.fromtimestamp(when.timestamp() + 1)
+        path = backup_dir / when.strftime(name_format)
+    return path
+
+
+def _remove_quietly(*paths):
+    for path in paths:
+        try:
+            Path(path).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def backup_in_progress() -> bool:
+    """Whether this process is writing a snapshot right now."""
+    return _backup_lock.locked()
+
+
+def verify_database(db_path) -> Dict:
+    """Run an integrity check on a database file and read its schema version.
+
+    Raises BackupError when the file is damaged, is not a SoulSeekarr database,
+    or was written by a newer version than this one.
+    """
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    except sqlite3.Error as e:
+        raise BackupError(f"Cannot open {db_path}: {e}")
+    try:
+        problems = [row[0] for row in conn.execute("PRAGMA integrity_check(20)")]
+        if problems != ['ok']:
+            raise BackupError(f"Integrity check failed: {'; '.join(problems)}")
+
+        version = get_schema_version(conn)
+        has_executions = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'script_executions'"
+        ).fetchone()
+        if version < 1 or not has_executions:
+            raise BackupError(f"{db_path} is not a SoulSeekarr database")
+        if version > SCHEMA_VERSION:
+            raise BackupError(
+                f"Snapshot has schema version {version}, newer than this version of SoulSeekarr ({SCHEMA_VERSION})"
+            )
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    except sqlite3.Error as e:
+        raise BackupError(f"Cannot verify {db_path}: {e}")
+    finally:
+        conn.close()
+
+    return {'schema_version': version, 'database_bytes': page_count * page_size}
+
+
+def _copy_database(source_path, target_path, pages: int,
+                   progress: Optional[Callable[[int, int], None]] = None) -> int:
+    """Copy a live database with the backup API a few pages at a time. Returns the step count."""
+    steps = 0
+
+    def on_step(status, remaining, total):
+        nonlocal steps
+        steps += 1
+        if progress:
+            progress(total - remaining, total)
+        if remaining:
+            time.sleep(BACKUP_STEP_PAUSE)
+
+    source = sqlite3.connect(source_path, timeout=60.0, isolation_level=None)
+    target = sqlite3.connect(target_path)
+    try:
+        # Pin one snapshot for the whole copy. Writers carry on in the WAL, and the
+        # backup sees no changes to restart for between steps.
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages, progress=on_step)
+        source.execute("COMMIT")
+
+        # The copy inherits WAL mode; a snapshot should be one self-contained file
+        target.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        target.close()
+        source.close()
+    return steps
+
+
+def _write_snapshot(source_path, path: Path, pages: int,
+                    progress: Optional[Callable[[int, int], None]] = None, verify: bool = True) -> Dict:
+    """Copy a database to a scratch file, verify it and gzip it to ``path``."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    scratch = path.with_name(f".{path.name[:-3]}.partial")
+    compressed = path.with_name(f".{path.name}.partial")
+    try:
+        started = time.time()
+        steps = _copy_database(source_path, str(scratch), pages, progress)
+        copy_seconds = round(time.time() - started, 2)
+        info = verify_database(scratch) if verify else {'schema_version': None, 'database_bytes': None}
+
+        with open(scratch, 'rb') as src, \
+                gzip.open(compressed, 'wb', compresslevel=BACKUP_COMPRESSION_LEVEL) as dst:
+            shutil.copyfileobj(src, dst, BACKUP_COPY_CHUNK_SIZE)
+        os.replace(compressed, path)
+    finally:
+        _remove_quietly(scratch, compressed)
+
+    info.update({'steps': steps, 'copy_seconds': copy_seconds})
+    return info
+
+
+def create_backup(db=None, backup_dir=None, keep: int = None,
+                  progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """Take a compressed, verified snapshot of the live database and rotate old ones.
+
+    ``progress(copied_pages, total_pages)`` is called after every copy step.
+    Returns details of the new snapshot.
+    """
+    db = db or get_db()
+    backup_dir = Path(backup_dir) if backup_dir else BACKUP_DIR
+    keep = BACKUP_KEEP if keep is None else keep
+
+    with _backup_lock:
+        started = time.time()
+        path = _backup_path(backup_dir, datetime.fromtimestamp(started))
+        copy = _write_snapshot(db.db_path, path, BACKUP_PAGES_PER_STEP, progress)
+
+        removed = rotate_backups(backup_dir, keep)
+        result = {
+            'name': path.name,
+            'path': str(path),
+            'created_at': datetime.fromtimestamp(started).isoformat(),
+            'schema_version': copy['schema_version'],
+            'database_bytes': copy['database_bytes'],
+            'compressed_bytes': path.stat().st_size,
+            'copy_steps': copy['steps'],
+            'copy_seconds': copy['copy_seconds'],
+            'duration_seconds': round(time.time() - started, 2),
+            'removed': removed,
+        }
+
+    logger.info(
+        f"Database backup {path.name} written in {result['duration_seconds']:.1f}s "
+        f"({result['database_bytes'] / 1024 / 1024:.1f} MB -> "
+        f"{result['compressed_bytes'] / 1024 / 1024:.1f} MB, {copy['steps']} copy steps)"
+        + (f", removed {len(removed)} old snapshots" if removed else "")
+    )
+    return result
+
+
+def list_backups(backup_dir=None) -> List[Dict]:
+    """Snapshots in the backup directory, newest first."""
+    backup_dir = Path(backup_dir) if backup_dir else BACKUP_DIR
+    if not backup_dir.exists():
+        return []
+
+    backups = []
+    for path in backup_dir.iterdir():
+        match = BACKUP_NAME_PATTERN.match(path.name)
+        if not match:
+            continue
+        backups.append({
+            'name': path.name,
+            'path': str(path),
+            'created_at': datetime.strptime(match.group(1), '%Y%m%d-%H%M%S').isoformat(),
+            'compressed_bytes': path.stat().st_size,
+        })
+    backups.sort(key=lambda backup: backup['name'], reverse=True)
+    return backups
+
+
+def rotate_backups(backup_dir=None, keep: int = None) -> List[str]:
+    """Delete all but the newest ``keep`` snapshots. Returns the removed names."""
+    keep = BACKUP_KEEP if keep is None else keep
+    if keep <= 0:
+        return []
+
+    removed = []
+    for backup in list_backups(backup_dir)[keep:]:
+        try:
+            os.remove(backup['path'])
+            removed.append(backup['name'])
+        except OSError as e:
+            logger.warning(f"Could not remove old backup {backup['name']}: {e}")
+    return removed
+
+
+def find_backup(name: str, backup_dir=None) -> Optional[Path]:
+    """Resolve a snapshot name from list_backups() (or a pre-restore copy) to its path."""
+    backup_dir = Path(backup_dir) if backup_dir else BACKUP_DIR
+    if not (BACKUP_NAME_PATTERN.match(name) or PRE_RESTORE_NAME_PATTERN.match(name)):
+        return None
+    path = backup_dir / name
+    return path if path.exists() else None
+
+
+def _live_lease_holders(db_path: Path) -> List[str]:
+    """Scripts some app process is running right now, going by fresh lease heartbeats."""
+    if not db_path.exists():
+        return []
+    stale_before = to_epoch_ms(datetime.now() - timedelta(seconds=EXECUTION_LEASE_STALE_SECONDS))
+    conn = sqlite3.connect(str(db_path), timeout=60.0)
+    try:
+        return [row[0] for row in conn.execute(
+            "SELECT script_id FROM execution_leases WHERE heartbeat_at >= ? ORDER BY script_id", (stale_before,)
+        )]
+    except sqlite3.OperationalError:
+        # Older schema without leases
+        return []
+    finally:
+        conn.close()
+
+
+def restore_backup(backup_path, db_path=None, backup_dir=None) -> Dict:
+    """Replace the database with a snapshot after verifying it.
+
+    This is an offline operation: stop SoulSeekarr first. Connections it has
+    open keep their cached state (the running log line counters, for one) and
+    its writer would carry on from there. A restore is refused while any app
+    process holds a live execution lease. The current database is snapshotted
+    before it is overwritten.
+    """
+    backup_path = Path(backup_path)
+    db_path = Path(db_path or DB_PATH)
+    backup_dir = Path(backup_dir) if backup_dir else BACKUP_DIR
+    if not backup_path.exists():
+        raise BackupError(f"Backup not found: {backup_path}")
+
+    running = _live_lease_holders(db_path)
+    if running:
+        raise BackupError(
+            f"SoulSeekarr is running ({', '.join(running)} in progress); stop it before restoring"
+        )
+
+    started = time.time()
+    scratch = db_path.with_name(f".{db_path.name}.restore")
+    try:
+        try:
+            with gzip.open(backup_path, 'rb') as src, open(scratch, 'wb') as dst:
+                shutil.copyfileobj(src, dst, BACKUP_COPY_CHUNK_SIZE)
+        except (OSError, EOFError) as e:
+            raise BackupError(f"Cannot decompress {backup_path}: {e}")
+        info = verify_database(scratch)
+
+        safety_copy = None
+        if db_path.exists():
+            # Not verified: a damaged database is a likely reason to be restoring. Named
+            # apart from the snapshots so rotation never removes it.
+            with _backup_lock:
+                safety_copy = _backup_path(backup_dir, datetime.now(), PRE_RESTORE_NAME_FORMAT)
+                _write_snapshot(str(db_path), safety_copy, -1, verify=False)
+            logger.info(f"Saved the current database as {safety_copy.name} before restoring")
+
+        # One step, so the live file goes from old to new contents in a single transaction
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        source = sqlite3.connect(str(scratch))
+        target = sqlite3.connect(str(db_path), timeout=60.0)
+        try:
+            source.backup(target, pages=-1)
+            target.execute("PRAGMA journal_mode=WAL")
+            schema_version = migrate(target)
+        finally:
+            target.close()
+            source.close()
+    finally:
+        _remove_quietly(scratch)
+
+    logger.info(
+        f"Restored {backup_path.name} (schema v{info['schema_version']}"
+        f"{f' upgraded to v{schema_version}' if schema_version != info['schema_version'] else ''}) "
+        f"in {time.time() - started:.1f}s"
+    )
+    return {
+        'restored': backup_path.name,
+        'schema_version': schema_version,
+        'snapshot_schema_version': info['schema_version'],
+        'previous_database': safety_copy.name if safety_copy else None,
+        'duration_seconds': round(time.time() - started, 2),
+    }
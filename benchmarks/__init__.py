@@ -0,0 +1,25 @@
+"""
+SoulSeekarr database benchmarks
+
+Two kinds of benchmark live here:
+
+* The bench_*.py scripts, each a standalone before/after comparison for one
+  optimisation (run them directly with python benchmarks/bench_<name>.py).
+* The benchmark suite (generator, suite and report modules), which builds a
+  synthetic soulseekarr.db at a chosen scale, times the DatabaseManager methods
+  the UI and scripts depend on, and writes a JSON report that can be compared
+  against a report from another version:
+
+    python -m benchmarks generate --scale medium
+    python -m benchmarks run --scale medium --output before.json
+    (check out the other version)
+    python -m benchmarks run --scale medium --output after.json --compare before.json
+"""
+
+import sys
+from pathlib import Path
+
+# The suite imports the app's modules (database, records, ...) from the repo root
+_REPO_ROOT = str(Path(__file__).parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Database benchmark suite
+
+Generates a synthetic database, times the DatabaseManager methods the UI and
+scripts rely on against a working copy of it, and writes a JSON report that can
+be compared with a report from another version. Run from the repository root.
+
+Usage:
+    python -m benchmarks generate [--scale small|medium|large] [--seed 42] [--db PATH]
+    python -m benchmarks run [--scale small] [--db PATH] [--regenerate] [--only NAME ...]
+                             [--repeat-scale 1.0] [--output report.json] [--compare baseline.json]
+    python -m benchmarks compare baseline.json current.json [--threshold 0.10]
+
+`run` generates the database first if it does not exist yet (it is cached under
+work/benchmarks/ per scale and seed). `run --compare` and `compare` exit with
+status 1 when any benchmark's median regressed by more than the threshold.
+"""
+
+import sys
+import shutil
+import logging
+import argparse
+from pathlib import Path
+
+from benchmarks.generator import SCALES, default_db_path, generate, load_info
+from benchmarks.report import (
+    DEFAULT_REGRESSION_THRESHOLD, build_report, save_report, load_report,
+    compare_reports, comparability_warnings, print_results, print_comparison
+)
+from benchmarks.suite import run_suite
+
+logger = logging.getLogger('benchmarks')
+
+
+def _db_path(args) -> Path:
+    """The generated database to use for these arguments."""
+    return Path(args.db) if args.db else default_db_path(args.scale, args.seed)
+
+
+def cmd_generate(args):
+    """Build (or rebuild) the synthetic database."""
+    db_path = _db_path(args)
+    info = generate(db_path, args.scale, args.seed)
+    print(f"Generated {db_path} ({info['size_mb']} MB) in {info['generate_seconds']} s")
+    return 0
+
+
+def cmd_run(args):
+    """Run the suite against a working copy of the generated database."""
+    from database import DatabaseManager
+
+    db_path = _db_path(args)
+    info = load_info(db_path)
+    if args.regenerate or not db_path.exists() or info is None:
+        logger.info(f"Generating {args.scale} database at {db_path}")
+        info = generate(db_path, args.scale, args.seed)
+
+    # Benchmarks write (and cleanup_old_data deletes), so they never touch the original
+    work_path = db_path.with_name(f"{db_path.stem}.run{db_path.suffix}")
+    for suffix in ('-wal', '-shm'):
+        Path(f"{work_path}{suffix}").unlink(missing_ok=True)
+    shutil.copyfile(db_path, work_path)
+    try:
+        db = DatabaseManager(str(work_path))
+        try:
+            results = run_suite(db, only=args.only, repeat_scale=args.repeat_scale)
+        finally:
+            db.close()
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            Path(f"{work_path}{suffix}").unlink(missing_ok=True)
+
+    report = build_report(results, info)
+    print_results(report)
+    if args.output:
+        save_report(report, args.output)
+        print(f"\nReport written to {args.output}")
+
+    if args.compare:
+        baseline = load_report(args.compare)
+        rows = compare_reports(baseline, report, args.threshold)
+        print()
+        print_comparison(rows, comparability_warnings(baseline, report))
+        return 1 if any(row['verdict'] == 'regression' for row in rows) else 0
+    return 0
+
+
+def cmd_compare(args):
+    """Compare two saved reports."""
+    baseline = load_report(args.baseline)
+    current = load_report(args.current)
+    rows = compare_reports(baseline, current, args.threshold)
+    print_comparison(rows, comparability_warnings(baseline, current))
+    return 1 if any(row['verdict'] == 'regression' for row in rows) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='SoulSeekarr database benchmarks')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log progress of each step')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    def add_database_args(subparser):
+        subparser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Size of the generated data')
+        subparser.add_argument('--seed', type=int, default=42, help='Random seed for the generated data')
+        subparser.add_argument('--db', help='Generated database path (default: work/benchmarks/<scale>-seed<seed>.db)')
+
+    generate_parser = subparsers.add_parser('generate', help='Build the synthetic database')
+    add_database_args(generate_parser)
+    generate_parser.set_defaults(func=cmd_generate)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark suite')
+    add_database_args(run_parser)
+    run_parser.add_argument('--regenerate', action='store_true', help='Rebuild the database even if it exists')
+    run_parser.add_argument('--only', nargs='+', metavar='NAME', help='Only run benchmarks whose name contains NAME')
+    run_parser.add_argument('--repeat-scale', type=float, default=1.0, help='Multiply every repeat count')
+    run_parser.add_argument('--output', help='Write the JSON report here')
+    run_parser.add_argument('--compare', metavar='BASELINE', help='Compare with a previous JSON report')
+    run_parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                            help='Median slowdown counted as a regression (default: 0.10 = 10%%)')
+    run_parser.set_defaults(func=cmd_run)
+
+    compare_parser = subparsers.add_parser('compare', help='Compare two JSON reports')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                                help='Median slowdown counted as a regression (default: 0.10 = 10%%)')
+    compare_parser.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
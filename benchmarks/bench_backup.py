@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Backup benchmark
+
+Takes a snapshot of a copy of a generated database while another thread keeps
+appending log lines the way a running script does, and reports the latency of
+those appends. For contrast it first runs a plain stepped backup that does not
+pin a read snapshot: any append between two steps makes SQLite restart the
+copy, so under steady logging it gives up after --deadline seconds. Finally the
+snapshot is restored to a scratch file and verified.
+
+Usage:
+    python benchmarks/bench_backup.py [--scale small] [--db PATH] [--append-interval 0.005] [--deadline 30]
+"""
+
+import sys
+import time
+import sqlite3
+import shutil
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import DatabaseManager
+from benchmarks.generator import SCALES, default_db_path, generate, load_info
+import backup
+
+
+def append_loop(db, execution_id, interval, stop, latencies):
+    """Append a log line every ``interval`` seconds, recording each call's latency."""
+    n = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        db.add_log_line(execution_id, f"Heartbeat {n}")
+        latencies.append(time.perf_counter() - start)
+        n += 1
+        time.sleep(interval)
+
+
+def percentile(values, fraction):
+    """Value at the given fraction of the sorted list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def unpinned_backup(db, backup_dir, deadline):
+    """Stepped backup API copy without a pinned snapshot, abandoned after ``deadline`` seconds."""
+    started = time.time()
+    restarts = 0
+    steps = 0
+    last_remaining = None
+
+    def on_step(status, remaining, total):
+        nonlocal restarts, steps, last_remaining
+        steps += 1
+        if last_remaining is not None and remaining >= last_remaining:
+            restarts += 1
+        last_remaining = remaining
+        if time.time() - started > deadline:
+            raise TimeoutError
+        time.sleep(backup.BACKUP_STEP_PAUSE)
+
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    source = sqlite3.connect(db.db_path)
+    target = sqlite3.connect(str(backup_dir / 'unpinned.db'))
+    finished = True
+    try:
+        source.backup(target, pages=backup.BACKUP_PAGES_PER_STEP, progress=on_step)
+    except TimeoutError:
+        finished = False
+    finally:
+        target.close()
+        source.close()
+    return {'copy_steps': steps, 'restarts': restarts, 'finished': finished,
+            'copy_seconds': round(time.time() - started, 2)}
+
+
+def measure(db_path, run, interval):
+    """Run ``run(db)`` with concurrent appends; returns (result, latencies)."""
+    db = DatabaseManager(str(db_path))
+    execution_id = db.start_execution('bench_backup', 'Backup Benchmark')
+    stop = threading.Event()
+    latencies = []
+    appender = threading.Thread(target=append_loop, args=(db, execution_id, interval, stop, latencies))
+    appender.start()
+    time.sleep(0.5)  # steady state before the backup starts
+
+    try:
+        result = run(db)
+    finally:
+        stop.set()
+        appender.join()
+        db.close()
+    return result, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure writer latency during an online backup')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Generated database scale')
+    parser.add_argument('--seed', type=int, default=42, help='Generated database seed')
+    parser.add_argument('--db', help='Generated database path (default: work/benchmarks/<scale>-seed<seed>.db)')
+    parser.add_argument('--append-interval', type=float, default=0.005, help='Seconds between concurrent appends')
+    parser.add_argument('--deadline', type=float, default=30.0, help='Seconds before the unpinned copy is abandoned')
+    args = parser.parse_args()
+
+    source = Path(args.db) if args.db else default_db_path(args.scale, args.seed)
+    if not source.exists() or load_info(source) is None:
+        print(f"Generating {args.scale} database at {source}...")
+        generate(source, args.scale, args.seed)
+
+    print(f"{'backup':<22} {'steps':>6} {'restarts':>8} {'copy s':>7} {'appends':>8} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}  result")
+    print("-" * 96)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        runs = (
+            ("unpinned steps", lambda db: unpinned_backup(db, tmp / 'unpinned', args.deadline)),
+            ("online backup", lambda db: backup.create_backup(db, backup_dir=tmp / 'backups', keep=0)),
+        )
+        for label, run in runs:
+            db_path = tmp / 'live.db'
+            for suffix in ('', '-wal', '-shm'):
+                Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+            shutil.copyfile(source, db_path)
+            result, latencies = measure(db_path, run, args.append_interval)
+            if 'path' in result:
+                outcome = (f"{result['database_bytes'] / 1024 / 1024:.1f} MB -> "
+                           f"{result['compressed_bytes'] / 1024 / 1024:.1f} MB gzip")
+            else:
+                outcome = 'finished' if result['finished'] else f"abandoned after {args.deadline:.0f}s"
+            print(f"{label:<22} {result['copy_steps']:6d} {result.get('restarts', 0):8d} "
+                  f"{result['copy_seconds']:7.2f} {len(latencies):8d} "
+                  f"{percentile(latencies, 0.5) * 1000:8.2f} {percentile(latencies, 0.99) * 1000:8.2f} "
+                  f"{max(latencies) * 1000:8.1f}  {outcome}")
+
+        restored = tmp / 'restored.db'
+        report = backup.restore_backup(result['path'], db_path=restored, backup_dir=tmp / 'safety')
+        info = backup.verify_database(restored)
+    print("-" * 96)
+    print(f"Restored {report['restored']} in {report['duration_seconds']:.2f}s "
+          f"(schema v{info['schema_version']}, integrity ok)")
+
+
+if __name__ == '__main__':
+    main()
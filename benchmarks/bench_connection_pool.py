@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Connection pool benchmark
+
+Measures the per-call overhead of DatabaseManager.get_connection() against the
+previous behaviour of opening a fresh sqlite3 connection and re-issuing the WAL
+pragmas on every call.
+
+Usage:
+    python benchmarks/bench_connection_pool.py [--iterations 5000] [--threads 4]
+"""
+
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import DatabaseManager
+
+
+def legacy_connection_call(db_path):
+    """One call using the old open/pragma/close-per-call pattern."""
+    conn = sqlite3.connect(db_path, timeout=60.0)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("SELECT COUNT(*) FROM script_executions").fetchone()
+    finally:
+        conn.close()
+
+
+def pooled_connection_call(db):
+    """One call through the pooled get_connection()."""
+    with db.get_connection() as conn:
+        conn.execute("SELECT COUNT(*) FROM script_executions").fetchone()
+
+
+def time_calls(func, iterations, threads):
+    """Run func() iterations times on each of N threads, return microseconds per call."""
+    def worker():
+        for _ in range(iterations):
+            func()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return elapsed / (iterations * threads) * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark pooled vs per-call SQLite connections')
+    parser.add_argument('--iterations', type=int, default=5000, help='Calls per thread')
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent threads')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'bench.db')
+        db = DatabaseManager(db_path)
+
+        print(f"Iterations: {args.iterations} x {args.threads} threads")
+        print("-" * 50)
+
+        for threads in (1, args.threads):
+            legacy_us = time_calls(lambda: legacy_connection_call(db_path), args.iterations, threads)
+            pooled_us = time_calls(lambda: pooled_connection_call(db), args.iterations, threads)
+            print(f"{threads} thread(s):")
+            print(f"  per-call connect + pragmas: {legacy_us:8.1f} us/call")
+            print(f"  pooled get_connection():    {pooled_us:8.1f} us/call")
+            print(f"  speedup:                    {legacy_us / pooled_us:8.1f}x")
+
+        print("-" * 50)
+        print(f"Pool stats: {db.get_pool_stats()}")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+In-memory execution output benchmark
+
+Feeds script output through the old per-script list (extended, then re-sliced
+to the last 1000 lines on every flush) and through the bounded ring buffers
+of execution_output.py, in 100-line batches as run_script_thread flushes
+them. Reports the time spent appending (batches built beforehand) and the
+traced memory held afterwards (batches built during the run, as in the app),
+for ordinary lines and for a script that writes very long lines.
+
+Usage:
+    python benchmarks/bench_execution_output.py [--lines 200000] [--scripts 10]
+"""
+
+import sys
+import time
+import argparse
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from execution_output import OutputStore
+
+
+def make_batch(offset, width):
+    """A freshly formatted flush, like run_script_thread builds for every batch."""
+    return [f"[12:00:00] Processing item {n}: " + "x" * width for n in range(offset, offset + 100)]
+
+
+def run_list(scripts, batches):
+    """The old script_outputs: extend, then re-slice when over 1000 lines."""
+    outputs = {}
+    for script in range(scripts):
+        outputs[script] = []
+        for batch in batches():
+            outputs[script].extend(batch)
+            if len(outputs[script]) > 1000:
+                outputs[script] = outputs[script][-1000:]
+    return outputs
+
+
+def run_store(scripts, batches):
+    """One ring buffer per run, capped by lines and size."""
+    store = OutputStore()
+    for script in range(scripts):
+        output = store.open(f'script_{script}')
+        for batch in batches():
+            store.append(output, batch)
+        store.finish(output)
+    return store
+
+
+def measure(run, scripts, lines, width):
+    """Wall time of appending prebuilt batches, then the memory held after a traced run."""
+    prebuilt = [make_batch(offset, width) for offset in range(0, lines, 100)]
+    start = time.perf_counter()
+    run(scripts, lambda: prebuilt)
+    elapsed = time.perf_counter() - start
+    del prebuilt
+    tracemalloc.start()
+    result = run(scripts, lambda: (make_batch(offset, width) for offset in range(0, lines, 100)))
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return elapsed, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare list re-slicing with bounded ring buffers')
+    parser.add_argument('--lines', type=int, default=200_000, help='Output lines per run')
+    parser.add_argument('--scripts', type=int, default=10, help='Scripts that have run')
+    args = parser.parse_args()
+
+    print(f"{args.scripts} runs of {args.lines} lines, flushed 100 at a time")
+    print(f"{'output':<22} {'line':>6} {'append ms':>10} {'MB held':>8}")
+    print("-" * 49)
+    for width in (40, 4000):
+        # Long lines are fewer so the run takes a similar time
+        lines = args.lines if width < 1000 else args.lines // 20
+        for label, run in (("list, re-sliced", run_list), ("ring buffer, bounded", run_store)):
+            elapsed, held = measure(run, args.scripts, lines, width)
+            print(f"{label:<22} {width:6d} {elapsed * 1000:10.1f} {held / 1024 / 1024:8.2f}")
+
+
+if __name__ == '__main__':
+    main()
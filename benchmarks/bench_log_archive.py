@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Log archive benchmark
+
+Fills a database with finished executions whose logs are stored one row per
+line, then archives them into compressed chunks and compares on-disk size and
+the time to read a full execution back through get_execution_logs().
+
+Usage:
+    python benchmarks/bench_log_archive.py [--executions 50] [--lines 20000] [--reads 20]
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import DatabaseManager
+
+SAMPLE_LINES = [
+    "🔍 Scanning directory: /media/Not_Owned/{artist}/{album}",
+    "  ✅ {artist} - {album} ({count} tracks, {size:.1f} MB)",
+    "  ⭐ Starred in Navidrome: {artist} - {album}",
+    "Searching slskd for: {artist} {album}",
+    "  Found {count} results, best match {size:.1f} MB FLAC",
+    "⚠️ Warning: no tracks matched for {artist} - {album}",
+]
+
+
+def make_line(rng):
+    """Build one realistic-looking output line."""
+    return rng.choice(SAMPLE_LINES).format(
+        artist=f"Artist {rng.randint(1, 2000)}",
+        album=f"Album {rng.randint(1, 10000)}",
+        count=rng.randint(1, 30),
+        size=rng.uniform(20, 900)
+    )
+
+
+def db_size_bytes(db):
+    """Checkpoint and vacuum so the file size reflects live data only."""
+    with db.get_connection() as conn:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+    return os.path.getsize(db.db_path)
+
+
+def time_reads(db, execution_ids, reads):
+    """Average milliseconds to read one whole execution's logs."""
+    start = time.perf_counter()
+    for i in range(reads):
+        db.get_execution_logs(execution_ids[i % len(execution_ids)], limit=10_000_000)
+    return (time.perf_counter() - start) / reads * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the compressed log archive tier')
+    parser.add_argument('--executions', type=int, default=50, help='Finished executions to create')
+    parser.add_argument('--lines', type=int, default=20000, help='Log lines per execution')
+    parser.add_argument('--reads', type=int, default=20, help='Full-execution reads to time')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / 'bench.db'))
+
+        print(f"Executions: {args.executions} x {args.lines:,} lines")
+        print("-" * 50)
+
+        execution_ids = []
+        for n in range(args.executions):
+            execution_id = db.start_execution('bench_log_archive', 'Log Archive Benchmark')
+            for offset in range(0, args.lines, 1000):
+                now = datetime.now()
+                db.add_log_lines_batch(execution_id, [
+                    {'content': make_line(rng), 'log_level': 'info', 'timestamp': now}
+                    for _ in range(min(1000, args.lines - offset))
+                ])
+            # Record completion without triggering the archive so row storage can be measured
+            db.submit_write(db._finish_execution, execution_id, 0, None)
+            execution_ids.append(execution_id)
+
+        row_size = db_size_bytes(db)
+        row_read_ms = time_reads(db, execution_ids, args.reads)
+
+        start = time.perf_counter()
+        for execution_id in execution_ids:
+            db.archive_execution_logs(execution_id)
+        archive_secs = time.perf_counter() - start
+
+        archive_size = db_size_bytes(db)
+        archive_read_ms = time_reads(db, execution_ids, args.reads)
+
+        print(f"Row per line:      {row_size / 1024 / 1024:8.1f} MB   {row_read_ms:8.1f} ms/execution read")
+        print(f"Archived chunks:   {archive_size / 1024 / 1024:8.1f} MB   {archive_read_ms:8.1f} ms/execution read")
+        print(f"Size reduction:    {row_size / archive_size:8.1f}x")
+        print(f"Archive time:      {archive_secs / len(execution_ids) * 1000:8.1f} ms/execution")
+        print("-" * 50)
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Log ingest benchmark
+
+Appends a large number of log lines to a single execution through
+DatabaseManager.add_log_lines_batch() and reports the per-batch latency at
+each checkpoint. With line numbers handed out by the writer's in-memory counter
+the latency should stay flat however long the execution gets.
+
+Pass --compare-legacy to also time the previous behaviour of counting the
+execution's existing rows before every batch.
+
+Usage:
+    python benchmarks/bench_log_ingest.py [--lines 1000000] [--batch-size 100] [--compare-legacy]
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import DatabaseManager
+from records import to_epoch_ms
+
+
+def legacy_insert_batch(cursor, execution_id, entries):
+    """The old COUNT(*)-per-batch append, run as a writer operation."""
+    cursor.execute("SELECT COUNT(*) as count FROM script_logs WHERE execution_id = ?", (execution_id,))
+    start_line_number = cursor.fetchone()['count'] + 1
+    cursor.executemany("""
+        INSERT INTO script_logs (execution_id, line_number, timestamp, content, log_level)
+        VALUES (?, ?, ?, ?, ?)
+    """, [
+        (execution_id, start_line_number + i, to_epoch_ms(entry['timestamp']), entry['content'], entry['log_level'])
+        for i, entry in enumerate(entries)
+    ])
+
+
+def make_batch(start, batch_size):
+    """Build one batch of synthetic log entries."""
+    now = datetime.now()
+    return [
+        {
+            'content': f"Processing item {start + i}: Artist - Album (2024) [FLAC] ... ok",
+            'log_level': 'info',
+            'timestamp': now
+        }
+        for i in range(batch_size)
+    ]
+
+
+def run_ingest(db, execution_id, total_lines, batch_size, checkpoints, append):
+    """Append total_lines lines, returning (lines_so_far, avg_ms_per_batch) per checkpoint window."""
+    results = []
+    window_start = time.perf_counter()
+    window_batches = 0
+    written = 0
+    checkpoint_every = max(batch_size, total_lines // checkpoints)
+
+    while written < total_lines:
+        size = min(batch_size, total_lines - written)
+        append(db, execution_id, make_batch(written, size))
+        written += size
+        window_batches += 1
+
+        if written % checkpoint_every == 0 or written == total_lines:
+            elapsed = time.perf_counter() - window_start
+            results.append((written, elapsed / window_batches * 1000))
+            window_start = time.perf_counter()
+            window_batches = 0
+
+    return results
+
+
+def append_current(db, execution_id, entries):
+    """Append through the public batch API."""
+    db.add_log_lines_batch(execution_id, entries)
+
+
+def append_legacy(db, execution_id, entries):
+    """Append through the writer using the old COUNT(*) numbering."""
+    db.submit_write(legacy_insert_batch, execution_id, entries)
+
+
+def print_results(label, results):
+    """Print the latency table for one run."""
+    print(f"{label}:")
+    print(f"  {'lines':>10}  {'ms/batch':>9}")
+    for lines, ms in results:
+        print(f"  {lines:>10,}  {ms:9.3f}")
+    first, last = results[0][1], results[-1][1]
+    print(f"  last/first window ratio: {last / first:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark log line ingest into a single execution')
+    parser.add_argument('--lines', type=int, default=1_000_000, help='Total lines to ingest')
+    parser.add_argument('--batch-size', type=int, default=100, help='Lines per add_log_lines_batch call')
+    parser.add_argument('--checkpoints', type=int, default=10, help='Number of latency windows to report')
+    parser.add_argument('--compare-legacy', action='store_true', help='Also time the COUNT(*)-per-batch append')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'bench.db')
+        db = DatabaseManager(db_path)
+
+        print(f"Ingesting {args.lines:,} lines in batches of {args.batch_size}")
+        print("-" * 50)
+
+        execution_id = db.start_execution('bench_log_ingest', 'Log Ingest Benchmark')
+        results = run_ingest(db, execution_id, args.lines, args.batch_size, args.checkpoints, append_current)
+        db.finish_execution(execution_id, 0)
+        print_results("Counter-based line numbers", results)
+
+        if args.compare_legacy:
+            execution_id = db.start_execution('bench_log_ingest_legacy', 'Log Ingest Benchmark (legacy)')
+            results = run_ingest(db, execution_id, args.lines, args.batch_size, args.checkpoints, append_legacy)
+            db.finish_execution(execution_id, 0)
+            print_results("COUNT(*) per batch", results)
+
+        print("-" * 50)
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Live log viewing benchmark
+
+Simulates a busy script run - one batch of log lines flushed per tick, the way
+run_script_thread flushes every second - with a number of open log viewers,
+three ways:
+
+- script polling: every viewer fetches /logs/<script_id> each tick, which
+  re-reads and re-sends the latest 1000 lines (the script log modal);
+- cursor polling: every viewer fetches the lines past its last line number each
+  tick (the execution log modal);
+- streaming: every viewer follows /api/execution/<id>/stream and is pushed each
+  committed batch.
+
+Reports database reads, bytes sent to viewers and how long a line waits before
+a viewer has it (for polling, half the one second interval on average). Time
+runs faster than in the app: one tick per --tick seconds stands for one second
+of the run.
+
+Usage:
+    python benchmarks/bench_log_stream.py [--viewers 5] [--ticks 120] [--lines-per-tick 200]
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import DatabaseManager
+from log_stream import LogStreamHub
+
+
+class CountingDB:
+    """Database proxy counting the reads a log viewer makes."""
+
+    def __init__(self, db):
+        self.db = db
+        self.reads = 0
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        attr = getattr(self.db, name)
+        if name.startswith('get_'):
+            def counted(*args, **kwargs):
+                with self.lock:
+                    self.reads += 1
+                return attr(*args, **kwargs)
+            return counted
+        return attr
+
+
+def make_batch(tick, lines_per_tick):
+    return [{'content': f"Processing item {tick * lines_per_tick + n}: Artist - Album (2024) [FLAC]"}
+            for n in range(lines_per_tick)]
+
+
+def run_polling(db, args, mode):
+    """Writer flushes a batch, then every viewer polls. Returns (reads, bytes, mean lag in ms)."""
+    counting = CountingDB(db)
+    execution_id = db.start_execution(f'poll_{mode}', 'Poll')
+    cursors = [0] * args.viewers
+    sent = 0
+    for tick in range(args.ticks):
+        db.add_log_lines_batch(execution_id, make_batch(tick, args.lines_per_tick))
+        for viewer in range(args.viewers):
+            if mode == 'script':
+                logs = counting.get_script_logs(f'poll_{mode}', limit=1000)
+                sent += len(json.dumps({'logs': logs}))
+            else:
+                page = counting.get_execution_log_page(execution_id, after_line=cursors[viewer], limit=1000)
+                logs = [db._format_log_line(line['timestamp'], line['content']) for line in page['lines']]
+                cursors[viewer] = page['last_line'] or cursors[viewer]
+                sent += len(json.dumps({'logs': logs, 'last_line': page['last_line']}))
+        time.sleep(args.tick)
+    db.finish_execution(execution_id, 0)
+    # A line flushed right after a poll waits a whole interval; on average half of one
+    return counting.reads, sent, 500.0
+
+
+def run_streaming(db, args):
+    """Writer flushes and publishes on commit; viewers follow the hub."""
+    counting = CountingDB(db)
+    hub = LogStreamHub()
+    execution_id = db.start_execution('stream', 'Stream')
+    published = {}
+    lags = []
+    sent = [0]
+    lock = threading.Lock()
+
+    def viewer():
+        for event in hub.stream(counting, execution_id):
+            received = time.perf_counter()
+            with lock:
+                sent[0] += len(event)
+                if event.startswith(b'id: '):
+                    last_line = int(event.split(b'\n', 1)[0][4:])
+                    if last_line in published:
+                        lags.append(received - published[last_line])
+
+    viewers = [threading.Thread(target=viewer) for _ in range(args.viewers)]
+    for thread in viewers:
+        thread.start()
+    time.sleep(0.1)
+
+    for tick in range(args.ticks):
+        batch = make_batch(tick, args.lines_per_tick)
+        future = db.add_log_lines_batch(execution_id, batch, wait=False)
+        with lock:
+            published[(tick + 1) * args.lines_per_tick] = time.perf_counter()
+        hub.publish_on_commit(execution_id, future, [entry['content'] for entry in batch])
+        time.sleep(args.tick)
+    db.finish_execution(execution_id, 0)
+    hub.finish(execution_id)
+    for thread in viewers:
+        thread.join()
+    mean_lag = sum(lags) / len(lags) * 1000 if lags else 0.0
+    return counting.reads, sent[0], mean_lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare polling and streaming of live execution logs')
+    parser.add_argument('--viewers', type=int, default=5, help='Open log viewers')
+    parser.add_argument('--ticks', type=int, default=120, help='Flush intervals (seconds) simulated')
+    parser.add_argument('--lines-per-tick', type=int, default=200, help='Log lines flushed per interval')
+    parser.add_argument('--tick', type=float, default=0.02, help='Real seconds per simulated second')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / 'bench.db'))
+        try:
+            print(f"{args.viewers} viewers, {args.ticks} s run, {args.lines_per_tick} lines/s")
+            print(f"{'viewing':<16} {'db reads':>9} {'MB sent':>9} {'lag (ms)':>9}")
+            print("-" * 46)
+            for label, run in (
+                ("script polling", lambda: run_polling(db, args, 'script')),
+                ("cursor polling", lambda: run_polling(db, args, 'cursor')),
+                ("streaming", lambda: run_streaming(db, args)),
+            ):
+                reads, sent, lag = run()
+                print(f"{label:<16} {reads:9d} {sent / 1024 / 1024:9.2f} {lag:9.1f}")
+        finally:
+            db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Script output capture benchmark
+
+Starts several child processes that print as fast as they can and reads their
+output the old way (a thread per process, text-mode readline with a datetime
+per line) and through output_capture.py (one selector thread, raw chunks split
+in bulk, one timestamp per chunk). Reports wall time, the CPU time the web
+process spent reading, the lines handed on for logging, and the reader threads
+used. A second run has each child draw a carriage-return progress bar: text
+mode turns every carriage return into a newline, so the old reader logged each
+update of the bar as a line of its own.
+
+Usage:
+    python benchmarks/bench_output_capture.py [--lines 200000] [--processes 4]
+"""
+
+import sys
+import time
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from output_capture import OutputCapture
+
+CHILD = r'''
+import sys
+lines, bar = int(sys.argv[1]), sys.argv[2] == 'bar'
+write = sys.stdout.write
+if bar:
+    for n in range(lines):
+        write(f"\r{n * 100 // lines:3d}%|{'#' * (n * 40 // lines):<40}| {n}/{lines}")
+    write("\n")
+else:
+    for n in range(lines):
+        write(f"Processing item {n}: Artist {n % 977} - Album {n % 131}\n")
+'''
+
+
+def start_children(processes, lines, bar, text):
+    return [subprocess.Popen([sys.executable, '-c', CHILD, str(lines), 'bar' if bar else 'lines'],
+                             stdout=subprocess.PIPE, universal_newlines=text, bufsize=1 if text else -1)
+            for _ in range(processes)]
+
+
+def run_readline(processes, lines, bar):
+    """The old reader: a thread per process iterating readline."""
+    children = start_children(processes, lines, bar, text=True)
+    counts = [0] * processes
+
+    def read(index, process):
+        for line in iter(process.stdout.readline, ''):
+            content = line.rstrip()
+            timestamp = datetime.now()
+            counts[index] += 1 if content and timestamp else 0
+
+    threads = [threading.Thread(target=read, args=(index, process)) for index, process in enumerate(children)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for process in children:
+        process.wait()
+    return sum(counts), len(threads)
+
+
+def run_capture(processes, lines, bar):
+    """One selector thread for every process."""
+    capture = OutputCapture()
+    children = start_children(processes, lines, bar, text=False)
+    counts = [0] * processes
+
+    def on_lines(index):
+        def handle(batch, timestamp):
+            counts[index] += sum(1 for line in batch if line.rstrip())
+        return handle
+
+    streams = [capture.watch(process.stdout, on_lines(index)) for index, process in enumerate(children)]
+    for stream in streams:
+        stream.wait()
+    for process in children:
+        process.wait()
+    return sum(counts), 1
+
+
+def measure(run, processes, lines, bar):
+    wall, cpu = time.perf_counter(), time.process_time()
+    captured, threads = run(processes, lines, bar)
+    return time.perf_counter() - wall, time.process_time() - cpu, captured, threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare per-process readline threads with the shared capture')
+    parser.add_argument('--lines', type=int, default=200_000, help='Lines (or bar updates) per process')
+    parser.add_argument('--processes', type=int, default=4, help='Scripts running at once')
+    args = parser.parse_args()
+
+    print(f"{args.processes} processes writing {args.lines} lines or progress-bar updates each")
+    print(f"{'reader':<22} {'output':<6} {'wall s':>7} {'cpu s':>7} {'lines':>8} {'threads':>8}")
+    print("-" * 63)
+    for bar in (False, True):
+        for label, run in (("readline per process", run_readline), ("shared chunked", run_capture)):
+            wall, cpu, captured, threads = measure(run, args.processes, args.lines, bar)
+            print(f"{label:<22} {'bar' if bar else 'lines':<6} {wall:7.2f} {cpu:7.2f} {captured:8d} {threads:8d}")
+
+
+if __name__ == '__main__':
+    main()
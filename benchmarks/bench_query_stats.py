@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Query stats overhead benchmark
+
+Runs the reads behind the web UI's polling endpoints (execution queue and
+stats, an expiring albums page, an album's tracks, a log page) plus a log
+append through two DatabaseManagers over the same data - one with
+DB_QUERY_STATS disabled and one with it enabled - and reports the
+instrumentation overhead. Rounds alternate between the two so machine noise
+affects both equally; the best round of each is compared.
+
+Usage:
+    python benchmarks/bench_query_stats.py [--albums 5000] [--iterations 500] [--rounds 7]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import DatabaseManager
+from records import to_epoch_ms
+
+
+def populate(db, albums):
+    """Insert executions, expiring albums with tracks and a logged execution."""
+    now = datetime.now()
+    with db.get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO script_executions
+            (script_id, script_name, start_time, end_time, duration_seconds, status, return_code)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (f"script_{n % 12}", f"Script {n % 12}", to_epoch_ms(now - timedelta(minutes=n)),
+             to_epoch_ms(now - timedelta(minutes=n) + timedelta(seconds=30)), 30.0, 'completed', 0)
+            for n in range(1, 2001)
+        ])
+        for album_id in range(1, albums + 1):
+            detected = to_epoch_ms(now - timedelta(days=album_id % 60, minutes=album_id))
+            conn.execute("""
+                INSERT INTO expiring_albums
+                (id, album_key, artist, album, directory, file_count, total_size_mb, first_detected, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (album_id, f"album-{album_id}", f"Artist {album_id % 997}", f"Album {album_id}",
+                  f"/media/Artist {album_id % 997}/Album {album_id}", 12, 400.0, detected, to_epoch_ms(now)))
+            conn.executemany("""
+                INSERT INTO album_tracks (album_id, file_path, file_name, file_size_mb, days_old, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (album_id, f"/media/Artist {album_id % 997}/Album {album_id}/{t:02d}.flac",
+                 f"{t:02d}.flac", 30.0, 10, detected)
+                for t in range(1, 13)
+            ])
+        conn.commit()
+
+    execution_id = db.start_execution('bench_query_stats', 'Query Stats Benchmark')
+    db.add_log_lines_batch(execution_id, [
+        {'content': f"Processing item {n}: Artist - Album [FLAC] ... ok", 'log_level': 'info'}
+        for n in range(5000)
+    ])
+    return execution_id
+
+
+def workload(db, albums, execution_id, iterations, rng):
+    """One round of UI-style reads and log appends, returning elapsed seconds."""
+    start = time.perf_counter()
+    for n in range(iterations):
+        db.get_execution_queue(limit=50)
+        db.get_execution_stats()
+        db.get_expiring_albums_summary(sort='expiry', limit=50, offset=rng.randrange(0, albums, 50))
+        db.get_album_tracks(f"album-{rng.randint(1, albums)}")
+        db.get_execution_log_page(execution_id, limit=200)
+        db.add_log_line(execution_id, f"Heartbeat {n}")
+    return time.perf_counter() - start
+
+
+def open_manager(db_path, enabled):
+    """A DatabaseManager with DB_QUERY_STATS on or off."""
+    if enabled:
+        os.environ['DB_QUERY_STATS'] = '1'
+    else:
+        os.environ.pop('DB_QUERY_STATS', None)
+    return DatabaseManager(db_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure DB_QUERY_STATS instrumentation overhead')
+    parser.add_argument('--albums', type=int, default=5000, help='Expiring albums (12 tracks each)')
+    parser.add_argument('--iterations', type=int, default=500, help='Workload iterations per round')
+    parser.add_argument('--rounds', type=int, default=7, help='Rounds per mode (best is reported)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        seed_path = str(Path(tmp) / 'seed.db')
+        seed = open_manager(seed_path, False)
+        execution_id = populate(seed, args.albums)
+        seed.close()
+
+        managers = {}
+        for label, enabled in (('disabled', False), ('enabled', True)):
+            db_path = str(Path(tmp) / f"{label}.db")
+            shutil.copyfile(seed_path, db_path)
+            managers[label] = open_manager(db_path, enabled)
+
+        best = {label: float('inf') for label in managers}
+        for round_number in range(args.rounds + 1):
+            for label, db in managers.items():
+                elapsed = workload(db, args.albums, execution_id, args.iterations, random.Random(round_number))
+                if round_number:  # first round warms up
+                    best[label] = min(best[label], elapsed)
+
+        snapshot = managers['enabled'].query_stats.snapshot(limit=1000)
+        for db in managers.values():
+            db.close()
+
+    statements = sum(s['count'] for s in snapshot['statements']) // (args.rounds + 1)
+    print(f"Iterations per round: {args.iterations:,} (~{statements:,} statements)")
+    print(f"Stats disabled: {best['disabled'] * 1000:8.1f} ms")
+    print(f"Stats enabled:  {best['enabled'] * 1000:8.1f} ms")
+    print(f"Overhead:       {(best['enabled'] / best['disabled'] - 1) * 100:+.2f}%")
+
+    print("\nTop statements by total time:")
+    for statement in snapshot['statements'][:8]:
+        print(f"  {statement['count']:>7,} x {statement['avg_ms']:7.3f} ms  {statement['sql'][:70]}")
+
+
+if __name__ == '__main__':
+    main()
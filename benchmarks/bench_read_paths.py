@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Read path benchmark
+
+Times the hot read queries - the execution queue, expiring albums, an album's
+tracks and a full execution log - against a database whose timestamps are
+stored as integer epoch milliseconds and decoded into slotted records.
+
+The same data is then copied into a second database with the timestamps
+rewritten as ISO text and read the previous way (SELECT *, dict(row) and
+datetime.fromisoformat per timestamp) for comparison. File sizes of both
+copies are reported as well.
+
+Usage:
+    python benchmarks/bench_read_paths.py [--executions 2000] [--albums 5000] [--log-lines 50000] [--reads 50]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import DatabaseManager
+from migrations import EPOCH_MS_COLUMNS
+from records import to_epoch_ms
+
+
+def populate(db, executions, albums, log_lines, rng):
+    """Fill the database, returning (album_key, log_execution_id) to read back."""
+    now = datetime.now()
+    with db.get_connection() as conn:
+        rows = []
+        for n in range(executions):
+            start = now - timedelta(minutes=executions - n)
+            rows.append((f"script_{n % 12}", f"Script {n % 12}", to_epoch_ms(start),
+                         to_epoch_ms(start + timedelta(seconds=30)), 30.0, 'completed', 0))
+        conn.executemany("""
+            INSERT INTO script_executions
+            (script_id, script_name, start_time, end_time, duration_seconds, status, return_code)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+        for album_id in range(1, albums + 1):
+            detected = to_epoch_ms(now - timedelta(days=rng.randint(0, 60), minutes=rng.randint(0, 1440)))
+            conn.execute("""
+                INSERT INTO expiring_albums
+                (id, album_key, artist, album, directory, file_count, total_size_mb, first_detected, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (album_id, f"album-{album_id}", f"Artist {album_id % 997}", f"Album {album_id}",
+                  f"/media/Not_Owned/Artist {album_id % 997}/Album {album_id}", 12, 400.0,
+                  detected, to_epoch_ms(now)))
+            conn.executemany("""
+                INSERT INTO album_tracks (album_id, file_path, file_name, file_size_mb, days_old, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (album_id, f"/media/Not_Owned/Artist {album_id % 997}/Album {album_id}/{t:02d}.flac",
+                 f"{t:02d}.flac", 30.0, 10, detected)
+                for t in range(1, 13)
+            ])
+        conn.commit()
+
+    execution_id = db.start_execution('bench_read_paths', 'Read Path Benchmark')
+    for offset in range(0, log_lines, 1000):
+        db.add_log_lines_batch(execution_id, [
+            {'content': f"Processing item {offset + i}: Artist - Album [FLAC] ... ok", 'log_level': 'info'}
+            for i in range(min(1000, log_lines - offset))
+        ])
+    # Record completion without archiving so both copies read live rows
+    db.submit_write(db._finish_execution, execution_id, 0, None)
+    return 'album-1', execution_id
+
+
+def make_legacy_copy(source_path, legacy_path):
+    """Copy the database and rewrite the epoch ms columns as ISO text."""
+    shutil.copyfile(source_path, legacy_path)
+    conn = sqlite3.connect(legacy_path)
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%epoch_ms%'").fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+    for table, columns in EPOCH_MS_COLUMNS.items():
+        assignments = ", ".join(
+            f"{column} = strftime('%Y-%m-%d %H:%M:%f', {column} / 1000.0, 'unixepoch', 'localtime')"
+            for column in columns
+        )
+        conn.execute(f"UPDATE {table} SET {assignments}")
+    conn.commit()
+    conn.close()
+
+
+def legacy_execution_queue(conn, limit):
+    """The previous get_execution_queue()."""
+    executions = []
+    for row in conn.execute("SELECT * FROM script_executions ORDER BY start_time DESC LIMIT ?", (limit,)).fetchall():
+        execution = dict(row)
+        execution['start_time'] = datetime.fromisoformat(execution['start_time'])
+        if execution['end_time']:
+            execution['end_time'] = datetime.fromisoformat(execution['end_time'])
+        executions.append(execution)
+    return executions
+
+
+def legacy_expiring_albums(conn):
+    """The previous get_expiring_albums()."""
+    albums = []
+    for row in conn.execute("""
+        SELECT * FROM expiring_albums WHERE status = 'pending' AND is_starred = FALSE ORDER BY first_detected ASC
+    """).fetchall():
+        album = dict(row)
+        album['first_detected'] = datetime.fromisoformat(album['first_detected'])
+        album['last_seen'] = datetime.fromisoformat(album['last_seen'])
+        if album['deleted_at']:
+            album['deleted_at'] = datetime.fromisoformat(album['deleted_at'])
+        albums.append(album)
+    return albums
+
+
+def legacy_album_tracks(conn, album_key):
+    """The previous get_album_tracks()."""
+    tracks = []
+    for row in conn.execute("""
+        SELECT at.*, ea.first_detected FROM album_tracks at
+        JOIN expiring_albums ea ON at.album_id = ea.id
+        WHERE ea.album_key = ? ORDER BY at.file_name ASC
+    """, (album_key,)).fetchall():
+        track = dict(row)
+        track['last_modified'] = datetime.fromisoformat(track['last_modified'])
+        track['days_old'] = (datetime.now() - track['last_modified']).days
+        tracks.append(track)
+    return tracks
+
+
+def legacy_execution_logs(conn, execution_id):
+    """The previous get_execution_logs() over live rows."""
+    return [
+        f"[{datetime.fromisoformat(row['timestamp']).strftime('%H:%M:%S')}] {row['content']}"
+        for row in conn.execute("""
+            SELECT timestamp, content FROM script_logs WHERE execution_id = ? ORDER BY line_number ASC
+        """, (execution_id,)).fetchall()
+    ]
+
+
+def timed(func, reads):
+    """Average milliseconds per call."""
+    func()  # warm up caches
+    start = time.perf_counter()
+    for _ in range(reads):
+        func()
+    return (time.perf_counter() - start) / reads * 1000
+
+
+def file_size_mb(path):
+    """Checkpoint and vacuum, then return the file size in MB."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path) / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hot database read paths')
+    parser.add_argument('--executions', type=int, default=2000, help='Executions in the queue table')
+    parser.add_argument('--albums', type=int, default=5000, help='Expiring albums (12 tracks each)')
+    parser.add_argument('--log-lines', type=int, default=50000, help='Lines in the execution read back')
+    parser.add_argument('--reads', type=int, default=50, help='Timed reads per query')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / 'bench.db')
+        legacy_path = str(Path(tmp) / 'legacy.db')
+
+        db = DatabaseManager(db_path)
+        album_key, execution_id = populate(db, args.executions, args.albums, args.log_lines, rng)
+        make_legacy_copy(db_path, legacy_path)
+
+        legacy = sqlite3.connect(legacy_path)
+        legacy.row_factory = sqlite3.Row
+
+        cases = [
+            ("Execution queue (100)",
+             lambda: legacy_execution_queue(legacy, 100),
+             lambda: db.get_execution_queue(limit=100)),
+            (f"Expiring albums ({args.albums:,})",
+             lambda: legacy_expiring_albums(legacy),
+             lambda: db.get_expiring_albums()),
+            ("Album tracks (12)",
+             lambda: legacy_album_tracks(legacy, album_key),
+             lambda: db.get_album_tracks(album_key)),
+            (f"Execution log ({args.log_lines:,} lines)",
+             lambda: legacy_execution_logs(legacy, execution_id),
+             lambda: db.get_execution_logs(execution_id, limit=10_000_000)),
+        ]
+
+        print(f"{'query':<32} {'ISO + dict':>12} {'epoch + record':>15} {'speedup':>8}")
+        print("-" * 70)
+        for label, before, after in cases:
+            before_ms = timed(before, args.reads)
+            after_ms = timed(after, args.reads)
+            print(f"{label:<32} {before_ms:10.3f}ms {after_ms:13.3f}ms {before_ms / after_ms:7.2f}x")
+        print("-" * 70)
+
+        legacy.close()
+        db.close()
+        print(f"Database size: ISO text {file_size_mb(legacy_path):.1f} MB, "
+              f"epoch ms {file_size_mb(db_path):.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
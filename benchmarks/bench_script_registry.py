@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Script registry benchmark
+
+Times script lookups the way the status and log endpoints make them: a full
+scan of the scripts folder that reads and parses every file (the old
+scan_scripts_folder() behaviour) against the cached registry, both when the
+refresh interval has not elapsed (served from memory) and when every lookup
+re-checks file signatures.
+
+Usage:
+    python benchmarks/bench_script_registry.py [--iterations 2000]
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from script_registry import ScriptRegistry, is_script_file, extract_script_metadata, build_script_config
+
+SCRIPTS_DIR = str(Path(__file__).parent.parent / 'scripts')
+
+
+def full_scan(script_id):
+    """List the folder and parse every script, then look one up."""
+    scripts = {}
+    for filename in os.listdir(SCRIPTS_DIR):
+        if is_script_file(filename):
+            metadata = extract_script_metadata(os.path.join(SCRIPTS_DIR, filename))
+            scripts[filename[:-3]] = build_script_config(filename[:-3], filename, metadata)
+    return scripts.get(script_id)
+
+
+def time_calls(func, iterations):
+    """Microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare script discovery with and without the registry')
+    parser.add_argument('--iterations', type=int, default=2000, help='Lookups per variant')
+    args = parser.parse_args()
+
+    script_id = 'scan_library_age'
+    cached = ScriptRegistry(SCRIPTS_DIR)
+    checked = ScriptRegistry(SCRIPTS_DIR, refresh_interval=0)
+    cached.refresh(force=True)
+    checked.refresh(force=True)
+
+    count = sum(1 for filename in os.listdir(SCRIPTS_DIR) if is_script_file(filename))
+    print(f"{count} scripts in {SCRIPTS_DIR}, {args.iterations} lookups of '{script_id}'")
+    print(f"  full scan and parse:        {time_calls(lambda: full_scan(script_id), args.iterations):9.1f} us/lookup")
+    print(f"  registry, stat every call:  {time_calls(lambda: checked.get(script_id), args.iterations):9.1f} us/lookup")
+    print(f"  registry, within interval:  {time_calls(lambda: cached.get(script_id), args.iterations):9.1f} us/lookup")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+SSE broadcasting benchmark
+
+Simulates the dashboard status stream for a number of connected clients: one
+script running and updating its progress for part of the run, then idle. The
+previous behaviour queued the full state to every client each second and each
+client serialized it; the broker sends a versioned delta only when something
+changed and encodes it once. Reports the CPU time spent and bytes queued.
+
+Usage:
+    python benchmarks/bench_sse_broker.py [--clients 50] [--ticks 600] [--active-ticks 120]
+"""
+
+import sys
+import json
+import time
+import queue
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sse_broker import SSEBroker
+
+
+def make_state(tick, active_ticks):
+    """Dashboard state at a given second: a running script for the first ``active_ticks``."""
+    running = {}
+    if tick < active_ticks:
+        running['scan_library_age'] = {
+            'running': True, 'pid': 4242, 'dry_run': False, 'start_time': '2026-01-01T10:00:00',
+            'progress': {'current': tick, 'total': active_ticks, 'percentage': tick * 100 // active_ticks,
+                         'current_item': 'Processing...'}
+        }
+    execution_queue = [{
+        'scriptId': f'script_{n % 4}', 'name': f'Script {n % 4}', 'startTime': '2026-01-01T09:00:00',
+        'endTime': '2026-01-01T09:05:00', 'status': 'completed', 'duration_seconds': 300.0,
+        'dry_run': False, 'execution_id': 1000 - n
+    } for n in range(20)]
+    if tick < active_ticks:
+        execution_queue[0] = dict(execution_queue[0], status='running', endTime=None, execution_id=1001)
+    return {'running_scripts': running, 'execution_queue': execution_queue}
+
+
+def run_full_state(clients, ticks, active_ticks):
+    """Full state to every client queue every tick, serialized per client."""
+    queues = [queue.Queue() for _ in range(clients)]
+    sent = 0
+    start = time.process_time()
+    for tick in range(ticks):
+        state = make_state(tick, active_ticks)
+        for q in queues:
+            q.put({'type': 'status_update', 'data': state})
+        for q in queues:
+            event = q.get_nowait()
+            sent += len(f"event: {event['type']}\n".encode()) + len(f"data: {json.dumps(event['data'])}\n\n".encode())
+    return time.process_time() - start, sent
+
+
+def run_broker(clients, ticks, active_ticks):
+    """Deltas only when changed, encoded once and shared."""
+    broker = SSEBroker()
+    queues = [broker.subscribe() for _ in range(clients)]
+    sent = sum(len(q.get_nowait()) for q in queues)
+    start = time.process_time()
+    for tick in range(ticks):
+        broker.publish_state(make_state(tick, active_ticks))
+        for q in queues:
+            while not q.empty():
+                sent += len(q.get_nowait())
+    return time.process_time() - start, sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare full-state and delta SSE broadcasting')
+    parser.add_argument('--clients', type=int, default=50, help='Connected dashboards')
+    parser.add_argument('--ticks', type=int, default=600, help='Broadcast intervals (seconds) simulated')
+    parser.add_argument('--active-ticks', type=int, default=120, help='Intervals with a script running')
+    args = parser.parse_args()
+
+    print(f"{args.clients} clients, {args.ticks} s simulated, script running for the first {args.active_ticks} s")
+    print(f"{'broadcast':<28} {'cpu ms':>9} {'MB queued':>10}")
+    print("-" * 49)
+    for label, run in (("full state, per-client json", run_full_state), ("versioned deltas, shared", run_broker)):
+        cpu, sent = run(args.clients, args.ticks, args.active_ticks)
+        print(f"{label:<28} {cpu * 1000:9.1f} {sent / 1024 / 1024:10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+SSE slow-client load test
+
+Connects a few clients that read everything and many that never read (a
+sleeping laptop behind a proxy), then publishes a changing dashboard state
+every tick - worst case, every tick is a delta. Samples traced memory as it
+goes, once with unbounded per-client buffers (how the old queue.Queue()
+subscribers behaved) and once with the broker's bounded, coalescing buffers
+and slow-client eviction. Time runs faster than in the app: one tick per
+--tick seconds, with eviction after --slow-client-seconds.
+
+Usage:
+    python benchmarks/bench_sse_load.py [--slow-clients 200] [--fast-clients 5] [--ticks 1500]
+"""
+
+import sys
+import time
+import argparse
+import threading
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sse_broker import SSEBroker
+from benchmarks.bench_sse_broker import make_state
+
+
+def fast_reader(subscriber, stop, received):
+    """Take events as soon as they arrive."""
+    while not stop.is_set():
+        try:
+            if subscriber.get(timeout=0.1) is not None:
+                received[0] += 1
+        except EOFError:
+            return
+
+
+def run(broker, args):
+    """Publish ``args.ticks`` states; returns (memory samples in MB, fast events received)."""
+    slow = [broker.subscribe() for _ in range(args.slow_clients)]
+    stop = threading.Event()
+    received = [0]
+    readers = [threading.Thread(target=fast_reader, args=(broker.subscribe(), stop, received))
+               for _ in range(args.fast_clients)]
+    for reader in readers:
+        reader.start()
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    samples = []
+    for tick in range(args.ticks):
+        # Progress changes every tick and a script starts or finishes every 50
+        broker.publish_state(make_state(tick % 100, 50 + tick % 50))
+        if tick % (args.ticks // 10) == 0 or tick == args.ticks - 1:
+            samples.append((tracemalloc.get_traced_memory()[0] - baseline) / 1024 / 1024)
+        time.sleep(args.tick)
+    tracemalloc.stop()
+
+    stop.set()
+    for reader in readers:
+        reader.join()
+    del slow
+    return samples, received[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memory of the SSE broker with clients that stop reading')
+    parser.add_argument('--slow-clients', type=int, default=200, help='Clients that never read')
+    parser.add_argument('--fast-clients', type=int, default=5, help='Clients that keep up')
+    parser.add_argument('--ticks', type=int, default=1500, help='State changes published')
+    parser.add_argument('--tick', type=float, default=0.002, help='Seconds between state changes')
+    parser.add_argument('--slow-client-seconds', type=float, default=2.0, help='Stall before eviction')
+    args = parser.parse_args()
+
+    print(f"{args.slow_clients} slow + {args.fast_clients} fast clients, {args.ticks} state changes")
+    for label, broker in (
+        ("unbounded", SSEBroker(max_buffered_events=10 ** 9, slow_client_seconds=float('inf'))),
+        ("bounded", SSEBroker(slow_client_seconds=args.slow_client_seconds)),
+    ):
+        samples, received = run(broker, args)
+        stats = broker.get_stats()
+        print(f"\n{label}: traced memory MB at each tenth of the run")
+        print("  " + " ".join(f"{sample:6.1f}" for sample in samples))
+        print(f"  fast clients received {received} events; subscribers left {stats['subscribers']}, "
+              f"max depth {stats['max_queue_depth']}, coalesced {stats['coalesced_events']}, "
+              f"evicted {stats['evicted_subscribers']}")
+
+
+if __name__ == '__main__':
+    main()
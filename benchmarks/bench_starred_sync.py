@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Starred track sync benchmark
+
+Times DatabaseManager.bulk_update_starred_tracks() against a library of album
+tracks, first for an initial sync and then for a typical re-sync where only a
+few stars changed. Pass --compare-legacy to also time the previous
+reset-everything-then-update-per-track approach (without the file_path index
+it scans the table once per starred track, so use a smaller --tracks).
+
+Usage:
+    python benchmarks/bench_starred_sync.py [--tracks 50000] [--starred 5000] [--compare-legacy]
+"""
+
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from database import DatabaseManager
+from records import to_epoch_ms
+
+
+def populate(db, track_count, tracks_per_album=12):
+    """Insert albums and tracks directly, returning every track path."""
+    now = to_epoch_ms(datetime.now())
+    paths = []
+    with db.get_connection() as conn:
+        for album_id in range(1, track_count // tracks_per_album + 2):
+            directory = f"/media/Not_Owned/Artist {album_id % 997}/Album {album_id}"
+            conn.execute("""
+                INSERT INTO expiring_albums
+                (id, album_key, artist, album, directory, file_count, total_size_mb, first_detected, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (album_id, f"album-{album_id}", f"Artist {album_id % 997}", f"Album {album_id}",
+                  directory, tracks_per_album, 400.0, now, now))
+            rows = []
+            for n in range(tracks_per_album):
+                if len(paths) >= track_count:
+                    break
+                path = f"{directory}/{n + 1:02d} - Track.flac"
+                paths.append(path)
+                rows.append((album_id, path, f"{n + 1:02d} - Track.flac", 30.0, 10, now))
+            conn.executemany("""
+                INSERT INTO album_tracks (album_id, file_path, file_name, file_size_mb, days_old, last_modified)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, rows)
+        conn.commit()
+    return paths
+
+
+def legacy_sync(db, starred_tracks):
+    """The previous implementation: reset everything, then one UPDATE per starred track."""
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE album_tracks SET is_starred = FALSE, updated_at = ?", (datetime.now(),))
+        for track in starred_tracks:
+            cursor.execute("""
+                UPDATE album_tracks
+                SET is_starred = TRUE, navidrome_id = ?, updated_at = ?
+                WHERE file_path = ?
+            """, (track.get('navidrome_id'), datetime.now(), track['file_path']))
+        conn.commit()
+
+
+def starred_payload(paths):
+    """Build the list bulk_update_starred_tracks expects."""
+    return [{'file_path': path, 'navidrome_id': f"nd-{i}", 'is_starred': True} for i, path in enumerate(paths)]
+
+
+def timed(func, *args):
+    """Run func(*args), returning (result, milliseconds)."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the starred track sync')
+    parser.add_argument('--tracks', type=int, default=50000, help='Tracks in the library')
+    parser.add_argument('--starred', type=int, default=5000, help='Tracks starred in Navidrome')
+    parser.add_argument('--churn', type=int, default=50, help='Stars added and removed between syncs')
+    parser.add_argument('--compare-legacy', action='store_true', help='Also time the previous implementation')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(str(Path(tmp) / 'bench.db'))
+        paths = populate(db, args.tracks)
+        starred = rng.sample(paths, args.starred)
+
+        print(f"Library: {len(paths):,} tracks, {len(starred):,} starred, churn {args.churn}")
+        print("-" * 50)
+
+        counts, ms = timed(db.bulk_update_starred_tracks, starred_payload(starred))
+        print(f"Initial sync:   {ms:9.1f} ms  {counts}")
+
+        unstarred = set(rng.sample(starred, args.churn))
+        candidates = list(set(paths) - set(starred))
+        resync = [p for p in starred if p not in unstarred] + rng.sample(candidates, args.churn)
+        counts, ms = timed(db.bulk_update_starred_tracks, starred_payload(resync))
+        print(f"Re-sync:        {ms:9.1f} ms  {counts}")
+
+        if args.compare_legacy:
+            with db.get_connection() as conn:
+                conn.execute("DROP INDEX IF EXISTS idx_album_tracks_file_path")
+            _, ms = timed(legacy_sync, db, starred_payload(resync))
+            print(f"Legacy re-sync: {ms:9.1f} ms  (no file_path index)")
+
+        print("-" * 50)
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""
+Synthetic database generator
+
+Builds a soulseekarr.db shaped like a long-running install: script executions
+spread over the last HISTORY_DAYS days with their logs archived the way
+finish_execution() leaves them, expiring albums with tracks (a few percent
+starred), and playlist tracks in every status.
+
+The schema comes from DatabaseManager (so migrations run exactly as they do in
+the app) and log archiving goes through the real writer operation. Bulk rows
+are inserted on a separate connection with large transactions, which is the
+only part that differs from how the app itself writes.
+
+Output is deterministic for a given scale and seed, so a generated database
+can be reused to compare versions.
+"""
+
+import os
+import json
+import time
+import random
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+from database import DatabaseManager
+from records import to_epoch_ms
+
+logger = logging.getLogger(__name__)
+
+# Row counts per scale. 'large' is the size of a busy multi-year install.
+SCALES = {
+    'small': {
+        'executions': 2_000,
+        'log_lines': 200_000,
+        'albums': 2_000,
+        'album_tracks': 26_000,
+        'playlist_tracks': 5_000,
+    },
+    'medium': {
+        'executions': 10_000,
+        'log_lines': 2_000_000,
+        'albums': 10_000,
+        'album_tracks': 130_000,
+        'playlist_tracks': 30_000,
+    },
+    'large': {
+        'executions': 50_000,
+        'log_lines': 20_000_000,
+        'albums': 30_000,
+        'album_tracks': 400_000,
+        'playlist_tracks': 100_000,
+    },
+}
+
+HISTORY_DAYS = 90            # Executions and albums are spread over this many days
+RUNNING_EXECUTIONS = 2       # Most recent executions left running with live log rows
+STARRED_FRACTION = 0.05      # Share of album tracks starred in Navidrome
+DELETED_FRACTION = 0.10      # Share of albums already deleted by cleanup
+INSERT_BATCH_SIZE = 50_000   # Rows per executemany() call while generating
+
+SCRIPTS = [
+    ('scan_library_age', 'Scan Library Age'),
+    ('delete_expired_albums', 'Delete Expired Albums'),
+    ('listenbrainz_recommendations', 'ListenBrainz Recommendations'),
+    ('organise_files', 'Organise Files'),
+    ('spotify_playlist_monitor', 'Spotify Playlist Monitor'),
+    ('tidal_playlist_monitor', 'Tidal Playlist Monitor'),
+    ('navidrome_starred_albums_monitor', 'Navidrome Starred Albums Monitor'),
+    ('queue_lidarr_monitored', 'Queue Lidarr Monitored'),
+    ('deduplicate_tracks', 'Deduplicate Tracks'),
+    ('log_cleanup', 'Log Cleanup'),
+]
+
+PLAYLIST_STATUSES = ['pending', 'downloading', 'downloaded', 'failed', 'playlist_added']
+
+LOG_TEMPLATES = [
+    ('info', "Processing {artist} - {album} [FLAC]"),
+    ('info', "Found {n} files in /media/Not_Owned/{artist}/{album}"),
+    ('info', "Moved {n} tracks to /media/Not_Owned/{artist}/{album}"),
+    ('debug', "Checked Navidrome star state for {artist} - {album}: not starred"),
+    ('info', "Searching slskd for {artist} - {album}"),
+    ('warning', "No complete match for {artist} - {album}, {n} of 12 tracks found"),
+    ('error', "Failed to read tags from track {n:02d} of {artist} - {album}"),
+]
+
+
+def default_db_path(scale: str, seed: int) -> Path:
+    """Where a generated database is cached, so repeated runs can reuse it."""
+    return Path('work') / 'benchmarks' / f"{scale}-seed{seed}.db"
+
+
+def info_path(db_path) -> Path:
+    """Sidecar file recording how a generated database was built."""
+    return Path(f"{db_path}.json")
+
+
+def _artist(n: int) -> str:
+    return f"Artist {n % 4999:04d}"
+
+
+def _album_name(n: int) -> str:
+    return f"Album {n:06d}"
+
+
+def _batched(rows, size: int = INSERT_BATCH_SIZE):
+    """Yield lists of at most ``size`` rows from an iterable."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _log_line_counts(total: int, executions: int, rng: random.Random):
+    """Split ``total`` lines over executions with a skewed (some runs are chatty) distribution."""
+    weights = [rng.expovariate(1.0) for _ in range(executions)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    counts[-1] += total - sum(counts)
+    return counts
+
+
+def _insert_executions(conn: sqlite3.Connection, counts: Dict, now: datetime, rng: random.Random):
+    """Insert executions and their live log rows; returns the ids of finished executions."""
+    executions = counts['executions']
+    line_counts = _log_line_counts(counts['log_lines'], executions, rng)
+    span_ms = HISTORY_DAYS * 86_400_000
+    now_ms = to_epoch_ms(now)
+
+    finished = []
+    for execution_number, line_count in enumerate(line_counts):
+        execution_id = execution_number + 1
+        script_id, script_name = SCRIPTS[rng.randrange(len(SCRIPTS))]
+        # Evenly spread over the history window, oldest first
+        start_ms = now_ms - span_ms + span_ms * execution_number // executions
+        duration_ms = 200 * line_count + rng.randint(500, 5_000)
+        running = execution_number >= executions - RUNNING_EXECUTIONS
+        failed = not running and rng.random() < 0.05
+        conn.execute("""
+            INSERT INTO script_executions
+            (id, script_id, script_name, start_time, end_time, duration_seconds, status, return_code,
+             dry_run, error_message)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            execution_id, script_id, script_name, start_ms,
+            None if running else start_ms + duration_ms,
+            None if running else duration_ms / 1000,
+            'running' if running else ('failed' if failed else 'completed'),
+            None if running else (1 if failed else 0),
+            rng.random() < 0.1,
+            "Script exited with code 1" if failed else None
+        ))
+        if not running:
+            finished.append(execution_id)
+
+        def log_rows(execution_id=execution_id, start_ms=start_ms, line_count=line_count):
+            for line_number in range(1, line_count + 1):
+                log_level, template = LOG_TEMPLATES[rng.randrange(len(LOG_TEMPLATES))]
+                n = rng.randrange(10_000)
+                yield (execution_id, line_number, start_ms + line_number * 200,
+                       template.format(artist=_artist(n), album=_album_name(n), n=n % 12 + 1), log_level)
+
+        for batch in _batched(log_rows()):
+            conn.executemany("""
+                INSERT INTO script_logs (execution_id, line_number, timestamp, content, log_level)
+                VALUES (?, ?, ?, ?, ?)
+            """, batch)
+
+        if execution_id % 1000 == 0:
+            conn.commit()
+
+    conn.executemany("""
+        INSERT INTO script_configs (script_id, name, description, script_path, execution_count)
+        VALUES (?, ?, ?, ?, ?)
+    """, [
+        (script_id, name, f"{name} (benchmark)", f"scripts/{script_id}.py", executions // len(SCRIPTS))
+        for script_id, name in SCRIPTS
+    ])
+    conn.commit()
+    return finished
+
+
+def _insert_albums(conn: sqlite3.Connection, counts: Dict, now: datetime, rng: random.Random):
+    """Insert expiring albums and their tracks."""
+    albums = counts['albums']
+    tracks_per_album = max(1, counts['album_tracks'] // max(1, albums))
+    now_ms = to_epoch_ms(now)
+
+    album_rows = []
+    track_rows = []
+    for album_id in range(1, albums + 1):
+        artist = _artist(album_id)
+        album = _album_name(album_id)
+        directory = f"/media/Not_Owned/{artist}/{album}"
+        first_detected = now_ms - rng.randrange(HISTORY_DAYS * 86_400_000)
+        deleted = rng.random() < DELETED_FRACTION
+        track_count = tracks_per_album if album_id < albums else counts['album_tracks'] - tracks_per_album * (albums - 1)
+        sizes = [round(rng.uniform(15, 60), 2) for _ in range(track_count)]
+        starred = [rng.random() < STARRED_FRACTION for _ in range(track_count)]
+        album_rows.append((
+            album_id, f"{artist.lower()}|{album.lower()}", artist, album, directory, track_count,
+            round(sum(sizes), 2), any(starred), first_detected, now_ms,
+            'deleted' if deleted else 'pending', now_ms if deleted else None
+        ))
+        for track_number in range(1, track_count + 1):
+            file_name = f"{track_number:02d} - Track {track_number}.flac"
+            track_rows.append((
+                album_id, f"{directory}/{file_name}", file_name, f"Track {track_number}", track_number,
+                artist, 2000 + album_id % 25, sizes[track_number - 1],
+                (now_ms - first_detected) // 86_400_000, first_detected, starred[track_number - 1],
+                f"nd-{album_id}-{track_number}"
+            ))
+
+    for batch in _batched(album_rows):
+        conn.executemany("""
+            INSERT INTO expiring_albums
+            (id, album_key, artist, album, directory, file_count, total_size_mb, is_starred,
+             first_detected, last_seen, status, deleted_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, batch)
+    for batch in _batched(track_rows):
+        conn.executemany("""
+            INSERT INTO album_tracks
+            (album_id, file_path, file_name, track_title, track_number, track_artist, year, file_size_mb,
+             days_old, last_modified, is_starred, navidrome_id)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, batch)
+    conn.commit()
+
+
+def _insert_playlist_tracks(conn: sqlite3.Connection, counts: Dict, rng: random.Random):
+    """Insert playlist tracks spread over every status."""
+    rows = (
+        (f"spotify:{n:022d}", _artist(n), f"Song {n}", _album_name(n), 1980 + n % 45,
+         PLAYLIST_STATUSES[rng.randrange(len(PLAYLIST_STATUSES))])
+        for n in range(1, counts['playlist_tracks'] + 1)
+    )
+    for batch in _batched(rows):
+        conn.executemany("""
+            INSERT INTO playlist_tracks (spotify_id, artist, title, album, year, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, batch)
+    conn.commit()
+
+
+def generate(db_path, scale: str = 'small', seed: int = 42, overrides: Dict = None) -> Dict:
+    """Build a synthetic database at ``db_path``, replacing any existing file.
+
+    ``overrides`` replaces individual row counts of the chosen scale. Returns the
+    row counts used plus the generation time.
+    """
+    counts = dict(SCALES[scale])
+    counts.update(overrides or {})
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    for suffix in ('', '-wal', '-shm', '.json'):
+        path = Path(f"{db_path}{suffix}")
+        if path.exists():
+            path.unlink()
+
+    rng = random.Random(seed)
+    # Timestamps are relative to generation time; everything else depends only on the seed
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    started = time.perf_counter()
+
+    db = DatabaseManager(str(db_path))
+    try:
+        conn = sqlite3.connect(str(db_path), timeout=60.0)
+        conn.execute("PRAGMA synchronous=OFF")
+        try:
+            logger.info(f"Generating {counts['executions']:,} executions with {counts['log_lines']:,} log lines")
+            finished = _insert_executions(conn, counts, now, rng)
+            logger.info(f"Generating {counts['albums']:,} albums with {counts['album_tracks']:,} tracks")
+            _insert_albums(conn, counts, now, rng)
+            logger.info(f"Generating {counts['playlist_tracks']:,} playlist tracks")
+            _insert_playlist_tracks(conn, counts, rng)
+        finally:
+            conn.close()
+
+        logger.info(f"Archiving logs of {len(finished):,} finished executions")
+        for execution_id in finished:
+            db.archive_execution_logs(execution_id, wait=False)
+        db.flush_writes()
+    finally:
+        db.close()
+
+    conn = sqlite3.connect(str(db_path))
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+
+    info = {
+        'scale': scale,
+        'seed': seed,
+        'counts': counts,
+        'generated_at': now.isoformat(),
+        'generate_seconds': round(time.perf_counter() - started, 1),
+        'size_mb': round(os.path.getsize(db_path) / 1024 / 1024, 1),
+    }
+    with open(info_path(db_path), 'w') as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def load_info(db_path) -> Dict:
+    """The generation details saved next to a generated database, or None."""
+    try:
+        with open(info_path(db_path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,149 @@
+"""
+Benchmark reports
+
+A report is a JSON document holding the suite results alongside what is needed
+to judge whether two reports are comparable: the code version, Python and
+SQLite versions, and the scale/seed of the generated database.
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPORT_FORMAT = 1
+
+DEFAULT_REGRESSION_THRESHOLD = 0.10  # Median slowdown that counts as a regression
+NOISE_FLOOR_MS = 0.5                 # Smaller absolute changes are never flagged
+
+
+def _git_version() -> Dict:
+    """Commit and dirty state of the working tree, when it is a git checkout."""
+    repo = Path(__file__).parent.parent
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo, capture_output=True,
+                                text=True, timeout=10).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=repo,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return {'commit': None, 'dirty': None}
+    return {'commit': commit or None, 'dirty': bool(status)}
+
+
+def build_report(results: Dict[str, Dict], database: Dict) -> Dict:
+    """Wrap suite results with version and environment details."""
+    return {
+        'format': REPORT_FORMAT,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'version': _git_version(),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'database': database,
+        'results': results,
+    }
+
+
+def save_report(report: Dict, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+
+
+def load_report(path) -> Dict:
+    with open(path) as f:
+        report = json.load(f)
+    if report.get('format') != REPORT_FORMAT:
+        raise ValueError(f"{path}: unsupported report format {report.get('format')!r}")
+    return report
+
+
+def compare_reports(baseline: Dict, current: Dict,
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> List[Dict]:
+    """Compare medians benchmark by benchmark.
+
+    Each row has the two medians, the ratio (current / baseline) and a verdict of
+    'regression', 'improvement', 'same', 'new' or 'removed'.
+    """
+    rows = []
+    names = list(baseline['results'])
+    names += [name for name in current['results'] if name not in baseline['results']]
+    for name in names:
+        before = baseline['results'].get(name)
+        after = current['results'].get(name)
+        row = {
+            'name': name,
+            'baseline_ms': before['median_ms'] if before else None,
+            'current_ms': after['median_ms'] if after else None,
+            'ratio': None,
+        }
+        if before is None:
+            row['verdict'] = 'new'
+        elif after is None:
+            row['verdict'] = 'removed'
+        else:
+            row['ratio'] = after['median_ms'] / before['median_ms'] if before['median_ms'] else None
+            change = after['median_ms'] - before['median_ms']
+            if abs(change) < NOISE_FLOOR_MS or row['ratio'] is None:
+                row['verdict'] = 'same'
+            elif row['ratio'] > 1 + threshold:
+                row['verdict'] = 'regression'
+            elif row['ratio'] < 1 / (1 + threshold):
+                row['verdict'] = 'improvement'
+            else:
+                row['verdict'] = 'same'
+        rows.append(row)
+    return rows
+
+
+def comparability_warnings(baseline: Dict, current: Dict) -> List[str]:
+    """Differences between two reports that make timings hard to compare."""
+    warnings = []
+    for key in ('scale', 'seed', 'counts'):
+        if baseline['database'].get(key) != current['database'].get(key):
+            warnings.append(f"database {key} differs: {baseline['database'].get(key)} vs "
+                            f"{current['database'].get(key)}")
+    for key in ('python', 'sqlite', 'platform'):
+        if baseline['environment'].get(key) != current['environment'].get(key):
+            warnings.append(f"{key} differs: {baseline['environment'].get(key)} vs "
+                            f"{current['environment'].get(key)}")
+    return warnings
+
+
+def _format_ms(value: Optional[float]) -> str:
+    return f"{value:10.3f}" if value is not None else f"{'-':>10}"
+
+
+def print_results(report: Dict, out=sys.stdout):
+    """Print one report's results as a table."""
+    database = report['database']
+    version = report['version']
+    print(f"SoulSeekarr benchmark - {database.get('scale')} scale, seed {database.get('seed')}, "
+          f"commit {(version.get('commit') or 'unknown')[:10]}{' (dirty)' if version.get('dirty') else ''}",
+          file=out)
+    print(f"{'benchmark':<40} {'median ms':>10} {'p95 ms':>10} {'min ms':>10} {'runs':>5}", file=out)
+    print("-" * 79, file=out)
+    for name, stats in report['results'].items():
+        print(f"{name:<40} {stats['median_ms']:10.3f} {stats['p95_ms']:10.3f} {stats['min_ms']:10.3f} "
+              f"{stats['runs']:5d}", file=out)
+
+
+def print_comparison(rows: List[Dict], warnings: List[str], out=sys.stdout):
+    """Print a comparison table, flagging regressions."""
+    for warning in warnings:
+        print(f"warning: {warning}", file=out)
+    print(f"{'benchmark':<40} {'baseline':>10} {'current':>10} {'change':>8}  verdict", file=out)
+    print("-" * 84, file=out)
+    for row in rows:
+        change = f"{(row['ratio'] - 1) * 100:+7.1f}%" if row['ratio'] is not None else f"{'-':>8}"
+        marker = ' <<<' if row['verdict'] == 'regression' else ''
+        print(f"{row['name']:<40} {_format_ms(row['baseline_ms'])} {_format_ms(row['current_ms'])} "
+              f"{change}  {row['verdict']}{marker}", file=out)
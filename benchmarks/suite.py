@@ -0,0 +1,242 @@
+"""
+Benchmark suite
+
+Each benchmark is registered with @benchmark and receives the DatabaseManager
+and a fixture dict describing the generated data (a busy script, a running
+execution, an album key, ...). It does any setup it needs and returns the
+callable to time. Benchmarks run in registration order - reads first, then
+writes, then cleanup_old_data, which deletes most of the history and so runs
+exactly once, last.
+"""
+
+import time
+import random
+import itertools
+import statistics
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from database import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+BENCHMARKS: List[Tuple[str, int, Callable]] = []
+
+
+def benchmark(name: str, repeat: int = 20):
+    """Register a benchmark timed ``repeat`` times (after one untimed warm-up call)."""
+    def decorator(func):
+        BENCHMARKS.append((name, repeat, func))
+        return func
+    return decorator
+
+
+def load_fixture(db: DatabaseManager) -> Dict:
+    """Pick the rows benchmarks operate on from the generated data."""
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT script_id FROM script_executions
+            GROUP BY script_id ORDER BY COUNT(*) DESC LIMIT 1
+        """)
+        busiest_script = cursor.fetchone()[0]
+        cursor.execute("SELECT MAX(id) FROM script_executions WHERE status = 'running'")
+        running_execution = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT execution_id FROM script_log_archives
+            GROUP BY execution_id ORDER BY SUM(line_count) DESC LIMIT 1
+        """)
+        longest_execution = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT album_key FROM expiring_albums
+            WHERE status = 'pending' ORDER BY track_count DESC, id ASC LIMIT 1
+        """)
+        album_key = cursor.fetchone()[0]
+        cursor.execute("SELECT file_path, navidrome_id, is_starred FROM album_tracks ORDER BY id")
+        tracks = [(row[0], row[1], bool(row[2])) for row in cursor.fetchall()]
+
+    starred = [{'file_path': path, 'navidrome_id': nid, 'is_starred': True} for path, nid, is_starred in tracks
+               if is_starred]
+    # A second starred set of the same size, as if the user re-starred a different 5%
+    rng = random.Random(7)
+    restarred = [{'file_path': path, 'navidrome_id': nid, 'is_starred': True}
+                 for path, nid, _ in rng.sample(tracks, len(starred))]
+
+    return {
+        'busiest_script': busiest_script,
+        'running_execution': running_execution,
+        'longest_execution': longest_execution,
+        'album_key': album_key,
+        'starred_tracks': starred,
+        'restarred_tracks': restarred,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+@benchmark('get_execution_queue', repeat=50)
+def _execution_queue(db, fixture):
+    """Execution queue panel (polled by the UI)."""
+    return lambda: db.get_execution_queue(limit=50)
+
+
+@benchmark('get_active_executions', repeat=50)
+def _active_executions(db, fixture):
+    """Running executions (polled by the UI)."""
+    return db.get_active_executions
+
+
+@benchmark('get_execution_stats', repeat=20)
+def _execution_stats(db, fixture):
+    """Execution statistics panel."""
+    return db.get_execution_stats
+
+
+@benchmark('get_script_logs', repeat=20)
+def _script_logs(db, fixture):
+    """Last 1000 log lines of the script with the most executions."""
+    return lambda: db.get_script_logs(fixture['busiest_script'], limit=1000)
+
+
+@benchmark('get_execution_log_page', repeat=50)
+def _execution_log_page(db, fixture):
+    """Newest page of the longest archived execution log."""
+    return lambda: db.get_execution_log_page(fixture['longest_execution'], limit=1000)
+
+
+@benchmark('get_execution_logs:longest', repeat=5)
+def _execution_logs(db, fixture):
+    """Entire log of the longest archived execution."""
+    return lambda: db.get_execution_logs(fixture['longest_execution'], limit=10_000_000)
+
+
+@benchmark('search_logs', repeat=20)
+def _search_logs(db, fixture):
+    """Full-text phrase search across all logs."""
+    if not db.log_search_available:
+        return None
+    return lambda: db.search_logs('"not starred"', limit=50)
+
+
+@benchmark('get_expiring_albums_summary', repeat=10)
+def _expiring_albums_summary(db, fixture):
+    """Unpaged expiring albums summary."""
+    return db.get_expiring_albums_summary
+
+
+@benchmark('get_expiring_albums_summary:page', repeat=50)
+def _expiring_albums_summary_page(db, fixture):
+    """First 200-album page of the expiring albums view."""
+    return lambda: db.get_expiring_albums_summary(sort='expiry', limit=200)
+
+
+@benchmark('get_expiring_albums_summary:search', repeat=20)
+def _expiring_albums_summary_search(db, fixture):
+    """Filtered, artist-sorted expiring albums page."""
+    return lambda: db.get_expiring_albums_summary(search='artist 01', sort='artist', limit=200)
+
+
+@benchmark('get_expiring_albums', repeat=10)
+def _expiring_albums(db, fixture):
+    """Every pending expiring album (delete_expired_albums.py)."""
+    return db.get_expiring_albums
+
+
+@benchmark('get_album_tracks', repeat=50)
+def _album_tracks(db, fixture):
+    """Track list of the largest pending album."""
+    return lambda: db.get_album_tracks(fixture['album_key'])
+
+
+@benchmark('get_starred_tracks', repeat=10)
+def _starred_tracks(db, fixture):
+    """Every starred track (delete_expired_albums.py)."""
+    return db.get_starred_tracks
+
+
+@benchmark('get_playlist_tracks_by_status', repeat=10)
+def _playlist_tracks_by_status(db, fixture):
+    """Pending playlist tracks (playlist monitors)."""
+    return lambda: db.get_playlist_tracks_by_status('pending')
+
+
+# ---------------------------------------------------------------------------
+# Writes
+# ---------------------------------------------------------------------------
+
+@benchmark('add_log_lines_batch', repeat=50)
+def _add_log_lines_batch(db, fixture):
+    """Append 1000 lines to a running execution."""
+    batch = [
+        {'content': f"Processing item {n}: Artist {n:04d} - Album {n:06d} [FLAC] ... ok", 'log_level': 'info'}
+        for n in range(1000)
+    ]
+    return lambda: db.add_log_lines_batch(fixture['running_execution'], batch)
+
+
+@benchmark('bulk_update_starred_tracks', repeat=10)
+def _bulk_update_starred_tracks(db, fixture):
+    """Navidrome star sync where ~5% of tracks change."""
+    # Alternate between two starred sets so every call has a real delta to apply
+    sets = itertools.cycle([fixture['restarred_tracks'], fixture['starred_tracks']])
+    return lambda: db.bulk_update_starred_tracks(next(sets))
+
+
+@benchmark('bulk_update_starred_tracks:unchanged', repeat=10)
+def _bulk_update_starred_tracks_unchanged(db, fixture):
+    """Navidrome star sync with nothing to change."""
+    return lambda: db.bulk_update_starred_tracks(fixture['starred_tracks'])
+
+
+@benchmark('cleanup_old_data', repeat=1)
+def _cleanup_old_data(db, fixture):
+    """Delete executions and logs older than 30 days."""
+    return lambda: db.cleanup_old_data(days=30)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def summarize(timings: List[float]) -> Dict:
+    """Millisecond statistics for a list of durations in seconds."""
+    ms = sorted(t * 1000 for t in timings)
+    return {
+        'runs': len(ms),
+        'min_ms': round(ms[0], 3),
+        'median_ms': round(statistics.median(ms), 3),
+        'p95_ms': round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        'mean_ms': round(statistics.fmean(ms), 3),
+        'max_ms': round(ms[-1], 3),
+    }
+
+
+def run_suite(db: DatabaseManager, only: List[str] = None, repeat_scale: float = 1.0) -> Dict[str, Dict]:
+    """Run the registered benchmarks against ``db``, returning stats per benchmark name.
+
+    ``only`` restricts the run to names containing one of the given substrings.
+    ``repeat_scale`` multiplies every benchmark's repeat count (minimum one run).
+    """
+    fixture = load_fixture(db)
+    results = {}
+    for name, repeat, setup in BENCHMARKS:
+        if only and not any(part in name for part in only):
+            continue
+        func = setup(db, fixture)
+        if func is None:
+            logger.info(f"Skipping {name}: not supported by this database")
+            continue
+
+        runs = max(1, round(repeat * repeat_scale))
+        if repeat > 1:
+            func()  # warm up the page cache and statement cache
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        results[name] = summarize(timings)
+        logger.info(f"{name}: median {results[name]['median_ms']:.3f} ms over {runs} runs")
+    return results
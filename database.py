@@ -8,22 +8,102 @@ import sqlite3
 import json
 import logging
 import threading
+import time
+import atexit
+import queue
+import zlib
+import html
+import re
+import unicodedata
 import os
-from datetime import datetime
+from concurrent.futures import Future
+from functools import lru_cache
+from itertools import islice
+from datetime import datetime, timedelta
 from pathlib import Path
 from contextlib import contextmanager
 from typing import Dict, List, Optional, Any
 
+from migrations import migrate, repair_schema, LOG_SEARCH_ROWID_SHIFT
+from query_stats import QueryStats, InstrumentedConnection, query_stats_enabled
+from records import (
+    to_epoch_ms, from_epoch_ms, epoch_ms_to_iso, ExecutionRecord, AlbumRecord, TrackRecord
+)
+
 logger = logging.getLogger(__name__)
 
 # Database file location
 DB_PATH = Path("work/soulseekarr.db")
 
+# Connection pool tuning
+POOL_MAX_IDLE_CONNECTIONS = 8      # Idle connections kept open for reuse
+POOL_HEALTH_CHECK_INTERVAL = 30.0  # Seconds a connection may sit idle before it is re-validated
+STATEMENT_CACHE_SIZE = 256         # Prepared statements cached per connection
+
+# Single-writer queue tuning
+WRITE_QUEUE_SIZE = 10000           # Pending write operations before submitters block
+WRITE_BATCH_SIZE = 500             # Operations coalesced into one transaction
+WRITER_SHUTDOWN_TIMEOUT = 30.0     # Seconds to wait for queued writes on shutdown
+WRITE_QUEUE_FULL_PAUSE = 0.005     # Seconds a blocking submitter waits before retrying a full queue
+
+# Log archive tuning
+LOG_ARCHIVE_CHUNK_SIZE = 64 * 1024  # Uncompressed bytes of log lines packed into one chunk
+LOG_ARCHIVE_COMPRESSION_LEVEL = 6   # zlib level used for archived chunks
+
+# Log search tuning
+LOG_SEARCH_MAX_RESULTS = 500
+LOG_SEARCH_SNIPPET_CHARS = 160
+
+# Log download tuning
+LOG_DOWNLOAD_PAGE_SIZE = 5000      # Lines read per short transaction while streaming a download
+
+# ORDER BY clauses accepted by get_expiring_albums_summary(sort=...)
+EXPIRING_ALBUM_SORTS = {
+    'expiry': "first_detected ASC, id ASC",
+    'artist': "artist COLLATE NOCASE ASC, album COLLATE NOCASE ASC",
+    'album': "album COLLATE NOCASE ASC, artist COLLATE NOCASE ASC",
+    'size': "total_size_mb DESC, id ASC",
+}
+
 class DatabaseManager:
     """Manages SQLite database operations for SoulSeekarr."""
     
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, max_idle_connections: int = POOL_MAX_IDLE_CONNECTIONS):
         self.db_path = db_path or str(DB_PATH)
+        self.max_idle_connections = max_idle_connections
+        
+        # Connection pool state. A thread that is already inside get_connection()
+        # reuses its checked-out connection; otherwise connections are taken from
+        # (and returned to) the idle list so pragmas are only applied once per connection.
+        self._local = threading.local()
+        self._pool_lock = threading.Lock()
+        self._idle_connections = []  # List of (connection, idle_since) tuples, used LIFO
+        self._open_connections = set()
+        self._closed = False
+        
+        # Single writer thread. Write operations are queued and applied by one
+        # dedicated connection, coalescing everything pending into one transaction.
+        self._write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer_lock = threading.Lock()
+        self._writer_thread = None
+        self._writer_cursor = None
+        
+        # Next log line number per running execution. Only touched by the writer,
+        # seeded once from MAX(line_number) so appends never count existing rows.
+        self._log_line_counters: Dict[int, int] = {}
+        
+        # Looked up lazily so startup stays a single PRAGMA read
+        self._log_search_available = None
+        
+        # Dedicated read-only connection for get_data_version(); the value is only
+        # comparable between reads on the same connection
+        self._version_conn = None
+        self._version_lock = threading.Lock()
+        
+        # Per-statement latency stats (DB_QUERY_STATS). None when disabled, in which
+        # case connections are plain sqlite3.Connection objects with no overhead.
+        self.query_stats = QueryStats() if query_stats_enabled() else None
+        
         self.ensure_database_exists()
     
     def ensure_database_exists(self):
@@ -34,895 +114,1509 @@ class DatabaseManager:
         with self.get_connection() as conn:
             self.create_tables(conn)
     
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a new pooled connection with pragmas applied once."""
+        # Increase timeout to wait for locks (default is 5.0 seconds)
+        # Using 60 seconds to be very safe against "database is locked" errors.
+        # Pooled connections move between threads, so same-thread checking is disabled;
+        # the pool guarantees a connection is only used by one thread at a time.
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=60.0,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=InstrumentedConnection if self.query_stats else sqlite3.Connection
+        )
+        if self.query_stats:
+            conn.query_stats = self.query_stats
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        
+        # New database files are created with incremental auto-vacuum so maintenance can
+        # hand freed pages back to the OS. This has to precede the first write (the WAL
+        # switch below); on an existing file it only takes effect after a VACUUM.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # Enable Write-Ahead Logging (WAL) for better concurrency
+        # This allows readers to not block writers and vice versa
+        conn.execute("PRAGMA journal_mode=WAL")
+        # Optimize synchronization for WAL mode
+        conn.execute("PRAGMA synchronous=NORMAL")
+        
+        with self._pool_lock:
+            self._open_connections.add(conn)
+        return conn
+    
+    def _discard_connection(self, conn: sqlite3.Connection):
+        """Close a connection and forget about it."""
+        with self._pool_lock:
+            self._open_connections.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.debug(f"Error closing database connection: {e}")
+    
+    def _is_connection_healthy(self, conn: sqlite3.Connection) -> bool:
+        """Check that an idle connection is still usable."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding unhealthy database connection: {e}")
+            return False
+    
+    def _acquire_connection(self) -> sqlite3.Connection:
+        """Take a connection from the idle pool, or open a new one."""
+        conn = None
+        idle_since = None
+        with self._pool_lock:
+            if self._idle_connections:
+                conn, idle_since = self._idle_connections.pop()
+        
+        # Re-validate connections that have been sitting idle for a while
+        if conn is not None and time.monotonic() - idle_since > POOL_HEALTH_CHECK_INTERVAL:
+            if not self._is_connection_healthy(conn):
+                self._discard_connection(conn)
+                conn = None
+        
+        if conn is None:
+            conn = self._open_connection()
+        return conn
+    
+    def _release_connection(self, conn: sqlite3.Connection):
+        """Return a connection to the idle pool."""
+        try:
+            # Match the old close()-per-call behaviour: uncommitted work is discarded
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding database connection after failed rollback: {e}")
+            self._discard_connection(conn)
+            return
+        
+        with self._pool_lock:
+            if not self._closed and len(self._idle_connections) < self.max_idle_connections:
+                self._idle_connections.append((conn, time.monotonic()))
+                return
+        self._discard_connection(conn)
+    
     @contextmanager
     def get_connection(self):
-        """Get a database connection with proper error handling."""
-        conn = None
+        """Get a pooled database connection with proper error handling.
+        
+        Nested calls on the same thread share the outer connection, so helper
+        methods can be called from inside an open ``with db.get_connection()`` block.
+        """
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        
+        if conn is not None:
+            # Re-entrant use on this thread: share the checked-out connection
+            local.depth += 1
+            try:
+                yield conn
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Database error: {e}")
+                raise
+            finally:
+                local.depth -= 1
+            return
+        
+        conn = self._acquire_connection()
+        local.conn = conn
+        local.depth = 1
         try:
-            # Increase timeout to wait for locks (default is 5.0 seconds)
-            # Using 60 seconds to be very safe against "database is locked" errors
-            conn = sqlite3.connect(self.db_path, timeout=60.0)
-            conn.row_factory = sqlite3.Row  # Enable dict-like access
-            
-            # Enable Write-Ahead Logging (WAL) for better concurrency
-            # This allows readers to not block writers and vice versa
-            conn.execute("PRAGMA journal_mode=WAL")
-            # Optimize synchronization for WAL mode
-            conn.execute("PRAGMA synchronous=NORMAL")
-            
             yield conn
         except Exception as e:
-            if conn:
-                conn.rollback()
+            conn.rollback()
             logger.error(f"Database error: {e}")
             raise
         finally:
-            if conn:
-                conn.close()
+            local.conn = None
+            local.depth = 0
+            self._release_connection(conn)
     
-    def create_tables(self, conn: sqlite3.Connection):
-        """Create all necessary database tables."""
-        cursor = conn.cursor()
-        
-        # Check current schema version
-        cursor.execute("PRAGMA user_version")
-        current_version = cursor.fetchone()[0]
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Get connection pool statistics."""
+        with self._pool_lock:
+            return {
+                'open_connections': len(self._open_connections),
+                'idle_connections': len(self._idle_connections),
+                'max_idle_connections': self.max_idle_connections
+            }
+    
+    def close(self):
+        """Flush queued writes and close all pooled connections (called on shutdown)."""
+        # Set under the writer lock too, so no write is queued behind the stop sentinel
+        with self._writer_lock, self._pool_lock:
+            self._closed = True
         
-        # Script executions table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS script_executions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                script_id TEXT NOT NULL,
-                script_name TEXT NOT NULL,
-                start_time TIMESTAMP NOT NULL,
-                end_time TIMESTAMP,
-                duration_seconds REAL,
-                status TEXT NOT NULL DEFAULT 'running',
-                return_code INTEGER,
-                dry_run BOOLEAN DEFAULT FALSE,
-                pid INTEGER,
-                error_message TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        # Writes submitted from now on are applied inline; drain what is already queued
+        self._stop_writer()
         
-        # Script logs table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS script_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                execution_id INTEGER NOT NULL,
-                line_number INTEGER NOT NULL,
-                timestamp TIMESTAMP NOT NULL,
-                content TEXT NOT NULL,
-                log_level TEXT DEFAULT 'info',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (execution_id) REFERENCES script_executions (id) ON DELETE CASCADE
-            )
-        """)
+        with self._pool_lock:
+            idle = [conn for conn, _ in self._idle_connections]
+            self._idle_connections.clear()
         
-        # Script configurations table (for dynamic discovery)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS script_configs (
-                script_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                description TEXT,
-                script_path TEXT NOT NULL,
-                supports_dry_run BOOLEAN DEFAULT TRUE,
-                section TEXT DEFAULT 'commands',
-                status TEXT DEFAULT 'active',
-                status_message TEXT,
-                last_discovered TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                execution_count INTEGER DEFAULT 0,
-                last_execution_time TIMESTAMP,
-                avg_duration_seconds REAL
-            )
-        """)
+        for conn in idle:
+            self._discard_connection(conn)
         
-        # Application settings table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS app_settings (
-                key TEXT PRIMARY KEY,
-                value TEXT NOT NULL,
-                description TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._discard_connection(self._version_conn)
+                self._version_conn = None
         
-        # Scheduled jobs table (for internal scheduler)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS scheduled_jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                script_id TEXT NOT NULL UNIQUE,
-                script_name TEXT NOT NULL,
-                script_path TEXT NOT NULL,
-                enabled BOOLEAN DEFAULT FALSE,
-                interval_type TEXT NOT NULL DEFAULT 'minutes',
-                interval_value INTEGER NOT NULL DEFAULT 60,
-                next_run TIMESTAMP,
-                last_run TIMESTAMP,
-                last_run_status TEXT,
-                last_run_duration REAL,
-                run_count INTEGER DEFAULT 0,
-                error_count INTEGER DEFAULT 0,
-                last_error TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        # Connections still checked out are closed when they are released
+        logger.debug("Database connection pool closed")
+    
+    # Single-writer queue
+    
+    def submit_write(self, operation, *args, wait: bool = True, timeout: float = None, block: bool = True):
+        """Queue a write operation for the database writer thread.
         
-        # Expiring albums table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS expiring_albums (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                album_key TEXT NOT NULL UNIQUE,
-                artist TEXT NOT NULL,
-                album TEXT NOT NULL,
-                directory TEXT NOT NULL,
-                file_count INTEGER NOT NULL,
-                total_size_mb REAL NOT NULL,
-                is_starred BOOLEAN DEFAULT FALSE,
-                first_detected TIMESTAMP NOT NULL,
-                last_seen TIMESTAMP NOT NULL,
-                status TEXT DEFAULT 'pending',
-                deleted_at TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        Args:
+            operation: Callable invoked as ``operation(cursor, *args)`` inside the
+                writer's transaction. It must not commit; its return value becomes
+                the result.
+            wait: Block until the transaction containing the write has committed
+                and return the operation's result. When False, return a Future
+                immediately (fire-and-forget).
+            timeout: Maximum seconds to wait for the result when ``wait`` is True.
+            block: When False, raise ``queue.Full`` instead of waiting for room in
+                the write queue (for callers that must never stall).
+        """
+        # Writes issued from inside a write operation run in the current transaction
+        if threading.current_thread() is self._writer_thread:
+            result = operation(self._writer_cursor, *args)
+            if wait:
+                return result
+            future = Future()
+            future.set_result(result)
+            return future
         
-        # Album tracks table (individual files in an album)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS album_tracks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                album_id INTEGER NOT NULL,
-                file_path TEXT NOT NULL,
-                file_name TEXT NOT NULL,
-                track_title TEXT,
-                file_size_mb REAL NOT NULL,
-                days_old INTEGER NOT NULL,
-                last_modified TIMESTAMP NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (album_id) REFERENCES expiring_albums (id) ON DELETE CASCADE,
-                UNIQUE(album_id, file_path)
-            )
-        """)
+        future = Future()
+        queued = False
+        while True:
+            # _closed is checked and the write queued under the lock _stop_writer() holds
+            # to queue its sentinel, so a write can never land behind it and be lost
+            with self._writer_lock:
+                if self._closed:
+                    break
+                self._ensure_writer()
+                try:
+                    self._write_queue.put_nowait((operation, args, future))
+                    queued = True
+                    break
+                except queue.Full:
+                    if not block:
+                        raise
+            # Queue full: back-pressure for fast producers, waiting outside the lock
+            time.sleep(WRITE_QUEUE_FULL_PAUSE)
         
-        # Playlist tracks table (for Spotify sync)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS playlist_tracks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                spotify_id TEXT NOT NULL UNIQUE,
-                artist TEXT NOT NULL,
-                title TEXT NOT NULL,
-                album TEXT,
-                status TEXT NOT NULL DEFAULT 'pending',
-                slskd_id TEXT,
-                navidrome_id TEXT,
-                last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+        if not queued:
+            # Writer has been shut down (interpreter exit) - apply synchronously
+            self._apply_write_inline(operation, args, future)
         
-        # Create indexes for better performance (excluding new columns initially)
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_script_executions_script_id ON script_executions(script_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_script_executions_start_time ON script_executions(start_time)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_script_executions_status ON script_executions(status)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_script_logs_execution_id ON script_logs(execution_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_script_logs_timestamp ON script_logs(timestamp)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_enabled ON scheduled_jobs(enabled)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_next_run ON scheduled_jobs(next_run)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_script_id ON scheduled_jobs(script_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_status ON expiring_albums(status)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_album_id ON album_tracks(album_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_days_old ON album_tracks(days_old)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_playlist_tracks_spotify_id ON playlist_tracks(spotify_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_playlist_tracks_status ON playlist_tracks(status)")
-        # Note: Indexes for new columns (is_starred, navidrome_id) are created in migration section
-        
-        # Run migrations if needed
-        if current_version == 0:
-            # Initial version
-            cursor.execute("PRAGMA user_version = 1")
-        
-        if current_version < 2:
-            # Migration: Add album_art_url column to expiring_albums
-            logger.info("Running migration to add album_art_url column...")
-            try:
-                cursor.execute("ALTER TABLE expiring_albums ADD COLUMN album_art_url TEXT")
-                cursor.execute("PRAGMA user_version = 2")
-                logger.info("Successfully added album_art_url column")
-            except sqlite3.OperationalError as e:
-                if "duplicate column" in str(e).lower():
-                    # Column already exists, just update version
-                    cursor.execute("PRAGMA user_version = 2")
-                    logger.info("album_art_url column already exists, updating version")
-                else:
-                    raise
-        if current_version < 3:
-            # Migration: Add track-level starred tracking and metadata
-            logger.info("Running migration to add track starred tracking...")
-            try:
-                # Add columns one by one with better error handling
-                columns_to_add = [
-                    "ALTER TABLE album_tracks ADD COLUMN is_starred BOOLEAN DEFAULT FALSE",
-                    "ALTER TABLE album_tracks ADD COLUMN navidrome_id TEXT",
-                    "ALTER TABLE album_tracks ADD COLUMN track_number INTEGER", 
-                    "ALTER TABLE album_tracks ADD COLUMN track_artist TEXT"
-                ]
-                
-                for sql in columns_to_add:
-                    try:
-                        cursor.execute(sql)
-                    except sqlite3.OperationalError as e:
-                        if "duplicate column" not in str(e).lower():
-                            raise  # Re-raise if not a duplicate column error
-                
-                # Create indexes
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_is_starred ON album_tracks(is_starred)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_navidrome_id ON album_tracks(navidrome_id)")
-                
-                # Update schema version
-                cursor.execute("PRAGMA user_version = 3")
-                conn.commit()  # Commit immediately after migration
-                
-                logger.info("Successfully added track starred tracking and metadata columns")
-            except sqlite3.OperationalError as e:
-                if "duplicate column" in str(e).lower():
-                    # Columns already exist, just update version
-                    cursor.execute("PRAGMA user_version = 3")
-                    conn.commit()
-                    logger.info("Track starred tracking columns already exist, updating version")
-                else:
-                    logger.error(f"Migration failed: {e}")
-                    raise
-        
-        if current_version < 4:
-            # Migration: Remove cleanup_days column - policy is now frontend responsibility
-            logger.info("Running migration to remove cleanup_days column...")
-            try:
-                # SQLite doesn't support DROP COLUMN directly, so we recreate the table
-                # First, create the new table structure without cleanup_days
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS expiring_albums_new (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        album_key TEXT NOT NULL UNIQUE,
-                        artist TEXT NOT NULL,
-                        album TEXT NOT NULL,
-                        directory TEXT NOT NULL,
-                        oldest_file_days INTEGER NOT NULL,
-                        days_until_expiry INTEGER NOT NULL,
-                        file_count INTEGER NOT NULL,
-                        total_size_mb REAL NOT NULL,
-                        is_starred BOOLEAN DEFAULT FALSE,
-                        album_art_url TEXT,
-                        first_detected TIMESTAMP NOT NULL,
-                        last_seen TIMESTAMP NOT NULL,
-                        status TEXT DEFAULT 'pending',
-                        deleted_at TIMESTAMP,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Copy data from old table to new (excluding cleanup_days)
-                cursor.execute("""
-                    INSERT INTO expiring_albums_new 
-                    (id, album_key, artist, album, directory, oldest_file_days, days_until_expiry,
-                     file_count, total_size_mb, is_starred, album_art_url, first_detected, last_seen,
-                     status, deleted_at, created_at, updated_at)
-                    SELECT id, album_key, artist, album, directory, oldest_file_days, days_until_expiry,
-                           file_count, total_size_mb, is_starred, album_art_url, first_detected, last_seen,
-                           status, deleted_at, created_at, updated_at
-                    FROM expiring_albums
-                """)
-                
-                # Drop old table and rename new one
-                cursor.execute("DROP TABLE expiring_albums")
-                cursor.execute("ALTER TABLE expiring_albums_new RENAME TO expiring_albums")
-                
-                # Recreate indexes
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_status ON expiring_albums(status)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_days_until_expiry ON expiring_albums(days_until_expiry)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
-                
-                # Update schema version
-                cursor.execute("PRAGMA user_version = 4")
-                conn.commit()  # Commit immediately after migration
-                
-                logger.info("Successfully removed cleanup_days column - policy now determined by frontend")
-            except Exception as e:
-                logger.error(f"Migration to remove cleanup_days failed: {e}")
-                # Try to continue - if tables exist without cleanup_days, that's fine
-                cursor.execute("PRAGMA user_version = 4")
-                conn.commit()
-                logger.info("Set schema version to 4, assuming cleanup_days already removed")
+        if wait:
+            return future.result(timeout)
+        return future
+    
+    def flush_writes(self, timeout: float = None):
+        """Block until every write queued so far has been committed."""
+        self.submit_write(lambda cursor: None, wait=True, timeout=timeout)
+    
+    def _ensure_writer(self):
+        """Start the writer thread on first use (``_writer_lock`` held)."""
+        if self._writer_thread is not None and self._writer_thread.is_alive():
+            return
+        self._writer_thread = threading.Thread(target=self._writer_loop, name='db-writer', daemon=True)
+        self._writer_thread.start()
+    
+    def _stop_writer(self):
+        """Drain the write queue and stop the writer thread."""
+        with self._writer_lock:
+            writer = self._writer_thread
+            if writer is None or not writer.is_alive():
+                return
+            self._write_queue.put(None)
+        writer.join(timeout=WRITER_SHUTDOWN_TIMEOUT)
+        if writer.is_alive():
+            logger.warning("Database writer did not finish flushing before shutdown")
+    
+    def _writer_loop(self):
+        """Apply queued writes, one transaction per batch of pending operations."""
+        conn = self._open_connection()
+        stopping = False
         
-        if current_version < 5:
-            # Migration: Add playlist_tracks table for Spotify sync
-            logger.info("Running migration to add playlist_tracks table...")
-            try:
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS playlist_tracks (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        spotify_id TEXT NOT NULL UNIQUE,
-                        artist TEXT NOT NULL,
-                        title TEXT NOT NULL,
-                        album TEXT,
-                        status TEXT NOT NULL DEFAULT 'pending',
-                        slskd_id TEXT,
-                        navidrome_id TEXT,
-                        last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_playlist_tracks_spotify_id ON playlist_tracks(spotify_id)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_playlist_tracks_status ON playlist_tracks(status)")
-                
-                cursor.execute("PRAGMA user_version = 5")
-                conn.commit()
-                logger.info("Successfully added playlist_tracks table")
-            except Exception as e:
-                logger.error(f"Migration failed: {e}")
-                raise
-
-        if current_version < 6:
-            # Migration: Add year column to playlist_tracks
-            logger.info("Running migration to add year column to playlist_tracks...")
-            try:
-                cursor.execute("ALTER TABLE playlist_tracks ADD COLUMN year INTEGER")
-                cursor.execute("PRAGMA user_version = 6")
-                conn.commit()
-                logger.info("Successfully added year column to playlist_tracks")
-            except sqlite3.OperationalError as e:
-                if "duplicate column" in str(e).lower():
-                    cursor.execute("PRAGMA user_version = 6")
-                    conn.commit()
-                    logger.info("year column already exists, updating version")
-                else:
-                    logger.error(f"Migration failed: {e}")
-                    raise
-
-        if current_version < 7:
-            # Migration: Remove album_expiry_history and oldest_file_days
-            logger.info("Running migration to remove legacy tables and columns...")
-            try:
-                # Drop unused table
-                cursor.execute("DROP TABLE IF EXISTS album_expiry_history")
-                
-                # Recreate expiring_albums without oldest_file_days
-                cursor.execute("ALTER TABLE expiring_albums RENAME TO expiring_albums_old")
-                
-                cursor.execute("""
-                    CREATE TABLE expiring_albums (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        album_key TEXT NOT NULL UNIQUE,
-                        artist TEXT NOT NULL,
-                        album TEXT NOT NULL,
-                        directory TEXT NOT NULL,
-                        days_until_expiry INTEGER NOT NULL,
-                        file_count INTEGER NOT NULL,
-                        total_size_mb REAL NOT NULL,
-                        is_starred BOOLEAN DEFAULT FALSE,
-                        album_art_url TEXT,
-                        first_detected TIMESTAMP NOT NULL,
-                        last_seen TIMESTAMP NOT NULL,
-                        status TEXT DEFAULT 'pending',
-                        deleted_at TIMESTAMP,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Copy data
-                cursor.execute("""
-                    INSERT INTO expiring_albums 
-                    (id, album_key, artist, album, directory, days_until_expiry, 
-                     file_count, total_size_mb, is_starred, album_art_url, 
-                     first_detected, last_seen, status, deleted_at, created_at, updated_at)
-                    SELECT id, album_key, artist, album, directory, days_until_expiry, 
-                           file_count, total_size_mb, is_starred, album_art_url, 
-                           first_detected, last_seen, status, deleted_at, created_at, updated_at
-                    FROM expiring_albums_old
-                """)
-                
-                cursor.execute("DROP TABLE expiring_albums_old")
-                
-                # Recreate indexes
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_status ON expiring_albums(status)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_days_until_expiry ON expiring_albums(days_until_expiry)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
-                
-                cursor.execute("PRAGMA user_version = 7")
-                conn.commit()
-                logger.info("Successfully removed legacy tables and columns")
-            except Exception as e:
-                logger.error(f"Migration failed: {e}")
-                raise
-
-        if current_version < 8:
-            # Migration: Remove days_until_expiry and album_art_url
-            logger.info("Running migration to remove days_until_expiry and album_art_url...")
-            try:
-                cursor.execute("ALTER TABLE expiring_albums RENAME TO expiring_albums_v7")
-                
-                cursor.execute("""
-                    CREATE TABLE expiring_albums (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        album_key TEXT NOT NULL UNIQUE,
-                        artist TEXT NOT NULL,
-                        album TEXT NOT NULL,
-                        directory TEXT NOT NULL,
-                        file_count INTEGER NOT NULL,
-                        total_size_mb REAL NOT NULL,
-                        is_starred BOOLEAN DEFAULT FALSE,
-                        first_detected TIMESTAMP NOT NULL,
-                        last_seen TIMESTAMP NOT NULL,
-                        status TEXT DEFAULT 'pending',
-                        deleted_at TIMESTAMP,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Copy data
-                cursor.execute("""
-                    INSERT INTO expiring_albums 
-                    (id, album_key, artist, album, directory, file_count, total_size_mb, 
-                     is_starred, first_detected, last_seen, status, deleted_at, created_at, updated_at)
-                    SELECT id, album_key, artist, album, directory, file_count, total_size_mb, 
-                           is_starred, first_detected, last_seen, status, deleted_at, created_at, updated_at
-                    FROM expiring_albums_v7
-                """)
-                
-                cursor.execute("DROP TABLE expiring_albums_v7")
-                
-                # Recreate indexes
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_status ON expiring_albums(status)")
-                cursor.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
-                
-                cursor.execute("PRAGMA user_version = 8")
-                conn.commit()
-                logger.info("Successfully removed days_until_expiry and album_art_url")
-            except Exception as e:
-                logger.error(f"Migration failed: {e}")
-                raise
-
-        if current_version < 9:
-            # Migration: Restore album_art_url and add year to album_tracks to match instructions
-            logger.info("Running migration to sync schema with instructions (v9)...")
-            try:
-                # Restore album_art_url to expiring_albums
-                try:
-                    cursor.execute("ALTER TABLE expiring_albums ADD COLUMN album_art_url TEXT")
-                    logger.info("Restored album_art_url to expiring_albums")
-                except sqlite3.OperationalError as e:
-                    if "duplicate column" not in str(e).lower():
-                        raise
-                
-                # Add year to album_tracks
+        while not stopping:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            
+            # Group commit: take everything that queued up while the last transaction ran
+            batch = [item]
+            while len(batch) < WRITE_BATCH_SIZE:
                 try:
-                    cursor.execute("ALTER TABLE album_tracks ADD COLUMN year INTEGER")
-                    logger.info("Added year column to album_tracks")
-                except sqlite3.OperationalError as e:
-                     if "duplicate column" not in str(e).lower():
-                        raise
-
-                cursor.execute("PRAGMA user_version = 9")
-                conn.commit()
-                logger.info("Successfully synced schema (v9)")
-            except Exception as e:
-                 logger.error(f"Migration v9 failed: {e}")
-                 raise
-
-        conn.commit()
+                    item = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            self._apply_write_batch(conn, batch)
         
-        # Verify final schema version
-        cursor.execute("PRAGMA user_version")
-        final_version = cursor.fetchone()[0]
-        logger.info(f"Database tables created/verified successfully (schema version: {final_version})")
-        
-        # Verify critical columns exist
+        self._discard_connection(conn)
+        logger.debug("Database writer stopped")
+    
+    def _apply_write_batch(self, conn: sqlite3.Connection, batch: List):
+        """Run a batch of write operations in a single transaction."""
+        cursor = conn.cursor()
+        outcomes = []
+        self._writer_cursor = cursor
         try:
-            cursor.execute("PRAGMA table_info(album_tracks)")
-            columns = [row[1] for row in cursor.fetchall()]
-            required_columns = ['is_starred', 'navidrome_id', 'track_number', 'track_artist']
-            missing_columns = [col for col in required_columns if col not in columns]
-            
-            if missing_columns:
-                logger.warning(f"Missing columns in album_tracks table: {missing_columns}")
+            cursor.execute("BEGIN IMMEDIATE")
+            for operation, args, future in batch:
+                # Each operation gets a savepoint so one failure doesn't sink the batch
+                cursor.execute("SAVEPOINT write_op")
+                try:
+                    result = operation(cursor, *args)
+                    cursor.execute("RELEASE SAVEPOINT write_op")
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    cursor.execute("ROLLBACK TO SAVEPOINT write_op")
+                    cursor.execute("RELEASE SAVEPOINT write_op")
+                    logger.error(f"Database write failed: {e}")
+                    outcomes.append((future, None, e))
+            conn.commit()
+        except Exception as e:
+            logger.error(f"Database write batch failed: {e}")
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            # Line counters may have advanced past rows that were just rolled back
+            self._log_line_counters.clear()
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self._writer_cursor = None
+        
+        # Only resolve futures once the transaction is durable
+        for future, result, error in outcomes:
+            if error is not None:
+                future.set_exception(error)
             else:
-                logger.info("All required columns verified in album_tracks table")
+                future.set_result(result)
+    
+    def _apply_write_inline(self, operation, args, future: Future):
+        """Apply a single write on a pooled connection (used after shutdown)."""
+        try:
+            with self.get_connection() as conn:
+                result = operation(conn.cursor(), *args)
+                conn.commit()
+            future.set_result(result)
         except Exception as e:
-            logger.warning(f"Could not verify table schema: {e}")
+            future.set_exception(e)
+    
+    def create_tables(self, conn: sqlite3.Connection):
+        """Create or upgrade the schema, then re-create any table that was dropped.
         
-        # Clean up any executions that were running when container stopped
-        self.cleanup_orphaned_executions(conn)
+        When the schema is current and complete this is a PRAGMA read and one
+        sqlite_master query.
+        """
+        migrate(conn)
+        repair_schema(conn)
     
-    def cleanup_orphaned_executions(self, conn: sqlite3.Connection):
-        """Mark any running executions as stopped (for container restarts)."""
-        cursor = conn.cursor()
+    def cleanup_orphaned_executions(self):
+        """Mark any running executions as stopped (for container restarts).
         
-        # Find executions that are still marked as running
-        cursor.execute("SELECT id, script_name, pid FROM script_executions WHERE status = 'running'")
-        orphaned_executions = cursor.fetchall()
+        Called once by the web app at startup rather than by every DatabaseManager,
+        so script processes don't repeat the check.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
         
-        if orphaned_executions:
-            logger.info(f"Found {len(orphaned_executions)} potentially orphaned running executions")
+            # Find executions that are still marked as running
+            cursor.execute("SELECT id, script_name, pid FROM script_executions WHERE status = 'running'")
+            orphaned_executions = cursor.fetchall()
+        
+            if orphaned_executions:
+                logger.info(f"Found {len(orphaned_executions)} potentially orphaned running executions")
             
-            current_time = datetime.now()
-            cleaned_count = 0
+                current_time = datetime.now()
+                cleaned_count = 0
             
-            for execution in orphaned_executions:
-                execution_id = execution['id']
-                script_name = execution['script_name']
-                pid = execution['pid']
+                for execution in orphaned_executions:
+                    execution_id = execution['id']
+                    script_name = execution['script_name']
+                    pid = execution['pid']
                 
-                # Check if process is actually still running
-                is_running = False
-                if pid:
-                    try:
-                        # Signal 0 checks if process exists and we have permission
-                        os.kill(pid, 0)
-                        is_running = True
-                    except OSError:
-                        is_running = False
+                    # Check if process is actually still running
+                    is_running = False
+                    if pid:
+                        try:
+                            # Signal 0 checks if process exists and we have permission
+                            os.kill(pid, 0)
+                            is_running = True
+                        except OSError:
+                            is_running = False
                 
-                if is_running:
-                    logger.info(f"Process {pid} for {script_name} is still running. Resuming tracking.")
-                    continue
+                    if is_running:
+                        logger.info(f"Process {pid} for {script_name} is still running. Resuming tracking.")
+                        continue
                 
-                # Mark as stopped if not running
-                cleaned_count += 1
+                    # Mark as stopped if not running
+                    cleaned_count += 1
                 
-                # Calculate duration from start time
-                cursor.execute("SELECT start_time FROM script_executions WHERE id = ?", (execution_id,))
-                start_time_str = cursor.fetchone()['start_time']
-                try:
-                    start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                except:
-                    start_time = datetime.fromisoformat(start_time_str)
+                    # Calculate duration from start time
+                    cursor.execute("SELECT start_time FROM script_executions WHERE id = ?", (execution_id,))
+                    start_time = from_epoch_ms(cursor.fetchone()['start_time'])
                     
-                duration = (current_time - start_time).total_seconds()
+                    duration = (current_time - start_time).total_seconds()
                 
-                cursor.execute("""
-                    UPDATE script_executions 
-                    SET status = 'stopped', 
-                        end_time = ?, 
-                        duration_seconds = ?,
-                        error_message = 'Execution interrupted by container restart',
-                        updated_at = ?
-                    WHERE id = ?
-                """, (current_time, duration, current_time, execution_id))
+                    cursor.execute("""
+                        UPDATE script_executions 
+                        SET status = 'stopped', 
+                            end_time = ?, 
+                            duration_seconds = ?,
+                            error_message = 'Execution interrupted by container restart',
+                            updated_at = ?
+                        WHERE id = ?
+                    """, (to_epoch_ms(current_time), duration, current_time, execution_id))
                 
-                logger.info(f"Marked orphaned execution as stopped: {script_name} (ID: {execution_id})")
+                    logger.info(f"Marked orphaned execution as stopped: {script_name} (ID: {execution_id})")
             
-            conn.commit()
-            if cleaned_count > 0:
-                logger.info(f"Cleaned up {cleaned_count} orphaned executions")
-        else:
-            logger.debug("No orphaned executions found")
+                conn.commit()
+                if cleaned_count > 0:
+                    logger.info(f"Cleaned up {cleaned_count} orphaned executions")
+            else:
+                logger.debug("No orphaned executions found")
     
     def start_execution(self, script_id: str, script_name: str, dry_run: bool = False, pid: int = None) -> int:
         """Record the start of a script execution."""
+        execution_id = self.submit_write(self._insert_execution, script_id, script_name, dry_run, pid)
+        logger.info(f"Started execution tracking for {script_name} (ID: {execution_id})")
+        return execution_id
+    
+    def _insert_execution(self, cursor: sqlite3.Cursor, script_id: str, script_name: str,
+                          dry_run: bool, pid: Optional[int]) -> int:
+        """Write operation: insert a running execution and refresh script stats."""
+        cursor.execute("""
+            INSERT INTO script_executions 
+            (script_id, script_name, start_time, status, dry_run, pid)
+            VALUES (?, ?, ?, 'running', ?, ?)
+        """, (script_id, script_name, to_epoch_ms(datetime.now()), dry_run, pid))
+        execution_id = cursor.lastrowid
+        
+        # Update script config execution count
+        self._update_script_stats(cursor, script_id)
+        return execution_id
+    
+    def finish_execution(self, execution_id: int, return_code: int, error_message: str = None,
+                         wait: bool = True):
+        """Record the completion of a script execution and archive its logs."""
+        result = self.submit_write(self._finish_execution, execution_id, return_code, error_message, wait=wait)
+        self.archive_execution_logs(execution_id, wait=False)
+        return result
+    
+    def _finish_execution(self, cursor: sqlite3.Cursor, execution_id: int, return_code: int,
+                          error_message: Optional[str]):
+        """Write operation: mark an execution as completed or failed."""
+        # Get start time to calculate duration
+        cursor.execute("SELECT start_time FROM script_executions WHERE id = ?", (execution_id,))
+        row = cursor.fetchone()
+        if not row:
+            logger.error(f"Execution ID {execution_id} not found")
+            return
+        
+        start_time = from_epoch_ms(row['start_time'])
+        end_time = datetime.now()
+        duration = (end_time - start_time).total_seconds()
+        
+        status = 'completed' if return_code == 0 else 'failed'
+        
+        # A run stopped on purpose (manually, or superseded by a newer run) keeps its status and reason
+        cursor.execute("""
+            UPDATE script_executions 
+            SET end_time = ?, duration_seconds = ?,
+                status = CASE WHEN status = 'stopped' THEN status ELSE ? END,
+                return_code = ?,
+                error_message = CASE WHEN status = 'stopped' THEN error_message ELSE ? END,
+                updated_at = ?
+            WHERE id = ?
+        """, (to_epoch_ms(end_time), duration, status, return_code, error_message, end_time, execution_id))
+        
+        self._log_line_counters.pop(execution_id, None)
+        logger.info(f"Finished execution tracking for ID {execution_id} with status {status}")
+    
+    def stop_execution(self, execution_id: int, reason: str = "Manually stopped"):
+        """Stop a running execution (useful for manual intervention)."""
+        stopped = self.submit_write(self._stop_execution, execution_id, reason)
+        if stopped:
+            self.archive_execution_logs(execution_id, wait=False)
+        return stopped
+    
+    def _stop_execution(self, cursor: sqlite3.Cursor, execution_id: int, reason: str) -> bool:
+        """Write operation: mark a running execution as stopped."""
+        # Check if execution is running
+        cursor.execute("SELECT start_time, status FROM script_executions WHERE id = ?", (execution_id,))
+        row = cursor.fetchone()
+        if not row:
+            logger.warning(f"Execution ID {execution_id} not found")
+            return False
+        
+        if row['status'] != 'running':
+            logger.warning(f"Execution ID {execution_id} is not running (status: {row['status']})")
+            return False
+        
+        # Calculate duration
+        start_time = from_epoch_ms(row['start_time'])
+        end_time = datetime.now()
+        duration = (end_time - start_time).total_seconds()
+        
+        # Update execution
+        cursor.execute("""
+            UPDATE script_executions 
+            SET status = 'stopped', 
+                end_time = ?, 
+                duration_seconds = ?,
+                error_message = ?,
+                updated_at = ?
+            WHERE id = ?
+        """, (to_epoch_ms(end_time), duration, reason, end_time, execution_id))
+        
+        self._log_line_counters.pop(execution_id, None)
+        logger.info(f"Stopped execution ID {execution_id}: {reason}")
+        return True
+    
+    def add_log_line(self, execution_id: int, content: str, log_level: str = 'info', wait: bool = True):
+        """Add a log line for a script execution."""
+        return self.submit_write(self._insert_log_line, execution_id, content, log_level,
+                                 to_epoch_ms(datetime.now()), wait=wait)
+    
+    def _insert_log_line(self, cursor: sqlite3.Cursor, execution_id: int, content: str,
+                         log_level: str, timestamp: int):
+        """Write operation: append a single log line. Returns its line number."""
+        line_number = self._next_log_line_number(cursor, execution_id)
+        
+        cursor.execute("""
+            INSERT INTO script_logs (execution_id, line_number, timestamp, content, log_level)
+            VALUES (?, ?, ?, ?, ?)
+        """, (execution_id, line_number, timestamp, content, log_level))
+        self._log_line_counters[execution_id] = line_number + 1
+        return line_number
+    
+    def add_log_lines_batch(self, execution_id: int, log_entries: List[Dict], wait: bool = True,
+                            block: bool = True):
+        """Add multiple log lines for a script execution efficiently.
+        
+        Pass ``wait=False`` to queue the lines without waiting for them to be committed,
+        and ``block=False`` as well to get ``queue.Full`` instead of waiting when the
+        write queue is full.
+        """
+        if not log_entries:
+            return
+        
+        # Prepare data for bulk insert outside the writer thread
+        now = to_epoch_ms(datetime.now())
+        data = [
+            (to_epoch_ms(entry.get('timestamp', now)), entry['content'], entry.get('log_level', 'info'))
+            for entry in log_entries
+        ]
+        return self.submit_write(self._insert_log_lines, execution_id, data, wait=wait, block=block)
+    
+    def _insert_log_lines(self, cursor: sqlite3.Cursor, execution_id: int, data: List[tuple]):
+        """Write operation: append a batch of (timestamp, content, log_level) lines.
+        
+        Returns the line number given to the first line; the rest follow consecutively.
+        """
+        start_line_number = self._next_log_line_number(cursor, execution_id)
+        
+        cursor.executemany("""
+            INSERT INTO script_logs (execution_id, line_number, timestamp, content, log_level)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (execution_id, start_line_number + i, timestamp, content, log_level)
+            for i, (timestamp, content, log_level) in enumerate(data)
+        ])
+        self._log_line_counters[execution_id] = start_line_number + len(data)
+        return start_line_number
+    
+    def _next_log_line_number(self, cursor: sqlite3.Cursor, execution_id: int) -> int:
+        """Return the next line number for an execution, seeding the counter on first use."""
+        line_number = self._log_line_counters.get(execution_id)
+        if line_number is None:
+            # Index seeks only (live rows, then archived chunks); later appends use the counter
+            line_number = self._get_last_log_line(cursor.connection, execution_id) + 1
+            self._log_line_counters[execution_id] = line_number
+        return line_number
+    
+    def archive_execution_logs(self, execution_id: int, wait: bool = True):
+        """Pack the live log rows of a finished execution into compressed archive chunks."""
+        return self.submit_write(self._archive_execution_logs, execution_id, wait=wait)
+    
+    def _archive_execution_logs(self, cursor: sqlite3.Cursor, execution_id: int) -> int:
+        """Write operation: move script_logs rows for an execution into script_log_archives.
+        
+        Each chunk is a zlib frame of newline-separated JSON arrays
+        ``[line_number, timestamp, log_level, content]`` holding roughly
+        LOG_ARCHIVE_CHUNK_SIZE bytes; first_line/last_line let readers skip chunks.
+        Returns the number of lines archived.
+        """
+        cursor.execute("""
+            SELECT line_number, timestamp, log_level, content
+            FROM script_logs
+            WHERE execution_id = ?
+            ORDER BY line_number ASC
+        """, (execution_id,))
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+        
+        # Append after any chunks already archived (e.g. lines logged after a stop)
+        cursor.execute("SELECT COALESCE(MAX(chunk_index) + 1, 0) FROM script_log_archives WHERE execution_id = ?",
+                       (execution_id,))
+        chunk_index = cursor.fetchone()[0]
+        
+        chunks = []
+        lines = []
+        raw_size = 0
+        first_line = None
+        for row in rows:
+            if not lines:
+                first_line = row[0]
+            encoded = json.dumps([row[0], row[1], row[2], row[3]], ensure_ascii=False)
+            lines.append(encoded)
+            raw_size += len(encoded) + 1
+            if raw_size >= LOG_ARCHIVE_CHUNK_SIZE:
+                chunks.append((first_line, row[0], lines))
+                lines = []
+                raw_size = 0
+        if lines:
+            chunks.append((first_line, rows[-1][0], lines))
+        
+        archive_rows = []
+        for first, last, chunk_lines in chunks:
+            raw = '\n'.join(chunk_lines).encode('utf-8')
+            archive_rows.append((
+                execution_id, chunk_index, first, last, len(chunk_lines), len(raw),
+                zlib.compress(raw, LOG_ARCHIVE_COMPRESSION_LEVEL)
+            ))
+            chunk_index += 1
+        
+        cursor.executemany("""
+            INSERT INTO script_log_archives
+            (execution_id, chunk_index, first_line, last_line, line_count, raw_size, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, archive_rows)
+        cursor.execute("DELETE FROM script_logs WHERE execution_id = ?", (execution_id,))
+        
+        logger.debug(f"Archived {len(rows)} log lines for execution {execution_id} into {len(archive_rows)} chunks")
+        return len(rows)
+    
+    def archive_finished_execution_logs(self) -> int:
+        """Queue archiving for every finished execution that still has live log rows."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                INSERT INTO script_executions 
-                (script_id, script_name, start_time, status, dry_run, pid)
-                VALUES (?, ?, ?, 'running', ?, ?)
-            """, (script_id, script_name, datetime.now(), dry_run, pid))
-            execution_id = cursor.lastrowid
-            conn.commit()
-            
-            # Update script config execution count
-            self.update_script_stats(script_id)
+                SELECT DISTINCT sl.execution_id
+                FROM script_logs sl
+                JOIN script_executions se ON sl.execution_id = se.id
+                WHERE se.status != 'running'
+            """)
+            execution_ids = [row[0] for row in cursor.fetchall()]
+        
+        # One write operation per execution so the writer is never held for long
+        for execution_id in execution_ids:
+            self.archive_execution_logs(execution_id, wait=False)
+        
+        if execution_ids:
+            logger.info(f"Queued log archiving for {len(execution_ids)} finished executions")
+        return len(execution_ids)
+    
+    def _iter_execution_log_rows(self, conn: sqlite3.Connection, execution_id: int,
+                                 after_line: int = 0, before_line: Optional[int] = None):
+        """Yield (line_number, timestamp, log_level, content) for an execution in line order.
+        
+        Only lines strictly between ``after_line`` and ``before_line`` are produced; rows are
+        streamed from the cursor so memory stays flat however long the execution is.
+        Archived chunks are read first, then any live rows, inside one read transaction
+        so a concurrent archive of the same execution can't hide or duplicate lines.
+        """
+        if before_line is None:
+            # Line numbers share the FTS rowid with the execution id, so they fit in 32 bits
+            before_line = 1 << LOG_SEARCH_ROWID_SHIFT
+        
+        owns_snapshot = not conn.in_transaction
+        if owns_snapshot:
+            conn.execute("BEGIN")
+        try:
+            archive_cursor = conn.execute("""
+                SELECT data
+                FROM script_log_archives
+                WHERE execution_id = ? AND last_line > ? AND first_line < ?
+                ORDER BY chunk_index ASC
+            """, (execution_id, after_line, before_line))
+            for (data,) in archive_cursor:
+                for encoded in zlib.decompress(data).decode('utf-8').split('\n'):
+                    line_number, timestamp, log_level, content = json.loads(encoded)
+                    if after_line < line_number < before_line:
+                        yield line_number, timestamp, log_level, content
+            
+            live_cursor = conn.execute("""
+                SELECT line_number, timestamp, log_level, content
+                FROM script_logs
+                WHERE execution_id = ? AND line_number > ? AND line_number < ?
+                ORDER BY line_number ASC
+            """, (execution_id, after_line, before_line))
+            for row in live_cursor:
+                yield row[0], row[1], row[2], row[3]
+        finally:
+            if owns_snapshot:
+                conn.rollback()
+    
+    def _get_last_log_line(self, conn: sqlite3.Connection, execution_id: int) -> int:
+        """Return the highest line number logged for an execution, live or archived."""
+        live_last = conn.execute("SELECT MAX(line_number) FROM script_logs WHERE execution_id = ?",
+                                 (execution_id,)).fetchone()[0]
+        archived_last = conn.execute("SELECT MAX(last_line) FROM script_log_archives WHERE execution_id = ?",
+                                     (execution_id,)).fetchone()[0]
+        return max(live_last or 0, archived_last or 0)
+    
+    @classmethod
+    def _format_log_line(cls, timestamp, content: str) -> str:
+        """Format a log row the way the UI displays it."""
+        if isinstance(timestamp, int):
+            return f"[{cls._clock_time(timestamp // 1000)}] {content}"
+        # Archived chunks written before the epoch ms migration hold ISO text
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        return f"[{timestamp.strftime('%H:%M:%S')}] {content}"
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _clock_time(epoch_seconds: int) -> str:
+        """HH:MM:SS for an epoch second; consecutive log lines mostly share one."""
+        return time.strftime('%H:%M:%S', time.localtime(epoch_seconds))
+    
+    @property
+    def log_search_available(self) -> bool:
+        """Whether the FTS5 log index exists (it is skipped on SQLite builds without FTS5)."""
+        if self._log_search_available is None:
+            with self.get_connection() as conn:
+                self._log_search_available = conn.execute(
+                    "SELECT COUNT(*) FROM sqlite_master WHERE name = 'script_logs_fts'"
+                ).fetchone()[0] > 0
+        return self._log_search_available
+    
+    def _delete_execution_logs(self, cursor: sqlite3.Cursor, execution_ids: List[int]):
+        """Write operation: remove live rows, archived chunks and index entries for executions."""
+        for execution_id in execution_ids:
+            if self.log_search_available:
+                # A contentless FTS5 table needs the original values to delete an entry
+                cursor.executemany("""
+                    INSERT INTO script_logs_fts (script_logs_fts, rowid, content, log_level)
+                    VALUES ('delete', ?, ?, ?)
+                """, [
+                    ((execution_id << LOG_SEARCH_ROWID_SHIFT) | line_number, content, log_level)
+                    for line_number, _, log_level, content
+                    in self._iter_execution_log_rows(cursor.connection, execution_id)
+                ])
+            cursor.execute("DELETE FROM script_logs WHERE execution_id = ?", (execution_id,))
+            cursor.execute("DELETE FROM script_log_archives WHERE execution_id = ?", (execution_id,))
+            self._log_line_counters.pop(execution_id, None)
+    
+    @staticmethod
+    def _parse_search_terms(query: str) -> List[str]:
+        """Split a user query into words and "quoted phrases"."""
+        terms = []
+        for phrase, word in re.findall(r'"([^"]+)"|(\S+)', query):
+            term = (phrase or word).strip()
+            if term:
+                terms.append(term)
+        return terms
+    
+    def search_logs(self, query: str, script_id: str = None, level: str = None,
+                    since: datetime = None, limit: int = 50, before: int = None) -> Dict:
+        """Full-text search across execution logs, newest first.
+        
+        Every term must match; "quoted phrases" match as phrases. ``before`` is the
+        ``next_cursor`` of a previous page. Returns results with execution_id,
+        line_number, script and an HTML-escaped snippet with <mark> highlights.
+        """
+        if not self.log_search_available:
+            raise RuntimeError("Log search is not available (SQLite FTS5 missing)")
+        
+        terms = self._parse_search_terms(query)
+        if not terms:
+            return {'results': [], 'next_cursor': None}
+        limit = max(1, min(limit, LOG_SEARCH_MAX_RESULTS))
+        
+        # Quote every term so user input can't inject FTS5 query syntax
+        match = ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+        match = f"content : ({match})"
+        if level:
+            match += ' AND log_level : "' + level.replace('"', '""') + '"'
+        
+        sql = f"""
+            SELECT f.rowid, se.id AS execution_id, se.script_id, se.script_name, se.start_time
+            FROM script_logs_fts f
+            JOIN script_executions se ON se.id = (f.rowid >> {LOG_SEARCH_ROWID_SHIFT})
+            WHERE script_logs_fts MATCH ?
+        """
+        params = [match]
+        if before is not None:
+            sql += " AND f.rowid < ?"
+            params.append(before)
+        if script_id:
+            sql += " AND se.script_id = ?"
+            params.append(script_id)
+        if since:
+            sql += " AND se.start_time >= ?"
+            params.append(to_epoch_ms(since))
+        sql += " ORDER BY f.rowid DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        with self.get_connection() as conn:
+            hits = conn.execute(sql, params).fetchall()
+            has_more = len(hits) > limit
+            hits = hits[:limit]
+            
+            line_mask = (1 << LOG_SEARCH_ROWID_SHIFT) - 1
+            lines = self._fetch_log_lines(conn, [
+                (hit['execution_id'], hit['rowid'] & line_mask) for hit in hits
+            ])
+            
+            pattern = re.compile('|'.join(re.escape(self._fold_text(term)[0])
+                                          for term in sorted(terms, key=len, reverse=True)),
+                                 re.IGNORECASE)
+            results = []
+            for hit in hits:
+                line_number = hit['rowid'] & line_mask
+                row = lines.get((hit['execution_id'], line_number))
+                if row is None:
+                    continue
+                timestamp, log_level, content = row
+                results.append({
+                    'execution_id': hit['execution_id'],
+                    'line_number': line_number,
+                    'script_id': hit['script_id'],
+                    'script_name': hit['script_name'],
+                    'execution_start': epoch_ms_to_iso(hit['start_time']),
+                    'timestamp': epoch_ms_to_iso(timestamp),
+                    'log_level': log_level,
+                    'snippet': self._highlight_snippet(content, pattern)
+                })
             
-            logger.info(f"Started execution tracking for {script_name} (ID: {execution_id})")
-            return execution_id
+            return {
+                'results': results,
+                'next_cursor': hits[-1]['rowid'] if has_more else None
+            }
+    
+    def _fetch_log_lines(self, conn: sqlite3.Connection, keys: List[tuple]) -> Dict[tuple, tuple]:
+        """Look up (timestamp, log_level, content) for (execution_id, line_number) keys."""
+        found = {}
+        chunk_cache = {}
+        for execution_id, line_number in keys:
+            row = conn.execute("""
+                SELECT timestamp, log_level, content FROM script_logs
+                WHERE execution_id = ? AND line_number = ?
+            """, (execution_id, line_number)).fetchone()
+            if row:
+                found[(execution_id, line_number)] = (row[0], row[1], row[2])
+                continue
+            
+            chunk = conn.execute("""
+                SELECT id, first_line, data FROM script_log_archives
+                WHERE execution_id = ? AND first_line <= ? AND last_line >= ?
+            """, (execution_id, line_number, line_number)).fetchone()
+            if chunk is None:
+                continue
+            if chunk['id'] not in chunk_cache:
+                chunk_cache[chunk['id']] = zlib.decompress(chunk['data']).decode('utf-8').split('\n')
+            encoded_lines = chunk_cache[chunk['id']]
+            
+            # Lines in a chunk are consecutive, so only the wanted line needs decoding
+            offset = line_number - chunk['first_line']
+            entry = json.loads(encoded_lines[offset]) if offset < len(encoded_lines) else None
+            if entry is None or entry[0] != line_number:
+                entry = next((e for e in map(json.loads, encoded_lines) if e[0] == line_number), None)
+            if entry:
+                found[(execution_id, line_number)] = (entry[1], entry[2], entry[3])
+        return found
     
-    def finish_execution(self, execution_id: int, return_code: int, error_message: str = None):
-        """Record the completion of a script execution."""
+    @staticmethod
+    def _fold_text(text: str):
+        """Strip diacritics like the FTS tokenizer does.
+        
+        Returns the folded text and, for each folded character, its index in ``text``.
+        """
+        folded = []
+        positions = []
+        for index, char in enumerate(text):
+            for part in unicodedata.normalize('NFKD', char):
+                if not unicodedata.combining(part):
+                    folded.append(part)
+                    positions.append(index)
+        return ''.join(folded), positions
+    
+    @classmethod
+    def _highlight_snippet(cls, content: str, pattern) -> str:
+        """Cut a window around the first match and wrap matches in <mark>."""
+        match = pattern.search(cls._fold_text(content)[0])
+        start = 0
+        if match and len(content) > LOG_SEARCH_SNIPPET_CHARS:
+            start = max(0, match.start() - LOG_SEARCH_SNIPPET_CHARS // 3)
+        window = content[start:start + LOG_SEARCH_SNIPPET_CHARS]
+        
+        # Match against the folded window and map spans back to the original characters
+        folded, positions = cls._fold_text(window)
+        parts = []
+        position = 0
+        for found in pattern.finditer(folded):
+            if found.start() == found.end():
+                continue
+            match_start = positions[found.start()]
+            match_end = positions[found.end() - 1] + 1
+            if match_start < position:
+                continue
+            parts.append(html.escape(window[position:match_start]))
+            parts.append(f"<mark>{html.escape(window[match_start:match_end])}</mark>")
+            position = match_end
+        parts.append(html.escape(window[position:]))
+        
+        snippet = ''.join(parts)
+        if start > 0:
+            snippet = '…' + snippet
+        if start + LOG_SEARCH_SNIPPET_CHARS < len(content):
+            snippet += '…'
+        return snippet
+    
+    def get_execution_queue(self, limit: int = 50) -> List[ExecutionRecord]:
+        """Get recent script executions for the queue view."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {ExecutionRecord.COLUMNS} FROM script_executions 
+                ORDER BY start_time DESC 
+                LIMIT ?
+            """, (limit,))
+            return [ExecutionRecord(*row) for row in cursor]
+    
+    def get_script_logs(self, script_id: str, limit: int = 1000) -> List[str]:
+        """Get recent logs for a script (for backwards compatibility)."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Get start time to calculate duration
-            cursor.execute("SELECT start_time FROM script_executions WHERE id = ?", (execution_id,))
-            row = cursor.fetchone()
-            if not row:
-                logger.error(f"Execution ID {execution_id} not found")
-                return
-            
-            start_time = datetime.fromisoformat(row['start_time'])
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
-            
-            status = 'completed' if return_code == 0 else 'failed'
-            
             cursor.execute("""
-                UPDATE script_executions 
-                SET end_time = ?, duration_seconds = ?, status = ?, return_code = ?, error_message = ?, updated_at = ?
-                WHERE id = ?
-            """, (end_time, duration, status, return_code, error_message, datetime.now(), execution_id))
+                SELECT id FROM script_executions
+                WHERE script_id = ?
+                ORDER BY start_time DESC
+            """, (script_id,))
+            execution_ids = [row['id'] for row in cursor.fetchall()]
+            
+            # Walk executions newest first, reading only the tail each one contributes
+            chunks = []
+            remaining = limit
+            for execution_id in execution_ids:
+                if remaining <= 0:
+                    break
+                after_line = max(0, self._get_last_log_line(conn, execution_id) - remaining)
+                lines = [
+                    self._format_log_line(timestamp, content)
+                    for _, timestamp, _, content in self._iter_execution_log_rows(conn, execution_id, after_line)
+                ]
+                chunks.append(lines)
+                remaining -= len(lines)
             
-            conn.commit()
-            logger.info(f"Finished execution tracking for ID {execution_id} with status {status}")
+            logs = []
+            for lines in reversed(chunks):  # Return in chronological order
+                logs.extend(lines)
+            return logs
     
-    def stop_execution(self, execution_id: int, reason: str = "Manually stopped"):
-        """Stop a running execution (useful for manual intervention)."""
+    def get_execution(self, execution_id: int) -> Optional[ExecutionRecord]:
+        """Get one script execution by ID."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Check if execution is running
-            cursor.execute("SELECT start_time, status FROM script_executions WHERE id = ?", (execution_id,))
+            cursor.row_factory = None
+            cursor.execute(f"SELECT {ExecutionRecord.COLUMNS} FROM script_executions WHERE id = ?",
+                           (execution_id,))
             row = cursor.fetchone()
-            if not row:
-                logger.warning(f"Execution ID {execution_id} not found")
-                return False
-            
-            if row['status'] != 'running':
-                logger.warning(f"Execution ID {execution_id} is not running (status: {row['status']})")
-                return False
-            
-            # Calculate duration
-            start_time = datetime.fromisoformat(row['start_time'])
-            end_time = datetime.now()
-            duration = (end_time - start_time).total_seconds()
+            return ExecutionRecord(*row) if row else None
+    
+    def get_execution_logs(self, execution_id: int, limit: int = 10000) -> List[str]:
+        """Get logs for a specific execution."""
+        with self.get_connection() as conn:
+            logs = []
+            for _, timestamp, _, content in self._iter_execution_log_rows(conn, execution_id):
+                logs.append(self._format_log_line(timestamp, content))
+                if len(logs) >= limit:
+                    break
             
-            # Update execution
-            cursor.execute("""
-                UPDATE script_executions 
-                SET status = 'stopped', 
-                    end_time = ?, 
-                    duration_seconds = ?,
-                    error_message = ?,
-                    updated_at = ?
-                WHERE id = ?
-            """, (end_time, duration, reason, end_time, execution_id))
+            return logs
+    
+    def get_execution_log_page(self, execution_id: int, after_line: Optional[int] = None,
+                               before_line: Optional[int] = None, limit: int = 1000) -> Dict:
+        """Get one page of an execution's logs using line-number cursors.
+        
+        ``after_line`` pages forward from a line, ``before_line`` pages backward, and with
+        neither the most recent ``limit`` lines are returned. Lines are always in ascending
+        order; ``has_more`` says whether further lines exist in the paging direction.
+        """
+        with self.get_connection() as conn:
+            if after_line is not None:
+                rows = []
+                for row in self._iter_execution_log_rows(conn, execution_id, after_line, before_line):
+                    rows.append(row)
+                    if len(rows) > limit:
+                        break
+                has_more = len(rows) > limit
+                rows = rows[:limit]
+            else:
+                if before_line is None:
+                    before_line = self._get_last_log_line(conn, execution_id) + 1
+                
+                # Line numbers are consecutive, so the window below before_line is usually
+                # exact; widen it if a gap means it came up short
+                lower = before_line - 1
+                rows = []
+                while len(rows) <= limit and lower > 0:
+                    lower = max(0, lower - (limit + 1 - len(rows)))
+                    rows = list(self._iter_execution_log_rows(conn, execution_id, lower, before_line))
+                has_more = len(rows) > limit
+                rows = rows[-limit:] if limit else []
             
-            conn.commit()
-            logger.info(f"Stopped execution ID {execution_id}: {reason}")
-            return True
+            return {
+                'execution_id': execution_id,
+                'lines': [
+                    {
+                        'line_number': line_number,
+                        'timestamp': timestamp,
+                        'log_level': log_level,
+                        'content': content
+                    }
+                    for line_number, timestamp, log_level, content in rows
+                ],
+                'first_line': rows[0][0] if rows else None,
+                'last_line': rows[-1][0] if rows else None,
+                'has_more': has_more
+            }
     
-    def add_log_line(self, execution_id: int, content: str, log_level: str = 'info'):
-        """Add a log line for a script execution."""
+    def iter_execution_log_lines(self, execution_id: int):
+        """Stream an execution's formatted log lines, a page at a time.
+        
+        Each page is its own short read, resuming after the last line number sent, so a
+        slow download neither holds a snapshot open (which would stop WAL checkpoints)
+        nor keeps a pooled connection checked out between pages.
+        """
+        after_line = 0
+        while True:
+            with self.get_connection() as conn:
+                rows = self._iter_execution_log_rows(conn, execution_id, after_line)
+                try:
+                    page = list(islice(rows, LOG_DOWNLOAD_PAGE_SIZE))
+                finally:
+                    # Ends the page's read transaction
+                    rows.close()
+            for _, timestamp, _, content in page:
+                yield self._format_log_line(timestamp, content)
+            if len(page) < LOG_DOWNLOAD_PAGE_SIZE:
+                return
+            after_line = page[-1][0]
+    
+    def iter_script_log_lines(self, script_id: str):
+        """Stream formatted log lines for every execution of a script, oldest first."""
+        with self.get_connection() as conn:
+            execution_ids = [
+                row['id'] for row in conn.execute("""
+                    SELECT id FROM script_executions
+                    WHERE script_id = ?
+                    ORDER BY start_time ASC
+                """, (script_id,)).fetchall()
+            ]
+        for execution_id in execution_ids:
+            yield from self.iter_execution_log_lines(execution_id)
+    
+    def clear_script_logs(self, script_id: str):
+        """Clear all logs for a script."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Get current line number
-            cursor.execute("SELECT COUNT(*) as count FROM script_logs WHERE execution_id = ?", (execution_id,))
-            line_number = cursor.fetchone()['count'] + 1
-            
-            cursor.execute("""
-                INSERT INTO script_logs (execution_id, line_number, timestamp, content, log_level)
-                VALUES (?, ?, ?, ?, ?)
-            """, (execution_id, line_number, datetime.now(), content, log_level))
-            
-            conn.commit()
+            cursor.execute("SELECT id FROM script_executions WHERE script_id = ?", (script_id,))
+            execution_ids = [row['id'] for row in cursor.fetchall()]
+        
+        self.submit_write(self._delete_execution_logs, execution_ids)
+        logger.info(f"Cleared logs for script {script_id}")
     
-    def add_log_lines_batch(self, execution_id: int, log_entries: List[Dict]):
-        """Add multiple log lines for a script execution efficiently."""
-        if not log_entries:
-            return
-            
+    def get_active_executions(self) -> Dict[str, Dict]:
+        """Get currently running executions."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f"""
+                SELECT {ExecutionRecord.COLUMNS} FROM script_executions 
+                WHERE status = 'running'
+                ORDER BY start_time DESC
+            """)
             
-            # Get current line number base
-            cursor.execute("SELECT COUNT(*) as count FROM script_logs WHERE execution_id = ?", (execution_id,))
-            start_line_number = cursor.fetchone()['count'] + 1
-            
-            # Prepare data for bulk insert
-            data = []
-            for i, entry in enumerate(log_entries):
-                data.append((
-                    execution_id, 
-                    start_line_number + i, 
-                    entry.get('timestamp', datetime.now()), 
-                    entry['content'], 
-                    entry.get('log_level', 'info')
-                ))
-            
-            cursor.executemany("""
-                INSERT INTO script_logs (execution_id, line_number, timestamp, content, log_level)
-                VALUES (?, ?, ?, ?, ?)
-            """, data)
+            active = {}
+            for row in cursor:
+                execution = ExecutionRecord(*row)
+                active[execution.script_id] = {
+                    'running': True,
+                    'pid': execution.pid,
+                    'start_time': execution.start_time,
+                    'dry_run': execution.dry_run,
+                    'execution_id': execution.id
+                }
             
-            conn.commit()
+            return active
     
-    def get_execution_queue(self, limit: int = 50) -> List[Dict]:
-        """Get recent script executions for the queue view."""
+    def update_script_stats(self, script_id: str):
+        """Update execution statistics for a script."""
+        self.submit_write(self._update_script_stats, script_id)
+    
+    def _update_script_stats(self, cursor: sqlite3.Cursor, script_id: str):
+        """Write operation: recompute execution statistics for a script."""
+        cursor.execute("""
+            UPDATE script_configs 
+            SET execution_count = (
+                SELECT COUNT(*) FROM script_executions WHERE script_id = ?
+            ),
+            last_execution_time = (
+                SELECT MAX(start_time) FROM script_executions WHERE script_id = ?
+            ),
+            avg_duration_seconds = (
+                SELECT AVG(duration_seconds) 
+                FROM script_executions 
+                WHERE script_id = ? AND duration_seconds IS NOT NULL
+            )
+            WHERE script_id = ?
+        """, (script_id, script_id, script_id, script_id))
+    
+    def save_script_config(self, script_id: str, config: Dict):
+        """Save or update a script configuration."""
+        return self.submit_write(self._save_script_config, script_id, config)
+    
+    def _save_script_config(self, cursor: sqlite3.Cursor, script_id: str, config: Dict):
+        """Write operation: insert or replace a script configuration."""
+        cursor.execute("""
+            INSERT OR REPLACE INTO script_configs 
+            (script_id, name, description, script_path, supports_dry_run, section, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            script_id,
+            config.get('name', script_id),
+            config.get('description', ''),
+            config.get('script', ''),
+            config.get('supports_dry_run', True),
+            config.get('section', 'commands'),
+            config.get('status', 'active')
+        ))
+    
+    def get_script_configs(self) -> Dict[str, Dict]:
+        """Get all script configurations."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM script_executions 
-                ORDER BY start_time DESC 
-                LIMIT ?
-            """, (limit,))
+            cursor.execute("SELECT * FROM script_configs WHERE status = 'active'")
             
-            executions = []
+            configs = {}
             for row in cursor.fetchall():
-                execution = dict(row)
-                # Convert timestamps
-                execution['start_time'] = datetime.fromisoformat(execution['start_time'])
-                if execution['end_time']:
-                    execution['end_time'] = datetime.fromisoformat(execution['end_time'])
-                executions.append(execution)
+                config = dict(row)
+                script_id = config.pop('script_id')
+                configs[script_id] = config
             
-            return executions
+            return configs
     
-    def get_execution_logs(self, execution_id: int, limit: int = 1000) -> List[Dict]:
-        """Get logs for a specific execution."""
+    def cleanup_old_data(self, days: int = 30):
+        """Clean up old execution data."""
+        cutoff_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+        
+        self.submit_write(self._delete_old_executions, cutoff_date)
+    
+    def _delete_old_executions(self, cursor: sqlite3.Cursor, cutoff_date: datetime):
+        """Write operation: delete finished executions that started before the cutoff."""
+        cutoff = to_epoch_ms(cutoff_date)
+        cursor.execute("""
+            SELECT id FROM script_executions 
+            WHERE start_time < ? AND status != 'running'
+        """, (cutoff,))
+        execution_ids = [row['id'] for row in cursor.fetchall()]
+        
+        # Logs are removed explicitly; foreign keys aren't enforced so CASCADE never fires
+        self._delete_execution_logs(cursor, execution_ids)
+        cursor.execute("""
+            DELETE FROM script_executions 
+            WHERE start_time < ? AND status != 'running'
+        """, (cutoff,))
+        
+        deleted_count = cursor.rowcount
+        if deleted_count > 0:
+            logger.info(f"Cleaned up {deleted_count} old execution records")
+    
+    def get_retention_policies(self) -> Dict[str, Dict]:
+        """Get the per-script retention overrides, keyed by script_id."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM script_logs 
-                WHERE execution_id = ? 
-                ORDER BY line_number ASC 
-                LIMIT ?
-            """, (execution_id, limit))
-            
-            logs = []
-            for row in cursor.fetchall():
-                log = dict(row)
-                log['timestamp'] = datetime.fromisoformat(log['timestamp'])
-                logs.append(log)
-            
-            return logs
+            cursor.execute("SELECT script_id, retention_days, keep_last FROM retention_policies")
+            return {
+                row['script_id']: {'retention_days': row['retention_days'], 'keep_last': row['keep_last']}
+                for row in cursor.fetchall()
+            }
     
-    def get_script_logs(self, script_id: str, limit: int = 1000) -> List[str]:
-        """Get recent logs for a script (for backwards compatibility)."""
+    def set_retention_policy(self, script_id: str, retention_days: int, keep_last: int = 0):
+        """Keep a script's executions for ``retention_days`` (0 = forever), and always its last ``keep_last``."""
+        self.submit_write(self._set_retention_policy, script_id, retention_days, keep_last)
+    
+    def _set_retention_policy(self, cursor: sqlite3.Cursor, script_id: str, retention_days: int, keep_last: int):
+        """Write operation: insert or update a retention policy."""
+        cursor.execute("""
+            INSERT INTO retention_policies (script_id, retention_days, keep_last, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(script_id) DO UPDATE SET
+                retention_days = excluded.retention_days,
+                keep_last = excluded.keep_last,
+                updated_at = excluded.updated_at
+        """, (script_id, retention_days, keep_last))
+    
+    def delete_retention_policy(self, script_id: str) -> bool:
+        """Remove a script's retention override so the defaults apply again."""
+        return self.submit_write(self._delete_retention_policy, script_id)
+    
+    def _delete_retention_policy(self, cursor: sqlite3.Cursor, script_id: str) -> bool:
+        """Write operation: delete a retention policy, returning whether one existed."""
+        cursor.execute("DELETE FROM retention_policies WHERE script_id = ?", (script_id,))
+        return cursor.rowcount > 0
+
+    def add_queued_run(self, script_id: str, source: str, payload: Dict, resources: List[str],
+                       queued_at: datetime, not_before: Optional[datetime] = None) -> int:
+        """Persist a run waiting for an executor worker. Returns its queue id."""
+        return self.submit_write(self._insert_queued_run, script_id, source, payload, resources,
+                                 queued_at, not_before)
+
+    def _insert_queued_run(self, cursor: sqlite3.Cursor, script_id: str, source: str, payload: Dict,
+                           resources: List[str], queued_at: datetime, not_before: Optional[datetime]) -> int:
+        """Write operation: insert a run_queue row."""
+        cursor.execute("""
+            INSERT INTO run_queue (script_id, source, payload, resources, status, not_before, queued_at)
+            VALUES (?, ?, ?, ?, 'queued', ?, ?)
+        """, (script_id, source, json.dumps(payload, default=str), ','.join(resources),
+              to_epoch_ms(not_before), to_epoch_ms(queued_at)))
+        return cursor.lastrowid
+
+    def mark_queued_run_started(self, run_id: int, started_at: datetime):
+        """Record that a queued run has been handed to a worker (not waited for)."""
+        self.submit_write(self._update_queued_run_started, run_id, started_at, wait=False)
+
+    def _update_queued_run_started(self, cursor: sqlite3.Cursor, run_id: int, started_at: datetime):
+        """Write operation: mark a run_queue row running."""
+        cursor.execute("UPDATE run_queue SET status = 'running', started_at = ? WHERE id = ?",
+                       (to_epoch_ms(started_at), run_id))
+
+    def remove_queued_run(self, run_id: int):
+        """Drop a run from the queue once it has ended or was cancelled (not waited for)."""
+        self.submit_write(self._delete_queued_run, run_id, wait=False)
+
+    def _delete_queued_run(self, cursor: sqlite3.Cursor, run_id: int):
+        """Write operation: delete a run_queue row."""
+        cursor.execute("DELETE FROM run_queue WHERE id = ?", (run_id,))
+
+    def get_queued_runs(self) -> List[Dict]:
+        """Every run in the queue, oldest first, with its payload decoded."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT sl.content, sl.timestamp
-                FROM script_logs sl
-                JOIN script_executions se ON sl.execution_id = se.id
-                WHERE se.script_id = ?
-                ORDER BY sl.timestamp DESC
-                LIMIT ?
-            """, (script_id, limit))
-            
-            logs = []
+                SELECT id, script_id, source, payload, resources, status, not_before, queued_at, started_at
+                FROM run_queue ORDER BY id
+            """)
+            runs = []
             for row in cursor.fetchall():
-                timestamp = datetime.fromisoformat(row['timestamp']).strftime('%H:%M:%S')
-                logs.append(f"[{timestamp}] {row['content']}")
-            
-            return list(reversed(logs))  # Return in chronological order
-    
-    def get_execution_logs(self, execution_id: int, limit: int = 10000) -> List[str]:
-        """Get logs for a specific execution."""
+                try:
+                    payload = json.loads(row['payload'])
+                except ValueError:
+                    payload = {}
+                runs.append({
+                    'id': row['id'],
+                    'script_id': row['script_id'],
+                    'source': row['source'],
+                    'payload': payload,
+                    'resources': [resource for resource in row['resources'].split(',') if resource],
+                    'status': row['status'],
+                    'not_before': from_epoch_ms(row['not_before']),
+                    'queued_at': from_epoch_ms(row['queued_at']),
+                    'started_at': from_epoch_ms(row['started_at'])
+                })
+            return runs
+
+    def discard_interrupted_runs(self) -> int:
+        """Remove runs that were running when the app stopped. Returns how many there were."""
+        return self.submit_write(self._delete_interrupted_runs)
+
+    def _delete_interrupted_runs(self, cursor: sqlite3.Cursor) -> int:
+        """Write operation: delete the run_queue rows left running."""
+        cursor.execute("DELETE FROM run_queue WHERE status = 'running'")
+        return cursor.rowcount
+
+    def acquire_execution_lease(self, script_id: str, owner: str, run_id: Optional[int],
+                                stale_before: datetime) -> Optional[Dict]:
+        """Take the script's lease for ``owner``.
+
+        Returns None when the lease is now held by ``owner``, or the current lease
+        when another owner holds it and has sent a heartbeat since ``stale_before``.
+        """
+        return self.submit_write(self._acquire_execution_lease, script_id, owner, run_id, stale_before)
+
+    def _acquire_execution_lease(self, cursor: sqlite3.Cursor, script_id: str, owner: str,
+                                 run_id: Optional[int], stale_before: datetime) -> Optional[Dict]:
+        """Write operation: insert the lease, or take it over when its holder went quiet."""
+        # The writer's transaction is BEGIN IMMEDIATE, so no other process can slip in between
+        cursor.execute("SELECT * FROM execution_leases WHERE script_id = ?", (script_id,))
+        row = cursor.fetchone()
+        if row and row['owner'] != owner:
+            if row['heartbeat_at'] >= to_epoch_ms(stale_before):
+                return dict(row)
+            logger.warning(f"Taking over stale lease on {script_id} from {row['owner']} "
+                           f"(last heartbeat {epoch_ms_to_iso(row['heartbeat_at'])})")
+        now = to_epoch_ms(datetime.now())
+        cursor.execute("""
+            INSERT OR REPLACE INTO execution_leases
+            (script_id, owner, run_id, execution_id, pid, acquired_at, heartbeat_at, cancel_requested)
+            VALUES (?, ?, ?, NULL, NULL, ?, ?, 0)
+        """, (script_id, owner, run_id, now, now))
+        return None
+
+    def update_execution_lease(self, script_id: str, owner: str, pid: Optional[int] = None,
+                               execution_id: Optional[int] = None):
+        """Record the process and execution running under a held lease (not waited for)."""
+        self.submit_write(self._update_execution_lease, script_id, owner, pid, execution_id, wait=False)
+
+    def _update_execution_lease(self, cursor: sqlite3.Cursor, script_id: str, owner: str,
+                                pid: Optional[int], execution_id: Optional[int]):
+        """Write operation: fill in a lease's pid and execution id."""
+        cursor.execute("""
+            UPDATE execution_leases
+            SET pid = COALESCE(?, pid), execution_id = COALESCE(?, execution_id)
+            WHERE script_id = ? AND owner = ?
+        """, (pid, execution_id, script_id, owner))
+
+    def heartbeat_execution_leases(self, owner: str):
+        """Refresh every lease held by ``owner`` (not waited for)."""
+        self.submit_write(self._heartbeat_execution_leases, owner, to_epoch_ms(datetime.now()), wait=False)
+
+    def _heartbeat_execution_leases(self, cursor: sqlite3.Cursor, owner: str, now: int):
+        """Write operation: bump heartbeat_at on an owner's leases."""
+        cursor.execute("UPDATE execution_leases SET heartbeat_at = ? WHERE owner = ?", (now, owner))
+
+    def release_execution_lease(self, script_id: str, owner: str):
+        """Give up a lease if ``owner`` still holds it (not waited for)."""
+        self.submit_write(self._delete_execution_lease, script_id, owner, wait=False)
+
+    def _delete_execution_lease(self, cursor: sqlite3.Cursor, script_id: str, owner: str):
+        """Write operation: delete one owner's lease."""
+        cursor.execute("DELETE FROM execution_leases WHERE script_id = ? AND owner = ?", (script_id, owner))
+
+    def release_execution_leases_of(self, owners: List[str]) -> int:
+        """Drop every lease held by the given owners. Returns how many there were."""
+        if not owners:
+            return 0
+        return self.submit_write(self._delete_execution_leases_of, owners)
+
+    def _delete_execution_leases_of(self, cursor: sqlite3.Cursor, owners: List[str]) -> int:
+        """Write operation: delete the leases of several owners."""
+        placeholders = ', '.join('?' * len(owners))
+        cursor.execute(f"DELETE FROM execution_leases WHERE owner IN ({placeholders})", owners)
+        return cursor.rowcount
+
+    def request_lease_cancel(self, script_id: str) -> bool:
+        """Ask the holder of a script's lease to stop its run. Returns whether there was a lease."""
+        return self.submit_write(self._request_lease_cancel, script_id)
+
+    def _request_lease_cancel(self, cursor: sqlite3.Cursor, script_id: str) -> bool:
+        """Write operation: flag a lease for cancellation."""
+        cursor.execute("UPDATE execution_leases SET cancel_requested = 1 WHERE script_id = ?", (script_id,))
+        return cursor.rowcount > 0
+
+    def get_execution_leases(self, owner: Optional[str] = None) -> List[Dict]:
+        """Every execution lease (or one owner's), with times as datetimes."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT content, timestamp
-                FROM script_logs
-                WHERE execution_id = ?
-                ORDER BY timestamp ASC
-                LIMIT ?
-            """, (execution_id, limit))
-            
-            logs = []
+            if owner is None:
+                cursor.execute("SELECT * FROM execution_leases ORDER BY acquired_at")
+            else:
+                cursor.execute("SELECT * FROM execution_leases WHERE owner = ? ORDER BY acquired_at", (owner,))
+            leases = []
             for row in cursor.fetchall():
-                timestamp = datetime.fromisoformat(row['timestamp']).strftime('%H:%M:%S')
-                logs.append(f"[{timestamp}] {row['content']}")
-            
-            return logs
-    
-    def clear_script_logs(self, script_id: str):
-        """Clear all logs for a script."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                DELETE FROM script_logs 
-                WHERE execution_id IN (
-                    SELECT id FROM script_executions WHERE script_id = ?
-                )
-            """, (script_id,))
-            conn.commit()
-            logger.info(f"Cleared logs for script {script_id}")
-    
-    def get_active_executions(self) -> Dict[str, Dict]:
-        """Get currently running executions."""
+                lease = dict(row)
+                lease['acquired_at'] = from_epoch_ms(lease['acquired_at'])
+                lease['heartbeat_at'] = from_epoch_ms(lease['heartbeat_at'])
+                lease['cancel_requested'] = bool(lease['cancel_requested'])
+                leases.append(lease)
+            return leases
+
+    def record_coalesced_execution(self, script_id: str, script_name: str, note: str) -> int:
+        """Record a run that was folded into one already queued or running, instead of duplicating it."""
+        return self.submit_write(self._insert_coalesced_execution, script_id, script_name, note)
+
+    def _insert_coalesced_execution(self, cursor: sqlite3.Cursor, script_id: str, script_name: str,
+                                    note: str) -> int:
+        """Write operation: insert a finished zero-length execution with status 'coalesced'."""
+        now = to_epoch_ms(datetime.now())
+        cursor.execute("""
+            INSERT INTO script_executions
+            (script_id, script_name, start_time, end_time, duration_seconds, status, error_message)
+            VALUES (?, ?, ?, ?, 0, 'coalesced', ?)
+        """, (script_id, script_name, now, now, note))
+        return cursor.lastrowid
+
+    def get_execution_script_ids(self) -> List[str]:
+        """Get every script_id that has executions on record."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM script_executions 
-                WHERE status = 'running'
-                ORDER BY start_time DESC
-            """)
-            
-            active = {}
-            for row in cursor.fetchall():
-                execution = dict(row)
-                execution['start_time'] = datetime.fromisoformat(execution['start_time'])
-                active[execution['script_id']] = {
-                    'running': True,
-                    'pid': execution['pid'],
-                    'start_time': execution['start_time'],
-                    'dry_run': execution['dry_run'],
-                    'execution_id': execution['id']
-                }
-            
-            return active
+            cursor.execute("SELECT DISTINCT script_id FROM script_executions")
+            return [row[0] for row in cursor.fetchall()]
     
-    def update_script_stats(self, script_id: str):
-        """Update execution statistics for a script."""
+    def get_expired_execution_ids(self, script_id: str, cutoff_date: datetime, keep_last: int = 0,
+                                  limit: int = 100) -> List[int]:
+        """Get up to ``limit`` of a script's finished executions started before the cutoff, oldest first.
+        
+        The script's ``keep_last`` most recent executions are never returned.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("""
-                UPDATE script_configs 
-                SET execution_count = (
-                    SELECT COUNT(*) FROM script_executions WHERE script_id = ?
-                ),
-                last_execution_time = (
-                    SELECT MAX(start_time) FROM script_executions WHERE script_id = ?
-                ),
-                avg_duration_seconds = (
-                    SELECT AVG(duration_seconds) 
-                    FROM script_executions 
-                    WHERE script_id = ? AND duration_seconds IS NOT NULL
+                SELECT id FROM script_executions
+                WHERE script_id = ? AND start_time < ? AND status != 'running'
+                AND id NOT IN (
+                    SELECT id FROM script_executions
+                    WHERE script_id = ?
+                    ORDER BY start_time DESC
+                    LIMIT ?
                 )
-                WHERE script_id = ?
-            """, (script_id, script_id, script_id, script_id))
-            conn.commit()
+                ORDER BY start_time ASC
+                LIMIT ?
+            """, (script_id, to_epoch_ms(cutoff_date), script_id, keep_last, limit))
+            return [row[0] for row in cursor.fetchall()]
     
-    def save_script_config(self, script_id: str, config: Dict):
-        """Save or update a script configuration."""
+    def delete_executions(self, execution_ids: List[int]) -> Dict[str, int]:
+        """Delete executions with their live logs, archived chunks and search index entries.
+        
+        Returns counts of deleted 'executions', 'log_lines' and 'archive_chunks'.
+        """
+        if not execution_ids:
+            return {'executions': 0, 'log_lines': 0, 'archive_chunks': 0}
+        return self.submit_write(self._delete_executions, list(execution_ids))
+    
+    def _delete_executions(self, cursor: sqlite3.Cursor, execution_ids: List[int]) -> Dict[str, int]:
+        """Write operation: delete a batch of executions and everything logged for them."""
+        placeholders = ','.join('?' * len(execution_ids))
+        cursor.execute(f"SELECT COUNT(*) FROM script_logs WHERE execution_id IN ({placeholders})", execution_ids)
+        live_lines = cursor.fetchone()[0]
+        cursor.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(line_count), 0) FROM script_log_archives
+            WHERE execution_id IN ({placeholders})
+        """, execution_ids)
+        archive_chunks, archived_lines = cursor.fetchone()
+        
+        self._delete_execution_logs(cursor, execution_ids)
+        cursor.execute(f"DELETE FROM script_executions WHERE id IN ({placeholders})", execution_ids)
+        return {
+            'executions': cursor.rowcount,
+            'log_lines': live_lines + archived_lines,
+            'archive_chunks': archive_chunks
+        }
+    
+    def get_data_version(self) -> int:
+        """A counter that changes whenever any other connection or process commits.
+        
+        Pollers compare it with the previous value to skip queries while nothing
+        has been written. Reading it does not touch any table.
+        """
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = self._open_connection()
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def get_storage_stats(self) -> Dict[str, int]:
+        """Get page counts and on-disk sizes of the database and its WAL."""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO script_configs 
-                (script_id, name, description, script_path, supports_dry_run, section, status)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
-                script_id,
-                config.get('name', script_id),
-                config.get('description', ''),
-                config.get('script', ''),
-                config.get('supports_dry_run', True),
-                config.get('section', 'commands'),
-                config.get('status', 'active')
-            ))
-            conn.commit()
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        
+        def file_size(path):
+            try:
+                return os.path.getsize(path)
+            except OSError:
+                return 0
+        
+        return {
+            'page_size': page_size,
+            'page_count': page_count,
+            'freelist_count': freelist_count,
+            'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(auto_vacuum, str(auto_vacuum)),
+            'database_bytes': file_size(self.db_path),
+            'wal_bytes': file_size(f"{self.db_path}-wal")
+        }
     
-    def get_script_configs(self) -> Dict[str, Dict]:
-        """Get all script configurations."""
+    def incremental_vacuum(self, pages: int) -> int:
+        """Return up to ``pages`` free pages to the filesystem (needs incremental auto-vacuum).
+        
+        Returns the number of pages freed. The file shrinks at the next WAL checkpoint.
+        """
+        return self.submit_write(self._incremental_vacuum, pages)
+    
+    def _incremental_vacuum(self, cursor: sqlite3.Cursor, pages: int) -> int:
+        """Write operation: run incremental_vacuum for up to ``pages`` pages."""
+        cursor.execute("PRAGMA freelist_count")
+        before = cursor.fetchone()[0]
+        # Each step of the pragma frees one page and sqlite3 steps a statement once per
+        # execute(), so it is run page by page (executescript() would commit the batch)
+        for _ in range(min(pages, before)):
+            cursor.execute("PRAGMA incremental_vacuum(1)")
+        cursor.execute("PRAGMA freelist_count")
+        return before - cursor.fetchone()[0]
+    
+    def checkpoint_wal(self, mode: str = 'TRUNCATE') -> Dict[str, int]:
+        """Checkpoint the WAL into the database file.
+        
+        Queued writes are flushed first. ``busy`` is 1 when readers or a writer kept the
+        checkpoint from completing (it is then retried at the next call).
+        """
+        if mode not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Unknown checkpoint mode: {mode}")
+        self.flush_writes()
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT * FROM script_configs WHERE status = 'active'")
-            
-            configs = {}
-            for row in cursor.fetchall():
-                config = dict(row)
-                script_id = config.pop('script_id')
-                configs[script_id] = config
-            
-            return configs
+            busy, log_frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return {'busy': busy, 'log_frames': log_frames, 'checkpointed_frames': checkpointed}
     
-    def cleanup_old_data(self, days: int = 30):
-        """Clean up old execution data."""
-        cutoff_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        cutoff_date = cutoff_date.replace(day=cutoff_date.day - days)
+    def enable_incremental_vacuum(self) -> bool:
+        """Convert the database to incremental auto-vacuum with a one-time VACUUM.
         
+        Databases created before auto-vacuum was enabled need this once. VACUUM rewrites
+        the whole file and holds the write lock meanwhile, so it only runs when the
+        database is not already incremental (maintenance calls it, never startup).
+        Returns True if a conversion was done.
+        """
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Delete old executions (logs will be deleted via CASCADE)
-            cursor.execute("""
-                DELETE FROM script_executions 
-                WHERE start_time < ? AND status != 'running'
-            """, (cutoff_date,))
-            
-            deleted_count = cursor.rowcount
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if mode == 2:
+                return False
+            if mode == 1:
+                # FULL to INCREMENTAL is a header change, no rebuild needed
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                return True
+            self.flush_writes()
+            logger.info("Converting database to incremental auto-vacuum (one-time VACUUM)...")
+            started = time.time()
             conn.commit()
-            
-            if deleted_count > 0:
-                logger.info(f"Cleaned up {deleted_count} old execution records")
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.info(f"Database converted to incremental auto-vacuum in {time.time() - started:.1f}s")
+            return True
     
     def get_execution_stats(self) -> Dict:
         """Get overall execution statistics."""
@@ -931,8 +1625,8 @@ class DatabaseManager:
             
             stats = {}
             
-            # Total executions
-            cursor.execute("SELECT COUNT(*) as total FROM script_executions")
+            # Total executions (coalesced runs never ran)
+            cursor.execute("SELECT COUNT(*) as total FROM script_executions WHERE status != 'coalesced'")
             stats['total_executions'] = cursor.fetchone()['total']
             
             # Success rate
@@ -941,7 +1635,7 @@ class DatabaseManager:
                     SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as successful,
                     COUNT(*) as total
                 FROM script_executions 
-                WHERE status != 'running'
+                WHERE status NOT IN ('running', 'coalesced')
             """)
             result = cursor.fetchone()
             if result['total'] > 0:
@@ -953,6 +1647,7 @@ class DatabaseManager:
             cursor.execute("""
                 SELECT script_name, COUNT(*) as count 
                 FROM script_executions 
+                WHERE status != 'coalesced'
                 GROUP BY script_id, script_name 
                 ORDER BY count DESC 
                 LIMIT 5
@@ -964,61 +1659,62 @@ class DatabaseManager:
     # Expiring Albums Management
     def upsert_expiring_album(self, album_data: Dict):
         """Insert or update an expiring album record."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            album_key = album_data['album_key']
-            
-            # Check if album already exists
-            cursor.execute("SELECT id, first_detected FROM expiring_albums WHERE album_key = ?", (album_key,))
-            existing = cursor.fetchone()
-            
-            now = datetime.now()
-            
-            if existing:
-                # Update existing record (preserving first_detected)
-                cursor.execute("""
-                    UPDATE expiring_albums 
-                    SET file_count = ?,
-                        total_size_mb = ?,
-                        is_starred = ?,
-                        last_seen = ?,
-                        status = ?,
-                        updated_at = ?
-                    WHERE album_key = ?
-                """, (
-                    album_data['file_count'],
-                    album_data['total_size_mb'],
-                    album_data['is_starred'],
-                    now,
-                    album_data['status'],
-                    now,
-                    album_key
-                ))
-                album_id = existing['id']
-            else:
-                # Insert new record
-                cursor.execute("""
-                    INSERT INTO expiring_albums 
-                    (album_key, artist, album, directory, file_count, total_size_mb, 
-                     is_starred, first_detected, last_seen, status)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    album_key,
-                    album_data['artist'],
-                    album_data['album'],
-                    album_data['directory'],
-                    album_data['file_count'],
-                    album_data['total_size_mb'],
-                    album_data['is_starred'],
-                    now,
-                    now,
-                    album_data['status']
-                ))
-                album_id = cursor.lastrowid
-            
-            conn.commit()
-            return album_id
+        return self.submit_write(self._upsert_expiring_album, album_data)
+    
+    def _upsert_expiring_album(self, cursor: sqlite3.Cursor, album_data: Dict) -> int:
+        """Write operation: insert or update an expiring album, returning its id."""
+        album_key = album_data['album_key']
+        
+        # Check if album already exists
+        cursor.execute("SELECT id FROM expiring_albums WHERE album_key = ?", (album_key,))
+        existing = cursor.fetchone()
+        
+        now = datetime.now()
+        now_ms = to_epoch_ms(now)
+        
+        if existing:
+            # Update existing record (preserving first_detected)
+            cursor.execute("""
+                UPDATE expiring_albums 
+                SET file_count = ?,
+                    total_size_mb = ?,
+                    is_starred = ?,
+                    last_seen = ?,
+                    status = ?,
+                    updated_at = ?
+                WHERE album_key = ?
+            """, (
+                album_data['file_count'],
+                album_data['total_size_mb'],
+                album_data['is_starred'],
+                now_ms,
+                album_data['status'],
+                now,
+                album_key
+            ))
+            album_id = existing['id']
+        else:
+            # Insert new record
+            cursor.execute("""
+                INSERT INTO expiring_albums 
+                (album_key, artist, album, directory, file_count, total_size_mb, 
+                 is_starred, first_detected, last_seen, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                album_key,
+                album_data['artist'],
+                album_data['album'],
+                album_data['directory'],
+                album_data['file_count'],
+                album_data['total_size_mb'],
+                album_data['is_starred'],
+                now_ms,
+                now_ms,
+                album_data['status']
+            ))
+            album_id = cursor.lastrowid
+        
+        return album_id
     
     def get_all_active_album_keys(self) -> List[str]:
         """Get keys of all albums that are not deleted."""
@@ -1027,12 +1723,13 @@ class DatabaseManager:
             cursor.execute("SELECT album_key FROM expiring_albums WHERE status != 'deleted'")
             return [row['album_key'] for row in cursor.fetchall()]
 
-    def get_expiring_albums(self, status: str = 'pending', include_starred: bool = False) -> List[Dict]:
+    def get_expiring_albums(self, status: str = 'pending', include_starred: bool = False) -> List[AlbumRecord]:
         """Get expiring albums from database."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
             
-            query = "SELECT * FROM expiring_albums WHERE status = ?"
+            query = f"SELECT {AlbumRecord.COLUMNS} FROM expiring_albums WHERE status = ?"
             params = [status]
             
             if not include_starred:
@@ -1041,220 +1738,242 @@ class DatabaseManager:
             query += " ORDER BY first_detected ASC"
             
             cursor.execute(query, params)
-            
-            albums = []
-            for row in cursor.fetchall():
-                album = dict(row)
-                album['first_detected'] = datetime.fromisoformat(album['first_detected'])
-                album['last_seen'] = datetime.fromisoformat(album['last_seen'])
-                if album['deleted_at']:
-                    album['deleted_at'] = datetime.fromisoformat(album['deleted_at'])
-                albums.append(album)
-            
-            return albums
+            return [AlbumRecord(*row) for row in cursor]
     
-    def get_expiring_albums_summary(self) -> Dict:
-        """Get summary data for expiring albums (for web UI)."""
-        import os
-        
+    def get_expiring_albums_summary(self, search: str = None, sort: str = 'expiry',
+                                    limit: Optional[int] = None, offset: int = 0) -> Dict:
+        """Get summary data for expiring albums (for web UI).
+
+        Filtering, ordering and paging happen in SQL over the
+        (status, is_starred, first_detected) index; track counts come from the
+        trigger-maintained expiring_albums.track_count column.
+        """
         # Get cleanup policy from environment (matches file_expiry_cleanup.py)
         cleanup_days = int(os.environ.get('CLEANUP_DAYS', '30'))
-        
+        now = datetime.now()
+        now_ms = to_epoch_ms(now)
+        order_by = EXPIRING_ALBUM_SORTS.get(sort, EXPIRING_ALBUM_SORTS['expiry'])
+
+        where = "status = 'pending' AND is_starred = FALSE"
+        params: List[Any] = []
+        if search:
+            pattern = '%' + re.sub(r'([\\%_])', r'\\\1', search.strip()) + '%'
+            where += " AND (artist LIKE ? ESCAPE '\\' OR album LIKE ? ESCAPE '\\')"
+            params.extend([pattern, pattern])
+
+        # Whole days since first detection, truncated like timedelta.days
+        days_since = "(? - first_detected) / 86400000"
+
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            
-            # Get active expiring albums with actual track counts
-            cursor.execute("""
-                SELECT ea.*, 
-                       COUNT(at.id) as actual_file_count
-                FROM expiring_albums ea
-                LEFT JOIN album_tracks at ON ea.id = at.album_id
-                WHERE ea.status = 'pending' AND ea.is_starred = FALSE
-                GROUP BY ea.id
-            """)
-            
+
+            cursor.execute(f"""
+                SELECT COUNT(*) AS total_albums,
+                       COALESCE(SUM(total_size_mb), 0) AS total_size_mb,
+                       COALESCE(SUM(days_since_detected > ?), 0) AS expired,
+                       COALESCE(SUM(days_since_detected = ?), 0) AS expiring_today
+                FROM (
+                    SELECT total_size_mb, {days_since} AS days_since_detected
+                    FROM expiring_albums
+                    WHERE {where}
+                )
+            """, [cleanup_days, cleanup_days, now_ms] + params)
+            stats = dict(cursor.fetchone())
+            stats['expiring_soon'] = stats['total_albums'] - stats['expired'] - stats['expiring_today']
+
+            cursor.execute(f"""
+                SELECT album_key, artist, album, directory, first_detected, file_count,
+                       track_count, total_size_mb, album_art_url, is_starred,
+                       {days_since} AS days_since_detected
+                FROM expiring_albums
+                WHERE {where}
+                ORDER BY {order_by}
+                LIMIT ? OFFSET ?
+            """, [now_ms] + params + [limit if limit is not None else -1, offset])
+
             albums = {}
-            
             for row in cursor.fetchall():
-                album_dict = dict(row)
-                album_key = album_dict['album_key']
-                
-                # Calculate days until expiry from first_detected timestamp
-                first_detected = datetime.fromisoformat(album_dict['first_detected'])
-                days_since_detected = (datetime.now() - first_detected).days
+                days_since_detected = row['days_since_detected']
                 days_until_expiry = cleanup_days - days_since_detected
-                
-                # Use actual file count from tracks table, fallback to stored count
-                actual_file_count = album_dict.get('actual_file_count', 0)
-                stored_file_count = album_dict['file_count']
+
+                # Use maintained track count, fallback to stored count
+                actual_file_count = row['track_count']
+                stored_file_count = row['file_count']
                 display_file_count = actual_file_count if actual_file_count > 0 else stored_file_count
-                
-                albums[album_key] = {
-                    'album_key': album_key,  # Include the key (MBID or Hash)
-                    'artist': album_dict['artist'],
-                    'album': album_dict['album'],
-                    'directory': album_dict['directory'],
+
+                albums[row['album_key']] = {
+                    'album_key': row['album_key'],  # Include the key (MBID or Hash)
+                    'artist': row['artist'],
+                    'album': row['album'],
+                    'directory': row['directory'],
                     'days_until_expiry': days_until_expiry,  # Calculated from first_detected
                     'days_since_detected': days_since_detected,
-                    'first_detected': album_dict['first_detected'],  # Include for frontend
+                    'first_detected': epoch_ms_to_iso(row['first_detected']),  # Include for frontend
                     'file_count': display_file_count,  # Use actual count from tracks
                     'stored_file_count': stored_file_count,  # Original for debugging
                     'actual_file_count': actual_file_count,  # Actual from tracks table
-                    'total_size_mb': album_dict['total_size_mb'],
-                    'album_art_url': album_dict.get('album_art_url'),
-                    'is_starred': album_dict['is_starred'],
+                    'total_size_mb': row['total_size_mb'],
+                    'album_art_url': row['album_art_url'],
+                    'is_starred': row['is_starred'],
                     'will_expire': days_until_expiry <= 0,
                     'sample_files': []  # Could be enhanced to track specific files
                 }
-            
-            # Sort albums by days_until_expiry (most urgent first)
-            albums_list = list(albums.values())
-            albums_list.sort(key=lambda x: x['days_until_expiry'])
-            
-            # Convert back to dict with same keys
-            sorted_albums = {}
-            for album in albums_list:
-                sorted_albums[album['album_key']] = album
-            
+
             return {
-                'generated_at': datetime.now().isoformat(),
+                'generated_at': now.isoformat(),
                 'cleanup_days': cleanup_days,  # Include for frontend calculations
-                'total_albums': len(sorted_albums),
-                'albums': sorted_albums
+                'total_albums': stats['total_albums'],
+                'stats': stats,
+                'offset': offset,
+                'limit': limit,
+                'has_more': limit is not None and offset + len(albums) < stats['total_albums'],
+                'albums': albums
             }
     
     def mark_album_deleted(self, album_key: str):
         """Mark an album as deleted."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE expiring_albums 
-                SET status = 'deleted', deleted_at = ?, updated_at = ?
-                WHERE album_key = ?
-            """, (datetime.now(), datetime.now(), album_key))
-            conn.commit()
+        return self.submit_write(self._mark_album_deleted, album_key)
+    
+    def _mark_album_deleted(self, cursor: sqlite3.Cursor, album_key: str):
+        """Write operation: mark an album as deleted."""
+        cursor.execute("""
+            UPDATE expiring_albums 
+            SET status = 'deleted', deleted_at = ?, updated_at = ?
+            WHERE album_key = ?
+        """, (to_epoch_ms(datetime.now()), datetime.now(), album_key))
     
     def mark_album_starred(self, album_key: str, is_starred: bool = True):
         """Mark an album as starred/unstarred."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE expiring_albums 
-                SET is_starred = ?, status = ?, updated_at = ?
-                WHERE album_key = ?
-            """, (is_starred, 'starred' if is_starred else 'pending', datetime.now(), album_key))
-            conn.commit()
+        return self.submit_write(self._mark_album_starred, album_key, is_starred)
+    
+    def _mark_album_starred(self, cursor: sqlite3.Cursor, album_key: str, is_starred: bool):
+        """Write operation: set an album's starred flag and status."""
+        cursor.execute("""
+            UPDATE expiring_albums 
+            SET is_starred = ?, status = ?, updated_at = ?
+            WHERE album_key = ?
+        """, (is_starred, 'starred' if is_starred else 'pending', datetime.now(), album_key))
+    
+    def cleanup_old_album_data(self, days: int = 90) -> int:
+        """Delete albums (and their tracks) that were marked deleted more than ``days`` ago."""
+        cutoff_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+        return self.submit_write(self._delete_old_albums, cutoff_date)
     
-    def cleanup_old_album_data(self, days: int = 90):
-        """Clean up old album expiry data."""
-        cutoff_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-        cutoff_date = cutoff_date.replace(day=cutoff_date.day - days)
+    def _delete_old_albums(self, cursor: sqlite3.Cursor, cutoff_date: datetime) -> int:
+        """Write operation: delete deleted albums older than the cutoff, returning how many."""
+        cutoff = to_epoch_ms(cutoff_date)
+        # Tracks are removed explicitly; foreign keys aren't enforced so CASCADE never fires
+        cursor.execute("""
+            DELETE FROM album_tracks WHERE album_id IN (
+                SELECT id FROM expiring_albums WHERE status = 'deleted' AND deleted_at < ?
+            )
+        """, (cutoff,))
+        cursor.execute("""
+            DELETE FROM expiring_albums 
+            WHERE status = 'deleted' AND deleted_at < ?
+        """, (cutoff,))
         
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Delete albums that were deleted more than X days ago
-            cursor.execute("""
-                DELETE FROM expiring_albums 
-                WHERE status = 'deleted' AND deleted_at < ?
-            """, (cutoff_date,))
-            
-            deleted_count = cursor.rowcount
-            
-            # Clean up very old history entries
-            cursor.execute("""
-                DELETE FROM album_expiry_history 
-                WHERE recorded_at < ?
-            """, (cutoff_date,))
-            
-            history_deleted = cursor.rowcount
-            
-            conn.commit()
-            
-            if deleted_count > 0 or history_deleted > 0:
-                logger.info(f"Cleaned up {deleted_count} old album records and {history_deleted} history entries")
+        deleted_count = cursor.rowcount
+        if deleted_count > 0:
+            logger.info(f"Cleaned up {deleted_count} old album records")
+        return deleted_count
     
+    def add_album_track(self, album_id: int, track_data: Dict, wait: bool = True):
+        """Add or update a track for an album.
 
-
-    def add_album_track(self, album_id: int, track_data: Dict):
-        """Add or update a track for an album."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT OR REPLACE INTO album_tracks 
-                (album_id, file_path, file_name, track_title, track_number, track_artist, 
-                 file_size_mb, days_old, last_modified, is_starred, navidrome_id, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                album_id,
-                track_data['file_path'],
-                track_data['file_name'],
-                track_data.get('track_title'),
-                track_data.get('track_number'),
-                track_data.get('track_artist'),
-                track_data['file_size_mb'],
-                track_data['days_old'],
-                track_data['last_modified'],
-                track_data.get('is_starred', False),
-                track_data.get('navidrome_id'),
-                datetime.now()
-            ))
-            conn.commit()
+        Uses an upsert rather than INSERT OR REPLACE: REPLACE deletes the old
+        row without firing delete triggers, which would skew track_count.
+        Pass ``wait=False`` during a scan to let the writer group the rows into
+        fewer transactions.
+        """
+        return self.submit_write(self._upsert_album_track, album_id, track_data, wait=wait)
     
-    def get_album_tracks(self, album_key: str) -> List[Dict]:
+    def _upsert_album_track(self, cursor: sqlite3.Cursor, album_id: int, track_data: Dict):
+        """Write operation: insert a track or update the existing row for its file."""
+        cursor.execute("""
+            INSERT INTO album_tracks 
+            (album_id, file_path, file_name, track_title, track_number, track_artist, 
+             file_size_mb, days_old, last_modified, is_starred, navidrome_id, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(album_id, file_path) DO UPDATE SET
+                file_name = excluded.file_name,
+                track_title = excluded.track_title,
+                track_number = excluded.track_number,
+                track_artist = excluded.track_artist,
+                file_size_mb = excluded.file_size_mb,
+                days_old = excluded.days_old,
+                last_modified = excluded.last_modified,
+                is_starred = excluded.is_starred,
+                navidrome_id = excluded.navidrome_id,
+                updated_at = excluded.updated_at
+        """, (
+            album_id,
+            track_data['file_path'],
+            track_data['file_name'],
+            track_data.get('track_title'),
+            track_data.get('track_number'),
+            track_data.get('track_artist'),
+            track_data['file_size_mb'],
+            track_data['days_old'],
+            to_epoch_ms(track_data['last_modified']),
+            track_data.get('is_starred', False),
+            track_data.get('navidrome_id'),
+            datetime.now()
+        ))
+    
+    def get_album_tracks(self, album_key: str) -> List[TrackRecord]:
         """Get all tracks for an album."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None
+            # days_old is recalculated from last_modified rather than read from the stored column
             cursor.execute("""
-                SELECT at.*, ea.first_detected
+                SELECT at.id, at.album_id, at.file_path, at.file_name, at.track_title, at.track_number,
+                       at.track_artist, at.year, at.file_size_mb, (? - at.last_modified) / 86400000,
+                       at.last_modified, at.is_starred, at.navidrome_id
                 FROM album_tracks at
                 JOIN expiring_albums ea ON at.album_id = ea.id
                 WHERE ea.album_key = ?
                 ORDER BY at.file_name ASC
-            """, (album_key,))
-            
-            tracks = []
-            for row in cursor.fetchall():
-                track = dict(row)
-                track['last_modified'] = datetime.fromisoformat(track['last_modified'])
-                
-                # Recalculate days_old from last_modified timestamp
-                days_old = (datetime.now() - track['last_modified']).days
-                track['days_old'] = days_old
-                
-                tracks.append(track)
-            
-            return tracks
+            """, (to_epoch_ms(datetime.now()), album_key))
+            return [TrackRecord(*row) for row in cursor]
     
     def clear_album_tracks(self, album_id: int):
         """Clear all tracks for an album (before re-scanning)."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM album_tracks WHERE album_id = ?", (album_id,))
-            conn.commit()
+        return self.submit_write(self._clear_album_tracks, album_id)
     
-    def update_track_starred_status(self, file_path: str, is_starred: bool, navidrome_id: str = None):
-        """Update the starred status of a specific track."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            if navidrome_id:
-                # Update by Navidrome ID if available
-                cursor.execute("""
-                    UPDATE album_tracks 
-                    SET is_starred = ?, navidrome_id = ?, updated_at = ?
-                    WHERE navidrome_id = ? OR file_path = ?
-                """, (is_starred, navidrome_id, datetime.now(), navidrome_id, file_path))
-            else:
-                # Update by file path
-                cursor.execute("""
-                    UPDATE album_tracks 
-                    SET is_starred = ?, updated_at = ?
-                    WHERE file_path = ?
-                """, (is_starred, datetime.now(), file_path))
-            
-            conn.commit()
-            return cursor.rowcount > 0
+    def _clear_album_tracks(self, cursor: sqlite3.Cursor, album_id: int):
+        """Write operation: delete an album's tracks."""
+        cursor.execute("DELETE FROM album_tracks WHERE album_id = ?", (album_id,))
+    
+    def update_track_starred_status(self, file_path: str, is_starred: bool, navidrome_id: str = None,
+                                    wait: bool = True):
+        """Update the starred status of a specific track.
+        
+        Returns whether a track matched (a Future of it with ``wait=False``).
+        """
+        return self.submit_write(self._update_track_starred_status, file_path, is_starred, navidrome_id,
+                                 wait=wait)
+    
+    def _update_track_starred_status(self, cursor: sqlite3.Cursor, file_path: str, is_starred: bool,
+                                     navidrome_id: Optional[str]) -> bool:
+        """Write operation: set a track's starred flag, matched by Navidrome ID or file path."""
+        if navidrome_id:
+            # Update by Navidrome ID if available
+            cursor.execute("""
+                UPDATE album_tracks 
+                SET is_starred = ?, navidrome_id = ?, updated_at = ?
+                WHERE navidrome_id = ? OR file_path = ?
+            """, (is_starred, navidrome_id, datetime.now(), navidrome_id, file_path))
+        else:
+            # Update by file path
+            cursor.execute("""
+                UPDATE album_tracks 
+                SET is_starred = ?, updated_at = ?
+                WHERE file_path = ?
+            """, (is_starred, datetime.now(), file_path))
+        
+        return cursor.rowcount > 0
     
     def get_starred_tracks(self) -> List[Dict]:
         """Get all starred tracks."""
@@ -1271,79 +1990,107 @@ class DatabaseManager:
             tracks = []
             for row in cursor.fetchall():
                 track = dict(row)
-                track['last_modified'] = datetime.fromisoformat(track['last_modified'])
+                track['last_modified'] = from_epoch_ms(track['last_modified'])
                 tracks.append(track)
             
             return tracks
     
-    def bulk_update_starred_tracks(self, starred_tracks: List[Dict]):
-        """Bulk update starred status for multiple tracks.
+    def bulk_update_starred_tracks(self, starred_tracks: List[Dict]) -> Dict[str, int]:
+        """Sync track starred status to the given starred set, changing only the delta.
         
         Args:
             starred_tracks: List of dicts with 'file_path' and 'is_starred' keys
+                (optionally 'navidrome_id'). Tracks not in the list are unstarred.
+        
+        Returns:
+            Dict with 'starred' and 'unstarred' counts of rows that changed
         """
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # First, reset all tracks to unstarred
-            cursor.execute("UPDATE album_tracks SET is_starred = FALSE, updated_at = ?", (datetime.now(),))
-            
-            # Then set starred tracks
-            for track in starred_tracks:
-                if track.get('is_starred', False):
-                    cursor.execute("""
-                        UPDATE album_tracks 
-                        SET is_starred = TRUE, 
-                            navidrome_id = ?,
-                            updated_at = ?
-                        WHERE file_path = ?
-                    """, (
-                        track.get('navidrome_id'),
-                        datetime.now(),
-                        track['file_path']
-                    ))
-            
-            conn.commit()
-            logger.info(f"Bulk updated starred status for {len(starred_tracks)} tracks")
+        rows = [
+            (track['file_path'], track.get('navidrome_id'))
+            for track in starred_tracks
+            if track.get('is_starred', False) and track.get('file_path')
+        ]
+        counts = self.submit_write(self._sync_starred_tracks, rows)
+        logger.info(f"Starred track sync: {counts['starred']} starred, {counts['unstarred']} unstarred "
+                    f"({len(rows)} starred in Navidrome)")
+        return counts
+    
+    def _sync_starred_tracks(self, cursor: sqlite3.Cursor, rows: List[tuple]) -> Dict[str, int]:
+        """Write operation: diff album_tracks against a temp table of starred paths."""
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS starred_sync (
+                file_path TEXT PRIMARY KEY,
+                navidrome_id TEXT
+            )
+        """)
+        cursor.execute("DELETE FROM starred_sync")
+        cursor.executemany("INSERT OR REPLACE INTO starred_sync (file_path, navidrome_id) VALUES (?, ?)", rows)
+        
+        now = datetime.now()
+        
+        # Newly starred: in the starred set but not starred yet
+        cursor.execute("""
+            UPDATE album_tracks 
+            SET is_starred = TRUE,
+                navidrome_id = COALESCE(
+                    (SELECT s.navidrome_id FROM starred_sync s WHERE s.file_path = album_tracks.file_path),
+                    navidrome_id
+                ),
+                updated_at = ?
+            WHERE file_path IN (SELECT file_path FROM starred_sync)
+            AND COALESCE(is_starred, FALSE) = FALSE
+        """, (now,))
+        starred = cursor.rowcount
+        
+        # Newly unstarred: starred now but missing from the starred set
+        cursor.execute("""
+            UPDATE album_tracks 
+            SET is_starred = FALSE, updated_at = ?
+            WHERE is_starred = TRUE
+            AND file_path NOT IN (SELECT file_path FROM starred_sync)
+        """, (now,))
+        unstarred = cursor.rowcount
+        
+        cursor.execute("DELETE FROM starred_sync")
+        return {'starred': starred, 'unstarred': unstarred}
 
     # Playlist Tracks Methods
     
     def upsert_playlist_track(self, track_data: Dict) -> int:
         """Insert or update a playlist track."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO playlist_tracks 
-                (spotify_id, artist, title, album, year, status, slskd_id, navidrome_id, last_checked)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(spotify_id) DO UPDATE SET
-                artist = excluded.artist,
-                title = excluded.title,
-                album = excluded.album,
-                year = excluded.year,
-                status = excluded.status,
-                slskd_id = COALESCE(excluded.slskd_id, playlist_tracks.slskd_id),
-                navidrome_id = COALESCE(excluded.navidrome_id, playlist_tracks.navidrome_id),
-                last_checked = excluded.last_checked,
-                updated_at = CURRENT_TIMESTAMP
-            """, (
-                track_data['spotify_id'],
-                track_data['artist'],
-                track_data['title'],
-                track_data.get('album'),
-                track_data.get('year'),
-                track_data.get('status', 'pending'),
-                track_data.get('slskd_id'),
-                track_data.get('navidrome_id'),
-                datetime.now()
-            ))
-            
-            conn.commit()
-            
-            # Get the ID
-            cursor.execute("SELECT id FROM playlist_tracks WHERE spotify_id = ?", (track_data['spotify_id'],))
-            return cursor.fetchone()[0]
+        return self.submit_write(self._upsert_playlist_track, track_data)
+    
+    def _upsert_playlist_track(self, cursor: sqlite3.Cursor, track_data: Dict) -> int:
+        """Write operation: insert or update a playlist track, returning its id."""
+        cursor.execute("""
+            INSERT INTO playlist_tracks 
+            (spotify_id, artist, title, album, year, status, slskd_id, navidrome_id, last_checked)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(spotify_id) DO UPDATE SET
+            artist = excluded.artist,
+            title = excluded.title,
+            album = excluded.album,
+            year = excluded.year,
+            status = excluded.status,
+            slskd_id = COALESCE(excluded.slskd_id, playlist_tracks.slskd_id),
+            navidrome_id = COALESCE(excluded.navidrome_id, playlist_tracks.navidrome_id),
+            last_checked = excluded.last_checked,
+            updated_at = CURRENT_TIMESTAMP
+        """, (
+            track_data['spotify_id'],
+            track_data['artist'],
+            track_data['title'],
+            track_data.get('album'),
+            track_data.get('year'),
+            track_data.get('status', 'pending'),
+            track_data.get('slskd_id'),
+            track_data.get('navidrome_id'),
+            datetime.now()
+        ))
+        
+        # Get the ID
+        cursor.execute("SELECT id FROM playlist_tracks WHERE spotify_id = ?", (track_data['spotify_id'],))
+        return cursor.fetchone()[0]
             
     def get_playlist_track(self, spotify_id: str) -> Optional[Dict]:
         """Get a playlist track by Spotify ID."""
@@ -1362,29 +2109,29 @@ class DatabaseManager:
             
     def update_playlist_track_status(self, spotify_id: str, status: str, slskd_id: str = None, navidrome_id: str = None):
         """Update status and optional IDs for a playlist track."""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            updates = ["status = ?", "updated_at = CURRENT_TIMESTAMP"]
-            params = [status]
-            
-            if slskd_id:
-                updates.append("slskd_id = ?")
-                params.append(slskd_id)
-                
-            if navidrome_id:
-                updates.append("navidrome_id = ?")
-                params.append(navidrome_id)
-                
-            params.append(spotify_id)
+        return self.submit_write(self._update_playlist_track_status, spotify_id, status, slskd_id, navidrome_id)
+    
+    def _update_playlist_track_status(self, cursor: sqlite3.Cursor, spotify_id: str, status: str,
+                                      slskd_id: Optional[str], navidrome_id: Optional[str]):
+        """Write operation: set a playlist track's status and any IDs given."""
+        updates = ["status = ?", "updated_at = CURRENT_TIMESTAMP"]
+        params = [status]
+        
+        if slskd_id:
+            updates.append("slskd_id = ?")
+            params.append(slskd_id)
             
-            cursor.execute(f"""
-                UPDATE playlist_tracks 
-                SET {', '.join(updates)}
-                WHERE spotify_id = ?
-            """, params)
+        if navidrome_id:
+            updates.append("navidrome_id = ?")
+            params.append(navidrome_id)
             
-            conn.commit()
+        params.append(spotify_id)
+        
+        cursor.execute(f"""
+            UPDATE playlist_tracks 
+            SET {', '.join(updates)}
+            WHERE spotify_id = ?
+        """, params)
 
 # Global database manager instance
 _db_instance = None
@@ -1400,6 +2147,7 @@ def get_db() -> DatabaseManager:
             if _db_instance is None:
                 logger.info("Initializing database manager...")
                 _db_instance = DatabaseManager()
+                atexit.register(_db_instance.close)
                 logger.info("Database manager initialization complete")
     
     return _db_instance
\ No newline at end of file
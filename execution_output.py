@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Execution output module for SoulSeekarr
+Bounded in-memory output of script runs.
+
+Each run gets its own ring buffer of formatted output lines, capped by line
+count and by size, so appending a batch never copies the lines already held
+and a chatty script cannot grow the web process. The database keeps the full
+log; this is only the recent tail served from memory (/output, and logs of runs
+whose lines have not reached the database).
+
+Buffers are keyed by run: a script's latest run answers the per-script views,
+and runs with an execution id can be looked up by it. A finished run is evicted
+once the script runs again, after EXECUTION_OUTPUT_TTL_SECONDS, or when more
+than EXECUTION_OUTPUT_KEEP_FINISHED finished runs are held, so memory stays flat
+over long uptimes.
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import deque, OrderedDict
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_OUTPUT_LINES = int(os.environ.get('EXECUTION_OUTPUT_LINES', '1000'))                 # Lines kept per run
+EXECUTION_OUTPUT_MAX_BYTES = int(os.environ.get('EXECUTION_OUTPUT_MAX_BYTES', str(512 * 1024)))  # Per run, counted in characters
+EXECUTION_OUTPUT_KEEP_FINISHED = int(os.environ.get('EXECUTION_OUTPUT_KEEP_FINISHED', '20'))     # Finished runs kept
+EXECUTION_OUTPUT_TTL_SECONDS = float(os.environ.get('EXECUTION_OUTPUT_TTL_SECONDS', '3600'))    # Finished runs dropped after
+
+
+class ExecutionOutput:
+    """Ring buffer of one run's output lines."""
+
+    def __init__(self, script_id: str, max_lines: int = EXECUTION_OUTPUT_LINES,
+                 max_bytes: int = EXECUTION_OUTPUT_MAX_BYTES):
+        self.script_id = script_id
+        self.execution_id: Optional[int] = None
+        self.lines = deque(maxlen=max_lines)
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.dropped_lines = 0
+        self.pending: Optional[str] = None             # Line being rewritten in place (progress bars)
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    def append(self, lines: Iterable[str]):
+        if not isinstance(lines, list):
+            lines = list(lines)
+        overflow = len(self.lines) + len(lines) - self.max_lines
+        if overflow > 0:
+            # The deque drops these from the front as the batch goes in
+            self.size -= sum(map(len, islice(self.lines, min(overflow, len(self.lines)))))
+            self.dropped_lines += overflow
+            lines = lines[-self.max_lines:]
+        self.lines.extend(lines)
+        self.size += sum(map(len, lines))
+        # Then drop from the front until the size fits; the newest line always stays
+        while self.size > self.max_bytes and len(self.lines) > 1:
+            self.size -= len(self.lines.popleft())
+            self.dropped_lines += 1
+
+    def tail(self, limit: Optional[int] = None) -> List[str]:
+        lines = list(self.lines)
+        if self.pending is not None:
+            lines.append(self.pending)
+        if limit is None or limit >= len(lines):
+            return lines
+        if limit <= 0:
+            return []
+        return lines[-limit:]
+
+    def clear(self):
+        self.lines.clear()
+        self.size = 0
+        self.pending = None
+
+
+class OutputStore:
+    """In-memory output of recent runs, with eviction of finished ones."""
+
+    def __init__(self, max_lines: int = EXECUTION_OUTPUT_LINES, max_bytes: int = EXECUTION_OUTPUT_MAX_BYTES,
+                 keep_finished: int = EXECUTION_OUTPUT_KEEP_FINISHED,
+                 ttl_seconds: float = EXECUTION_OUTPUT_TTL_SECONDS):
+        self.lock = threading.Lock()
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.keep_finished = keep_finished
+        self.ttl_seconds = ttl_seconds
+        self._outputs: 'OrderedDict[int, ExecutionOutput]' = OrderedDict()  # Oldest run first
+        self._latest: Dict[str, ExecutionOutput] = {}
+        self._by_execution: Dict[int, ExecutionOutput] = {}
+        self.evicted = 0
+
+    def open(self, script_id: str) -> ExecutionOutput:
+        """Start the buffer for a new run; it becomes the script's current output."""
+        output = ExecutionOutput(script_id, self.max_lines, self.max_bytes)
+        with self.lock:
+            self._outputs[id(output)] = output
+            self._latest[script_id] = output
+            self._prune(time.time())
+        return output
+
+    def set_execution(self, output: ExecutionOutput, execution_id: int):
+        with self.lock:
+            output.execution_id = execution_id
+            self._by_execution[execution_id] = output
+
+    def append(self, output: ExecutionOutput, lines: Iterable[str]):
+        with self.lock:
+            output.append(lines)
+
+    def set_pending(self, output: ExecutionOutput, line: Optional[str]):
+        """Show ``line`` after the run's output until it is replaced, or cleared with None."""
+        with self.lock:
+            output.pending = line
+
+    def finish(self, output: ExecutionOutput):
+        with self.lock:
+            output.pending = None
+            output.finished_at = time.time()
+            self._prune(output.finished_at)
+
+    def script_lines(self, script_id: str, limit: Optional[int] = None) -> List[str]:
+        """Output of the script's latest run still in memory."""
+        with self.lock:
+            output = self._latest.get(script_id)
+            return output.tail(limit) if output else []
+
+    def execution_lines(self, execution_id: int, limit: Optional[int] = None) -> Optional[List[str]]:
+        """Output of a run by execution id, or None when it is not in memory."""
+        with self.lock:
+            output = self._by_execution.get(execution_id)
+            return output.tail(limit) if output else None
+
+    def clear(self, script_id: str):
+        """Empty the script's current output."""
+        with self.lock:
+            output = self._latest.get(script_id)
+            if output:
+                output.clear()
+
+    def prune(self) -> int:
+        """Evict finished runs past the retention limits. Returns how many were evicted."""
+        with self.lock:
+            return self._prune(time.time())
+
+    def _prune(self, now: float) -> int:
+        finished = [output for output in self._outputs.values() if output.finished_at is not None]
+        # Superseded by a newer run of the same script, or finished too long ago
+        expired = [output for output in finished
+                   if self._latest.get(output.script_id) is not output or now - output.finished_at > self.ttl_seconds]
+        excess = len(finished) - len(expired) - self.keep_finished
+        if excess > 0:
+            # Oldest first, skipping the ones already expiring
+            expired.extend([output for output in finished if output not in expired][:excess])
+        for output in expired:
+            self._evict(output)
+        return len(expired)
+
+    def _evict(self, output: ExecutionOutput):
+        del self._outputs[id(output)]
+        if self._latest.get(output.script_id) is output:
+            del self._latest[output.script_id]
+        if output.execution_id is not None and self._by_execution.get(output.execution_id) is output:
+            del self._by_execution[output.execution_id]
+        self.evicted += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            outputs = list(self._outputs.values())
+            return {
+                'runs': len(outputs),
+                'running': sum(1 for output in outputs if output.finished_at is None),
+                'lines': sum(len(output.lines) for output in outputs),
+                'bytes': sum(output.size for output in outputs),
+                'dropped_lines': sum(output.dropped_lines for output in outputs),
+                'evicted_runs': self.evicted,
+                'limits': {
+                    'lines_per_run': self.max_lines,
+                    'bytes_per_run': self.max_bytes,
+                    'keep_finished': self.keep_finished,
+                    'ttl_seconds': self.ttl_seconds
+                }
+            }
+
+# Global store instance
+output_store = None
+
+def get_output_store() -> OutputStore:
+    """Get the global execution output store."""
+    global output_store
+    if output_store is None:
+        output_store = OutputStore()
+    return output_store
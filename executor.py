@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Executor module for SoulSeekarr
+One bounded pool of workers for every script run, with per-resource limits.
+
+Manual runs, scheduled jobs and the cron queue all submit here. A submitted run
+is written to the run_queue table first, so runs that were still waiting when
+the app stopped are picked up again on the next start (runs that were already
+running are dropped: their process went with the app).
+
+EXECUTOR_WORKERS runs execute at once. On top of that a script can declare the
+resources it leans on in its docstring (``Resources: disk-heavy, lidarr``), and
+at most EXECUTOR_RESOURCE_LIMITS runs (``lidarr=2,disk-heavy=1``; anything not
+listed gets EXECUTOR_DEFAULT_RESOURCE_LIMIT) use each resource at a time. A
+script never runs twice at once. Waiting runs start in submission order, except
+that a run whose resources are busy does not hold up the ones behind it.
+
+A script never overlaps itself, even across processes sharing the database:
+a run takes the script's execution lease (leases.py) before it starts. When a
+run is submitted while the script is already queued or running, here or in
+another process, the script's overlap policy decides what happens:
+
+    skip          the new run is coalesced into the existing one (default)
+    queue-behind  the new run waits for the current one, at most one waiting
+    cancel-older  the current run is stopped and the new one replaces it
+
+Scripts pick a policy with ``Overlap:`` in their docstring; anything else uses
+EXECUTION_OVERLAP_POLICY. A coalesced run is recorded as a 'coalesced'
+execution saying which run it was folded into, so history shows it.
+
+What a run does is up to the handler registered for its source; the executor
+only decides when it may start. A handler returns the run's exit code, and a
+non-zero code (or an exception) counts the run as failed.
+"""
+
+import os
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from leases import LeaseManager
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_WORKERS = int(os.environ.get('EXECUTOR_WORKERS', '3'))                              # Runs executing at once
+EXECUTOR_RESOURCE_LIMITS = os.environ.get('EXECUTOR_RESOURCE_LIMITS', '')                    # e.g. "lidarr=2,disk-heavy=1"
+EXECUTOR_DEFAULT_RESOURCE_LIMIT = int(os.environ.get('EXECUTOR_DEFAULT_RESOURCE_LIMIT', '1'))  # Per resource not listed
+EXECUTION_OVERLAP_POLICY = os.environ.get('EXECUTION_OVERLAP_POLICY', 'skip').lower()         # skip, queue-behind or cancel-older
+
+OVERLAP_POLICIES = ('skip', 'queue-behind', 'cancel-older')
+
+
+def parse_resource_limits(spec: str) -> Dict[str, int]:
+    """Parse ``name=limit`` pairs separated by commas; malformed entries are skipped."""
+    limits = {}
+    for entry in spec.split(','):
+        name, _, value = entry.partition('=')
+        name = name.strip().lower()
+        try:
+            limit = int(value)
+        except ValueError:
+            if entry.strip():
+                logger.warning(f"Ignoring executor resource limit '{entry.strip()}'")
+            continue
+        if name:
+            limits[name] = max(1, limit)
+    return limits
+
+
+class RunJob:
+    """A run waiting for, or holding, a worker."""
+
+    def __init__(self, job_id: int, script_id: str, source: str, payload: Dict[str, Any],
+                 resources: Iterable[str], queued_at: datetime, not_before: Optional[datetime] = None):
+        self.id = job_id
+        self.script_id = script_id
+        self.source = source
+        self.payload = payload
+        self.resources = tuple(resources)
+        self.queued_at = queued_at
+        self.not_before = not_before
+        self.started_at: Optional[datetime] = None
+        self.state = 'queued'                          # queued, running, finished or coalesced
+        self.coalesced = 0                             # Later runs folded into this one
+        self.note: Optional[str] = None                # What a coalesced run was folded into
+        self.retry_at: Optional[datetime] = None       # Set while another process holds the lease
+        self.blocked: Optional[str] = None
+        self.superseding = False                       # Asked the lease holder to stop (cancel-older)
+
+    @property
+    def overlap(self) -> str:
+        return self.payload.get('overlap') or EXECUTION_OVERLAP_POLICY
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'script_id': self.script_id,
+            'name': self.payload.get('name') or self.script_id,
+            'source': self.source,
+            'state': self.state,
+            'resources': list(self.resources),
+            'queued_at': self.queued_at.isoformat(),
+            'not_before': self.not_before.isoformat() if self.not_before else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'overlap': self.overlap,
+            'coalesced': self.coalesced,
+            'note': self.note
+        }
+
+
+class ScriptExecutor:
+    """Bounded worker pool fed from the persistent run queue."""
+
+    def __init__(self, db=None, workers: int = EXECUTOR_WORKERS, resource_limits: Optional[Dict[str, int]] = None,
+                 default_resource_limit: int = EXECUTOR_DEFAULT_RESOURCE_LIMIT, leases: Optional[LeaseManager] = None,
+                 overlap_policy: str = EXECUTION_OVERLAP_POLICY):
+        if db is None:
+            from database import get_db
+            db = get_db()
+        self.db = db
+        self.leases = leases or LeaseManager(db)
+        self.submit_lock = threading.Lock()            # One overlap decision at a time
+        self.default_overlap = overlap_policy if overlap_policy in OVERLAP_POLICIES else 'skip'
+        if overlap_policy != self.default_overlap:
+            logger.warning(f"Unknown overlap policy '{overlap_policy}', using skip")
+        self.workers = max(1, workers)
+        self.resource_limits = (parse_resource_limits(EXECUTOR_RESOURCE_LIMITS)
+                                if resource_limits is None else resource_limits)
+        self.default_resource_limit = max(1, default_resource_limit)
+        self.condition = threading.Condition()
+        self.running = False
+        self._threads: List[threading.Thread] = []
+        self._handlers: Dict[str, Callable[[RunJob], Optional[int]]] = {}
+        self._queue: List[RunJob] = []                 # Waiting runs, oldest first
+        self._active: Dict[int, RunJob] = {}           # Runs holding a worker
+        self._resource_use: Dict[str, int] = {}
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+
+    def register(self, source: str, handler: Callable[[RunJob], Optional[int]]):
+        """Set the function that carries out runs submitted by ``source`` (called on a worker).
+
+        The handler returns the run's exit code; None means the run was skipped.
+        """
+        with self.condition:
+            self._handlers[source] = handler
+            self.condition.notify_all()
+
+    def start(self):
+        """Reload the persisted queue and start the workers."""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+
+        self.leases.start()
+        interrupted = self.db.discard_interrupted_runs()
+        if interrupted:
+            logger.warning(f"Dropped {interrupted} queued runs that were running when the app stopped")
+        restored = [RunJob(run['id'], run['script_id'], run['source'], run['payload'], run['resources'],
+                           run['queued_at'], run['not_before'])
+                    for run in self.db.get_queued_runs()]
+        with self.condition:
+            known = {job.id for job in self._queue}
+            self._queue.extend(job for job in restored if job.id not in known)
+            self._queue.sort(key=lambda job: job.id)
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"executor-{number + 1}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+        if restored:
+            logger.info(f"Restored {len(restored)} queued runs")
+        logger.info(f"Executor started with {self.workers} workers")
+
+    def stop(self):
+        """Stop handing out runs; runs in progress finish on their own."""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self._threads = []
+        self.leases.stop()
+
+    def submit(self, script_id: str, source: str, payload: Optional[Dict[str, Any]] = None,
+               resources: Optional[Iterable[str]] = None, not_before: Optional[datetime] = None,
+               overlap: Optional[str] = None) -> RunJob:
+        """Queue a run, or coalesce it into the script's existing one.
+
+        ``resources`` and ``overlap`` default to what the script declares. A
+        coalesced run comes back with state 'coalesced' and never starts.
+        """
+        if resources is None or overlap is None:
+            from script_registry import get_script_registry
+            config = get_script_registry().get(script_id) or {}
+            if resources is None:
+                resources = config.get('resources', [])
+            if overlap is None:
+                overlap = config.get('overlap')
+        resources = sorted({resource.lower() for resource in resources})
+        payload = dict(payload or {}, overlap=self.overlap_policy(overlap))
+        queued_at = datetime.now()
+
+        with self.submit_lock:
+            with self.condition:
+                running = next((job for job in self._active.values() if job.script_id == script_id), None)
+                waiting = [job for job in self._queue if job.script_id == script_id]
+                superseded = []
+                if payload['overlap'] == 'cancel-older':
+                    superseded = waiting
+                    self._queue = [job for job in self._queue if job.script_id != script_id]
+                    existing = None
+                elif payload['overlap'] == 'skip':
+                    existing = waiting[0] if waiting else running
+                else:
+                    existing = waiting[0] if waiting else None
+                if existing is not None:
+                    existing.coalesced += 1
+                    into = (f"run {existing.id} ({existing.source}), already "
+                            f"{'running' if existing.state == 'running' else 'queued'}")
+            if existing is not None:
+                return self._coalesce(script_id, source, payload, resources, queued_at, into)
+
+            if payload['overlap'] == 'skip' and running is None:
+                holder = self.leases.holder(script_id)
+                if holder:
+                    return self._coalesce(script_id, source, payload, resources, queued_at,
+                                          f"the run in {holder['owner']}")
+
+            for job in superseded:
+                self.db.remove_queued_run(job.id)
+                self._record_coalesced(job, "a newer run")
+            if payload['overlap'] == 'cancel-older' and running is not None:
+                self.leases.cancel(script_id, "Superseded by a newer run")
+
+            job_id = self.db.add_queued_run(script_id, source, payload, resources, queued_at, not_before)
+            job = RunJob(job_id, script_id, source, payload, resources, queued_at, not_before)
+            with self.condition:
+                self._queue.append(job)
+                # Concurrent submits may get here out of id order
+                self._queue.sort(key=lambda queued: queued.id)
+                self.condition.notify_all()
+        return job
+
+    def overlap_policy(self, overlap: Optional[str]) -> str:
+        """A valid overlap policy, falling back to the default one."""
+        if overlap and overlap.lower() in OVERLAP_POLICIES:
+            return overlap.lower()
+        if overlap:
+            logger.warning(f"Ignoring unknown overlap policy '{overlap}'")
+        return self.default_overlap
+
+    def _coalesce(self, script_id: str, source: str, payload: Dict[str, Any], resources: List[str],
+                  queued_at: datetime, into: str) -> RunJob:
+        """A run that is not queued because the script's existing run covers it."""
+        job = RunJob(None, script_id, source, payload, resources, queued_at)
+        self._record_coalesced(job, into)
+        return job
+
+    def _record_coalesced(self, job: RunJob, into: str):
+        job.state = 'coalesced'
+        job.note = f"Coalesced into {into}"
+        with self.condition:
+            self.coalesced += 1
+        logger.info(f"{job.payload.get('name') or job.script_id} ({job.source}): {job.note}")
+        try:
+            self.db.record_coalesced_execution(job.script_id, job.payload.get('name') or job.script_id, job.note)
+        except Exception as e:
+            logger.error(f"Failed to record coalesced run of {job.script_id}: {e}")
+
+    def cancel(self, job_id: int) -> bool:
+        """Remove a run that has not started yet."""
+        with self.condition:
+            job = next((job for job in self._queue if job.id == job_id), None)
+            if job is None:
+                return False
+            self._queue.remove(job)
+        self.db.remove_queued_run(job_id)
+        return True
+
+    def cancel_source(self, source: str) -> int:
+        """Remove every run from ``source`` that has not started yet."""
+        with self.condition:
+            cancelled = [job for job in self._queue if job.source == source]
+            self._queue = [job for job in self._queue if job.source != source]
+        for job in cancelled:
+            self.db.remove_queued_run(job.id)
+        return len(cancelled)
+
+    def find(self, script_id: str, source: Optional[str] = None) -> Optional[RunJob]:
+        """The script's running or waiting run (from ``source``, if given), if it has one."""
+        with self.condition:
+            for job in list(self._active.values()) + self._queue:
+                if job.script_id == script_id and source in (None, job.source):
+                    return job
+            return None
+
+    def resource_limit(self, resource: str) -> int:
+        return self.resource_limits.get(resource, self.default_resource_limit)
+
+    def waiting_for(self, job: RunJob) -> Optional[str]:
+        """What a queued run is waiting for, or None when it is running or about to start."""
+        with self.condition:
+            return self._blocker(job, datetime.now())
+
+    def _blocker(self, job: RunJob, now: datetime) -> Optional[str]:
+        if job.state != 'queued':
+            return None
+        if not self.running:
+            return "Waiting for the executor to start"
+        if job.not_before and job.not_before > now:
+            return f"Starts at {job.not_before.strftime('%H:%M')}"
+        if job.retry_at and job.retry_at > now:
+            return job.blocked
+        if any(active.script_id == job.script_id for active in self._active.values()):
+            return "Waiting for the script's current run"
+        for resource in job.resources:
+            if self._resource_use.get(resource, 0) >= self.resource_limit(resource):
+                return f"Waiting for {resource}"
+        if len(self._active) >= self.workers:
+            return "Waiting for a free worker"
+        if job.source not in self._handlers:
+            return f"Waiting for the {job.source} runner"
+        return None
+
+    def _take(self, now: datetime) -> Tuple[Optional[RunJob], Optional[float]]:
+        """Claim the oldest run that may start now (condition held).
+
+        Returns (job, None), or (None, seconds until a delayed run is due / None).
+        """
+        next_due = None
+        for job in self._queue:
+            due = max(filter(None, (job.not_before, job.retry_at)), default=None)
+            if due and due > now:
+                wait = (due - now).total_seconds()
+                next_due = wait if next_due is None else min(next_due, wait)
+                continue
+            if self._blocker(job, now) is None:
+                self._queue.remove(job)
+                job.state = 'running'
+                job.started_at = now
+                self._active[job.id] = job
+                for resource in job.resources:
+                    self._resource_use[resource] = self._resource_use.get(resource, 0) + 1
+                return job, None
+        return None, next_due
+
+    def _release(self, job: RunJob, state: str = 'finished'):
+        """Give back a run's worker and resources (condition held)."""
+        self._active.pop(job.id, None)
+        for resource in job.resources:
+            self._resource_use[resource] -= 1
+            if self._resource_use[resource] <= 0:
+                del self._resource_use[resource]
+        job.state = state
+
+    def _claim_lease(self, job: RunJob) -> bool:
+        """Take the script's execution lease for a claimed run.
+
+        When another process holds it, the run is coalesced (skip) or put back to
+        retry after a heartbeat (queue-behind, cancel-older); returns False then.
+        """
+        try:
+            holder = self.leases.acquire(job.script_id, job.id)
+        except Exception as e:
+            # Without the lease table, run unguarded rather than not at all
+            logger.error(f"Failed to take the execution lease for {job.script_id}: {e}")
+            return True
+        if holder is None:
+            return True
+        if job.overlap == 'skip':
+            with self.condition:
+                self._release(job, 'coalesced')
+                self.condition.notify_all()
+            self.db.remove_queued_run(job.id)
+            self._record_coalesced(job, f"the run in {holder['owner']}")
+            return False
+        if job.overlap == 'cancel-older' and not job.superseding:
+            job.superseding = True
+            self.leases.cancel(job.script_id, "Superseded by a newer run")
+        with self.condition:
+            self._release(job, 'queued')
+            job.started_at = None
+            job.retry_at = datetime.now() + timedelta(seconds=self.leases.heartbeat_seconds)
+            job.blocked = f"Waiting for the run in {holder['owner']}"
+            self._queue.append(job)
+            self._queue.sort(key=lambda queued: queued.id)
+            self.condition.notify_all()
+        return False
+
+    def _worker(self):
+        while True:
+            with self.condition:
+                while True:
+                    if not self.running:
+                        return
+                    job, wait = self._take(datetime.now())
+                    if job is not None:
+                        handler = self._handlers[job.source]
+                        break
+                    self.condition.wait(wait)
+
+            if not self._claim_lease(job):
+                continue
+            job.retry_at = job.blocked = None
+            self.db.mark_queued_run_started(job.id, job.started_at)
+            logger.info(f"Executor running {job.script_id} ({job.source})"
+                        + (f" holding {', '.join(job.resources)}" if job.resources else ""))
+            failed = False
+            try:
+                return_code = handler(job)
+                failed = return_code is not None and return_code != 0
+            except Exception as e:
+                failed = True
+                logger.error(f"Executor run of {job.script_id} ({job.source}) failed: {e}")
+            finally:
+                self.leases.release(job.script_id)
+                with self.condition:
+                    self._release(job)
+                    if failed:
+                        self.failed += 1
+                    else:
+                        self.completed += 1
+                    # Freed resources may unblock several waiting runs
+                    self.condition.notify_all()
+                self.db.remove_queued_run(job.id)
+
+    def get_queue(self) -> List[Dict[str, Any]]:
+        """Running runs, then waiting ones, each with what it is waiting for."""
+        now = datetime.now()
+        with self.condition:
+            runs = []
+            for job in list(self._active.values()) + self._queue:
+                entry = job.to_dict()
+                entry['waiting'] = self._blocker(job, now)
+                runs.append(entry)
+            return runs
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.condition:
+            resources = set(self.resource_limits) | set(self._resource_use)
+            resources.update(resource for job in self._queue for resource in job.resources)
+            return {
+                'workers': self.workers,
+                'busy_workers': len(self._active),
+                'queued': len(self._queue),
+                'completed': self.completed,
+                'failed': self.failed,
+                'coalesced': self.coalesced,
+                'overlap_policy': self.default_overlap,
+                'resources': {
+                    resource: {'in_use': self._resource_use.get(resource, 0), 'limit': self.resource_limit(resource)}
+                    for resource in sorted(resources)
+                },
+                'default_resource_limit': self.default_resource_limit
+            }
+
+# Global executor instance
+executor = None
+
+def get_executor() -> ScriptExecutor:
+    """Get the global script executor."""
+    global executor
+    if executor is None:
+        executor = ScriptExecutor()
+    return executor
+
+def start_executor():
+    """Start the global executor's workers."""
+    get_executor().start()
+
+def stop_executor():
+    """Stop the global executor."""
+    if executor:
+        executor.stop()
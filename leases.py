@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Execution leases module for SoulSeekarr
+Database-backed locks that keep a script from running twice, across processes.
+
+Before a run starts the executor takes the script's row in execution_leases. The
+lease names its owner (host, pid and a token unique to this start of the app)
+and is refreshed every EXECUTION_LEASE_HEARTBEAT_SECONDS while the run lasts.
+Another process wanting the same script finds a live lease and applies the
+script's overlap policy; a lease whose heartbeat is older than
+EXECUTION_LEASE_STALE_SECONDS belongs to a process that died, and is taken over.
+
+A lease also records the pid and execution id of its run, so a newer run with
+the cancel-older policy can stop it: directly when it runs in this process, or
+by flagging the lease, which the owning process acts on at its next heartbeat.
+"""
+
+import os
+import signal
+import socket
+import uuid
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EXECUTION_LEASE_HEARTBEAT_SECONDS = float(os.environ.get('EXECUTION_LEASE_HEARTBEAT_SECONDS', '15'))
+EXECUTION_LEASE_STALE_SECONDS = float(os.environ.get('EXECUTION_LEASE_STALE_SECONDS', '90'))
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists but belongs to someone else
+        return True
+
+
+class LeaseManager:
+    """The execution leases held by this process, and the heartbeat that keeps them."""
+
+    def __init__(self, db, heartbeat_seconds: float = EXECUTION_LEASE_HEARTBEAT_SECONDS,
+                 stale_seconds: float = EXECUTION_LEASE_STALE_SECONDS):
+        self.db = db
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self.host = socket.gethostname()
+        self.owner = f"{self.host}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lock = threading.Lock()
+        self._held: Dict[str, Dict[str, Any]] = {}  # script_id -> run_id, pid, execution_id, cancelled
+        self._stop = threading.Event()
+        self._thread = None
+        self.cancelled_runs = 0
+
+    def start(self):
+        """Drop leases left by an earlier start of the app on this host, then start heartbeats."""
+        orphaned = set()
+        for lease in self.db.get_execution_leases():
+            host, _, rest = lease['owner'].partition(':')
+            pid_text = rest.split(':', 1)[0]
+            if host != self.host or lease['owner'] == self.owner or not pid_text.isdigit():
+                continue
+            # A reused pid (pid 1 in a container) or a dead one: the owner is gone
+            pid = int(pid_text)
+            if pid == os.getpid() or not _process_alive(pid):
+                orphaned.add(lease['owner'])
+        released = self.db.release_execution_leases_of(sorted(orphaned))
+        if released:
+            logger.warning(f"Released {released} execution leases left by a previous start")
+        self._ensure_heartbeat()
+
+    def stop(self):
+        self._stop.set()
+
+    def _ensure_heartbeat(self):
+        with self.lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._heartbeat_loop, name="lease-heartbeat", daemon=True)
+                self._thread.start()
+
+    def acquire(self, script_id: str, run_id: Optional[int] = None) -> Optional[Dict]:
+        """Take the script's lease. Returns None on success, or the live lease of its other holder."""
+        stale_before = datetime.now() - timedelta(seconds=self.stale_seconds)
+        holder = self.db.acquire_execution_lease(script_id, self.owner, run_id, stale_before)
+        if holder is None:
+            with self.lock:
+                self._held[script_id] = {'run_id': run_id, 'pid': None, 'execution_id': None, 'cancelled': False}
+            self._ensure_heartbeat()
+        return holder
+
+    def attach(self, script_id: str, pid: Optional[int] = None, execution_id: Optional[int] = None):
+        """Record the process and execution of a run holding a lease (no-op without one)."""
+        with self.lock:
+            lease = self._held.get(script_id)
+            if lease is None:
+                return
+            if pid is not None:
+                lease['pid'] = pid
+            if execution_id is not None:
+                lease['execution_id'] = execution_id
+            # Cancelled before its process existed: stop it now
+            cancelled = lease['cancelled']
+        self.db.update_execution_lease(script_id, self.owner, pid, execution_id)
+        if cancelled and pid:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def release(self, script_id: str):
+        with self.lock:
+            self._held.pop(script_id, None)
+        self.db.release_execution_lease(script_id, self.owner)
+
+    def held(self, script_id: str) -> Optional[Dict[str, Any]]:
+        """This process's lease on the script, if it holds one."""
+        with self.lock:
+            lease = self._held.get(script_id)
+            return dict(lease) if lease else None
+
+    def holder(self, script_id: str) -> Optional[Dict]:
+        """The live lease another process holds on the script, if any."""
+        stale_before = datetime.now() - timedelta(seconds=self.stale_seconds)
+        for lease in self.db.get_execution_leases():
+            if (lease['script_id'] == script_id and lease['owner'] != self.owner
+                    and lease['heartbeat_at'] >= stale_before):
+                return lease
+        return None
+
+    def cancel(self, script_id: str, reason: str) -> bool:
+        """Stop the script's current run, here or in the process holding its lease."""
+        with self.lock:
+            local = script_id in self._held
+        if local:
+            return self._stop_run(script_id, reason)
+        if self.db.request_lease_cancel(script_id):
+            logger.info(f"Asked the holder of {script_id}'s lease to stop its run: {reason}")
+            return True
+        return False
+
+    def _stop_run(self, script_id: str, reason: str) -> bool:
+        """Stop a run holding one of this process's leases."""
+        with self.lock:
+            lease = self._held.get(script_id)
+            if lease is None or lease['cancelled']:
+                return False
+            lease['cancelled'] = True
+            pid, execution_id = lease['pid'], lease['execution_id']
+        if execution_id:
+            # Recorded first, so the run's own finish keeps the reason
+            self.db.stop_execution(execution_id, reason)
+        if pid:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        with self.lock:
+            self.cancelled_runs += 1
+        logger.info(f"Stopped the running {script_id} (pid {pid}): {reason}")
+        return bool(pid or execution_id)
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                with self.lock:
+                    if not self._held:
+                        continue
+                self.db.heartbeat_execution_leases(self.owner)
+                # Other processes flag our leases when a newer run should replace ours
+                for lease in self.db.get_execution_leases(self.owner):
+                    if lease['cancel_requested']:
+                        self._stop_run(lease['script_id'], "Superseded by a newer run")
+            except Exception as e:
+                logger.error(f"Error refreshing execution leases: {e}")
+
+    def get_status(self) -> Dict[str, Any]:
+        stale_before = datetime.now() - timedelta(seconds=self.stale_seconds)
+        leases: List[Dict] = []
+        for lease in self.db.get_execution_leases():
+            leases.append({
+                'script_id': lease['script_id'],
+                'owner': lease['owner'],
+                'ours': lease['owner'] == self.owner,
+                'run_id': lease['run_id'],
+                'execution_id': lease['execution_id'],
+                'pid': lease['pid'],
+                'acquired_at': lease['acquired_at'].isoformat() if lease['acquired_at'] else None,
+                'heartbeat_at': lease['heartbeat_at'].isoformat() if lease['heartbeat_at'] else None,
+                'stale': lease['heartbeat_at'] is None or lease['heartbeat_at'] < stale_before,
+                'cancel_requested': lease['cancel_requested']
+            })
+        return {
+            'owner': self.owner,
+            'heartbeat_seconds': self.heartbeat_seconds,
+            'stale_seconds': self.stale_seconds,
+            'cancelled_runs': self.cancelled_runs,
+            'leases': leases
+        }
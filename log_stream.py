@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Log stream module for SoulSeekarr
+Live execution logs over Server-Sent Events.
+
+Each running execution has a channel. The script runner publishes every batch
+of log lines once the database writer has committed it (so line numbers are
+final and the lines can be re-read), and each viewer of the execution gets the
+batch in its own small buffer. A viewer's stream only ever sends lines past
+the last line number it has seen:
+
+- On connect or resume (``after_line`` / Last-Event-ID) it catches up from the
+  database a page at a time, then switches to the live batches.
+- A viewer that falls LOG_STREAM_MAX_BUFFERED batches behind has its buffer
+  dropped and catches up from the database again, at the pace its connection
+  drains. The runner never waits for viewers.
+- When the execution finishes the stream sends the remaining lines and an
+  ``end`` event, then closes.
+
+Executions run by another process have no live publisher; their viewers re-read
+the database whenever the stream has been idle for LOG_STREAM_IDLE_SECONDS.
+"""
+
+import json
+import threading
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+LOG_STREAM_PAGE_LINES = 500        # Lines per event when catching up from the database
+LOG_STREAM_MAX_BUFFERED = 32       # Live batches buffered per viewer before it falls back to the database
+LOG_STREAM_IDLE_SECONDS = 15       # Idle time before the database is re-checked and a keep-alive sent
+LOG_STREAM_RETRY_MS = 3000         # Reconnect delay suggested to EventSource
+
+
+def encode_lines_event(first_line: int, lines: List[str]) -> bytes:
+    """A ``lines`` event; its id is the last line number so EventSource can resume from it."""
+    last_line = first_line + len(lines) - 1
+    data = json.dumps({'first_line': first_line, 'last_line': last_line, 'lines': lines},
+                      separators=(',', ':'))
+    return f"id: {last_line}\nevent: lines\ndata: {data}\n\n".encode('utf-8')
+
+
+def encode_end_event(execution) -> bytes:
+    data = json.dumps({
+        'status': execution.status if execution else None,
+        'return_code': execution.return_code if execution else None,
+        'end_time': execution.end_time.isoformat() if execution and execution.end_time else None
+    })
+    return f"event: end\ndata: {data}\n\n".encode('utf-8')
+
+
+class LogViewer:
+    """One viewer's buffer of committed (first_line, lines) batches."""
+
+    def __init__(self, max_batches: int = LOG_STREAM_MAX_BUFFERED):
+        self.max_batches = max_batches
+        self.batches = deque()
+        self.condition = threading.Condition()
+        self.overflowed = False
+        self.finished = False
+
+    def offer(self, first_line: int, lines: List[str]):
+        with self.condition:
+            if len(self.batches) >= self.max_batches:
+                # Fell behind: drop the backlog, the stream re-reads it from the database
+                self.batches.clear()
+                self.overflowed = True
+            else:
+                self.batches.append((first_line, lines))
+            self.condition.notify()
+
+    def finish(self):
+        with self.condition:
+            self.finished = True
+            self.condition.notify()
+
+    def take(self, timeout: float):
+        """Wait for batches; returns (batches, overflowed, finished)."""
+        with self.condition:
+            if not self.batches and not self.overflowed and not self.finished:
+                self.condition.wait(timeout)
+            batches = list(self.batches)
+            self.batches.clear()
+            overflowed = self.overflowed
+            self.overflowed = False
+            return batches, overflowed, self.finished
+
+
+class LogStreamHub:
+    """Per-execution live log channels."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._channels: Dict[int, List[LogViewer]] = {}
+        self.overflows = 0
+
+    def subscribe(self, execution_id: int) -> LogViewer:
+        viewer = LogViewer()
+        with self.lock:
+            self._channels.setdefault(execution_id, []).append(viewer)
+        return viewer
+
+    def unsubscribe(self, execution_id: int, viewer: LogViewer):
+        with self.lock:
+            viewers = self._channels.get(execution_id)
+            if viewers and viewer in viewers:
+                viewers.remove(viewer)
+                if not viewers:
+                    del self._channels[execution_id]
+
+    def publish(self, execution_id: int, first_line: int, lines: List[str]):
+        """Hand committed lines to the execution's viewers (never blocks on them)."""
+        if not lines:
+            return
+        with self.lock:
+            viewers = list(self._channels.get(execution_id, ()))
+        for viewer in viewers:
+            if viewer.overflowed:
+                continue
+            viewer.offer(first_line, lines)
+            if viewer.overflowed:
+                self.overflows += 1
+
+    def publish_on_commit(self, execution_id: int, future, lines: List[str]):
+        """Publish lines once the queued write that numbers them has committed.
+
+        ``future`` is what ``add_log_lines_batch``/``add_log_line`` return with
+        ``wait=False``; its result is the first line number.
+        """
+        def on_commit(done):
+            if done.exception() is None and done.result() is not None:
+                self.publish(execution_id, done.result(), lines)
+        future.add_done_callback(on_commit)
+
+    def finish(self, execution_id: int):
+        """Tell the execution's viewers that no more lines are coming."""
+        with self.lock:
+            viewers = self._channels.pop(execution_id, [])
+        for viewer in viewers:
+            viewer.finish()
+
+    def _catch_up(self, db, execution_id: int, after_line: int):
+        """Yield (event, last_line) for every committed line past ``after_line``."""
+        while True:
+            page = db.get_execution_log_page(execution_id, after_line=after_line, limit=LOG_STREAM_PAGE_LINES)
+            if not page['lines']:
+                return
+            lines = [db._format_log_line(line['timestamp'], line['content']) for line in page['lines']]
+            after_line = page['last_line']
+            yield encode_lines_event(page['first_line'], lines), after_line
+            if not page['has_more']:
+                return
+
+    def stream(self, db, execution_id: int, after_line: Optional[int] = None):
+        """Generator of encoded events for one viewer of an execution's log."""
+        viewer = self.subscribe(execution_id)
+        cursor = after_line if after_line is not None and after_line >= 0 else 0
+        try:
+            yield f"retry: {LOG_STREAM_RETRY_MS}\n\n".encode('utf-8')
+            catch_up = True
+            finished = False
+            while True:
+                if catch_up:
+                    # Status first: once it is no longer running, every line is already
+                    # committed and this catch-up is the last one
+                    execution = db.get_execution(execution_id)
+                    for event, cursor in self._catch_up(db, execution_id, cursor):
+                        yield event
+                    catch_up = False
+                    if finished or execution is None or execution.status != 'running':
+                        yield encode_end_event(execution)
+                        return
+
+                batches, overflowed, finished = viewer.take(LOG_STREAM_IDLE_SECONDS)
+                if overflowed or finished:
+                    catch_up = True
+                    continue
+                if not batches:
+                    # Idle: pick up lines written by other processes and re-check the status
+                    yield b": keep-alive\n\n"
+                    catch_up = True
+                    continue
+
+                for first_line, lines in batches:
+                    if first_line > cursor + 1:
+                        # A gap (lines committed before this viewer subscribed); fill it from the database
+                        catch_up = True
+                        break
+                    new_lines = lines[cursor + 1 - first_line:]
+                    if new_lines:
+                        yield encode_lines_event(cursor + 1, new_lines)
+                        cursor += len(new_lines)
+        finally:
+            self.unsubscribe(execution_id, viewer)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'channels': len(self._channels),
+                'viewers': sum(len(viewers) for viewers in self._channels.values()),
+                'buffered_batches': sum(len(viewer.batches) for viewers in self._channels.values()
+                                        for viewer in viewers),
+                'overflows': self.overflows
+            }
+
+# Global hub instance
+log_streams = None
+
+def get_log_streams() -> LogStreamHub:
+    """Get the global log stream hub."""
+    global log_streams
+    if log_streams is None:
+        log_streams = LogStreamHub()
+    return log_streams
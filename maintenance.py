@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Maintenance module for SoulSeekarr
+Background database upkeep: log retention, space reclamation and WAL checkpoints.
+
+A maintenance pass deletes executions (with their logs) that are past their
+script's retention period in small batches, pausing between batches so the
+writer thread and the UI are never held up for long. It then purges albums
+deleted long ago (only when ALBUM_RETENTION_DAYS is set), returns freed pages to the filesystem with incremental
+vacuum, truncates the WAL and reports how much space was reclaimed.
+
+Between passes the WAL is checkpointed on its own, shorter interval so it
+doesn't grow without bound while scripts are logging.
+"""
+
+import os
+import time
+import threading
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from database import get_db
+
+logger = logging.getLogger(__name__)
+
+# Defaults for scripts without a row in retention_policies
+RETENTION_DAYS = int(os.environ.get('RETENTION_DAYS', '30'))          # 0 keeps executions forever
+RETENTION_KEEP_LAST = int(os.environ.get('RETENTION_KEEP_LAST', '0'))  # Newest executions always kept
+ALBUM_RETENTION_DAYS = int(os.environ.get('ALBUM_RETENTION_DAYS', '0'))  # 0 never purges deleted albums
+
+# Scheduling
+MAINTENANCE_INTERVAL_HOURS = float(os.environ.get('MAINTENANCE_INTERVAL_HOURS', '6'))
+WAL_CHECKPOINT_INTERVAL_MINUTES = float(os.environ.get('WAL_CHECKPOINT_INTERVAL_MINUTES', '15'))
+MAINTENANCE_STARTUP_DELAY = 60.0   # Seconds after start before the first pass
+
+# Batching
+RETENTION_BATCH_SIZE = 25          # Executions deleted per write operation
+RETENTION_BATCH_PAUSE = 0.5        # Seconds between batches
+VACUUM_STEP_PAGES = 2048           # Pages freed per incremental vacuum step
+VACUUM_STEP_PAUSE = 0.2            # Seconds between vacuum steps
+
+MAINTENANCE_HISTORY = 20           # Pass reports kept for the status endpoint
+
+
+class MaintenanceManager:
+    """Runs database maintenance passes and WAL checkpoints in a background thread."""
+
+    def __init__(self, db=None):
+        self.db = db or get_db()
+        self.running = False
+        self.maintenance_thread = None
+        self.lock = threading.Lock()
+        self.pass_lock = threading.Lock()  # One pass at a time (scheduled or on demand)
+        self._wake = threading.Event()       # Interrupts the wait between scheduled runs
+        self._stopping = threading.Event()   # Interrupts pauses between batches
+        self._pass_requested = False
+        self.history = deque(maxlen=MAINTENANCE_HISTORY)
+        self.current_pass: Optional[Dict] = None
+        self.next_pass: Optional[datetime] = None
+        self.last_checkpoint: Optional[Dict] = None
+
+    def start(self):
+        """Start the maintenance loop in a background thread."""
+        with self.lock:
+            if self.running:
+                logger.warning("Maintenance is already running")
+                return
+
+            self.running = True
+            self._wake.clear()
+            self._stopping.clear()
+            self.maintenance_thread = threading.Thread(target=self._run_loop, name='db-maintenance', daemon=True)
+            self.maintenance_thread.start()
+            logger.info("Database maintenance started")
+
+    def stop(self):
+        """Stop the maintenance loop, interrupting a pass between batches."""
+        with self.lock:
+            if not self.running:
+                return
+
+            self.running = False
+            self._stopping.set()
+            self._wake.set()
+            if self.maintenance_thread:
+                self.maintenance_thread.join(timeout=30)
+            logger.info("Database maintenance stopped")
+
+    def request_pass(self):
+        """Ask the background loop to run a pass now."""
+        self._pass_requested = True
+        self._wake.set()
+
+    def _run_loop(self):
+        """Alternate WAL checkpoints and full passes until stopped."""
+        next_pass = time.time() + MAINTENANCE_STARTUP_DELAY
+        next_checkpoint = time.time() + WAL_CHECKPOINT_INTERVAL_MINUTES * 60
+
+        while self.running:
+            self.next_pass = datetime.fromtimestamp(next_pass)
+            timeout = max(0.0, min(next_pass, next_checkpoint) - time.time())
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if not self.running:
+                break
+
+            try:
+                now = time.time()
+                if self._pass_requested or now >= next_pass:
+                    self._pass_requested = False
+                    self.run_pass()
+                    next_pass = time.time() + MAINTENANCE_INTERVAL_HOURS * 3600
+                    next_checkpoint = time.time() + WAL_CHECKPOINT_INTERVAL_MINUTES * 60
+                elif now >= next_checkpoint:
+                    self.checkpoint()
+                    next_checkpoint = time.time() + WAL_CHECKPOINT_INTERVAL_MINUTES * 60
+            except Exception as e:
+                logger.error(f"Error in database maintenance: {e}")
+                # Don't spin on a persistent error
+                next_pass = max(next_pass, time.time() + 300)
+                next_checkpoint = max(next_checkpoint, time.time() + 300)
+
+        self.next_pass = None
+
+    def _pause(self, seconds: float) -> bool:
+        """Sleep between batches; returns False when maintenance is stopping."""
+        return not self._stopping.wait(seconds)
+
+    def checkpoint(self) -> Dict:
+        """Checkpoint and truncate the WAL."""
+        result = self.db.checkpoint_wal('TRUNCATE')
+        result['at'] = datetime.now().isoformat()
+        self.last_checkpoint = result
+        if result['busy']:
+            logger.debug("WAL checkpoint could not complete while the database was busy")
+        return result
+
+    def get_retention_policy(self, script_id: str, policies: Dict[str, Dict] = None) -> Dict:
+        """The retention policy that applies to a script."""
+        if policies is None:
+            policies = self.db.get_retention_policies()
+        return policies.get(script_id, {'retention_days': RETENTION_DAYS, 'keep_last': RETENTION_KEEP_LAST})
+
+    def apply_retention(self, report: Dict) -> bool:
+        """Delete expired executions script by script, in batches. Returns False if interrupted."""
+        policies = self.db.get_retention_policies()
+        for script_id in self.db.get_execution_script_ids():
+            policy = self.get_retention_policy(script_id, policies)
+            if policy['retention_days'] <= 0:
+                continue
+
+            cutoff_date = datetime.now() - timedelta(days=policy['retention_days'])
+            while True:
+                execution_ids = self.db.get_expired_execution_ids(
+                    script_id, cutoff_date, policy['keep_last'], RETENTION_BATCH_SIZE
+                )
+                if not execution_ids:
+                    break
+
+                deleted = self.db.delete_executions(execution_ids)
+                for key in ('executions', 'log_lines', 'archive_chunks'):
+                    report['deleted'][key] += deleted[key]
+                report['batches'] += 1
+
+                if not self._pause(RETENTION_BATCH_PAUSE):
+                    return False
+        return True
+
+    def reclaim_space(self, report: Dict) -> bool:
+        """Hand free pages back to the filesystem in steps. Returns False if interrupted."""
+        if self.db.get_storage_stats()['auto_vacuum'] != 'incremental':
+            # Databases created before auto-vacuum was enabled are converted once, here
+            # rather than at startup because the VACUUM rewrites the whole file
+            report['converted_auto_vacuum'] = self.db.enable_incremental_vacuum()
+
+        while True:
+            freed = self.db.incremental_vacuum(VACUUM_STEP_PAGES)
+            report['freed_pages'] += freed
+            if freed < VACUUM_STEP_PAGES:
+                return True
+            if not self._pause(VACUUM_STEP_PAUSE):
+                return False
+
+    def run_pass(self) -> Dict:
+        """Run retention, album purge, incremental vacuum and a WAL checkpoint; returns the pass report."""
+        with self.pass_lock:
+            started = time.time()
+            before = self.db.get_storage_stats()
+            report = {
+                'started_at': datetime.fromtimestamp(started).isoformat(),
+                'finished_at': None,
+                'completed': False,
+                'deleted': {'executions': 0, 'log_lines': 0, 'archive_chunks': 0, 'albums': 0},
+                'batches': 0,
+                'freed_pages': 0,
+                'before': before,
+            }
+            self.current_pass = report
+
+            try:
+                completed = self.apply_retention(report)
+                if completed and ALBUM_RETENTION_DAYS > 0:
+                    report['deleted']['albums'] = self.db.cleanup_old_album_data(days=ALBUM_RETENTION_DAYS)
+                if completed:
+                    completed = self.reclaim_space(report)
+                report['checkpoint'] = self.checkpoint()
+                report['completed'] = completed
+            finally:
+                after = self.db.get_storage_stats()
+                report['after'] = after
+                report['reclaimed_bytes'] = (
+                    before['database_bytes'] + before['wal_bytes'] - after['database_bytes'] - after['wal_bytes']
+                )
+                report['duration_seconds'] = round(time.time() - started, 2)
+                report['finished_at'] = datetime.now().isoformat()
+                self.current_pass = None
+                self.history.append(report)
+
+            deleted = report['deleted']
+            logger.info(
+                f"Maintenance pass {'finished' if report['completed'] else 'interrupted'} in "
+                f"{report['duration_seconds']:.1f}s: deleted {deleted['executions']} executions "
+                f"({deleted['log_lines']} log lines) and {deleted['albums']} albums, "
+                f"reclaimed {report['reclaimed_bytes'] / 1024 / 1024:.1f} MB "
+                f"(database {before['database_bytes'] / 1024 / 1024:.1f} -> "
+                f"{after['database_bytes'] / 1024 / 1024:.1f} MB, "
+                f"WAL {before['wal_bytes'] / 1024 / 1024:.1f} -> {after['wal_bytes'] / 1024 / 1024:.1f} MB)"
+            )
+            return report
+
+    def get_status(self) -> Dict:
+        """Current storage, schedule and the most recent pass reports."""
+        return {
+            'running': self.running,
+            'pass_in_progress': self.current_pass is not None,
+            'next_pass': self.next_pass.isoformat() if self.next_pass else None,
+            'last_checkpoint': self.last_checkpoint,
+            'storage': self.db.get_storage_stats(),
+            'defaults': {
+                'retention_days': RETENTION_DAYS,
+                'keep_last': RETENTION_KEEP_LAST,
+                'album_retention_days': ALBUM_RETENTION_DAYS,
+                'interval_hours': MAINTENANCE_INTERVAL_HOURS,
+                'checkpoint_interval_minutes': WAL_CHECKPOINT_INTERVAL_MINUTES
+            },
+            'history': list(reversed(self.history))
+        }
+
+# Global maintenance instance
+maintenance = None
+
+def get_maintenance() -> MaintenanceManager:
+    """Get the global maintenance instance."""
+    global maintenance
+    if maintenance is None:
+        maintenance = MaintenanceManager()
+    return maintenance
+
+def start_maintenance():
+    """Start the global maintenance loop."""
+    get_maintenance().start()
+
+def stop_maintenance():
+    """Stop the global maintenance loop."""
+    if maintenance:
+        maintenance.stop()
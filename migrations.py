@@ -0,0 +1,1059 @@
+#!/usr/bin/env python3
+"""
+Database migrations for SoulSeekarr
+Ordered, versioned schema steps tracked with PRAGMA user_version.
+
+A brand new database is created directly at the current schema. An existing
+database runs only the steps above its stored version, each in its own
+transaction. When the schema is already current, migrate() costs a single
+PRAGMA read.
+
+Run ``python migrations.py --check`` to upgrade fixture databases from every
+historical version and compare the result with a freshly created schema.
+"""
+
+import sys
+import json
+import zlib
+import logging
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# FTS rowids pack (execution_id, line_number) so a hit maps straight back to a log line
+LOG_SEARCH_ROWID_SHIFT = 32
+
+# Columns stored as integer epoch milliseconds (see records.to_epoch_ms). Scripts that
+# still write datetimes or ISO text are normalised by triggers, and each table has an
+# <table>_iso view presenting these columns as local-time text for ad-hoc queries.
+EPOCH_MS_COLUMNS = {
+    'script_executions': ('start_time', 'end_time'),
+    'script_logs': ('timestamp',),
+    'expiring_albums': ('first_detected', 'last_seen', 'deleted_at'),
+    'album_tracks': ('last_modified',),
+}
+
+# Tables written from outside DatabaseManager, which get normalising triggers
+EPOCH_MS_NORMALISED_TABLES = ('expiring_albums', 'album_tracks')
+
+# Registered migration steps: (version, description, function)
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Connection], None]]] = []
+
+
+def migration(version: int, description: str):
+    """Register a function as the step that brings the schema to ``version``."""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda step: step[0])
+        return func
+    return decorator
+
+
+def _add_column(conn: sqlite3.Connection, table: str, column_sql: str):
+    """ALTER TABLE ADD COLUMN, tolerating a column that already exists."""
+    try:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_sql}")
+    except sqlite3.OperationalError as e:
+        if "duplicate column" not in str(e).lower():
+            raise
+
+
+# ---------------------------------------------------------------------------
+# Current schema
+# ---------------------------------------------------------------------------
+
+def create_schema(conn: sqlite3.Connection):
+    """Create every table, index and trigger at the current schema version."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS script_executions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            script_id TEXT NOT NULL,
+            script_name TEXT NOT NULL,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP,
+            duration_seconds REAL,
+            status TEXT NOT NULL DEFAULT 'running',
+            return_code INTEGER,
+            dry_run BOOLEAN DEFAULT FALSE,
+            pid INTEGER,
+            error_message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS script_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            execution_id INTEGER NOT NULL,
+            line_number INTEGER NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            content TEXT NOT NULL,
+            log_level TEXT DEFAULT 'info',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (execution_id) REFERENCES script_executions (id) ON DELETE CASCADE
+        )
+    """)
+
+    _create_script_log_archives(conn)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS script_configs (
+            script_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            script_path TEXT NOT NULL,
+            supports_dry_run BOOLEAN DEFAULT TRUE,
+            section TEXT DEFAULT 'commands',
+            status TEXT DEFAULT 'active',
+            status_message TEXT,
+            last_discovered TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            execution_count INTEGER DEFAULT 0,
+            last_execution_time TIMESTAMP,
+            avg_duration_seconds REAL
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS app_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            description TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            script_id TEXT NOT NULL UNIQUE,
+            script_name TEXT NOT NULL,
+            script_path TEXT NOT NULL,
+            enabled BOOLEAN DEFAULT FALSE,
+            interval_type TEXT NOT NULL DEFAULT 'minutes',
+            interval_value INTEGER NOT NULL DEFAULT 60,
+            next_run TIMESTAMP,
+            last_run TIMESTAMP,
+            last_run_status TEXT,
+            last_run_duration REAL,
+            run_count INTEGER DEFAULT 0,
+            error_count INTEGER DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS expiring_albums (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            album_key TEXT NOT NULL UNIQUE,
+            artist TEXT NOT NULL,
+            album TEXT NOT NULL,
+            directory TEXT NOT NULL,
+            file_count INTEGER NOT NULL,
+            total_size_mb REAL NOT NULL,
+            is_starred BOOLEAN DEFAULT FALSE,
+            first_detected TIMESTAMP NOT NULL,
+            last_seen TIMESTAMP NOT NULL,
+            status TEXT DEFAULT 'pending',
+            deleted_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            album_art_url TEXT,
+            track_count INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS album_tracks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            album_id INTEGER NOT NULL,
+            file_path TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            track_title TEXT,
+            file_size_mb REAL NOT NULL,
+            days_old INTEGER NOT NULL,
+            last_modified TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_starred BOOLEAN DEFAULT FALSE,
+            navidrome_id TEXT,
+            track_number INTEGER,
+            track_artist TEXT,
+            year INTEGER,
+            FOREIGN KEY (album_id) REFERENCES expiring_albums (id) ON DELETE CASCADE,
+            UNIQUE(album_id, file_path)
+        )
+    """)
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS playlist_tracks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            spotify_id TEXT NOT NULL UNIQUE,
+            artist TEXT NOT NULL,
+            title TEXT NOT NULL,
+            album TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            slskd_id TEXT,
+            navidrome_id TEXT,
+            last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            year INTEGER
+        )
+    """)
+
+    _create_retention_policies(conn)
+    _create_run_queue(conn)
+    _create_execution_leases(conn)
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_script_executions_script_start ON script_executions(script_id, start_time)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_executions_start_time ON script_executions(start_time)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_executions_status ON script_executions(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_logs_execution_line ON script_logs(execution_id, line_number)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_logs_timestamp ON script_logs(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_enabled ON scheduled_jobs(enabled)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_next_run ON scheduled_jobs(next_run)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_script_id ON scheduled_jobs(script_id)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_expiring_albums_expiry ON expiring_albums(status, is_starred, first_detected)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_album_id ON album_tracks(album_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_days_old ON album_tracks(days_old)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_is_starred ON album_tracks(is_starred)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_navidrome_id ON album_tracks(navidrome_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_file_path ON album_tracks(file_path)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_playlist_tracks_spotify_id ON playlist_tracks(spotify_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_playlist_tracks_status ON playlist_tracks(status)")
+
+    _create_album_track_count_triggers(conn)
+    _create_epoch_ms_triggers(conn)
+    _create_epoch_ms_views(conn)
+    _create_log_search_index(conn)
+
+
+def _create_script_log_archives(conn: sqlite3.Connection):
+    """Compressed log chunks for finished executions (live executions use script_logs)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS script_log_archives (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            execution_id INTEGER NOT NULL,
+            chunk_index INTEGER NOT NULL,
+            first_line INTEGER NOT NULL,
+            last_line INTEGER NOT NULL,
+            line_count INTEGER NOT NULL,
+            raw_size INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (execution_id, chunk_index),
+            FOREIGN KEY (execution_id) REFERENCES script_executions (id) ON DELETE CASCADE
+        )
+    """)
+
+
+def _create_retention_policies(conn: sqlite3.Connection):
+    """Per-script log retention overrides (scripts without a row use the defaults)."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS retention_policies (
+            script_id TEXT PRIMARY KEY,
+            retention_days INTEGER NOT NULL,
+            keep_last INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _create_run_queue(conn: sqlite3.Connection):
+    """Runs waiting for (or holding) an executor worker; rows are removed when a run ends."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            script_id TEXT NOT NULL,
+            source TEXT NOT NULL,
+            payload TEXT NOT NULL DEFAULT '{}',
+            resources TEXT NOT NULL DEFAULT '',
+            status TEXT NOT NULL DEFAULT 'queued',
+            not_before INTEGER,
+            queued_at INTEGER NOT NULL,
+            started_at INTEGER
+        )
+    """)
+
+
+def _create_execution_leases(conn: sqlite3.Connection):
+    """One row per script being run by some app process, kept alive by heartbeats."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS execution_leases (
+            script_id TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            run_id INTEGER,
+            execution_id INTEGER,
+            pid INTEGER,
+            acquired_at INTEGER NOT NULL,
+            heartbeat_at INTEGER NOT NULL,
+            cancel_requested INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+
+
+def _epoch_ms_sql(column: str) -> str:
+    """SQL converting a local-time ISO text column to epoch ms, leaving other values alone."""
+    return (f"CASE typeof({column}) WHEN 'text' "
+            f"THEN CAST(round((julianday({column}, 'utc') - 2440587.5) * 86400000) AS INTEGER) "
+            f"ELSE {column} END")
+
+
+def _create_epoch_ms_triggers(conn: sqlite3.Connection):
+    """Convert text timestamps written by scripts' own connections to epoch ms."""
+    for table in EPOCH_MS_NORMALISED_TABLES:
+        columns = EPOCH_MS_COLUMNS[table]
+        needs_conversion = " OR ".join(f"typeof(NEW.{column}) = 'text'" for column in columns)
+        assignments = ", ".join(f"{column} = {_epoch_ms_sql(column)}" for column in columns)
+        for event, name in (("INSERT", "insert"), (f"UPDATE OF {', '.join(columns)}", "update")):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_epoch_ms_{name} AFTER {event} ON {table}
+                WHEN {needs_conversion}
+                BEGIN
+                    UPDATE {table} SET {assignments} WHERE rowid = NEW.rowid;
+                END
+            """)
+
+
+def _create_epoch_ms_views(conn: sqlite3.Connection):
+    """(Re)create the <table>_iso compatibility views over the epoch ms tables.
+
+    The column lists are read from the live table, so call this again from any
+    migration that adds columns to one of these tables.
+    """
+    for table, timestamp_columns in EPOCH_MS_COLUMNS.items():
+        select = []
+        for row in conn.execute(f"PRAGMA table_info({table})"):
+            column = row[1]
+            if column in timestamp_columns:
+                select.append(
+                    f"strftime('%Y-%m-%d %H:%M:%f', {column} / 1000.0, 'unixepoch', 'localtime') AS {column}"
+                )
+            else:
+                select.append(column)
+        conn.execute(f"DROP VIEW IF EXISTS {table}_iso")
+        conn.execute(f"CREATE VIEW {table}_iso AS SELECT {', '.join(select)} FROM {table}")
+
+
+def _create_album_track_count_triggers(conn: sqlite3.Connection):
+    """Keep expiring_albums.track_count in step with album_tracks."""
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS album_tracks_count_insert AFTER INSERT ON album_tracks
+        BEGIN
+            UPDATE expiring_albums SET track_count = track_count + 1 WHERE id = NEW.album_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS album_tracks_count_delete AFTER DELETE ON album_tracks
+        BEGIN
+            UPDATE expiring_albums SET track_count = track_count - 1 WHERE id = OLD.album_id;
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS album_tracks_count_move AFTER UPDATE OF album_id ON album_tracks
+        WHEN OLD.album_id IS NOT NEW.album_id
+        BEGIN
+            UPDATE expiring_albums SET track_count = track_count - 1 WHERE id = OLD.album_id;
+            UPDATE expiring_albums SET track_count = track_count + 1 WHERE id = NEW.album_id;
+        END
+    """)
+
+
+def _create_log_search_index(conn: sqlite3.Connection) -> bool:
+    """Create the contentless FTS5 log index and its insert trigger.
+
+    Returns False (and logs a warning) when this SQLite build has no FTS5.
+    """
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS script_logs_fts USING fts5(
+                content, log_level, content='', tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"Log search disabled, SQLite FTS5 is not available: {e}")
+        return False
+
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS script_logs_fts_insert AFTER INSERT ON script_logs
+        BEGIN
+            INSERT INTO script_logs_fts (rowid, content, log_level)
+            VALUES ((new.execution_id << {LOG_SEARCH_ROWID_SHIFT}) | new.line_number,
+                    new.content, new.log_level);
+        END
+    """)
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Migration steps
+# ---------------------------------------------------------------------------
+
+@migration(1, "baseline tables")
+def _migrate_v1(conn: sqlite3.Connection):
+    # Databases from before schema versioning: make sure the original tables exist.
+    # expiring_albums is the layout the v4 rebuild copies from (with cleanup_days).
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS script_executions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            script_id TEXT NOT NULL,
+            script_name TEXT NOT NULL,
+            start_time TIMESTAMP NOT NULL,
+            end_time TIMESTAMP,
+            duration_seconds REAL,
+            status TEXT NOT NULL DEFAULT 'running',
+            return_code INTEGER,
+            dry_run BOOLEAN DEFAULT FALSE,
+            pid INTEGER,
+            error_message TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS script_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            execution_id INTEGER NOT NULL,
+            line_number INTEGER NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            content TEXT NOT NULL,
+            log_level TEXT DEFAULT 'info',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (execution_id) REFERENCES script_executions (id) ON DELETE CASCADE
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS script_configs (
+            script_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            script_path TEXT NOT NULL,
+            supports_dry_run BOOLEAN DEFAULT TRUE,
+            section TEXT DEFAULT 'commands',
+            status TEXT DEFAULT 'active',
+            status_message TEXT,
+            last_discovered TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            execution_count INTEGER DEFAULT 0,
+            last_execution_time TIMESTAMP,
+            avg_duration_seconds REAL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS app_settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            description TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            script_id TEXT NOT NULL UNIQUE,
+            script_name TEXT NOT NULL,
+            script_path TEXT NOT NULL,
+            enabled BOOLEAN DEFAULT FALSE,
+            interval_type TEXT NOT NULL DEFAULT 'minutes',
+            interval_value INTEGER NOT NULL DEFAULT 60,
+            next_run TIMESTAMP,
+            last_run TIMESTAMP,
+            last_run_status TEXT,
+            last_run_duration REAL,
+            run_count INTEGER DEFAULT 0,
+            error_count INTEGER DEFAULT 0,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS expiring_albums (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            album_key TEXT NOT NULL UNIQUE,
+            artist TEXT NOT NULL,
+            album TEXT NOT NULL,
+            directory TEXT NOT NULL,
+            oldest_file_days INTEGER NOT NULL,
+            days_until_expiry INTEGER NOT NULL,
+            cleanup_days INTEGER NOT NULL,
+            file_count INTEGER NOT NULL,
+            total_size_mb REAL NOT NULL,
+            is_starred BOOLEAN DEFAULT FALSE,
+            first_detected TIMESTAMP NOT NULL,
+            last_seen TIMESTAMP NOT NULL,
+            status TEXT DEFAULT 'pending',
+            deleted_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS album_tracks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            album_id INTEGER NOT NULL,
+            file_path TEXT NOT NULL,
+            file_name TEXT NOT NULL,
+            track_title TEXT,
+            file_size_mb REAL NOT NULL,
+            days_old INTEGER NOT NULL,
+            last_modified TIMESTAMP NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (album_id) REFERENCES expiring_albums (id) ON DELETE CASCADE,
+            UNIQUE(album_id, file_path)
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_executions_script_id ON script_executions(script_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_executions_start_time ON script_executions(start_time)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_executions_status ON script_executions(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_logs_execution_id ON script_logs(execution_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_logs_timestamp ON script_logs(timestamp)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_enabled ON scheduled_jobs(enabled)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_next_run ON scheduled_jobs(next_run)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_script_id ON scheduled_jobs(script_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_status ON expiring_albums(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_album_id ON album_tracks(album_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_days_old ON album_tracks(days_old)")
+
+
+@migration(2, "add album_art_url to expiring_albums")
+def _migrate_v2(conn: sqlite3.Connection):
+    _add_column(conn, "expiring_albums", "album_art_url TEXT")
+
+
+@migration(3, "add track starred tracking and metadata")
+def _migrate_v3(conn: sqlite3.Connection):
+    _add_column(conn, "album_tracks", "is_starred BOOLEAN DEFAULT FALSE")
+    _add_column(conn, "album_tracks", "navidrome_id TEXT")
+    _add_column(conn, "album_tracks", "track_number INTEGER")
+    _add_column(conn, "album_tracks", "track_artist TEXT")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_is_starred ON album_tracks(is_starred)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_navidrome_id ON album_tracks(navidrome_id)")
+
+
+@migration(4, "remove cleanup_days from expiring_albums")
+def _migrate_v4(conn: sqlite3.Connection):
+    # SQLite can't DROP COLUMN here, so the table is rebuilt without cleanup_days
+    conn.execute("""
+        CREATE TABLE expiring_albums_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            album_key TEXT NOT NULL UNIQUE,
+            artist TEXT NOT NULL,
+            album TEXT NOT NULL,
+            directory TEXT NOT NULL,
+            oldest_file_days INTEGER NOT NULL,
+            days_until_expiry INTEGER NOT NULL,
+            file_count INTEGER NOT NULL,
+            total_size_mb REAL NOT NULL,
+            is_starred BOOLEAN DEFAULT FALSE,
+            album_art_url TEXT,
+            first_detected TIMESTAMP NOT NULL,
+            last_seen TIMESTAMP NOT NULL,
+            status TEXT DEFAULT 'pending',
+            deleted_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        INSERT INTO expiring_albums_new
+        (id, album_key, artist, album, directory, oldest_file_days, days_until_expiry,
+         file_count, total_size_mb, is_starred, album_art_url, first_detected, last_seen,
+         status, deleted_at, created_at, updated_at)
+        SELECT id, album_key, artist, album, directory, oldest_file_days, days_until_expiry,
+               file_count, total_size_mb, is_starred, album_art_url, first_detected, last_seen,
+               status, deleted_at, created_at, updated_at
+        FROM expiring_albums
+    """)
+    conn.execute("DROP TABLE expiring_albums")
+    conn.execute("ALTER TABLE expiring_albums_new RENAME TO expiring_albums")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_status ON expiring_albums(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_days_until_expiry ON expiring_albums(days_until_expiry)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
+
+
+@migration(5, "add playlist_tracks table for Spotify sync")
+def _migrate_v5(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS playlist_tracks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            spotify_id TEXT NOT NULL UNIQUE,
+            artist TEXT NOT NULL,
+            title TEXT NOT NULL,
+            album TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            slskd_id TEXT,
+            navidrome_id TEXT,
+            last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_playlist_tracks_spotify_id ON playlist_tracks(spotify_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_playlist_tracks_status ON playlist_tracks(status)")
+
+
+@migration(6, "add year to playlist_tracks")
+def _migrate_v6(conn: sqlite3.Connection):
+    _add_column(conn, "playlist_tracks", "year INTEGER")
+
+
+@migration(7, "remove album_expiry_history and oldest_file_days")
+def _migrate_v7(conn: sqlite3.Connection):
+    conn.execute("DROP TABLE IF EXISTS album_expiry_history")
+    conn.execute("ALTER TABLE expiring_albums RENAME TO expiring_albums_old")
+    conn.execute("""
+        CREATE TABLE expiring_albums (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            album_key TEXT NOT NULL UNIQUE,
+            artist TEXT NOT NULL,
+            album TEXT NOT NULL,
+            directory TEXT NOT NULL,
+            days_until_expiry INTEGER NOT NULL,
+            file_count INTEGER NOT NULL,
+            total_size_mb REAL NOT NULL,
+            is_starred BOOLEAN DEFAULT FALSE,
+            album_art_url TEXT,
+            first_detected TIMESTAMP NOT NULL,
+            last_seen TIMESTAMP NOT NULL,
+            status TEXT DEFAULT 'pending',
+            deleted_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        INSERT INTO expiring_albums
+        (id, album_key, artist, album, directory, days_until_expiry,
+         file_count, total_size_mb, is_starred, album_art_url,
+         first_detected, last_seen, status, deleted_at, created_at, updated_at)
+        SELECT id, album_key, artist, album, directory, days_until_expiry,
+               file_count, total_size_mb, is_starred, album_art_url,
+               first_detected, last_seen, status, deleted_at, created_at, updated_at
+        FROM expiring_albums_old
+    """)
+    conn.execute("DROP TABLE expiring_albums_old")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_status ON expiring_albums(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_days_until_expiry ON expiring_albums(days_until_expiry)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
+
+
+@migration(8, "remove days_until_expiry and album_art_url")
+def _migrate_v8(conn: sqlite3.Connection):
+    conn.execute("ALTER TABLE expiring_albums RENAME TO expiring_albums_v7")
+    conn.execute("""
+        CREATE TABLE expiring_albums (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            album_key TEXT NOT NULL UNIQUE,
+            artist TEXT NOT NULL,
+            album TEXT NOT NULL,
+            directory TEXT NOT NULL,
+            file_count INTEGER NOT NULL,
+            total_size_mb REAL NOT NULL,
+            is_starred BOOLEAN DEFAULT FALSE,
+            first_detected TIMESTAMP NOT NULL,
+            last_seen TIMESTAMP NOT NULL,
+            status TEXT DEFAULT 'pending',
+            deleted_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        INSERT INTO expiring_albums
+        (id, album_key, artist, album, directory, file_count, total_size_mb,
+         is_starred, first_detected, last_seen, status, deleted_at, created_at, updated_at)
+        SELECT id, album_key, artist, album, directory, file_count, total_size_mb,
+               is_starred, first_detected, last_seen, status, deleted_at, created_at, updated_at
+        FROM expiring_albums_v7
+    """)
+    conn.execute("DROP TABLE expiring_albums_v7")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_status ON expiring_albums(status)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_expiring_albums_last_seen ON expiring_albums(last_seen)")
+
+
+@migration(9, "restore album_art_url and add year to album_tracks")
+def _migrate_v9(conn: sqlite3.Connection):
+    _add_column(conn, "expiring_albums", "album_art_url TEXT")
+    _add_column(conn, "album_tracks", "year INTEGER")
+
+
+@migration(10, "index script_logs by (execution_id, line_number)")
+def _migrate_v10(conn: sqlite3.Connection):
+    # The next line number becomes an index seek and ordered reads don't need a sort
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_script_logs_execution_line ON script_logs(execution_id, line_number)")
+    conn.execute("DROP INDEX IF EXISTS idx_script_logs_execution_id")
+
+
+@migration(11, "add script_log_archives table")
+def _migrate_v11(conn: sqlite3.Connection):
+    _create_script_log_archives(conn)
+
+
+@migration(12, "add FTS5 log search index")
+def _migrate_v12(conn: sqlite3.Connection):
+    if not _create_log_search_index(conn):
+        return
+
+    # Backfill live rows in SQL and archived chunks chunk by chunk
+    cursor = conn.execute(f"""
+        INSERT INTO script_logs_fts (rowid, content, log_level)
+        SELECT (execution_id << {LOG_SEARCH_ROWID_SHIFT}) | line_number, content, log_level
+        FROM script_logs
+    """)
+    indexed = cursor.rowcount
+    for execution_id, data in conn.execute("SELECT execution_id, data FROM script_log_archives").fetchall():
+        rows = []
+        for encoded in zlib.decompress(data).decode('utf-8').split('\n'):
+            line_number, _, log_level, content = json.loads(encoded)
+            rows.append(((execution_id << LOG_SEARCH_ROWID_SHIFT) | line_number, content, log_level))
+        conn.executemany("INSERT INTO script_logs_fts (rowid, content, log_level) VALUES (?, ?, ?)", rows)
+        indexed += len(rows)
+    logger.info(f"Log search index built ({indexed} lines)")
+
+
+@migration(13, "index album_tracks by file_path")
+def _migrate_v13(conn: sqlite3.Connection):
+    # Starred sync and per-track updates match on file_path
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_album_tracks_file_path ON album_tracks(file_path)")
+
+
+@migration(14, "maintain album track counts and index albums by expiry")
+def _migrate_v14(conn: sqlite3.Connection):
+    _add_column(conn, "expiring_albums", "track_count INTEGER NOT NULL DEFAULT 0")
+    conn.execute("""
+        UPDATE expiring_albums
+        SET track_count = (SELECT COUNT(*) FROM album_tracks WHERE album_id = expiring_albums.id)
+    """)
+    _create_album_track_count_triggers(conn)
+
+    # The expiry listing filters on status and is_starred and orders by first_detected;
+    # the composite index covers the old single-column status index too
+    conn.execute("DROP INDEX IF EXISTS idx_expiring_albums_status")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_expiring_albums_expiry ON expiring_albums(status, is_starred, first_detected)"
+    )
+
+
+@migration(15, "store hot timestamps as integer epoch milliseconds")
+def _migrate_v15(conn: sqlite3.Connection):
+    for table, columns in EPOCH_MS_COLUMNS.items():
+        assignments = ", ".join(f"{column} = {_epoch_ms_sql(column)}" for column in columns)
+        needs_conversion = " OR ".join(f"typeof({column}) = 'text'" for column in columns)
+        cursor = conn.execute(f"UPDATE {table} SET {assignments} WHERE {needs_conversion}")
+        logger.info(f"Converted {cursor.rowcount} {table} rows to epoch ms")
+
+    # last_execution_time mirrors MAX(script_executions.start_time)
+    conn.execute(f"""
+        UPDATE script_configs SET last_execution_time = {_epoch_ms_sql('last_execution_time')}
+        WHERE typeof(last_execution_time) = 'text'
+    """)
+
+    _create_epoch_ms_triggers(conn)
+    _create_epoch_ms_views(conn)
+
+
+@migration(16, "add retention policies and index executions by script and start time")
+def _migrate_v16(conn: sqlite3.Connection):
+    _create_retention_policies(conn)
+    # Retention and get_script_logs() walk one script's executions in start_time order;
+    # the composite index also serves the old script_id-only lookups
+    conn.execute("DROP INDEX IF EXISTS idx_script_executions_script_id")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_script_executions_script_start ON script_executions(script_id, start_time)"
+    )
+
+
+@migration(17, "add the persistent executor run queue")
+def _migrate_v17(conn: sqlite3.Connection):
+    _create_run_queue(conn)
+
+
+@migration(18, "add execution leases")
+def _migrate_v18(conn: sqlite3.Connection):
+    _create_execution_leases(conn)
+
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# Tables create_schema() builds (script_logs_fts is optional, it needs FTS5)
+REQUIRED_TABLES = (
+    'script_executions', 'script_logs', 'script_log_archives', 'script_configs', 'app_settings',
+    'scheduled_jobs', 'expiring_albums', 'album_tracks', 'playlist_tracks', 'retention_policies',
+    'run_queue', 'execution_leases',
+)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Read the schema version stored in the database header."""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, target_version: int = None) -> int:
+    """Bring the database up to ``target_version`` (default: the current schema).
+
+    Returns the resulting version. When the database is already current this is a
+    single PRAGMA read.
+    """
+    target_version = SCHEMA_VERSION if target_version is None else target_version
+    version = get_schema_version(conn)
+    if version >= target_version:
+        return version
+
+    # Serialize against other processes starting at the same time, then re-check
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = get_schema_version(conn)
+        if version == 0 and target_version == SCHEMA_VERSION and _is_empty(conn):
+            logger.info(f"Creating database schema (version {SCHEMA_VERSION})")
+            create_schema(conn)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.commit()
+            return SCHEMA_VERSION
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    for step_version, description, step in MIGRATIONS:
+        if step_version <= version or step_version > target_version:
+            continue
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= step_version:
+                # Another process applied this step while we waited for the lock
+                conn.commit()
+                continue
+            logger.info(f"Running database migration v{step_version}: {description}...")
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {step_version}")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Migration v{step_version} failed: {e}")
+            raise
+        version = step_version
+
+    logger.info(f"Database schema is at version {version}")
+    return version
+
+
+def missing_tables(conn: sqlite3.Connection) -> List[str]:
+    """Tables of the current schema that are not present in the database."""
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return [table for table in REQUIRED_TABLES if table not in existing]
+
+
+def repair_schema(conn: sqlite3.Connection) -> List[str]:
+    """Re-create current-schema tables that were dropped, with their indexes and triggers.
+
+    Only applies to a database already at SCHEMA_VERSION (older ones are handled by
+    migrate()). create_schema() is idempotent, so existing tables are left alone.
+    Returns the names of the tables that were re-created.
+    """
+    if get_schema_version(conn) != SCHEMA_VERSION or not missing_tables(conn):
+        return []
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        missing = missing_tables(conn)
+        if missing:
+            logger.warning(f"Re-creating missing database tables: {', '.join(missing)}")
+            create_schema(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return missing
+
+
+def _is_empty(conn: sqlite3.Connection) -> bool:
+    """True when the database has no tables at all."""
+    return conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] == 0
+
+
+# ---------------------------------------------------------------------------
+# Self-check harness
+# ---------------------------------------------------------------------------
+
+def _describe_schema(conn: sqlite3.Connection) -> Dict[str, object]:
+    """Tables with their column sets, plus index, trigger and view names, for comparison."""
+    tables = {}
+    for (name,) in conn.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name NOT LIKE 'script_logs_fts_%'
+        ORDER BY name
+    """):
+        tables[name] = sorted(
+            (row[1], row[2].upper(), bool(row[3]), row[4], bool(row[5]))
+            for row in conn.execute(f"PRAGMA table_info({name})")
+        )
+    indexes = sorted(
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND name NOT LIKE 'sqlite_%'"
+        )
+    )
+    triggers = sorted(row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'"))
+    views = sorted(row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'"))
+    return {'tables': tables, 'indexes': indexes, 'triggers': triggers, 'views': views}
+
+
+def _seed_fixture(conn: sqlite3.Connection):
+    """Insert a representative row into each v1 table."""
+    conn.execute("""
+        INSERT INTO script_executions (id, script_id, script_name, start_time, end_time, status)
+        VALUES (1, 'scan_library_age', 'Scan Library Age', '2024-01-01 10:00:00', '2024-01-01 10:05:00', 'completed')
+    """)
+    conn.execute("""
+        INSERT INTO script_logs (execution_id, line_number, timestamp, content, log_level)
+        VALUES (1, 1, '2024-01-01 10:00:01', 'Scanning Artist - Album', 'info')
+    """)
+    conn.execute("""
+        INSERT INTO expiring_albums
+        (id, album_key, artist, album, directory, oldest_file_days, days_until_expiry, cleanup_days,
+         file_count, total_size_mb, is_starred, first_detected, last_seen, status)
+        VALUES (1, 'artist|album', 'Artist', 'Album', '/media/Not_Owned/Artist/Album', 10, 20, 30,
+                12, 420.5, 0, '2024-01-01 10:00:00', '2024-01-02 10:00:00', 'pending')
+    """)
+    conn.execute("""
+        INSERT INTO album_tracks
+        (album_id, file_path, file_name, track_title, file_size_mb, days_old, last_modified)
+        VALUES (1, '/media/Not_Owned/Artist/Album/01.flac', '01.flac', 'Intro', 35.0, 10, '2023-12-22 10:00:00')
+    """)
+    conn.execute("INSERT INTO app_settings (key, value) VALUES ('CLEANUP_DAYS', '30')")
+
+
+def _check_fixture_data(conn: sqlite3.Connection) -> List[str]:
+    """Verify the seeded rows survived the upgrade."""
+    problems = []
+    album = conn.execute("SELECT album_key, file_count, first_detected FROM expiring_albums WHERE id = 1").fetchone()
+    first_detected_ms = round(datetime(2024, 1, 1, 10, 0, 0).timestamp() * 1000)
+    if album is None or album[0] != 'artist|album' or album[1] != 12 or album[2] != first_detected_ms:
+        problems.append(f"expiring_albums row not preserved: {album}")
+    iso = conn.execute("SELECT first_detected FROM expiring_albums_iso WHERE id = 1").fetchone()
+    if iso is None or iso[0] != '2024-01-01 10:00:00.000':
+        problems.append(f"expiring_albums_iso view mismatch: {iso}")
+    track = conn.execute("SELECT file_name, is_starred FROM album_tracks WHERE album_id = 1").fetchone()
+    if track is None or track[0] != '01.flac' or track[1] not in (0, 'FALSE', None):
+        problems.append(f"album_tracks row not preserved: {track}")
+    track_count = conn.execute("SELECT track_count FROM expiring_albums WHERE id = 1").fetchone()
+    if track_count is None or track_count[0] != 1:
+        problems.append(f"expiring_albums.track_count not backfilled: {track_count}")
+    log_count = conn.execute("SELECT COUNT(*) FROM script_logs WHERE execution_id = 1").fetchone()[0]
+    if log_count != 1:
+        problems.append(f"script_logs rows not preserved: {log_count}")
+    setting = conn.execute("SELECT value FROM app_settings WHERE key = 'CLEANUP_DAYS'").fetchone()
+    if setting is None or setting[0] != '30':
+        problems.append(f"app_settings row not preserved: {setting}")
+    return problems
+
+
+def build_fixture(path: str, version: int):
+    """Create a database at a historical schema version with sample data."""
+    conn = sqlite3.connect(path)
+    try:
+        migrate(conn, target_version=1)
+        _seed_fixture(conn)
+        conn.commit()
+        migrate(conn, target_version=version)
+    finally:
+        conn.close()
+
+
+def run_checks(verbose: bool = False) -> bool:
+    """Upgrade fixtures from every historical version and compare with a fresh schema."""
+    with tempfile.TemporaryDirectory() as tmp:
+        fresh_path = str(Path(tmp) / 'fresh.db')
+        conn = sqlite3.connect(fresh_path)
+        migrate(conn)
+        expected = _describe_schema(conn)
+        fast_path_version = migrate(conn)
+        conn.close()
+
+        ok = fast_path_version == SCHEMA_VERSION
+        if not ok:
+            print(f"FAIL fresh database reports version {fast_path_version}, expected {SCHEMA_VERSION}")
+
+        for version in range(1, SCHEMA_VERSION):
+            path = str(Path(tmp) / f'fixture_v{version}.db')
+            build_fixture(path, version)
+
+            conn = sqlite3.connect(path)
+            try:
+                problems = []
+                final_version = migrate(conn)
+                if final_version != SCHEMA_VERSION:
+                    problems.append(f"ended at version {final_version}")
+
+                actual = _describe_schema(conn)
+                for key in ('indexes', 'triggers', 'views'):
+                    missing = set(expected[key]) - set(actual[key])
+                    extra = set(actual[key]) - set(expected[key])
+                    if missing or extra:
+                        problems.append(f"{key} differ: missing {sorted(missing)}, extra {sorted(extra)}")
+                for table in sorted(set(expected['tables']) | set(actual['tables'])):
+                    if expected['tables'].get(table) != actual['tables'].get(table):
+                        problems.append(f"table {table} differs from fresh schema")
+                        if verbose:
+                            problems.append(f"  expected {expected['tables'].get(table)}")
+                            problems.append(f"  actual   {actual['tables'].get(table)}")
+
+                problems.extend(_check_fixture_data(conn))
+                integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+                if integrity != 'ok':
+                    problems.append(f"integrity_check: {integrity}")
+            finally:
+                conn.close()
+
+            if problems:
+                ok = False
+                print(f"FAIL v{version} -> v{SCHEMA_VERSION}")
+                for problem in problems:
+                    print(f"  {problem}")
+            else:
+                print(f"ok   v{version} -> v{SCHEMA_VERSION}")
+
+        return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SoulSeekarr database migrations')
+    parser.add_argument('--check', action='store_true',
+                        help='Upgrade fixture databases from every historical version and verify the result')
+    parser.add_argument('--verbose', action='store_true', help='Show column-level differences')
+    parser.add_argument('database', nargs='?', help='Database to migrate (default: work/soulseekarr.db)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING if args.check else logging.INFO, format='%(message)s')
+
+    if args.check:
+        sys.exit(0 if run_checks(args.verbose) else 1)
+
+    conn = sqlite3.connect(args.database or 'work/soulseekarr.db')
+    try:
+        print(f"Schema version: {migrate(conn)} (current: {SCHEMA_VERSION})")
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Output capture module for SoulSeekarr
+One reader thread for the output of every running script.
+
+Script output pipes are registered with a single selector thread, which reads
+whatever each pipe holds with os.read in chunks of up to
+OUTPUT_CAPTURE_CHUNK_BYTES. A chunk is split into lines in one pass, decoded
+once, and every line in it shares one timestamp, so a script printing
+thousands of lines a second costs a handful of calls rather than several per
+line. A line is never waited on: output without a newline stays buffered until
+the newline arrives, and a line longer than OUTPUT_CAPTURE_MAX_LINE is cut.
+
+A carriage return rewrites the current line in place, as a terminal shows a
+progress bar (tqdm and the like): only the text written last before a newline
+becomes the line, and the text since the last newline is handed over as the
+pending line, to be shown until it is replaced or completed.
+
+On Windows, where pipes cannot be selected, each stream gets a reader thread
+of its own running the same splitting.
+"""
+
+import os
+import selectors
+import threading
+import logging
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_CAPTURE_CHUNK_BYTES = int(os.environ.get('OUTPUT_CAPTURE_CHUNK_BYTES', str(64 * 1024)))  # Largest single read
+OUTPUT_CAPTURE_MAX_LINE = int(os.environ.get('OUTPUT_CAPTURE_MAX_LINE', str(64 * 1024)))        # Longer lines are cut
+
+
+def _last_write(line: str) -> str:
+    """What a terminal shows for a line rewritten with carriage returns."""
+    if '\r' not in line:
+        return line
+    for segment in reversed(line.split('\r')):
+        if segment:
+            return segment
+    return ''
+
+
+class LineSplitter:
+    """Turns raw output chunks into complete lines and the pending (\\r-rewritten) line."""
+
+    def __init__(self, max_line: int = OUTPUT_CAPTURE_MAX_LINE):
+        self.max_line = max_line
+        self.buffer = b''
+        self.pending: Optional[str] = None
+
+    def feed(self, chunk: bytes) -> Tuple[List[str], Optional[str]]:
+        """Split a chunk. Returns the lines it completed and the new pending line (None if unchanged)."""
+        data = self.buffer + chunk if self.buffer else chunk
+        end = data.rfind(b'\n')
+        lines: List[str] = []
+        if end != -1:
+            lines = [_last_write(line) for line in data[:end].decode('utf-8', 'replace').split('\n')]
+            data = data[end + 1:]
+            self.pending = None
+
+        if b'\r' in data:
+            # Everything before the last rewrite is gone from the screen, so not kept either
+            cut = data.rfind(b'\r', 0, len(data) - 1)
+            if cut > 0:
+                data = data[cut:]
+        while len(data) > self.max_line:
+            lines.append(_last_write(data[:self.max_line].decode('utf-8', 'replace')))
+            data = data[self.max_line:]
+        self.buffer = data
+
+        pending = None
+        if b'\r' in data:
+            # The writer may be mid-character; show what has arrived
+            text = _last_write(data.decode('utf-8', 'ignore'))
+            if text != self.pending:
+                self.pending = pending = text
+        return lines, pending
+
+    def finish(self) -> List[str]:
+        """The last line, when the output did not end with a newline."""
+        data, self.buffer = self.buffer, b''
+        self.pending = None
+        if not data:
+            return []
+        return [_last_write(data.decode('utf-8', 'replace'))]
+
+
+class CapturedStream:
+    """A pipe being read, and where its lines go."""
+
+    def __init__(self, stream, on_lines: Callable[[List[str], datetime], None],
+                 on_pending: Optional[Callable[[str, datetime], None]] = None,
+                 max_line: int = OUTPUT_CAPTURE_MAX_LINE):
+        self.stream = stream
+        self.fd = stream.fileno()
+        self.on_lines = on_lines
+        self.on_pending = on_pending
+        self.splitter = LineSplitter(max_line)
+        self.done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the pipe has closed and its last line was delivered."""
+        return self.done.wait(timeout)
+
+    def deliver(self, lines: List[str], pending: Optional[str], timestamp: datetime):
+        try:
+            if lines:
+                self.on_lines(lines, timestamp)
+            if pending is not None and self.on_pending is not None:
+                self.on_pending(pending, timestamp)
+        except Exception as e:
+            # One bad consumer must not stop the reader serving every other script
+            logger.error(f"Error handling captured output: {e}")
+
+
+class OutputCapture:
+    """The shared reader thread and the pipes it serves."""
+
+    def __init__(self, chunk_bytes: int = OUTPUT_CAPTURE_CHUNK_BYTES, max_line: int = OUTPUT_CAPTURE_MAX_LINE):
+        self.chunk_bytes = chunk_bytes
+        self.max_line = max_line
+        self.lock = threading.Lock()
+        self._selector = None
+        self._wake_read = self._wake_write = None
+        self._added: List[CapturedStream] = []
+        self._thread = None
+        self.streams = 0
+        self.chunks = 0
+        self.bytes_read = 0
+
+    def watch(self, stream, on_lines: Callable[[List[str], datetime], None],
+              on_pending: Optional[Callable[[str, datetime], None]] = None) -> CapturedStream:
+        """Read a binary pipe until it closes, then close it.
+
+        ``on_lines(lines, timestamp)`` gets each batch of complete lines and
+        ``on_pending(text, timestamp)`` the line being rewritten in place; both
+        run on the reader thread and must not block.
+        """
+        captured = CapturedStream(stream, on_lines, on_pending, self.max_line)
+        with self.lock:
+            self.streams += 1
+        if os.name == 'nt':
+            threading.Thread(target=self._read_blocking, args=(captured,), name="output-capture", daemon=True).start()
+            return captured
+        os.set_blocking(captured.fd, False)
+        with self.lock:
+            self._ensure_thread()
+            self._added.append(captured)
+        os.write(self._wake_write, b'\0')
+        return captured
+
+    def _ensure_thread(self):
+        """Start the reader on first use (lock held)."""
+        if self._thread is not None:
+            return
+        self._selector = selectors.DefaultSelector()
+        self._wake_read, self._wake_write = os.pipe()
+        os.set_blocking(self._wake_read, False)
+        self._selector.register(self._wake_read, selectors.EVENT_READ)
+        self._thread = threading.Thread(target=self._run, name="output-capture", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                for key, _ in self._selector.select():
+                    if key.fileobj == self._wake_read:
+                        self._register_added()
+                    else:
+                        self._read(key.data)
+            except Exception as e:
+                logger.error(f"Error in output capture loop: {e}")
+
+    def _register_added(self):
+        try:
+            while os.read(self._wake_read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        with self.lock:
+            added, self._added = self._added, []
+        for captured in added:
+            self._selector.register(captured.fd, selectors.EVENT_READ, captured)
+
+    def _read(self, captured: CapturedStream):
+        try:
+            chunk = os.read(captured.fd, self.chunk_bytes)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.warning(f"Error reading script output: {e}")
+            chunk = b''
+        if chunk:
+            self._handle(captured, chunk)
+            return
+        self._selector.unregister(captured.fd)
+        self._close(captured)
+
+    def _read_blocking(self, captured: CapturedStream):
+        try:
+            while True:
+                chunk = os.read(captured.fd, self.chunk_bytes)
+                if not chunk:
+                    break
+                self._handle(captured, chunk)
+        except OSError as e:
+            logger.warning(f"Error reading script output: {e}")
+        self._close(captured)
+
+    def _handle(self, captured: CapturedStream, chunk: bytes):
+        self.chunks += 1
+        self.bytes_read += len(chunk)
+        lines, pending = captured.splitter.feed(chunk)
+        if lines or pending is not None:
+            captured.deliver(lines, pending, datetime.now())
+
+    def _close(self, captured: CapturedStream):
+        captured.deliver(captured.splitter.finish(), None, datetime.now())
+        try:
+            captured.stream.close()
+        except OSError:
+            pass
+        with self.lock:
+            self.streams -= 1
+        captured.done.set()
+
+    def get_stats(self):
+        with self.lock:
+            return {'streams': self.streams, 'chunks': self.chunks, 'bytes_read': self.bytes_read}
+
+# Global capture instance
+output_capture = None
+
+def get_output_capture() -> OutputCapture:
+    """Get the global output capture."""
+    global output_capture
+    if output_capture is None:
+        output_capture = OutputCapture()
+    return output_capture
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Query statistics for SoulSeekarr
+Optional per-statement instrumentation for DatabaseManager connections.
+
+When DB_QUERY_STATS is enabled, pooled connections are opened with the
+InstrumentedConnection factory below. Every execute()/executemany() is timed and
+recorded against its normalized SQL (literals replaced by ?, whitespace collapsed)
+in a latency histogram. Statements slower than DB_SLOW_QUERY_MS are logged along
+with their EXPLAIN QUERY PLAN, which is captured once per normalized statement.
+
+Timings cover statement execution up to the first row; rows fetched later from a
+SELECT cursor are not included. When disabled, connections are plain
+sqlite3.Connection objects and nothing here runs.
+"""
+
+import os
+import re
+import time
+import logging
+import sqlite3
+import threading
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds (the last bucket is open-ended)
+LATENCY_BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+SLOW_QUERY_HISTORY = 100       # Recent slow statements kept for the debug endpoint
+NORMALIZED_SQL_CACHE_SIZE = 2048
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def query_stats_enabled() -> bool:
+    """Whether DB_QUERY_STATS asks for instrumented connections."""
+    return os.environ.get('DB_QUERY_STATS', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def slow_query_threshold_ms() -> float:
+    """DB_SLOW_QUERY_MS, the latency above which statements are logged with their plan."""
+    try:
+        return float(os.environ.get('DB_SLOW_QUERY_MS', '100'))
+    except ValueError:
+        return 100.0
+
+
+def normalize_sql(sql: str) -> str:
+    """Reduce a statement to its shape so calls that differ only in literals group together."""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _IN_LIST.sub('IN (?...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class _StatementStats:
+    """Latency totals and histogram for one normalized statement."""
+    __slots__ = ('sql', 'count', 'rows', 'total_ms', 'max_ms', 'buckets', 'plan')
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.count = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.plan = None
+
+
+class QueryStats:
+    """Thread-safe collector shared by every instrumented connection of a DatabaseManager."""
+
+    def __init__(self, slow_threshold_ms: float = None):
+        self.slow_threshold_ms = slow_query_threshold_ms() if slow_threshold_ms is None else slow_threshold_ms
+        self._lock = threading.Lock()
+        self._statements: Dict[str, _StatementStats] = {}
+        self._by_sql: Dict[str, _StatementStats] = {}  # raw SQL -> entry in _statements
+        self._slow = deque(maxlen=SLOW_QUERY_HISTORY)
+        self._started = time.time()
+
+    def _stats_for(self, sql: str) -> _StatementStats:
+        """Stats entry for a raw statement; normalization runs once per distinct SQL string."""
+        normalized = normalize_sql(sql)
+        with self._lock:
+            stats = self._statements.get(normalized)
+            if stats is None:
+                stats = self._statements[normalized] = _StatementStats(normalized)
+            if len(self._by_sql) >= NORMALIZED_SQL_CACHE_SIZE:
+                self._by_sql.clear()
+            self._by_sql[sql] = stats
+        return stats
+
+    def record(self, conn: sqlite3.Connection, sql: str, params, elapsed_ms: float, rows: int = 1):
+        """Record one execution; slow statements get a plan captured and are logged."""
+        stats = self._by_sql.get(sql) or self._stats_for(sql)
+        with self._lock:
+            stats.count += 1
+            stats.rows += rows
+            stats.total_ms += elapsed_ms
+            if elapsed_ms > stats.max_ms:
+                stats.max_ms = elapsed_ms
+            stats.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+        if elapsed_ms >= self.slow_threshold_ms:
+            self._record_slow(conn, stats, sql, params, elapsed_ms, rows)
+
+    def _record_slow(self, conn, stats: _StatementStats, sql: str, params, elapsed_ms: float, rows: int):
+        with self._lock:
+            capture_plan = stats.plan is None
+            if capture_plan:
+                stats.plan = []  # claim it so concurrent slow calls don't all EXPLAIN
+        if capture_plan:
+            stats.plan = self._explain(conn, sql, params)
+
+        with self._lock:
+            self._slow.append({
+                'sql': stats.sql,
+                'elapsed_ms': round(elapsed_ms, 3),
+                'rows': rows,
+                'at': time.time(),
+                'plan': stats.plan
+            })
+        plan_text = '; '.join(stats.plan) if stats.plan else 'n/a'
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {stats.sql} | plan: {plan_text}")
+
+    @staticmethod
+    def _explain(conn: sqlite3.Connection, sql: str, params) -> List[str]:
+        """EXPLAIN QUERY PLAN for a statement, bypassing instrumentation."""
+        try:
+            cursor = sqlite3.Connection.cursor(conn, sqlite3.Cursor)
+            cursor.row_factory = None
+            sqlite3.Cursor.execute(cursor, f"EXPLAIN QUERY PLAN {sql}", params if params is not None else ())
+            return [row[3] for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.debug(f"Could not capture query plan: {e}")
+            return []
+
+    def snapshot(self, limit: int = 50) -> Dict:
+        """Statements ordered by total time, plus recent slow queries."""
+        with self._lock:
+            statements = [
+                {
+                    'sql': sql,
+                    'count': stats.count,
+                    'rows': stats.rows,
+                    'total_ms': round(stats.total_ms, 3),
+                    'avg_ms': round(stats.total_ms / stats.count, 3),
+                    'max_ms': round(stats.max_ms, 3),
+                    'histogram': {
+                        (f"<={bound}ms" if i < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}ms"): n
+                        for i, (bound, n) in enumerate(zip(LATENCY_BUCKETS_MS + (None,), stats.buckets))
+                        if n
+                    },
+                    'plan': stats.plan
+                }
+                for sql, stats in self._statements.items()
+            ]
+            slow = list(self._slow)
+
+        statements.sort(key=lambda s: s['total_ms'], reverse=True)
+        return {
+            'enabled': True,
+            'since': self._started,
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'statement_count': len(statements),
+            'statements': statements[:limit],
+            'slow_queries': slow[::-1]
+        }
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._by_sql.clear()
+            self._slow.clear()
+            self._started = time.time()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that times execute()/executemany() into its connection's QueryStats."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.connection.query_stats.record(
+                self.connection, sql, parameters, (time.perf_counter() - start) * 1000
+            )
+
+    def executemany(self, sql, seq_of_parameters):
+        # Materialize so the row count is known and the first row can feed EXPLAIN
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self.connection.query_stats.record(
+                self.connection, sql, seq_of_parameters[0] if seq_of_parameters else None,
+                (time.perf_counter() - start) * 1000, rows=len(seq_of_parameters)
+            )
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3.Connection factory whose cursors (including execute() shortcuts) are timed.
+
+    Pass as ``factory=`` to sqlite3.connect() and set ``query_stats`` afterwards.
+    """
+    query_stats: Optional[QueryStats] = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return sqlite3.Connection.cursor(self, InstrumentedCursor).execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return sqlite3.Connection.cursor(self, InstrumentedCursor).executemany(sql, seq_of_parameters)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Row records for SoulSeekarr
+Lightweight typed records and timestamp helpers for the database layer.
+
+Timestamps on the hot tables (script_executions, script_logs, expiring_albums,
+album_tracks) are stored as integer epoch milliseconds. The helpers here convert
+between those integers and the naive local datetimes the rest of the app uses.
+
+The record classes are what the hot read queries return instead of dicts: each
+is built straight from a plain tuple row, with slots in the same order as its
+COLUMNS select list and timestamps already converted to datetimes.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+def to_epoch_ms(value) -> Optional[int]:
+    """Convert a datetime (naive local time), ISO string or epoch ms to epoch ms."""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return round(value.timestamp() * 1000)
+
+
+def from_epoch_ms(value) -> Optional[datetime]:
+    """Convert stored epoch ms to a naive local datetime.
+
+    ISO strings are accepted too, for rows written before the epoch migration
+    (archived log chunks keep the timestamps they were archived with).
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return datetime.fromtimestamp(value / 1000)
+
+
+def epoch_ms_to_iso(value) -> Optional[str]:
+    """Convert stored epoch ms to an ISO string for JSON responses."""
+    dt = from_epoch_ms(value)
+    return dt.isoformat() if dt else None
+
+
+class _Record:
+    """Base for slotted row records."""
+    __slots__ = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ExecutionRecord(_Record):
+    """A script_executions row."""
+    __slots__ = ('id', 'script_id', 'script_name', 'start_time', 'end_time', 'duration_seconds',
+                 'status', 'return_code', 'error_message', 'dry_run', 'pid')
+    COLUMNS = ', '.join(__slots__)
+
+    def __init__(self, id, script_id, script_name, start_time, end_time, duration_seconds,
+                 status, return_code, error_message, dry_run, pid):
+        self.id = id
+        self.script_id = script_id
+        self.script_name = script_name
+        self.start_time = from_epoch_ms(start_time)
+        self.end_time = from_epoch_ms(end_time)
+        self.duration_seconds = duration_seconds
+        self.status = status
+        self.return_code = return_code
+        self.error_message = error_message
+        self.dry_run = bool(dry_run)
+        self.pid = pid
+
+
+class AlbumRecord(_Record):
+    """An expiring_albums row."""
+    __slots__ = ('id', 'album_key', 'artist', 'album', 'directory', 'file_count', 'track_count',
+                 'total_size_mb', 'is_starred', 'first_detected', 'last_seen', 'status',
+                 'deleted_at', 'album_art_url')
+    COLUMNS = ', '.join(__slots__)
+
+    def __init__(self, id, album_key, artist, album, directory, file_count, track_count,
+                 total_size_mb, is_starred, first_detected, last_seen, status,
+                 deleted_at, album_art_url):
+        self.id = id
+        self.album_key = album_key
+        self.artist = artist
+        self.album = album
+        self.directory = directory
+        self.file_count = file_count
+        self.track_count = track_count
+        self.total_size_mb = total_size_mb
+        self.is_starred = bool(is_starred)
+        self.first_detected = from_epoch_ms(first_detected)
+        self.last_seen = from_epoch_ms(last_seen)
+        self.status = status
+        self.deleted_at = from_epoch_ms(deleted_at)
+        self.album_art_url = album_art_url
+
+
+class TrackRecord(_Record):
+    """An album_tracks row, with days_old computed by the query."""
+    __slots__ = ('id', 'album_id', 'file_path', 'file_name', 'track_title', 'track_number',
+                 'track_artist', 'year', 'file_size_mb', 'days_old', 'last_modified',
+                 'is_starred', 'navidrome_id')
+    COLUMNS = ', '.join(__slots__)
+
+    def __init__(self, id, album_id, file_path, file_name, track_title, track_number,
+                 track_artist, year, file_size_mb, days_old, last_modified,
+                 is_starred, navidrome_id):
+        self.id = id
+        self.album_id = album_id
+        self.file_path = file_path
+        self.file_name = file_name
+        self.track_title = track_title
+        self.track_number = track_number
+        self.track_artist = track_artist
+        self.year = year
+        self.file_size_mb = file_size_mb
+        self.days_old = days_old
+        self.last_modified = from_epoch_ms(last_modified)
+        self.is_starred = bool(is_starred)
+        self.navidrome_id = navidrome_id
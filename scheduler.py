@@ -2,19 +2,49 @@
 """
 Scheduler module for SoulSeekarr
 Provides a Laravel-like scheduler for running scripts at configurable intervals.
+
+Due jobs are submitted to the script executor rather than run on the scheduler
+thread, so they share its worker pool and resource limits with manual runs, and
+run through the runner the app registers, the same one manual runs use. A
+job whose scheduled run is still queued or running is left due and submitted on
+a later check. When the script is busy with another run, the executor applies
+the script's overlap policy; a run coalesced into the busy one counts as this
+interval's run and the job moves on to its next run time.
+
+The scheduler thread does not poll. Enabled jobs are loaded from
+scheduled_jobs when it starts and kept in a min-heap of wake-up times, and the
+thread sleeps on a condition until the earliest one (add_job, enable_job,
+update_job_schedule and the others wake it to re-plan). The table is the
+persistent copy, read at start and when a job is edited but never polled.
+While a job's run is pending the job is looked at again every check_interval
+seconds, in memory, so a run dropped from the executor queue is submitted again.
 """
 
 import os
-import time
+import heapq
+import shlex
 import threading
 import logging
-import subprocess
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from database import get_db
+from executor import get_executor
 
 logger = logging.getLogger(__name__)
 
+# Relative job script paths are resolved against the application root
+APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+def _parse_time(value) -> Optional[datetime]:
+    """A next_run value as stored (datetime or its ISO text), or None."""
+    if value is None or isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        logger.warning(f"Ignoring unreadable schedule time {value!r}")
+        return None
+
 class SchedulerManager:
     """
     A Laravel-style scheduler for managing periodic script execution.
@@ -23,10 +53,27 @@ class SchedulerManager:
     
     def __init__(self):
         self.db = get_db()
+        self.executor = get_executor()
+        self.executor.register('scheduled', self._run_queued_job)
         self.running = False
         self.scheduler_thread = None
         self.lock = threading.Lock()
-        self.check_interval = 60  # Check every 60 seconds
+        self.condition = threading.Condition()  # Guards the jobs and the heap; notified on every change
+        self._jobs: Dict[str, Dict] = {}  # Enabled jobs by script_id, each with the 'wake_at' it is due
+        self._heap: List[Tuple[datetime, str]] = []  # (wake_at, script_id); stale entries are skipped
+        self.check_interval = 60  # Re-check a job whose run is still pending
+        self.max_wait = 300  # Longest sleep, so a wall-clock change is noticed
+        self.job_timeout = 3600  # Scheduled runs are killed after an hour
+        self.runner = None
+    
+    def set_runner(self, runner: Callable[..., int]):
+        """Set the function that runs a job's script and returns its exit code.
+        
+        Called as ``runner(script_id, command, run_name=..., timeout=...)``; the app
+        passes its run_script_thread, so scheduled runs get the same output capture,
+        log storage, progress and PID tracking as manual ones.
+        """
+        self.runner = runner
     
     def start(self):
         """Start the scheduler in a background thread."""
@@ -36,6 +83,7 @@ class SchedulerManager:
                 return
             
             self.running = True
+            self._load_jobs()
             self.scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
             self.scheduler_thread.start()
             logger.info("Scheduler started successfully")
@@ -47,136 +95,199 @@ class SchedulerManager:
                 return
             
             self.running = False
+            with self.condition:
+                self.condition.notify_all()
             if self.scheduler_thread:
                 self.scheduler_thread.join(timeout=10)
             logger.info("Scheduler stopped")
     
     def _run_scheduler(self):
-        """Main scheduler loop that runs in background thread."""
+        """Main scheduler loop: sleep until the earliest job is due, then submit the due ones."""
         logger.info("Scheduler loop started")
         
         while self.running:
             try:
-                # Get jobs that are due to run
-                due_jobs = self._get_due_jobs()
+                with self.condition:
+                    due = self._pop_due(datetime.now())
+                    while self.running and not due:
+                        self.condition.wait(self._seconds_to_next())
+                        due = self._pop_due(datetime.now())
                 
-                for job in due_jobs:
+                for job in due:
                     if not self.running:
                         break
-                    
-                    self._execute_job(job)
-                
-                # Sleep for check interval
-                time.sleep(self.check_interval)
+                    self._submit_job(job)
                 
             except Exception as e:
                 logger.error(f"Error in scheduler loop: {e}")
-                time.sleep(self.check_interval)  # Continue running even if there's an error
+                with self.condition:
+                    self.condition.wait(self.check_interval)  # Continue running even if there's an error
         
         logger.info("Scheduler loop stopped")
     
-    def _get_due_jobs(self) -> List[Dict]:
-        """Get all jobs that are due to run."""
+    def _load_jobs(self):
+        """Read the enabled jobs from the database into the heap (on start)."""
         try:
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
-                
-                # Get all enabled jobs that are due to run
-                current_time = datetime.now()
                 cursor.execute("""
-                    SELECT id, script_id, script_name, script_path, interval_type, interval_value,
-                           next_run, last_run, run_count, error_count
+                    SELECT id, script_id, script_name, script_path, interval_type, interval_value, next_run
                     FROM scheduled_jobs 
-                    WHERE enabled = TRUE 
-                    AND (next_run IS NULL OR next_run <= ?)
-                    ORDER BY next_run ASC
-                """, (current_time,))
-                
+                    WHERE enabled = TRUE
+                """)
                 jobs = [dict(row) for row in cursor.fetchall()]
-                return jobs
-                
         except Exception as e:
-            logger.error(f"Error getting due jobs: {e}")
-            return []
+            logger.error(f"Error loading scheduled jobs: {e}")
+            return
+        with self.condition:
+            self._jobs = {}
+            self._heap = []
+            for job in jobs:
+                self._plan(job, _parse_time(job['next_run']))
+        logger.info(f"Loaded {len(jobs)} scheduled jobs")
+    
+    def _reload_job(self, script_id: str):
+        """Re-read one job after its row changed, and re-plan it (or drop it when gone or disabled)."""
+        try:
+            with self.db.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, script_id, script_name, script_path, interval_type, interval_value, next_run
+                    FROM scheduled_jobs 
+                    WHERE script_id = ? AND enabled = TRUE
+                """, (script_id,))
+                row = cursor.fetchone()
+        except Exception as e:
+            logger.error(f"Error reloading scheduled job {script_id}: {e}")
+            return
+        with self.condition:
+            if row:
+                job = dict(row)
+                self._plan(job, _parse_time(job['next_run']))
+            else:
+                self._jobs.pop(script_id, None)
+                self.condition.notify_all()
+    
+    def _plan(self, job: Dict, wake_at: Optional[datetime]):
+        """Set when a job is next looked at and wake the loop (condition held)."""
+        job['wake_at'] = wake_at or datetime.now()
+        self._jobs[job['script_id']] = job
+        heapq.heappush(self._heap, (job['wake_at'], job['script_id']))
+        self.condition.notify_all()
+    
+    def _replan(self, job_id: int, wake_at: datetime):
+        """Move a known job to a new time, e.g. once its run has finished."""
+        with self.condition:
+            job = next((job for job in self._jobs.values() if job['id'] == job_id), None)
+            if job is not None:
+                self._plan(job, wake_at)
+    
+    def _pop_due(self, now: datetime) -> List[Dict]:
+        """Take the jobs due by ``now`` off the heap (condition held).
+        
+        A due job stays planned for a re-check in check_interval seconds, replaced
+        by its next run time when its run finishes.
+        """
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            wake_at, script_id = heapq.heappop(self._heap)
+            job = self._jobs.get(script_id)
+            if job is None or job['wake_at'] != wake_at:
+                continue  # Removed, disabled or re-planned since
+            due.append(dict(job))
+            self._plan(job, now + timedelta(seconds=self.check_interval))
+        return due
+    
+    def _seconds_to_next(self) -> float:
+        """How long the loop may sleep (condition held)."""
+        while self._heap:
+            wake_at, script_id = self._heap[0]
+            job = self._jobs.get(script_id)
+            if job is not None and job['wake_at'] == wake_at:
+                return min(max((wake_at - datetime.now()).total_seconds(), 0), self.max_wait)
+            heapq.heappop(self._heap)
+        return self.max_wait
+    
+    def _submit_job(self, job: Dict):
+        """Queue a due job on the executor unless its previous scheduled run is still there."""
+        if self.executor.find(job['script_id'], source='scheduled'):
+            logger.debug(f"Scheduled job {job['script_name']} deferred: its last run is still queued or running")
+            return
+        run = self.executor.submit(job['script_id'], 'scheduled', {
+            'name': f"{job['script_name']} (Scheduled)",
+            'job_id': job['id']
+        })
+        if run.state == 'coalesced':
+            next_run = self._calculate_next_run(job['interval_type'], job['interval_value'])
+            try:
+                self.db.submit_write(self._write_next_run, job['id'], next_run)
+            except Exception as e:
+                logger.error(f"Error updating next run for job {job['id']}: {e}")
+            self._replan(job['id'], next_run)
+            return
+        logger.info(f"Queued scheduled job: {job['script_name']} ({job['script_id']})")
+    
+    def _run_queued_job(self, run):
+        """Executor handler for scheduled runs; re-reads the job in case it changed while queued.
+
+        Returns the run's exit code, or None if the run was skipped.
+        """
+        job = self._get_job(run.payload.get('job_id'))
+        if job is None or not job['enabled']:
+            logger.info(f"Skipping queued run of {run.script_id}: its schedule was removed or disabled")
+            return None
+        return self._execute_job(job)
+    
+    def _get_job(self, job_id: int) -> Optional[Dict]:
+        """A scheduled job by id, or None if it no longer exists."""
+        try:
+            with self.db.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, script_id, script_name, script_path, enabled, interval_type, interval_value,
+                           next_run, last_run, run_count, error_count
+                    FROM scheduled_jobs 
+                    WHERE id = ?
+                """, (job_id,))
+                row = cursor.fetchone()
+                return dict(row) if row else None
+        except Exception as e:
+            logger.error(f"Error getting scheduled job {job_id}: {e}")
+            return None
     
-    def _execute_job(self, job: Dict):
-        """Execute a scheduled job with integrated execution tracking."""
+    def _execute_job(self, job: Dict) -> int:
+        """Execute a scheduled job through the runner, which records and streams it like a manual run.
+
+        Returns the job's exit code (-1 if it could not be run).
+        """
         job_id = job['id']
         script_id = job['script_id']
         script_name = job['script_name']
-        script_path = job['script_path']
         
         logger.info(f"Executing scheduled job: {script_name} ({script_id})")
         
-        # Start execution tracking (same as manual runs)
-        execution_id = None
-        try:
-            execution_id = self.db.start_execution(script_id, f"{script_name} (Scheduled)", dry_run=False)
-            logger.info(f"Started execution tracking for scheduled job: {execution_id}")
-        except Exception as e:
-            logger.error(f"Failed to start execution tracking: {e}")
-            return
-        
         start_time = datetime.now()
-        success = False
         error_message = None
-        return_code = 1
+        return_code = -1
         
-        try:
-            # Make sure script path is absolute
-            if not os.path.isabs(script_path):
-                # If it's relative, make it relative to the application root
-                app_root = os.path.dirname(os.path.abspath(__file__))
-                script_path = os.path.join(app_root, script_path)
-            
-            # Execute the script
-            if script_path.endswith('.py'):
-                # Python script - use the same python executable as the current process
-                import sys
-                cmd = [sys.executable, '-u', script_path]
-            elif script_path.endswith('.bat'):
-                # Windows batch file
-                cmd = ['cmd', '/c', script_path]
-            elif script_path.endswith('.sh'):
-                # Shell script (Linux/Unix)
-                cmd = ['/bin/bash', script_path]
-            else:
-                # Try to execute directly
-                cmd = [script_path]
-            
-            # Run with timeout
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=3600,  # 1 hour timeout
-                cwd=os.path.dirname(script_path) if os.path.dirname(script_path) else None
-            )
-            
-            return_code = result.returncode
-            
-            if result.returncode == 0:
-                success = True
-                logger.info(f"Scheduled job {script_name} completed successfully")
-            else:
-                error_message = f"Exit code {result.returncode}: {result.stderr}"
-                logger.error(f"Scheduled job {script_name} failed: {error_message}")
-                
-        except subprocess.TimeoutExpired:
-            return_code = -1
-            error_message = "Job execution timeout (1 hour)"
-            logger.error(f"Scheduled job {script_name} timed out")
-        except Exception as e:
-            return_code = -1
-            error_message = str(e)
-            logger.error(f"Scheduled job {script_name} execution error: {e}")
+        if self.runner is None:
+            error_message = "No script runner registered"
+            logger.error(f"Scheduled job {script_name} not run: {error_message}")
+        else:
+            try:
+                return_code = self.runner(script_id, self._command(job['script_path']),
+                                          run_name=f"{script_name} (Scheduled)", timeout=self.job_timeout)
+            except Exception as e:
+                error_message = str(e)
+                logger.error(f"Scheduled job {script_name} execution error: {e}")
         
-        # Finish execution tracking
-        try:
-            self.db.finish_execution(execution_id, return_code, error_message)
-            logger.info(f"Finished execution tracking for scheduled job: {execution_id}")
-        except Exception as e:
-            logger.error(f"Failed to finish execution tracking: {e}")
+        success = return_code == 0
+        if success:
+            logger.info(f"Scheduled job {script_name} completed successfully")
+        elif error_message is None:
+            # The output itself is in the execution's log
+            error_message = f"Exit code {return_code}"
+            logger.error(f"Scheduled job {script_name} failed: {error_message}")
         
         # Calculate next run time and update job statistics
         end_time = datetime.now()
@@ -185,6 +296,27 @@ class SchedulerManager:
         
         # Update job statistics
         self._update_job_stats(job_id, success, duration, error_message, next_run)
+        return return_code
+    
+    @staticmethod
+    def _command(script_path: str) -> str:
+        """The command line for a job's script, in the form manual runs use.
+        
+        Relative paths are resolved against the application root and quoted, so a
+        path containing spaces survives the runner's shlex.split().
+        """
+        if not os.path.isabs(script_path):
+            script_path = os.path.join(APP_ROOT, script_path)
+        quoted = shlex.quote(script_path)
+        if script_path.endswith('.py'):
+            # The interpreter manual runs use (see script_registry)
+            return f"python3 -u {quoted}"
+        if script_path.endswith('.bat'):
+            return f"cmd /c {quoted}"
+        if script_path.endswith('.sh'):
+            # Run through bash, so the script needn't be executable
+            return f"/bin/bash {quoted}"
+        return script_path
     
     def _calculate_next_run(self, interval_type: str, interval_value: int) -> datetime:
         """Calculate the next run time based on interval."""
@@ -202,30 +334,37 @@ class SchedulerManager:
     
     def _update_job_stats(self, job_id: int, success: bool, duration: float, 
                          error_message: Optional[str], next_run: datetime):
-        """Update job statistics after execution."""
+        """Update job statistics after execution, and plan the job's next run."""
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Update job stats
-                cursor.execute("""
-                    UPDATE scheduled_jobs 
-                    SET last_run = CURRENT_TIMESTAMP,
-                        last_run_status = ?,
-                        last_run_duration = ?,
-                        next_run = ?,
-                        run_count = run_count + 1,
-                        error_count = CASE WHEN ? THEN error_count ELSE error_count + 1 END,
-                        last_error = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                """, ('success' if success else 'error', duration, next_run, 
-                      success, error_message if not success else None, job_id))
-                
-                conn.commit()
-                
+            self.db.submit_write(self._write_job_stats, job_id, success, duration, error_message, next_run)
         except Exception as e:
             logger.error(f"Error updating job stats for job {job_id}: {e}")
+        self._replan(job_id, next_run)
+    
+    @staticmethod
+    def _write_job_stats(cursor, job_id: int, success: bool, duration: float,
+                         error_message: Optional[str], next_run: datetime):
+        """Write operation run on the database writer thread."""
+        cursor.execute("""
+            UPDATE scheduled_jobs 
+            SET last_run = CURRENT_TIMESTAMP,
+                last_run_status = ?,
+                last_run_duration = ?,
+                next_run = ?,
+                run_count = run_count + 1,
+                error_count = CASE WHEN ? THEN error_count ELSE error_count + 1 END,
+                last_error = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, ('success' if success else 'error', duration, next_run, 
+              success, error_message if not success else None, job_id))
+    
+    @staticmethod
+    def _write_next_run(cursor, job_id: int, next_run: datetime):
+        """Write operation: move a job to its next run time without counting a run."""
+        cursor.execute("""
+            UPDATE scheduled_jobs SET next_run = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?
+        """, (next_run, job_id))
     
     def add_job(self, script_id: str, script_name: str, script_path: str,
                 interval_type: str = 'hours', interval_value: int = 1,
@@ -249,6 +388,17 @@ class SchedulerManager:
                 
                 conn.commit()
                 
+                with self.condition:
+                    self._plan({
+                        'id': cursor.lastrowid,
+                        'script_id': script_id,
+                        'script_name': script_name,
+                        'script_path': script_path,
+                        'interval_type': interval_type,
+                        'interval_value': interval_value,
+                        'next_run': next_run
+                    }, next_run)
+                
                 logger.info(f"Added scheduled job: {script_name} (every {interval_value} {interval_type}, starting {next_run})")
                 return True, f"Job scheduled to run every {interval_value} {interval_type}"
                 
@@ -267,6 +417,9 @@ class SchedulerManager:
                 
                 if cursor.rowcount > 0:
                     conn.commit()
+                    with self.condition:
+                        self._jobs.pop(script_id, None)
+                        self.condition.notify_all()
                     logger.info(f"Removed scheduled job: {script_id}")
                     return True, "Job removed from scheduler"
                 else:
@@ -291,6 +444,7 @@ class SchedulerManager:
                 
                 if cursor.rowcount > 0:
                     conn.commit()
+                    self._reload_job(script_id)
                     logger.info(f"Enabled scheduled job: {script_id}")
                     return True, "Job enabled"
                 else:
@@ -315,6 +469,9 @@ class SchedulerManager:
                 
                 if cursor.rowcount > 0:
                     conn.commit()
+                    with self.condition:
+                        self._jobs.pop(script_id, None)
+                        self.condition.notify_all()
                     logger.info(f"Disabled scheduled job: {script_id}")
                     return True, "Job disabled"
                 else:
@@ -388,6 +545,7 @@ class SchedulerManager:
                 
                 if cursor.rowcount > 0:
                     conn.commit()
+                    self._reload_job(script_id)
                     logger.info(f"Updated schedule for job {script_id}: every {interval_value} {interval_type}")
                     return True, f"Schedule updated to every {interval_value} {interval_type}"
                 else:
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Script events module for SoulSeekarr
+Structured progress, log and metric events from scripts to the web app.
+
+When the web app runs a script it opens a pipe next to stdout and passes its
+file descriptor in SOULSEEKARR_EVENTS_FD. Scripts report through the helpers
+below, which write one JSON object per line to that pipe:
+
+    {"type": "progress", "current": 12, "total": 340, "item": "Artist - Album"}
+    {"type": "sub_progress", "message": "Getting track listing..."}
+    {"type": "metric", "name": "albums_updated", "value": 12}
+    {"type": "item", "item": "Artist - Album", "status": "ok"}
+
+The app reads the pipe as events arrive, so progress is exact and is never
+re-derived from the output text.
+
+Log lines stay on stdout, so they keep their order with plain prints and
+tracebacks; a second pipe would be read independently. Under the app each line
+written by ``log()`` is prefixed with its level between two ASCII unit
+separators (``\x1fwarning\x1fAlbum has no tracks``), which the app strips to
+store the level exactly.
+
+Run from a shell (no pipe), the helpers fall back to printing: progress as the
+``PROGRESS: [n/total] p% - Processing: item`` lines the app still recognises on
+stdout, logs as plain text, metrics and items not at all.
+
+Scripts using ``logging`` can route it through ``log_handler()``, which writes
+level-tagged lines under the app and plain ones otherwise.
+"""
+
+import os
+import sys
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+EVENTS_FD_ENV = 'SOULSEEKARR_EVENTS_FD'
+EVENT_TYPES = ('progress', 'sub_progress', 'metric', 'item')
+LOG_LEVEL_MARK = '\x1f'  # Encloses the level at the start of a tagged stdout log line
+LOG_LEVELS = ('debug', 'info', 'warning', 'error')
+
+_channel = None
+_channel_checked = False
+_channel_lock = threading.Lock()
+
+
+def _get_channel():
+    """The events pipe from the environment, opened on first use (None when absent)."""
+    global _channel, _channel_checked
+    if not _channel_checked:
+        with _channel_lock:
+            if not _channel_checked:
+                # Not passed on: the descriptor is not inherited by the script's own children
+                fd = os.environ.pop(EVENTS_FD_ENV, None)
+                try:
+                    if fd:
+                        _channel = os.fdopen(int(fd), 'w', buffering=1, encoding='utf-8')
+                except (ValueError, OSError):
+                    _channel = None
+                _channel_checked = True
+    return _channel
+
+
+def enabled() -> bool:
+    """Whether events reach the web app (the script was started by it)."""
+    return _get_channel() is not None
+
+
+def emit(event_type: str, **fields) -> bool:
+    """Write one event to the pipe. Returns False when there is no pipe."""
+    global _channel
+    channel = _get_channel()
+    if channel is None:
+        return False
+    line = json.dumps({'type': event_type, **fields}, separators=(',', ':'), default=str) + '\n'
+    with _channel_lock:
+        try:
+            channel.write(line)
+        except (BrokenPipeError, ValueError, OSError):
+            # The app went away; keep the script running on plain output
+            _channel = None
+            return False
+    return True
+
+
+def progress(current: int, total: int, item: Optional[str] = None):
+    """Report ``current`` of ``total`` done, optionally naming the item being processed."""
+    if not emit('progress', current=current, total=total, item=item):
+        percentage = int(current * 100 / total) if total else 0
+        print(f"PROGRESS: [{current}/{total}] {percentage}% - Processing: {item or 'Processing...'}", flush=True)
+
+
+def sub_progress(message: str):
+    """Report a step within the current item."""
+    if not emit('sub_progress', message=message):
+        print(f"PROGRESS_SUB: {message}", flush=True)
+
+
+def log(message: str, level: str = 'info'):
+    """Write a log line to stdout with an explicit level (tagged when run by the app)."""
+    if not enabled():
+        print(message, flush=True)
+        return
+    level = level if level in LOG_LEVELS else 'info'
+    # Every line of a multi-line message (a traceback) gets the tag
+    sys.stdout.write(''.join(f"{LOG_LEVEL_MARK}{level}{LOG_LEVEL_MARK}{line}\n"
+                             for line in str(message).split('\n')))
+    sys.stdout.flush()
+
+
+def metric(name: str, value: Any):
+    """Record a named counter or measurement for the run."""
+    emit('metric', name=name, value=value)
+
+
+def item_completed(item: str, status: str = 'ok'):
+    """Record that an item finished (``status`` such as ok, skipped or failed)."""
+    emit('item', item=item, status=status)
+
+
+class EventLogHandler(logging.Handler):
+    """Logging handler writing records as level-tagged log lines."""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = self.format(record)
+            level = record.levelname.lower()
+            if level == 'critical':
+                level = 'error'
+            log(message, level if level in LOG_LEVELS else 'info')
+        except Exception:
+            self.handleError(record)
+
+
+def log_handler() -> logging.Handler:
+    """A handler for a script's logging: level-tagged lines under the app, plain ones otherwise."""
+    if enabled():
+        return EventLogHandler()
+    return logging.StreamHandler(sys.stdout)
+
+
+def parse_event(line: str) -> Optional[Dict[str, Any]]:
+    """Decode one line from the pipe; None when it is not a known event."""
+    try:
+        event = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(event, dict) or event.get('type') not in EVENT_TYPES:
+        return None
+    return event
+
+
+def parse_log_line(line: str) -> Optional[Tuple[str, str]]:
+    """Split a tagged stdout line into (level, message); None for untagged output."""
+    if not line.startswith(LOG_LEVEL_MARK):
+        return None
+    level, mark, message = line[1:].partition(LOG_LEVEL_MARK)
+    if not mark or level not in LOG_LEVELS:
+        return None
+    return level, message
+
+
+def progress_state(event: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The dashboard progress dict for a progress event."""
+    try:
+        current = int(event['current'])
+        total = int(event['total'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return {
+        'current': current,
+        'total': total,
+        'percentage': min(100, int(current * 100 / total)) if total > 0 else 0,
+        'current_item': str(event.get('item') or 'Processing...')
+    }
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Script registry module for SoulSeekarr
+Discovers the scripts in the scripts folder and caches their parsed metadata.
+
+Each script's metadata is parsed from its docstring once and kept together with
+the file's (mtime, size). A refresh lists the folder and stats each file, and
+only re-reads files whose signature changed; new files are parsed and deleted
+ones dropped. Refreshes happen at most every SCRIPT_REGISTRY_REFRESH_SECONDS,
+so the pages and status endpoints that look scripts up on every poll are served
+from memory in between.
+"""
+
+import os
+import copy
+import time
+import threading
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the scripts folder for added, changed or removed files
+SCRIPT_REGISTRY_REFRESH_SECONDS = float(os.environ.get('SCRIPT_REGISTRY_REFRESH_SECONDS', '2'))
+
+
+def is_script_file(filename: str) -> bool:
+    """Whether a file in the scripts folder is a runnable script."""
+    # Skip system files, hidden files, and Python cache files
+    return (filename.endswith('.py') and
+            not filename.startswith('__') and
+            not filename.startswith('._') and
+            not filename.startswith('.') and
+            filename != '__pycache__')
+
+
+def extract_script_metadata(script_path):
+    """Extract metadata from a Python script's docstring and comments."""
+    metadata = {
+        'name': None,
+        'description': 'Python script',
+        'supports_dry_run': True,
+        'section': 'commands',
+        'author': '',
+        'version': '',
+        'tags': [],
+        'resources': [],
+        'overlap': None
+    }
+
+    try:
+        with open(script_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        # Look for module docstring
+        if '"""' in content:
+            start = content.find('"""')
+            if start != -1:
+                end = content.find('"""', start + 3)
+                if end != -1:
+                    docstring = content[start + 3:end].strip()
+                    lines = docstring.split('\n')
+
+                    # First line is usually the description
+                    if lines:
+                        first_line = lines[0].strip()
+                        if first_line:
+                            metadata['description'] = first_line
+
+                    # Look for metadata in docstring
+                    for line in lines:
+                        line = line.strip()
+                        if line.startswith('Name:'):
+                            metadata['name'] = line[5:].strip()
+                        elif line.startswith('Author:'):
+                            metadata['author'] = line[7:].strip()
+                        elif line.startswith('Version:'):
+                            metadata['version'] = line[8:].strip()
+                        elif line.startswith('Section:'):
+                            metadata['section'] = line[8:].strip().lower()
+                        elif line.startswith('Tags:'):
+                            tags = line[5:].strip()
+                            metadata['tags'] = [tag.strip() for tag in tags.split(',') if tag.strip()]
+                        elif line.startswith('Resources:'):
+                            # Concurrency classes the executor limits (e.g. slskd, lidarr, disk-heavy)
+                            resources = line[10:].strip().lower()
+                            metadata['resources'] = [resource.strip() for resource in resources.split(',')
+                                                     if resource.strip()]
+                        elif line.startswith('Overlap:'):
+                            # What a run does when the script is already running: skip, queue-behind, cancel-older
+                            metadata['overlap'] = line[8:].strip().lower() or None
+                        elif line.startswith('Supports dry run:'):
+                            supports = line[17:].strip().lower()
+                            metadata['supports_dry_run'] = supports in ['true', 'yes', '1']
+
+        # Check for specific patterns in code
+        if '--dry-run' in content or 'DRY_RUN' in content:
+            metadata['supports_dry_run'] = True
+        elif 'dry_run' not in content.lower():
+            metadata['supports_dry_run'] = False
+
+        # Determine section based on filename patterns
+        filename = os.path.basename(script_path).lower()
+        if 'test' in filename or 'validate' in filename:
+            metadata['section'] = 'tests'
+        elif 'monitor' in filename or 'queue' in filename or 'process' in filename:
+            metadata['section'] = 'commands'
+
+    except Exception as e:
+        logger.warning(f"Could not extract metadata from {script_path}: {e}")
+
+    return metadata
+
+
+def build_script_config(script_id: str, filename: str, metadata: Dict) -> Dict:
+    """The configuration the UI and runner use for a discovered script."""
+    return {
+        'name': metadata.get('name', script_id.replace('_', ' ').title()),
+        'description': metadata.get('description', 'Python script'),
+        'script': f'python3 -u scripts/{filename}',
+        'supports_dry_run': metadata.get('supports_dry_run', True),
+        'section': metadata.get('section', 'commands'),
+        'author': metadata.get('author', ''),
+        'version': metadata.get('version', ''),
+        'tags': metadata.get('tags', []),
+        'resources': metadata.get('resources', []),
+        'overlap': metadata.get('overlap')
+    }
+
+
+class ScriptRegistry:
+    """Parsed script metadata keyed by script_id, refreshed from (mtime, size)."""
+
+    def __init__(self, scripts_dir: str, refresh_interval: float = SCRIPT_REGISTRY_REFRESH_SECONDS):
+        self.scripts_dir = scripts_dir
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self._scripts: Dict[str, Dict] = {}
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+        self._last_refresh = None  # Monotonic time of the last folder check
+
+    def refresh(self, force: bool = False):
+        """Re-parse scripts whose file changed since the last check."""
+        with self.lock:
+            now = time.monotonic()
+            if not force and self._last_refresh is not None and now - self._last_refresh < self.refresh_interval:
+                return
+            self._last_refresh = now
+
+            if not os.path.exists(self.scripts_dir):
+                if self._scripts:
+                    logger.warning(f"Scripts directory not found: {self.scripts_dir}")
+                self._scripts = {}
+                self._signatures = {}
+                return
+
+            seen = set()
+            parsed = 0
+            try:
+                with os.scandir(self.scripts_dir) as entries:
+                    for entry in entries:
+                        if not is_script_file(entry.name) or not entry.is_file():
+                            continue
+                        script_id = entry.name[:-3]  # Remove .py extension
+                        seen.add(script_id)
+
+                        stat = entry.stat()
+                        signature = (stat.st_mtime_ns, stat.st_size)
+                        if self._signatures.get(script_id) == signature:
+                            continue
+
+                        metadata = extract_script_metadata(entry.path)
+                        self._scripts[script_id] = build_script_config(script_id, entry.name, metadata)
+                        self._signatures[script_id] = signature
+                        parsed += 1
+            except OSError as e:
+                logger.error(f"Error scanning scripts folder: {e}")
+                return
+
+            removed = [script_id for script_id in self._scripts if script_id not in seen]
+            for script_id in removed:
+                del self._scripts[script_id]
+                del self._signatures[script_id]
+
+            if parsed or removed:
+                logger.debug(f"Script registry: parsed {parsed}, removed {len(removed)}, "
+                             f"{len(self._scripts)} scripts in {self.scripts_dir}")
+
+    def get_all(self) -> Dict[str, Dict]:
+        """Copies of every script's configuration, safe for callers to annotate."""
+        self.refresh()
+        with self.lock:
+            return {script_id: copy.deepcopy(config) for script_id, config in self._scripts.items()}
+
+    def get(self, script_id: str) -> Optional[Dict]:
+        """A copy of one script's configuration, or None if there is no such script."""
+        self.refresh()
+        with self.lock:
+            config = self._scripts.get(script_id)
+            return copy.deepcopy(config) if config is not None else None
+
+    def __contains__(self, script_id: str) -> bool:
+        self.refresh()
+        with self.lock:
+            return script_id in self._scripts
+
+# Global registry instance
+script_registry = None
+
+def get_script_registry() -> ScriptRegistry:
+    """Get the global script registry for the scripts folder."""
+    global script_registry
+    if script_registry is None:
+        script_registry = ScriptRegistry(os.path.join(os.getcwd(), 'scripts'))
+    return script_registry
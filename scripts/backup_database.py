@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Backup Database v1.0
+
+Takes an online, compressed snapshot of the SoulSeekarr database without pausing
+running scripts, verifies it and keeps the newest BACKUP_KEEP snapshots.
+Use --list to show snapshots and --restore NAME to restore one. Restoring is an
+offline operation: stop SoulSeekarr and run it from a shell. It is refused when
+the script is started by the web app or while the app is running a script.
+
+Name: Backup Database
+Author: SoulSeekarr
+Version: 1.0
+Section: commands
+Tags: backup, database, maintenance
+Resources: disk-heavy
+Overlap: queue-behind
+Supports dry run: true
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The database and backup paths are relative to the application root, which the app
+# runs scripts from; this also covers running the script from a shell elsewhere
+os.chdir(Path(__file__).parent.parent)
+
+# Import project modules
+from action_logger import log_script_start, log_script_complete
+from backup import (
+    BACKUP_DIR, BACKUP_KEEP, BackupError, create_backup, list_backups, find_backup, restore_backup
+)
+from database import get_db, DB_PATH
+import script_events
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(message)s',
+    handlers=[script_events.log_handler()]
+)
+logger = logging.getLogger(__name__)
+
+
+def show_backups():
+    """Print the snapshots in the backup directory."""
+    backups = list_backups()
+    if not backups:
+        logger.info(f"No backups in {BACKUP_DIR}")
+        return
+    logger.info(f"{len(backups)} backups in {BACKUP_DIR}:")
+    for backup in backups:
+        logger.info(f"  {backup['name']}  {backup['compressed_bytes'] / 1024 / 1024:8.1f} MB")
+
+
+def run_backup(dry_run=False):
+    """Snapshot the live database."""
+    if dry_run:
+        stats = get_db().get_storage_stats()
+        logger.info(f"Would back up {DB_PATH} ({stats['database_bytes'] / 1024 / 1024:.1f} MB) "
+                    f"to {BACKUP_DIR}, keeping the newest {BACKUP_KEEP or 'all'}")
+        return
+
+    last_percent = -1
+
+    def progress(copied, total):
+        nonlocal last_percent
+        percent = copied * 100 // total if total else 100
+        if percent // 25 > last_percent // 25:
+            logger.info(f"  Copied {copied}/{total} pages ({percent}%)")
+        last_percent = percent
+
+    result = create_backup(progress=progress)
+    logger.info(f"✅ Wrote {result['name']}: {result['database_bytes'] / 1024 / 1024:.1f} MB -> "
+                f"{result['compressed_bytes'] / 1024 / 1024:.1f} MB in {result['duration_seconds']:.1f}s")
+    for name in result['removed']:
+        logger.info(f"🗑️  Removed old backup {name}")
+
+
+def run_restore(name, dry_run=False):
+    """Restore a snapshot over the live database (SoulSeekarr must be stopped)."""
+    if script_events.enabled():
+        # Started by the web app, whose pooled connections and writer stay open
+        raise BackupError("Restoring is an offline operation: stop SoulSeekarr and run "
+                          f"'python scripts/backup_database.py --restore {name}' from a shell")
+
+    path = find_backup(name) or Path(name)
+    if not path.exists():
+        raise BackupError(f"Backup not found: {name}")
+
+    if dry_run:
+        logger.info(f"Would restore {path} over {DB_PATH}")
+        return
+
+    result = restore_backup(path)
+    logger.info(f"✅ Restored {result['restored']} (schema v{result['schema_version']})")
+    if result['previous_database']:
+        logger.info(f"The previous database was saved as {result['previous_database']}")
+
+
+def main():
+    """Main script execution."""
+    parser = argparse.ArgumentParser(description='Back up or restore the SoulSeekarr database')
+    parser.add_argument('--dry-run', action='store_true', help='Show what would be done')
+    parser.add_argument('--list', action='store_true', help='List existing backups')
+    parser.add_argument('--restore', metavar='NAME', help='Restore a backup (offline: stop SoulSeekarr first)')
+    args = parser.parse_args()
+
+    if args.list:
+        show_backups()
+        return
+
+    # Header
+    logger.info("=" * 60)
+    logger.info("BACKUP DATABASE v1.0")
+    logger.info("=" * 60)
+    logger.info("")
+
+    if args.dry_run:
+        logger.info("🧪 DRY RUN MODE - No files will be written")
+        logger.info("")
+
+    start_time = time.time()
+    parameters = ' '.join(arg for arg in sys.argv[1:]) or 'normal'
+    log_script_start("Backup Database", f"Parameters: {parameters}")
+
+    try:
+        if args.restore:
+            run_restore(args.restore, dry_run=args.dry_run)
+        else:
+            run_backup(dry_run=args.dry_run)
+
+        log_script_complete("Backup Database", time.time() - start_time, success=True)
+        logger.info("")
+        logger.info("=" * 60)
+        logger.info("✅ COMPLETED SUCCESSFULLY")
+        logger.info("=" * 60)
+
+    except BackupError as e:
+        log_script_complete("Backup Database", time.time() - start_time, success=False, error=str(e))
+        logger.error(f"❌ {e}")
+        sys.exit(1)
+    except Exception as e:
+        log_script_complete("Backup Database", time.time() - start_time, success=False, error=str(e))
+        logger.error(f"❌ Error: {e}")
+        raise
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,7 @@ Author: SoulSeekarr
 Version: 1.0
 Section: commands
 Tags: cleanup, expiry, delete
+Resources: disk-heavy, lidarr
 Supports dry run: true
 """
 
@@ -23,7 +24,7 @@ import signal
 import logging
 import argparse
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Import dependencies with error handling
 try:
@@ -39,9 +40,11 @@ sys.path.append(str(Path(__file__).parent.parent))
 from settings import get_setting, get_lidarr_config
 from action_logger import log_script_start, log_script_complete, log_action, log_file_operation
 from lidarr_utils import LidarrClient
+import script_events
 
 try:
     from database import get_db
+    from records import to_epoch_ms, from_epoch_ms
     DATABASE_AVAILABLE = True
     db = get_db()
 except ImportError:
@@ -59,7 +62,7 @@ logging.basicConfig(
     format='%(message)s',
     handlers=[
         logging.FileHandler(log_file),
-        logging.StreamHandler(sys.stdout)
+        script_events.log_handler()
     ]
 )
 logger = logging.getLogger(__name__)
@@ -200,7 +203,7 @@ def mark_as_deleted(album_id):
             UPDATE expiring_albums 
             SET status = 'deleted', deleted_at = ?
             WHERE id = ?
-        """, (datetime.now(), album_id))
+        """, (to_epoch_ms(datetime.now()), album_id))
         conn.commit()
 
 def get_expired_albums(cleanup_days):
@@ -217,27 +220,25 @@ def get_expired_albums(cleanup_days):
         # album detected Jan 2 (29 days ago) -> Not expired
         # album detected Dec 31 (31 days ago) -> Expired
         
-        cursor.execute("SELECT datetime('now', '-' || ? || ' days')", (str(cleanup_days),))
-        cutoff_date = cursor.fetchone()[0]
+        cutoff_date = datetime.now() - timedelta(days=cleanup_days)
         
         logger.info(f"Cleanup Policy: {cleanup_days} days")
-        logger.info(f"Cutoff Date: {cutoff_date}")
+        logger.info(f"Cutoff Date: {cutoff_date.strftime('%Y-%m-%d %H:%M:%S')}")
         
+        # first_detected is stored as epoch milliseconds
         query = """
             SELECT * FROM expiring_albums 
             WHERE status != 'deleted' 
             AND is_starred = 0
-            AND first_detected < datetime('now', '-' || ? || ' days')
+            AND first_detected < ?
         """
         
-        cursor.execute(query, (str(cleanup_days),))
+        cursor.execute(query, (to_epoch_ms(cutoff_date),))
         
         albums = []
         for row in cursor.fetchall():
             album = dict(row)
-            # Convert timestamp strings to datetime objects
-            if isinstance(album['first_detected'], str):
-                album['first_detected'] = datetime.fromisoformat(album['first_detected'])
+            album['first_detected'] = from_epoch_ms(album['first_detected'])
             albums.append(album)
             
         return albums
@@ -290,20 +291,28 @@ def main():
         success_count = 0
         fail_count = 0
         
-        if TQDM_AVAILABLE:
+        # A console progress bar only when run by hand; the web app gets progress events
+        if TQDM_AVAILABLE and not script_events.enabled():
             iterator = tqdm(expired_albums, desc="Deleting albums")
         else:
             iterator = expired_albums
             
-        for album in iterator:
+        for index, album in enumerate(iterator, 1):
             if interrupted:
                 break
-                
+            
+            album_label = f"{album['artist']} - {album['album']}"
+            script_events.progress(index, len(expired_albums), album_label)
             if delete_album(album, dry_run=dry_run):
                 success_count += 1
+                script_events.item_completed(album_label, 'deleted')
             else:
                 fail_count += 1
-                
+                script_events.item_completed(album_label, 'failed')
+        
+        script_events.metric('deleted', success_count)
+        script_events.metric('failed', fail_count)
+        
         # Summary
         logger.info("")
         logger.info("=" * 60)
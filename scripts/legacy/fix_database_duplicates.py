@@ -17,6 +17,7 @@ from datetime import datetime
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import get_db_connection
+from records import from_epoch_ms
 
 # Setup logging
 logging.basicConfig(
@@ -91,7 +92,7 @@ def fix_duplicates():
                     continue
                 
                 # 2. Aggregate Data
-                all_first_detected = [datetime.fromisoformat(str(r['first_detected'])) for r in records]
+                all_first_detected = [from_epoch_ms(r['first_detected']) for r in records]
                 earliest_detected = min(all_first_detected)
                 
                 is_starred = any(r['is_starred'] for r in records)
@@ -381,13 +381,13 @@ class NavidromeStarredAlbumsMonitor:
         try:
             self.logger.info("Syncing starred status to database...")
             
-            # 1. Reset all starred status first (to handle un-starring)
-            # We do this by setting is_starred=False for everything
-            # This is safe because we're about to re-star everything that should be starred
+            # 1. Reset album starred status first (to handle un-starring)
+            # We do this by setting is_starred=False for every album
+            # This is safe because we're about to re-star everything that should be starred.
+            # Tracks don't need a reset: the bulk sync below unstars anything not in the set.
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("UPDATE expiring_albums SET is_starred = FALSE, status = 'pending' WHERE is_starred = TRUE")
-                cursor.execute("UPDATE album_tracks SET is_starred = FALSE WHERE is_starred = TRUE")
                 conn.commit()
             
             # 2. Update starred albums
@@ -408,8 +408,9 @@ class NavidromeStarredAlbumsMonitor:
                     'is_starred': True
                 })
             
-            if starred_tracks_data:
-                self.db.bulk_update_starred_tracks(starred_tracks_data)
+            # Always sync, even when empty, so tracks un-starred in Navidrome are cleared
+            counts = self.db.bulk_update_starred_tracks(starred_tracks_data)
+            self.logger.info(f"Tracks newly starred: {counts['starred']}, newly unstarred: {counts['unstarred']}")
                 
             self.logger.info("Starred status synced to database")
             
@@ -70,6 +70,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 # Import our modules
 try:
     from database import get_db
+    from records import from_epoch_ms
     DATABASE_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ Warning: Database not available - expiry tracking will be disabled: {e}")
@@ -722,7 +723,7 @@ class FileOrganiser:
                                 """, (album_key,))
                                 expiry_info = cursor.fetchone()
                                 if expiry_info:
-                                    logger.debug(f"      📅 First detected: {expiry_info['first_detected']}")
+                                    logger.debug(f"      📅 First detected: {from_epoch_ms(expiry_info['first_detected'])}")
                                 return expiry_info
                         
                         # Use retry logic for expiry info lookup
@@ -14,6 +14,7 @@ Author: SoulSeekarr
 Version: 3.0
 Section: commands
 Tags: listenbrainz, recommendations, lidarr, discovery, weekly-exploration
+Resources: lidarr
 Supports dry run: true
 """
 
@@ -32,6 +33,8 @@ from datetime import datetime
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent.parent))
 
+import script_events
+
 # Import settings and utilities
 try:
     from settings import (
@@ -58,7 +61,7 @@ logging.basicConfig(
     format='%(message)s',
     handlers=[
         logging.FileHandler(log_file),
-        logging.StreamHandler(sys.stdout)
+        script_events.log_handler()
     ]
 )
 logger = logging.getLogger(__name__)
@@ -309,8 +312,7 @@ class ListenBrainzRecommendations:
                 if monitored_count >= self.limit:
                     break
                 
-                percentage = int(((i+1) / total_items) * 100)
-                print(f"PROGRESS: [{i+1}/{total_items}] {percentage}% - Checking: {album['artist']} - {album['album']}")
+                script_events.progress(i + 1, total_items, f"{album['artist']} - {album['album']}")
                 
                 if self.process_recommendation(album):
                     monitored_count += 1
@@ -321,7 +323,7 @@ class ListenBrainzRecommendations:
                     time.sleep(1) # Be nice to APIs
 
             # Force 100% progress at completion
-            print(f"PROGRESS: [{total_items}/{total_items}] 100% - Completed")
+            script_events.progress(total_items, total_items, "Completed")
 
             # Summary
             self.logger.info("=" * 60)
@@ -10,6 +10,7 @@ Author: SoulSeekarr
 Version: 1.0
 Section: commands
 Tags: scanning, library, age, cleanup
+Resources: disk-heavy, navidrome
 Supports dry run: true
 """
 
@@ -48,9 +49,11 @@ from settings import (
     get_navidrome_config
 )
 from action_logger import log_script_start, log_script_complete, log_action
+import script_events
 
 try:
     from database import get_db
+    from records import to_epoch_ms
     DATABASE_AVAILABLE = True
     db = get_db()
 except ImportError:
@@ -68,7 +71,7 @@ logging.basicConfig(
     format='%(message)s',
     handlers=[
         logging.FileHandler(log_file),
-        logging.StreamHandler(sys.stdout)
+        script_events.log_handler()
     ]
 )
 logger = logging.getLogger(__name__)
@@ -292,8 +295,7 @@ def scan_directory(directory, starred_album_keys, starred_track_paths, dry_run=F
             processed_count += 1
             
             # Update progress
-            percentage = int((processed_count / total_albums) * 100)
-            print(f"PROGRESS: [{processed_count}/{total_albums}] {percentage}% - Processing: {artist} - {album_name}")
+            script_events.progress(processed_count, total_albums, f"{artist} - {album_name}")
 
         except Exception as e:
             logger.error(f"Error processing {album_dir}: {e}")
@@ -345,8 +347,6 @@ def get_audio_metadata(file_path):
 def update_database_album(db, album_data, track_data_list):
     """Update album and tracks in database transaction."""
     with db.get_connection() as conn:
-        conn.execute("PRAGMA busy_timeout = 30000")
-        conn.execute("PRAGMA journal_mode = WAL")
         cursor = conn.cursor()
         
         # Check existing
@@ -364,7 +364,7 @@ def update_database_album(db, album_data, track_data_list):
             """
             params = [
                 album_data['file_count'], album_data['total_size_mb'], 
-                album_data['is_starred'], now, now
+                album_data['is_starred'], to_epoch_ms(now), now
             ]
             
             # Only update art if found
@@ -387,7 +387,7 @@ def update_database_album(db, album_data, track_data_list):
             """, (
                 album_data['album_key'], album_data['artist'], album_data['album'],
                 album_data['directory'], album_data['file_count'], album_data['total_size_mb'],
-                album_data['is_starred'], album_data['first_detected'], now, album_data['status'],
+                album_data['is_starred'], to_epoch_ms(album_data['first_detected']), to_epoch_ms(now), album_data['status'],
                 album_data.get('album_art_url')
             ))
             album_id = cursor.lastrowid
@@ -401,7 +401,7 @@ def update_database_album(db, album_data, track_data_list):
                 values.append((
                     album_id, t['file_path'], t['file_name'], t['track_title'],
                     t['track_number'], t['track_artist'], t['file_size_mb'],
-                    t['days_old'], t['last_modified'], t['is_starred'], t['navidrome_id'],
+                    t['days_old'], to_epoch_ms(t['last_modified']), t['is_starred'], t['navidrome_id'],
                     t['year']
                 ))
             
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+SSE broker module for SoulSeekarr
+Versioned state broadcasting to Server-Sent Events clients.
+
+The broker holds the latest published state, a dict of sections. Publishing a
+new state compares it with the previous one and, only when something changed,
+bumps the version and emits a delta: dict sections carry just their added or
+changed keys plus a list of removed keys, other sections are replaced whole.
+Every event is encoded once and the same bytes are queued for every
+subscriber.
+
+A new subscriber gets a full snapshot. A reconnecting one (EventSource sends
+the id of the last event it saw as Last-Event-ID) gets the deltas it missed
+when they are still in the recent history, nothing when it is up to date, and
+a snapshot otherwise. Clients apply deltas to their snapshot and can rely on
+versions being consecutive.
+
+Each subscriber has a bounded buffer. When a client falls SSE_MAX_BUFFERED_EVENTS
+behind, its pending events are coalesced into one snapshot of the latest state
+(one-off events are dropped), so a client that stops reading costs at most one
+buffer. A client that has taken nothing from a non-empty buffer for
+SSE_SLOW_CLIENT_SECONDS is evicted: its buffer is released and its stream ends,
+and EventSource reconnects and resumes from its last event id.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SSE_DELTA_HISTORY = 100          # Deltas kept for Last-Event-ID resume
+SSE_KEEPALIVE_SECONDS = 20       # Idle time before a keep-alive comment is sent
+SSE_RETRY_MS = 5000              # Reconnect delay suggested to EventSource
+SSE_MAX_BUFFERED_EVENTS = int(os.environ.get('SSE_MAX_BUFFERED_EVENTS', '64'))    # Per subscriber
+SSE_SLOW_CLIENT_SECONDS = float(os.environ.get('SSE_SLOW_CLIENT_SECONDS', '60'))  # Stalled before eviction
+
+SNAPSHOT_EVENT = 'status_snapshot'
+DELTA_EVENT = 'status_delta'
+
+
+def encode_event(event_type: str, data: Any, event_id: Optional[int] = None) -> bytes:
+    """Serialize one SSE event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+
+def compute_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Optional[Dict[str, Dict]]:
+    """What changed between two states, or None when they are equal."""
+    changed = {}
+    removed = {}
+    for section, value in current.items():
+        before = previous.get(section)
+        if value == before:
+            continue
+        if isinstance(value, dict) and isinstance(before, dict):
+            changed[section] = {key: item for key, item in value.items() if before.get(key) != item}
+            gone = [key for key in before if key not in value]
+            if gone:
+                removed[section] = gone
+        else:
+            changed[section] = value
+    for section in previous:
+        if section not in current:
+            changed[section] = None
+    if not changed and not removed:
+        return None
+    return {'changed': changed, 'removed': removed}
+
+
+class Subscriber:
+    """One client's bounded event buffer."""
+
+    def __init__(self, max_events: int = SSE_MAX_BUFFERED_EVENTS):
+        self.max_events = max_events
+        self.events = deque()
+        self.buffered_bytes = 0
+        self.condition = threading.Condition()
+        self.last_read = time.monotonic()  # When the client last took an event (or connected)
+        self.connected_at = time.time()
+        self.evicted = False
+        self.coalesced = 0
+        self.dropped = 0
+
+    def _append(self, payload: bytes):
+        self.events.append(payload)
+        self.buffered_bytes += len(payload)
+
+    def _clear(self):
+        self.events.clear()
+        self.buffered_bytes = 0
+
+    def offer(self, payload: bytes, snapshot=None):
+        """Queue an event. ``snapshot()`` builds the replacement for a full buffer of
+        state events; without it (one-off events) the event is dropped when full."""
+        with self.condition:
+            if self.evicted:
+                return
+            if len(self.events) >= self.max_events:
+                if snapshot is None:
+                    self.dropped += 1
+                    return
+                self.coalesced += len(self.events)
+                self._clear()
+                payload = snapshot()
+            elif not self.events:
+                # An empty buffer means the client has kept up until now
+                self.last_read = time.monotonic()
+            self._append(payload)
+            self.condition.notify()
+
+    def get(self, timeout: float) -> Optional[bytes]:
+        """Next event, or None on timeout. Raises EOFError once evicted."""
+        with self.condition:
+            if not self.events and not self.evicted:
+                self.condition.wait(timeout)
+            if self.evicted:
+                raise EOFError
+            if not self.events:
+                return None
+            payload = self.events.popleft()
+            self.buffered_bytes -= len(payload)
+            self.last_read = time.monotonic()
+            return payload
+
+    def stalled_for(self, now: float) -> float:
+        """Seconds the client has left a non-empty buffer untouched."""
+        return now - self.last_read if self.events else 0.0
+
+    def evict(self):
+        with self.condition:
+            self.evicted = True
+            self._clear()
+            self.condition.notify()
+
+
+class SSEBroker:
+    """Fans versioned state deltas and ad-hoc events out to subscriber queues."""
+
+    def __init__(self, history: int = SSE_DELTA_HISTORY, max_buffered_events: int = SSE_MAX_BUFFERED_EVENTS,
+                 slow_client_seconds: float = SSE_SLOW_CLIENT_SECONDS):
+        self.lock = threading.Lock()
+        self.version = 0
+        self.state: Dict[str, Any] = {}
+        self.max_buffered_events = max_buffered_events
+        self.slow_client_seconds = slow_client_seconds
+        self._deltas = deque(maxlen=history)  # (version, encoded delta event)
+        self._subscribers: List[Subscriber] = []
+        self._subscribed = threading.Condition(self.lock)  # Notified when a client connects
+        self.evicted_total = 0
+        self.coalesced_total = 0  # Events folded into snapshots by subscribers that left
+        self.dropped_total = 0
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """Register a client, its buffer primed with what it needs to catch up."""
+        subscriber = Subscriber(self.max_buffered_events)
+        with self.lock:
+            catch_up = self._catch_up(last_event_id)
+            if len(catch_up) > self.max_buffered_events:
+                catch_up = [self._snapshot_event()]
+            for payload in catch_up:
+                subscriber.offer(payload)
+            self._subscribers.append(subscriber)
+            self._subscribed.notify_all()
+        return subscriber
+
+    def wait_for_subscribers(self, timeout: Optional[float] = None) -> bool:
+        """Block until at least one client is connected; returns False on timeout.
+
+        Lets the publisher skip building state nobody would receive. The first
+        client after an idle spell gets the last published state, then a delta.
+        """
+        with self.lock:
+            return bool(self._subscribed.wait_for(lambda: self._subscribers, timeout))
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self.lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+                self._retire(subscriber)
+
+    def _retire(self, subscriber: Subscriber):
+        """Fold a departing subscriber's counters into the broker totals."""
+        self.coalesced_total += subscriber.coalesced
+        self.dropped_total += subscriber.dropped
+
+    def _catch_up(self, last_event_id: Optional[str]) -> List[bytes]:
+        """Events that bring a client from ``last_event_id`` to the current version."""
+        try:
+            seen = int(last_event_id) if last_event_id else None
+        except ValueError:
+            seen = None
+
+        if seen == self.version:
+            return []
+        if seen is not None and self._deltas and self._deltas[0][0] <= seen + 1 and seen < self.version:
+            return [payload for version, payload in self._deltas if version > seen]
+        return [self._snapshot_event()]
+
+    def _snapshot_event(self) -> bytes:
+        return encode_event(SNAPSHOT_EVENT, {'version': self.version, 'state': self.state}, self.version)
+
+    def _fan_out(self, payload: bytes, is_state: bool):
+        """Queue an event for every subscriber, coalescing or evicting the ones behind."""
+        snapshot = None
+
+        def build_snapshot():
+            # Built at most once per event and shared by every coalescing subscriber
+            nonlocal snapshot
+            if snapshot is None:
+                snapshot = self._snapshot_event()
+            return snapshot
+
+        now = time.monotonic()
+        for subscriber in list(self._subscribers):
+            if subscriber.stalled_for(now) > self.slow_client_seconds:
+                logger.info(f"Evicting SSE client stalled for {subscriber.stalled_for(now):.0f}s "
+                            f"with {len(subscriber.events)} events pending")
+                subscriber.evict()
+                self._subscribers.remove(subscriber)
+                self._retire(subscriber)
+                self.evicted_total += 1
+                continue
+            subscriber.offer(payload, build_snapshot if is_state else None)
+
+    def publish_state(self, state: Dict[str, Any]) -> bool:
+        """Publish the current state; returns True when it differed and a delta was sent."""
+        with self.lock:
+            delta = compute_delta(self.state, state)
+            if delta is None:
+                return False
+            self.version += 1
+            self.state = state
+            delta['version'] = self.version
+            payload = encode_event(DELTA_EVENT, delta, self.version)
+            self._deltas.append((self.version, payload))
+            self._fan_out(payload, True)
+            return True
+
+    def publish(self, event_type: str, data: Any):
+        """Send a one-off event (not part of the versioned state) to every client."""
+        payload = encode_event(event_type, data)
+        with self.lock:
+            self._fan_out(payload, False)
+
+    def stream(self, last_event_id: Optional[str] = None):
+        """Generator of encoded events for one client, for a streaming response."""
+        subscriber = self.subscribe(last_event_id)
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n".encode('utf-8')
+            while True:
+                try:
+                    payload = subscriber.get(timeout=SSE_KEEPALIVE_SECONDS)
+                except EOFError:
+                    # Evicted as a slow consumer; the client reconnects and resumes
+                    return
+                # A keep-alive comment keeps proxies from closing an idle connection
+                yield payload if payload is not None else b": keep-alive\n\n"
+        finally:
+            self.unsubscribe(subscriber)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Subscriber count, buffer depths and slow-consumer counters."""
+        now = time.monotonic()
+        with self.lock:
+            subscribers = list(self._subscribers)
+            depths = [len(subscriber.events) for subscriber in subscribers]
+            return {
+                'version': self.version,
+                'subscribers': len(subscribers),
+                'queued_events': sum(depths),
+                'queued_bytes': sum(subscriber.buffered_bytes for subscriber in subscribers),
+                'max_queue_depth': max(depths, default=0),
+                'max_stalled_seconds': round(max((subscriber.stalled_for(now) for subscriber in subscribers),
+                                                 default=0.0), 1),
+                'coalesced_events': self.coalesced_total + sum(subscriber.coalesced for subscriber in subscribers),
+                'dropped_events': self.dropped_total + sum(subscriber.dropped for subscriber in subscribers),
+                'evicted_subscribers': self.evicted_total,
+                'deltas_kept': len(self._deltas),
+                'limits': {
+                    'max_buffered_events': self.max_buffered_events,
+                    'slow_client_seconds': self.slow_client_seconds
+                }
+            }
+
+# Global broker instance
+sse_broker = None
+
+def get_sse_broker() -> SSEBroker:
+    """Get the global SSE broker."""
+    global sse_broker
+    if sse_broker is None:
+        sse_broker = SSEBroker()
+    return sse_broker
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Schema repair tests: a table dropped from a current database is re-created by
+ensure_database_exists() (this is how scripts/legacy/wipe_database.py resets albums).
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import DatabaseManager
+from migrations import SCHEMA_VERSION, get_schema_version, missing_tables
+
+
+class EnsureDatabaseExistsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db = DatabaseManager(str(Path(self.tmpdir.name) / "soulseekarr.db"))
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def _schema_objects(self, table):
+        with self.db.get_connection() as conn:
+            return sorted(
+                (row[0], row[1]) for row in conn.execute(
+                    "SELECT type, name FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger')",
+                    (table,)
+                )
+            )
+
+    def test_dropped_album_tables_are_recreated(self):
+        albums_before = self._schema_objects('expiring_albums')
+        tracks_before = self._schema_objects('album_tracks')
+        self.assertTrue(albums_before)
+        self.assertTrue(tracks_before)
+
+        with self.db.get_connection() as conn:
+            conn.execute("DROP TABLE IF EXISTS expiring_albums")
+            conn.execute("DROP TABLE IF EXISTS album_tracks")
+            conn.commit()
+            self.assertEqual(missing_tables(conn), ['expiring_albums', 'album_tracks'])
+
+        self.db.ensure_database_exists()
+
+        with self.db.get_connection() as conn:
+            self.assertEqual(missing_tables(conn), [])
+            self.assertEqual(get_schema_version(conn), SCHEMA_VERSION)
+        self.assertEqual(self._schema_objects('expiring_albums'), albums_before)
+        self.assertEqual(self._schema_objects('album_tracks'), tracks_before)
+
+    def test_track_count_trigger_works_after_repair(self):
+        with self.db.get_connection() as conn:
+            conn.execute("DROP TABLE IF EXISTS expiring_albums")
+            conn.execute("DROP TABLE IF EXISTS album_tracks")
+            conn.commit()
+
+        self.db.ensure_database_exists()
+
+        with self.db.get_connection() as conn:
+            conn.execute("""
+                INSERT INTO expiring_albums
+                (id, album_key, artist, album, directory, file_count, total_size_mb, first_detected, last_seen)
+                VALUES (1, 'artist|album', 'Artist', 'Album', '/media/Artist/Album', 1, 10.0, 0, 0)
+            """)
+            conn.execute("""
+                INSERT INTO album_tracks (album_id, file_path, file_name, file_size_mb, days_old, last_modified)
+                VALUES (1, '/media/Artist/Album/01.flac', '01.flac', 10.0, 10, 0)
+            """)
+            conn.commit()
+            track_count = conn.execute("SELECT track_count FROM expiring_albums WHERE id = 1").fetchone()[0]
+        self.assertEqual(track_count, 1)
+
+    def test_complete_schema_is_left_alone(self):
+        with self.db.get_connection() as conn:
+            conn.execute("INSERT INTO app_settings (key, value) VALUES ('kept', '1')")
+            conn.commit()
+
+        self.db.ensure_database_exists()
+
+        with self.db.get_connection() as conn:
+            row = conn.execute("SELECT value FROM app_settings WHERE key = 'kept'").fetchone()
+        self.assertEqual(row[0], '1')
+
+
+if __name__ == "__main__":
+    unittest.main()
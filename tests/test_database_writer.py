@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Single-writer queue tests: writes submitted while the manager is closing are
+either committed by the writer or applied inline, never left waiting.
+"""
+
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import DatabaseManager
+
+
+def _insert_setting(cursor, key):
+    cursor.execute("INSERT INTO app_settings (key, value) VALUES (?, '1')", (key,))
+
+
+class WriterShutdownTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmpdir.name) / "soulseekarr.db")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_writes_racing_close_all_complete(self):
+        db = DatabaseManager(self.db_path)
+        start = threading.Barrier(5)
+        futures = []
+        futures_lock = threading.Lock()
+
+        def producer(worker):
+            start.wait()
+            for i in range(200):
+                future = db.submit_write(_insert_setting, f"{worker}-{i}", wait=False)
+                with futures_lock:
+                    futures.append(future)
+
+        threads = [threading.Thread(target=producer, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        db.close()
+        for thread in threads:
+            thread.join(timeout=10)
+
+        for future in futures:
+            future.result(timeout=10)
+
+        check = DatabaseManager(self.db_path)
+        try:
+            with check.get_connection() as conn:
+                count = conn.execute("SELECT COUNT(*) FROM app_settings WHERE value = '1'").fetchone()[0]
+            self.assertEqual(count, 800)
+        finally:
+            check.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Execution lease tests: two managers on one database stand in for two processes
+sharing a script, with heartbeats and staleness shortened to fractions of a second.
+"""
+
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import DatabaseManager
+from executor import ScriptExecutor
+from leases import LeaseManager
+
+HEARTBEAT_SECONDS = 0.05
+STALE_SECONDS = 0.5
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class LeaseTests(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        db_path = str(Path(self.tmpdir.name) / "soulseekarr.db")
+        # A database manager each, as two processes would have
+        self.db_a = DatabaseManager(db_path)
+        self.db_b = DatabaseManager(db_path)
+        self.leases_a = LeaseManager(self.db_a, HEARTBEAT_SECONDS, STALE_SECONDS)
+        self.leases_b = LeaseManager(self.db_b, HEARTBEAT_SECONDS, STALE_SECONDS)
+
+    def tearDown(self):
+        self.leases_a.stop()
+        self.leases_b.stop()
+        self.db_a.close()
+        self.db_b.close()
+        self.tmpdir.cleanup()
+
+    def test_live_lease_blocks_second_acquire(self):
+        self.assertIsNone(self.leases_a.acquire("organise_files", run_id=1))
+        # Well past the stale window: only the heartbeats keep the lease live
+        time.sleep(STALE_SECONDS * 2)
+
+        holder = self.leases_b.acquire("organise_files", run_id=2)
+
+        self.assertIsNotNone(holder)
+        self.assertEqual(holder['owner'], self.leases_a.owner)
+        self.assertIsNone(self.leases_b.held("organise_files"))
+
+    def test_stale_lease_is_taken_over(self):
+        self.assertIsNone(self.leases_a.acquire("organise_files", run_id=1))
+        # The holder stops heartbeating, as a crashed process would
+        self.leases_a.stop()
+        time.sleep(STALE_SECONDS * 2)
+
+        self.assertIsNone(self.leases_b.acquire("organise_files", run_id=2))
+        lease = self.db_b.get_execution_leases()[0]
+        self.assertEqual(lease['owner'], self.leases_b.owner)
+        self.assertEqual(lease['run_id'], 2)
+
+    def test_cancel_older_stops_other_holder(self):
+        ran = threading.Event()
+
+        def run(job):
+            ran.set()
+            return 0
+
+        executor = ScriptExecutor(db=self.db_b, workers=1, resource_limits={}, leases=self.leases_b)
+        executor.register('manual', run)
+        # Started before the other holder exists, so its startup cleanup leaves that lease alone
+        executor.start()
+        self.addCleanup(executor.stop)
+
+        self.assertIsNone(self.leases_a.acquire("organise_files", run_id=1))
+        older = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        self.addCleanup(older.kill)
+        self.leases_a.attach("organise_files", pid=older.pid)
+
+        executor.submit("organise_files", 'manual', resources=[], overlap='cancel-older')
+
+        # The holder sees the cancel flag at its next heartbeat and stops its run
+        self.assertEqual(older.wait(timeout=5), -signal.SIGTERM)
+        self.assertEqual(self.leases_a.cancelled_runs, 1)
+        self.assertFalse(ran.is_set())
+
+        # Once the older run gives up its lease, the newer one starts
+        self.leases_a.release("organise_files")
+        self.assertTrue(ran.wait(timeout=5))
+        self.assertTrue(_wait_for(lambda: executor.get_stats()['completed'] == 1))
+
+
+if __name__ == "__main__":
+    unittest.main()